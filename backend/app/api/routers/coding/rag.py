@@ -519,15 +519,14 @@ async def query_coding_rag(
             detail="生成查询向量失败，请检查嵌入服务配置"
         )
 
-    # 检索片段
-    # 如果指定了类型过滤，需要over-fetch以确保过滤后仍有足够数量
-    fetch_multiplier = 3 if request.data_types else 1
-    fetch_top_k = request.top_k * fetch_multiplier
+    # 检索片段（类型过滤在检索时生效，无需 over-fetch）
+    fetch_top_k = request.top_k
 
     chunks = await vector_store.query_chunks(
         project_id=project_id,
         embedding=query_embedding,
-        top_k=fetch_top_k
+        top_k=fetch_top_k,
+        data_types=request.data_types or None,
     )
 
     # 调试日志：记录检索到的原始数据
@@ -5,10 +5,11 @@
 配置管理使用 ImageConfigService，图片生成使用 ImageGenerationService。
 """
 
+import asyncio
 import re
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from fastapi.responses import FileResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -43,7 +44,10 @@ from ...services.image_generation.schemas import (
     PageImageGenerationRequest,
 )
 from ...services.image_generation.pdf_export import PDFExportService
-from ...services.image_generation.fs_utils import get_images_root
+from ...services.image_generation.fs_utils import async_stat, get_images_root
+from ...services.image_generation.progress import get_progress_hub
+from ...services.image_generation.service import build_derivative_urls, schedule_derivative_backfill
+from ...utils.sse_helpers import create_sse_response, sse_event
 
 router = APIRouter(prefix="/image-generation", tags=["image-generation"])
 
@@ -51,6 +55,18 @@ _EXPORT_PDF_PROJECT_RE = re.compile(
     r"^(manga|manga_pro)_(?P<project_id>[0-9a-fA-F-]{36})_ch\d+_\d{8}_\d{6}\.pdf$"
 )
 
+# 进度流的心跳间隔（秒），防止代理因空闲断开连接
+_PROGRESS_KEEPALIVE_INTERVAL = 15.0
+
+# 衍生图按图片ID寻址，同一ID的内容不会变化，允许客户端长期缓存
+_DERIVATIVE_CACHE_CONTROL = "private, max-age=604800"
+
+_DERIVATIVE_MEDIA_TYPES = {
+    ".webp": "image/webp",
+    ".jpg": "image/jpeg",
+    ".png": "image/png",
+}
+
 
 async def _ensure_novel_project_owner(session: AsyncSession, project_id: str, user_id: int) -> None:
     """确保小说项目归属于当前用户（用于图片/导出等跨表资源）。"""
@@ -271,6 +287,34 @@ async def generate_page_image(
     return result
 
 
+@router.get("/progress/stream")
+async def stream_generation_progress(
+    request: Request,
+    project_id: Optional[str] = Query(None, description="只推送该项目的进度"),
+    desktop_user: UserInDB = Depends(get_default_user),
+):
+    """订阅图片生成进度（SSE）
+
+    推送当前用户正在进行的生成任务的进度事件（event: progress），包括开始/结束，
+    以及 ComfyUI 的节点执行（executing）与采样步数（progress）。进度只在当前进程内广播。
+    """
+    hub = get_progress_hub()
+
+    async def event_generator():
+        async with hub.subscribe(desktop_user.id) as queue:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=_PROGRESS_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if project_id and event.get("project_id") != project_id:
+                    continue
+                yield sse_event("progress", event)
+
+    return create_sse_response(event_generator())
+
+
 # ==================== 图片管理 ====================
 
 @router.get(
@@ -297,6 +341,8 @@ async def get_scene_images(
             file_path=img.file_path,
             # Bug 41 修复: 使用正确的路由路径
             url=f"/api/image-generation/files/{project_id}/chapter_{chapter_number}/scene_{scene_id}/{img.file_name}",
+            **build_derivative_urls(img.id),
+            scene_id=scene_id,
             width=img.width,
             height=img.height,
             prompt=img.prompt,
@@ -344,6 +390,7 @@ async def get_chapter_images(
             file_path=img.file_path,
             # Bug 41 修复: 使用正确的路由路径
             url=f"/api/image-generation/files/{project_id}/chapter_{chapter_number}/scene_{img.scene_id}/{img.file_name}",
+            **build_derivative_urls(img.id),
             scene_id=img.scene_id,
             panel_id=img.panel_id,
             image_type=img.image_type,  # 图片类型: panel 或 page
@@ -376,6 +423,80 @@ async def delete_image(
     return {"success": True}
 
 
+async def _serve_image_derivative(
+    request: Request,
+    image_id: int,
+    kind: str,
+    session: AsyncSession,
+    user_id: int,
+) -> Response:
+    """返回图片的衍生图（缺失时即时生成；生成失败退回原图），支持 ETag 协商缓存"""
+    image = await session.get(GeneratedImage, image_id)
+    if not image:
+        raise ResourceNotFoundError("图片", f"ID={image_id}")
+    await _ensure_novel_project_owner(session, str(image.project_id), user_id)
+
+    service = ImageGenerationService(session)
+    if await service.ensure_derivatives(image):
+        await session.commit()
+        relative_path = image.thumbnail_path if kind == "thumbnail" else image.preview_path
+    else:
+        relative_path = image.file_path
+
+    file_path = get_images_root() / relative_path
+    try:
+        stat_result = await async_stat(file_path)
+    except OSError:
+        raise HTTPException(status_code=404, detail="图片不存在")
+
+    etag = f'"{image_id}-{kind}-{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+    headers = {"ETag": etag, "Cache-Control": _DERIVATIVE_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return FileResponse(
+        path=file_path,
+        media_type=_DERIVATIVE_MEDIA_TYPES.get(file_path.suffix.lower(), "image/png"),
+        headers=headers,
+        stat_result=stat_result,
+    )
+
+
+@router.get("/images/{image_id}/thumbnail")
+async def get_image_thumbnail(
+    request: Request,
+    image_id: int,
+    session: AsyncSession = Depends(get_session),
+    desktop_user: UserInDB = Depends(get_default_user),
+):
+    """获取图片缩略图（图片网格使用）"""
+    return await _serve_image_derivative(request, image_id, "thumbnail", session, desktop_user.id)
+
+
+@router.get("/images/{image_id}/preview")
+async def get_image_preview(
+    request: Request,
+    image_id: int,
+    session: AsyncSession = Depends(get_session),
+    desktop_user: UserInDB = Depends(get_default_user),
+):
+    """获取图片预览图（单图查看使用）"""
+    return await _serve_image_derivative(request, image_id, "preview", session, desktop_user.id)
+
+
+@router.post("/novels/{project_id}/images/derivatives/backfill")
+async def backfill_image_derivatives(
+    project_id: str,
+    session: AsyncSession = Depends(get_session),
+    desktop_user: UserInDB = Depends(get_default_user),
+):
+    """在后台为项目中缺少缩略图/预览图的历史图片补生成衍生图"""
+    await _ensure_novel_project_owner(session, project_id, desktop_user.id)
+    schedule_derivative_backfill(project_id)
+    return {"success": True}
+
+
 @router.post("/images/{image_id}/toggle-selection")
 async def toggle_image_selection(
     image_id: int,
@@ -5,7 +5,7 @@
 """
 
 import logging
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict
 
 from fastapi import APIRouter, Depends, File, UploadFile, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -55,15 +55,22 @@ async def import_txt_file(
     if not file.filename or not file.filename.lower().endswith('.txt'):
         raise InvalidParameterError("文件类型", "仅支持TXT文件格式")
 
-    # 读取文件内容
-    file_content = await file.read()
-    if not file_content:
+    # 按块读取文件内容，不把整个文件读入内存
+    block_size = ImportAnalysisService.STREAM_BLOCK_SIZE
+    first_block = await file.read(block_size)
+    if not first_block:
         raise InvalidParameterError("文件内容", "文件内容为空")
 
+    async def file_blocks() -> AsyncIterator[bytes]:
+        block = first_block
+        while block:
+            yield block
+            block = await file.read(block_size)
+
     # 执行导入
-    result = await import_service.import_txt(
+    result = await import_service.import_txt_stream(
         project_id=project_id,
-        file_content=file_content,
+        blocks=file_blocks(),
         user_id=desktop_user.id,
     )
 
@@ -179,13 +179,13 @@ async def continue_optimization_session(
         logger.info("收到新内容，长度: %d", len(content))
 
     session_manager = get_session_manager()
-    session_obj = session_manager.get_session(session_id)
+    session_obj = await session_manager.find_session(session_id)
     if not session_obj:
         raise HTTPException(status_code=404, detail=f"会话不存在或已结束: {session_id}")
     if int(getattr(session_obj, "user_id", 0) or 0) != int(desktop_user.id):
         raise HTTPException(status_code=403, detail="无权访问该会话")
 
-    success = session_manager.resume_session(session_id, content=content)
+    success = await session_manager.resume_session(session_id, content=content)
 
     if success:
         return SessionActionResponse(success=True, message="会话已恢复")
@@ -215,13 +215,13 @@ async def cancel_optimization_session(
     logger.info("用户 %s 请求取消会话 %s", desktop_user.id, session_id)
 
     session_manager = get_session_manager()
-    session_obj = session_manager.get_session(session_id)
+    session_obj = await session_manager.find_session(session_id)
     if not session_obj:
         raise HTTPException(status_code=404, detail=f"会话不存在: {session_id}")
     if int(getattr(session_obj, "user_id", 0) or 0) != int(desktop_user.id):
         raise HTTPException(status_code=403, detail="无权访问该会话")
 
-    success = session_manager.cancel_session(session_id)
+    success = await session_manager.cancel_session(session_id)
 
     if success:
         return SessionActionResponse(success=True, message="会话已取消")
@@ -247,7 +247,7 @@ async def get_optimization_session(
         会话状态信息
     """
     session_manager = get_session_manager()
-    session = session_manager.get_session(session_id)
+    session = await session_manager.find_session(session_id)
 
     if not session:
         raise HTTPException(
@@ -320,6 +320,37 @@ class Settings(BaseSettings):
         env="OLLAMA_EMBEDDING_MODEL",
         description="Ollama 嵌入模型名称",
     )
+    embedding_batch_size: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=2048,
+        env="EMBEDDING_BATCH_SIZE",
+        description="批量嵌入时每个请求包含的文本数，未配置时按提供方使用默认值（openai=64, ollama=32, local=32）",
+    )
+    embedding_batch_concurrency: int = Field(
+        default=2,
+        ge=1,
+        le=16,
+        env="EMBEDDING_BATCH_CONCURRENCY",
+        description="批量嵌入时同时进行的批次数上限（local 提供方固定串行）",
+    )
+    embedding_cache_enabled: bool = Field(
+        default=True,
+        env="EMBEDDING_CACHE_ENABLED",
+        description="是否启用嵌入向量缓存（按 模型+内容哈希 复用已生成的向量）",
+    )
+    embedding_cache_memory_entries: int = Field(
+        default=4096,
+        ge=0,
+        env="EMBEDDING_CACHE_MEMORY_ENTRIES",
+        description="嵌入缓存内存 LRU 层的最大条目数（0 表示只使用磁盘层）",
+    )
+    embedding_cache_max_entries: int = Field(
+        default=200000,
+        ge=1000,
+        env="EMBEDDING_CACHE_MAX_ENTRIES",
+        description="嵌入缓存磁盘层最大条目数，超出后按最近使用时间淘汰",
+    )
     vector_db_url: Optional[str] = Field(
         default="file:storage/vectors.db",
         env="VECTOR_DB_URL",
@@ -354,6 +385,54 @@ class Settings(BaseSettings):
         env="VECTOR_CHUNK_OVERLAP",
         description="章节分块重叠字数",
     )
+    vector_index_enabled: bool = Field(
+        default=True,
+        env="VECTOR_INDEX_ENABLED",
+        description="向量库缺少 vector_distance_cosine 时，是否使用进程内向量索引代替逐次全表扫描",
+    )
+    vector_index_memory_mb: int = Field(
+        default=512,
+        ge=16,
+        env="VECTOR_INDEX_MEMORY_MB",
+        description="进程内向量索引的内存预算（MB），超出后按最近使用淘汰项目索引",
+    )
+    vector_index_ivf_threshold: int = Field(
+        default=50000,
+        ge=0,
+        env="VECTOR_INDEX_IVF_THRESHOLD",
+        description="单个项目向量数达到该值时启用 IVF 近似检索（0 表示始终精确检索）",
+    )
+    vector_index_ivf_nprobe: int = Field(
+        default=32,
+        ge=1,
+        env="VECTOR_INDEX_IVF_NPROBE",
+        description="IVF 近似检索时探查的聚类数，越大召回越高、速度越慢",
+    )
+    rag_lexical_search_enabled: bool = Field(
+        default=True,
+        env="RAG_LEXICAL_SEARCH_ENABLED",
+        description="是否维护 rag_chunks 的 FTS5 全文索引并启用词法/混合检索（需 SQLite 支持 FTS5）",
+    )
+    rag_hybrid_rrf_k: int = Field(
+        default=60,
+        ge=1,
+        env="RAG_HYBRID_RRF_K",
+        description="混合检索倒数排名融合（RRF）的平滑常数，越大各路排名差异的影响越小",
+    )
+    rag_ingest_parallel_types: int = Field(
+        default=4,
+        ge=1,
+        le=16,
+        env="RAG_INGEST_PARALLEL_TYPES",
+        description="项目完整入库时同时处理的数据类型数（每个类型使用独立数据库会话，1 表示顺序执行）",
+    )
+    rag_ingest_max_inflight_embeddings: int = Field(
+        default=4,
+        ge=1,
+        le=32,
+        env="RAG_INGEST_MAX_INFLIGHT_EMBEDDINGS",
+        description="入库时所有数据类型合计同时进行的嵌入批次数",
+    )
 
     # LLM Temperature 配置
     llm_temp_inspiration: float = Field(
@@ -519,6 +598,148 @@ class Settings(BaseSettings):
         env="IMAGE_MAX_CONCURRENT",
         description="图片生成请求最大并发数",
     )
+    image_processing_workers: int = Field(
+        default=2,
+        ge=1,
+        le=16,
+        env="IMAGE_PROCESSING_WORKERS",
+        description="图片后处理（解码/裁切/编码）专用线程数",
+    )
+    image_download_concurrency: int = Field(
+        default=4,
+        ge=1,
+        le=16,
+        env="IMAGE_DOWNLOAD_CONCURRENCY",
+        description="单次生成结果中同时下载的图片数",
+    )
+    image_thumbnail_size: int = Field(
+        default=256,
+        ge=64,
+        le=1024,
+        env="IMAGE_THUMBNAIL_SIZE",
+        description="缩略图长边像素（图片网格使用）",
+    )
+    image_preview_size: int = Field(
+        default=1024,
+        ge=256,
+        le=4096,
+        env="IMAGE_PREVIEW_SIZE",
+        description="预览图长边像素（单图查看使用）",
+    )
+    image_derivative_format: str = Field(
+        default="webp",
+        env="IMAGE_DERIVATIVE_FORMAT",
+        description="缩略图/预览图编码格式：webp 或 jpeg（webp 不可用时自动退回 jpeg）",
+    )
+    image_derivative_quality: int = Field(
+        default=80,
+        ge=30,
+        le=100,
+        env="IMAGE_DERIVATIVE_QUALITY",
+        description="缩略图/预览图编码质量",
+    )
+    image_derivative_backfill_on_startup: bool = Field(
+        default=True,
+        env="IMAGE_DERIVATIVE_BACKFILL_ON_STARTUP",
+        description="启动后在后台为缺少缩略图的历史图片补生成衍生图",
+    )
+    comfyui_websocket_enabled: bool = Field(
+        default=True,
+        env="COMFYUI_WEBSOCKET_ENABLED",
+        description="ComfyUI 通过 /ws 事件流跟踪任务进度与完成（连接中断时退回 /history 轮询）",
+    )
+    reference_image_cache_mb: int = Field(
+        default=64,
+        ge=0,
+        le=1024,
+        env="REFERENCE_IMAGE_CACHE_MB",
+        description="参考图（角色立绘）内存缓存上限（MB），0 表示不缓存",
+    )
+    reference_upload_verify_interval: float = Field(
+        default=300.0,
+        ge=0.0,
+        le=86400.0,
+        env="REFERENCE_UPLOAD_VERIFY_INTERVAL",
+        description="复用已上传到供应商的参考图前，超过该间隔（秒）先确认服务端文件仍存在",
+    )
+    import_analysis_concurrency: int = Field(
+        default=4,
+        ge=1,
+        le=20,
+        env="IMPORT_ANALYSIS_CONCURRENCY",
+        description="导入分析时单个项目同时进行的逐章LLM任务数（仍受LLM队列总并发限制）",
+    )
+    import_analysis_commit_batch: int = Field(
+        default=5,
+        ge=1,
+        le=100,
+        env="IMPORT_ANALYSIS_COMMIT_BATCH",
+        description="导入分析每完成多少章提交一次结果并检查取消状态",
+    )
+
+    # -------------------- HTTP连接池配置 --------------------
+    http_pool_max_connections: int = Field(
+        default=100,
+        ge=1,
+        le=1000,
+        env="HTTP_POOL_MAX_CONNECTIONS",
+        description="每个共享HTTP客户端的最大连接数",
+    )
+    http_pool_max_keepalive: int = Field(
+        default=20,
+        ge=0,
+        le=1000,
+        env="HTTP_POOL_MAX_KEEPALIVE",
+        description="每个共享HTTP客户端保持活跃的最大空闲连接数",
+    )
+    http_pool_keepalive_expiry: float = Field(
+        default=60.0,
+        ge=1.0,
+        env="HTTP_POOL_KEEPALIVE_EXPIRY",
+        description="空闲连接保活时间（秒）",
+    )
+    http_pool_idle_ttl: int = Field(
+        default=600,
+        ge=30,
+        env="HTTP_POOL_IDLE_TTL",
+        description="共享客户端空闲多久后被回收（秒），不同API地址/密钥各自独立计时",
+    )
+    http_pool_http2: bool = Field(
+        default=True,
+        env="HTTP_POOL_HTTP2",
+        description="共享客户端是否启用HTTP/2（需安装h2，未安装时自动降级为HTTP/1.1）",
+    )
+
+    # -------------------- 共享状态（多 worker） --------------------
+    shared_state_backend: str = Field(
+        default="memory",
+        env="SHARED_STATE_BACKEND",
+        description="跨 worker 共享状态后端：memory（单进程）/ sqlite（同机多 worker）/ redis（跨主机）",
+    )
+    shared_state_sqlite_path: Optional[str] = Field(
+        default=None,
+        env="SHARED_STATE_SQLITE_PATH",
+        description="sqlite 后端的数据库文件路径（默认 storage/shared_state.db）",
+    )
+    shared_state_redis_url: Optional[str] = Field(
+        default=None,
+        env="SHARED_STATE_REDIS_URL",
+        description="redis 后端连接地址，如 redis://localhost:6379/0（需安装 redis 包）",
+    )
+    shared_state_slot_ttl: float = Field(
+        default=600.0,
+        ge=30.0,
+        le=7200.0,
+        env="SHARED_STATE_SLOT_TTL",
+        description="跨 worker 并发槽位的租约时长（秒），持有期间自动续期，进程崩溃后到期释放",
+    )
+    shared_state_sync_interval: float = Field(
+        default=1.0,
+        ge=0.1,
+        le=60.0,
+        env="SHARED_STATE_SYNC_INTERVAL",
+        description="本地缓存检查共享版本号的最小间隔（秒）",
+    )
 
     model_config = SettingsConfigDict(
         env_file=_resolve_env_files(),
@@ -559,6 +780,15 @@ class Settings(BaseSettings):
             raise ValueError("EMBEDDING_PROVIDER 仅支持 openai 或 ollama")
         return candidate
 
+    @field_validator("shared_state_backend", mode="before")
+    @classmethod
+    def _normalize_shared_state_backend(cls, value: Optional[str]) -> str:
+        """限制共享状态后端的取值范围。"""
+        candidate = (value or "memory").strip().lower()
+        if candidate not in {"memory", "sqlite", "redis"}:
+            raise ValueError("SHARED_STATE_BACKEND 仅支持 memory、sqlite 或 redis")
+        return candidate
+
     @field_validator("logging_level", mode="before")
     @classmethod
     def _normalize_logging_level(cls, value: Optional[str]) -> str:
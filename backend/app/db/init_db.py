@@ -544,6 +544,17 @@ async def _run_migrations() -> None:
             "image_type",
             "ALTER TABLE generated_images ADD COLUMN image_type VARCHAR(20) DEFAULT 'panel' NOT NULL"
         ),
+        # 衍生图：缩略图与预览图路径
+        (
+            "generated_images",
+            "thumbnail_path",
+            "ALTER TABLE generated_images ADD COLUMN thumbnail_path TEXT"
+        ),
+        (
+            "generated_images",
+            "preview_path",
+            "ALTER TABLE generated_images ADD COLUMN preview_path TEXT"
+        ),
         # 整页提示词列表：存储整页漫画生成所需的提示词
         (
             "chapter_manga_prompts",
@@ -79,12 +79,41 @@ async def lifespan(app: FastAPI):
         await PromptService(session).preload()
         await _preload_embedding_model_if_needed(session)
 
+    if settings.image_derivative_backfill_on_startup:
+        from .services.image_generation.service import schedule_derivative_backfill
+
+        schedule_derivative_backfill()
+
     yield
 
-    # 关闭阶段：清理 HTTP 客户端连接池
-    from .services.image_generation.service import HTTPClientManager
+    from .services.image_generation.service import cancel_derivative_backfill
+
+    await cancel_derivative_backfill()
+
+    from .services.image_generation.providers.comfyui_ws import close_event_streams
+
+    await close_event_streams()
+
+    # 关闭阶段：清理共享 HTTP 客户端连接池（LLM、嵌入、图片下载）
+    from .utils.http_client_pool import close_http_client_pool
+
+    await close_http_client_pool()
+
+    from .services.embedding_cache import close_embedding_cache
+
+    close_embedding_cache()
+
+    from .services.image_generation.image_processing import shutdown_image_executor
+
+    shutdown_image_executor()
+
+    from .utils.llm_request_logger import close_request_logger
+
+    close_request_logger()
+
+    from .services.shared_state import close_shared_state
 
-    await HTTPClientManager.close_client()
+    await close_shared_state()
 
 
 app = FastAPI(
@@ -90,6 +90,9 @@ class GeneratedImage(Base):
     mime_type: Mapped[Optional[str]] = mapped_column(String(50), default="image/png")
     width: Mapped[Optional[int]] = mapped_column(Integer)
     height: Mapped[Optional[int]] = mapped_column(Integer)
+    # 衍生图（相对于storage目录）：网格使用缩略图，单图查看使用预览图；历史图片由后台任务补生成
+    thumbnail_path: Mapped[Optional[str]] = mapped_column(Text(), nullable=True)
+    preview_path: Mapped[Optional[str]] = mapped_column(Text(), nullable=True)
 
     # 生成信息
     prompt: Mapped[Optional[str]] = mapped_column(Text())  # 使用的提示词
@@ -1,6 +1,6 @@
-from typing import Any, Generic, Iterable, List, Optional, TypeVar, Tuple
+from typing import Any, Dict, Generic, Iterable, List, Optional, TypeVar, Tuple
 
-from sqlalchemy import delete, func, inspect, select
+from sqlalchemy import delete, func, inspect, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import InstrumentedAttribute
 
@@ -234,6 +234,19 @@ class BaseRepository(Generic[ModelType]):
         await self.session.flush()
         return instances
 
+    async def bulk_update(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        按主键批量更新（ORM bulk UPDATE，executemany 执行）
+
+        不会同步会话中已加载的实例，调用方需自行避免继续使用这些实例的旧值。
+
+        Args:
+            rows: 每项为包含主键及待更新字段的字典
+        """
+        if not rows:
+            return
+        await self.session.execute(update(self.model), rows)
+
     async def bulk_delete_by_ids(self, ids: List[Any]) -> int:
         """
         根据ID列表批量删除记录
@@ -1,8 +1,11 @@
 """章节大纲数据访问层"""
 
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from .base import BaseRepository
 from ..models.novel import ChapterOutline
@@ -144,3 +147,82 @@ class ChapterOutlineRepository(BaseRepository[ChapterOutline]):
             self.session.add(outline)
             await self.session.flush()
             return outline
+
+    async def bulk_upsert(
+        self,
+        project_id: str,
+        outlines: List[dict]
+    ) -> None:
+        """
+        批量更新或创建章节大纲
+
+        SQLite / PostgreSQL 使用 INSERT ... ON CONFLICT DO UPDATE，MySQL 使用
+        INSERT ... ON DUPLICATE KEY UPDATE（依赖 uq_project_chapter 唯一约束），每批一条语句；
+        其他数据库回退为一次查询已有大纲后批量更新、批量插入。
+        同一批次中重复的章节号以最后一项为准。不会同步会话中已加载的大纲实例。
+
+        Args:
+            project_id: 项目ID
+            outlines: 大纲数据列表，每项包含 chapter_number、title、summary
+        """
+        if not outlines:
+            return
+
+        rows_by_number: Dict[int, dict] = {}
+        for item in outlines:
+            rows_by_number[item["chapter_number"]] = {
+                "project_id": project_id,
+                "chapter_number": item["chapter_number"],
+                "title": item.get("title", ""),
+                "summary": item.get("summary"),
+            }
+        rows = list(rows_by_number.values())
+
+        dialect = self.session.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql", "mysql"):
+            for offset in range(0, len(rows), _UPSERT_CHUNK_SIZE):
+                await self.session.execute(
+                    _build_upsert_statement(dialect, rows[offset:offset + _UPSERT_CHUNK_SIZE])
+                )
+            return
+
+        result = await self.session.execute(
+            select(ChapterOutline.chapter_number, ChapterOutline.id).where(
+                ChapterOutline.project_id == project_id,
+                ChapterOutline.chapter_number.in_(list(rows_by_number)),
+            )
+        )
+        existing: Dict[int, int] = dict(result.all())
+
+        updates = []
+        inserts = []
+        for row in rows:
+            outline_id = existing.get(row["chapter_number"])
+            if outline_id is not None:
+                updates.append({"id": outline_id, "title": row["title"], "summary": row["summary"]})
+            else:
+                inserts.append(row)
+
+        await self.bulk_update(updates)
+        if inserts:
+            await self.session.execute(insert(ChapterOutline), inserts)
+
+
+# 单条 upsert 语句的最大行数（每行 4 个参数，远低于 SQLite 的参数上限）
+_UPSERT_CHUNK_SIZE = 500
+
+
+def _build_upsert_statement(dialect: str, rows: List[dict]):
+    """按数据库方言构造多行 upsert 语句（冲突键为 project_id + chapter_number）"""
+    if dialect == "mysql":
+        stmt = mysql_insert(ChapterOutline).values(rows)
+        return stmt.on_duplicate_key_update(
+            title=stmt.inserted.title,
+            summary=stmt.inserted.summary,
+        )
+
+    stmt = (sqlite_insert if dialect == "sqlite" else postgresql_insert)(ChapterOutline).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[ChapterOutline.project_id, ChapterOutline.chapter_number],
+        set_={"title": stmt.excluded.title, "summary": stmt.excluded.summary},
+    )
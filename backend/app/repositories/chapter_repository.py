@@ -14,9 +14,9 @@
     新代码建议直接从各自文件导入。
 """
 
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.orm import selectinload
 
 from .base import BaseRepository
@@ -85,6 +85,38 @@ class ChapterRepository(BaseRepository[Chapter]):
         result = await self.session.execute(stmt)
         return result.scalars().first()
 
+    async def get_with_versions_by_number(
+        self,
+        project_id: str,
+        chapter_number: int
+    ) -> Optional[Chapter]:
+        """
+        根据项目ID和章节号获取章节，仅预加载章节展示所需的版本与评审
+
+        用于单章节详情接口，避免为读取一个章节而加载整个项目的章节树。
+
+        Args:
+            project_id: 项目ID
+            chapter_number: 章节号
+
+        Returns:
+            章节实例，不存在返回None
+        """
+        stmt = (
+            select(Chapter)
+            .where(
+                Chapter.project_id == project_id,
+                Chapter.chapter_number == chapter_number
+            )
+            .options(
+                selectinload(Chapter.versions),
+                selectinload(Chapter.selected_version),
+                selectinload(Chapter.evaluations),
+            )
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
+
     async def get_by_project_and_numbers(
         self,
         project_id: str,
@@ -187,6 +219,42 @@ class ChapterRepository(BaseRepository[Chapter]):
         await self.session.refresh(chapter)
         return chapter
 
+    async def ensure_chapter_ids(
+        self,
+        project_id: str,
+        chapter_numbers: List[int]
+    ) -> Dict[int, int]:
+        """
+        批量获取或创建章节，返回章节号到章节ID的映射
+
+        缺失的章节以 executemany 批量插入后再查询ID（不依赖 RETURNING，兼容 MySQL）。
+        不会把新建章节加入会话的实例缓存。
+
+        Args:
+            project_id: 项目ID
+            chapter_numbers: 章节号列表
+
+        Returns:
+            {章节号: 章节ID}
+        """
+        if not chapter_numbers:
+            return {}
+
+        stmt = select(Chapter.chapter_number, Chapter.id).where(
+            Chapter.project_id == project_id,
+            Chapter.chapter_number.in_(chapter_numbers),
+        )
+        ids: Dict[int, int] = dict((await self.session.execute(stmt)).all())
+
+        missing = [number for number in chapter_numbers if number not in ids]
+        if missing:
+            await self.session.execute(
+                insert(Chapter),
+                [{"project_id": project_id, "chapter_number": number} for number in missing],
+            )
+            ids = dict((await self.session.execute(stmt)).all())
+        return ids
+
 
 # 模块级导出（向后兼容）
 __all__ = [
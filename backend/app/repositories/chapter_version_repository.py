@@ -1,8 +1,8 @@
 """章节版本数据访问层"""
 
-from typing import Iterable, List
+from typing import Dict, Iterable, List
 
-from sqlalchemy import delete, select
+from sqlalchemy import delete, insert, select
 
 from .base import BaseRepository
 from ..models.novel import ChapterVersion
@@ -75,3 +75,41 @@ class ChapterVersionRepository(BaseRepository[ChapterVersion]):
             self.session.add_all(versions)
         await self.session.flush()
         return versions
+
+    async def replace_single_versions(
+        self,
+        contents: Dict[int, str],
+        version_label: str = "v1"
+    ) -> Dict[int, int]:
+        """
+        批量替换多个章节的版本，每个章节只保留一个新版本
+
+        删除、插入各一条 executemany 语句，再一次查询新版本ID（不依赖 RETURNING）。
+
+        Args:
+            contents: {章节ID: 版本内容}
+            version_label: 版本标签
+
+        Returns:
+            {章节ID: 新版本ID}
+        """
+        if not contents:
+            return {}
+
+        chapter_ids = list(contents)
+        await self.session.execute(
+            delete(ChapterVersion).where(ChapterVersion.chapter_id.in_(chapter_ids))
+        )
+        await self.session.execute(
+            insert(ChapterVersion),
+            [
+                {"chapter_id": chapter_id, "content": content, "version_label": version_label}
+                for chapter_id, content in contents.items()
+            ],
+        )
+        result = await self.session.execute(
+            select(ChapterVersion.chapter_id, ChapterVersion.id).where(
+                ChapterVersion.chapter_id.in_(chapter_ids)
+            )
+        )
+        return dict(result.all())
@@ -1,10 +1,10 @@
-from typing import Iterable, Optional, Tuple
+from typing import Collection, Iterable, Optional, Tuple
 
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 
 from .base import BaseRepository, RelationOptionsMixin
-from ..models import Chapter, ChapterOutline, NovelProject
+from ..models import Chapter, ChapterOutline, ChapterVersion, NovelProject
 from ..models.novel import NovelBlueprint
 
 
@@ -38,6 +38,49 @@ class NovelRepository(RelationOptionsMixin, BaseRepository[NovelProject]):
             ),
         ]
 
+    def _relation_load_option(self, relation: str):
+        """
+        单个关联的加载选项（用于按需加载）
+
+        chapters 只加载计算版本序号所需的版本列，不加载版本正文、评审和选中版本。
+        """
+        if relation == "chapters":
+            return selectinload(NovelProject.chapters).selectinload(Chapter.versions).load_only(
+                ChapterVersion.id,
+                ChapterVersion.chapter_id,
+                ChapterVersion.created_at,
+            )
+        return selectinload(getattr(NovelProject, relation))
+
+    async def get_owner_id(self, project_id: str) -> Optional[int]:
+        """只查询项目所属用户ID（用于权限校验，不加载任何关联数据）"""
+        stmt = select(NovelProject.user_id).where(NovelProject.id == project_id)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def get_with_partial_relations(
+        self,
+        project_id: str,
+        relations: Collection[str],
+    ) -> Optional[NovelProject]:
+        """
+        按需加载项目关联数据
+
+        Args:
+            project_id: 项目ID
+            relations: 需要加载的关联名（characters、relationships_、outlines、
+                conversations、part_outlines、chapters），蓝图总是加载
+
+        Returns:
+            项目实例，不存在返回None
+        """
+        options = [selectinload(NovelProject.blueprint)]
+        options.extend(self._relation_load_option(relation) for relation in relations)
+        stmt = select(NovelProject).where(NovelProject.id == project_id)
+        stmt = self._apply_load_options(stmt, options)
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
+
     async def count_all(self) -> int:
         """统计所有项目数量"""
         result = await self.session.execute(select(func.count(NovelProject.id)))
@@ -20,6 +20,21 @@ class PartOutlineRepository(BaseRepository[PartOutline]):
         """获取指定项目的特定部分大纲"""
         return await self.get(project_id=project_id, part_number=part_number)
 
+    async def get_by_part_numbers(self, project_id: str, part_numbers: List[int]) -> List[PartOutline]:
+        """一次查询获取指定项目的多个部分大纲，按part_number升序排列（不存在的编号忽略）"""
+        if not part_numbers:
+            return []
+        stmt = (
+            select(PartOutline)
+            .where(
+                PartOutline.project_id == project_id,
+                PartOutline.part_number.in_(set(part_numbers)),
+            )
+            .order_by(PartOutline.part_number)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
     # delete_by_project_id 已在 BaseRepository 中实现，无需重复定义
 
     async def delete_from_part(self, project_id: str, from_part: int) -> int:
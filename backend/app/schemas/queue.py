@@ -2,7 +2,7 @@
 队列相关的Pydantic数据模型
 """
 
-from typing import Optional
+from typing import Dict, Optional
 from pydantic import BaseModel, Field
 
 
@@ -12,6 +12,11 @@ class QueueStatus(BaseModel):
     waiting: int = Field(..., description="等待中的请求数")
     max_concurrent: int = Field(..., description="最大并发数")
     total_processed: int = Field(..., description="已处理的请求总数")
+    waiting_by_priority: Dict[str, int] = Field(default_factory=dict, description="按优先级统计的等待数")
+    wait_histogram: Dict[str, int] = Field(default_factory=dict, description="排队等待时长分布（毫秒分桶）")
+    wait_avg_ms: float = Field(0.0, description="平均排队等待时长（毫秒）")
+    wait_max_ms: float = Field(0.0, description="最长排队等待时长（毫秒）")
+    cancelled: int = Field(0, description="排队期间被取消的请求数")
 
 
 class QueueStatusResponse(BaseModel):
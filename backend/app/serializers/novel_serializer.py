@@ -6,7 +6,7 @@
 
 import json
 import logging
-from typing import Dict, List, Optional
+from typing import Collection, Dict, FrozenSet, List, Optional
 
 from ..models.novel import (
     Chapter,
@@ -29,6 +29,27 @@ from ..schemas.novel import (
 from .part_outline_serializer import build_part_outline_schema
 
 
+# 各区段序列化实际用到的项目关联（蓝图总是需要），供服务层按需加载
+SECTION_RELATIONS: Dict[NovelSectionType, FrozenSet[str]] = {
+    NovelSectionType.OVERVIEW: frozenset(),
+    NovelSectionType.WORLD_SETTING: frozenset(),
+    NovelSectionType.CHARACTERS: frozenset({"characters"}),
+    NovelSectionType.RELATIONSHIPS: frozenset({"relationships_"}),
+    NovelSectionType.CHAPTER_OUTLINE: frozenset({"outlines", "part_outlines"}),
+    NovelSectionType.CHAPTERS: frozenset({"outlines", "chapters"}),
+}
+
+# 项目Schema序列化用到的关联（章节版本只需要ID与创建时间）
+PROJECT_SCHEMA_RELATIONS: FrozenSet[str] = frozenset({
+    "characters",
+    "relationships_",
+    "outlines",
+    "conversations",
+    "part_outlines",
+    "chapters",
+})
+
+
 class NovelSerializer:
     """
     小说项目序列化器
@@ -113,7 +134,10 @@ class NovelSerializer:
         )
 
     @staticmethod
-    def build_blueprint_schema(project: NovelProject) -> Blueprint:
+    def build_blueprint_schema(
+        project: NovelProject,
+        relations: Optional[Collection[str]] = None,
+    ) -> Blueprint:
         """
         构建蓝图Schema
 
@@ -121,12 +145,19 @@ class NovelSerializer:
 
         Args:
             project: 项目ORM模型
+            relations: 只序列化这些已加载的关联（None表示全部），
+                未包含的关联返回空列表，避免触发异步会话中的懒加载
 
         Returns:
             Blueprint: 蓝图Schema
         """
         blueprint_obj = project.blueprint
 
+        def _related(name: str) -> list:
+            if relations is not None and name not in relations:
+                return []
+            return getattr(project, name)
+
         if blueprint_obj:
             return Blueprint(
                 title=blueprint_obj.title or "",
@@ -148,7 +179,7 @@ class NovelSerializer:
                         "relationship_to_protagonist": character.relationship_to_protagonist,
                         **(character.extra or {}),
                     }
-                    for character in sorted(project.characters, key=lambda c: c.position)
+                    for character in sorted(_related("characters"), key=lambda c: c.position)
                 ],
                 relationships=[
                     {
@@ -156,7 +187,7 @@ class NovelSerializer:
                         "character_to": relation.character_to,
                         "description": relation.description or "",
                     }
-                    for relation in sorted(project.relationships_, key=lambda r: r.position)
+                    for relation in sorted(_related("relationships_"), key=lambda r: r.position)
                 ],
                 chapter_outline=[
                     ChapterOutlineSchema(
@@ -164,14 +195,14 @@ class NovelSerializer:
                         title=outline.title,
                         summary=outline.summary or "",
                     )
-                    for outline in sorted(project.outlines, key=lambda o: o.chapter_number)
+                    for outline in sorted(_related("outlines"), key=lambda o: o.chapter_number)
                 ],
                 needs_part_outlines=blueprint_obj.needs_part_outlines,
                 total_chapters=blueprint_obj.total_chapters,
                 chapters_per_part=blueprint_obj.chapters_per_part,
                 part_outlines=[
                     build_part_outline_schema(part)
-                    for part in sorted(project.part_outlines, key=lambda p: p.part_number)
+                    for part in sorted(_related("part_outlines"), key=lambda p: p.part_number)
                 ],
                 avatar_svg=blueprint_obj.avatar_svg,
                 avatar_animal=blueprint_obj.avatar_animal,
@@ -207,7 +238,7 @@ class NovelSerializer:
         根据请求的区段类型，返回相应的数据片段。
 
         Args:
-            project: 项目ORM模型
+            project: 项目ORM模型（至少预加载 SECTION_RELATIONS[section] 中的关联）
             section: 区段类型（概览、世界设定、角色等）
 
         Returns:
@@ -216,7 +247,9 @@ class NovelSerializer:
         Raises:
             ValueError: 未知的区段类型
         """
-        blueprint = NovelSerializer.build_blueprint_schema(project)
+        if section not in SECTION_RELATIONS:
+            raise ValueError(f"未知的区段类型: {section}")
+        blueprint = NovelSerializer.build_blueprint_schema(project, SECTION_RELATIONS[section])
 
         if section == NovelSectionType.OVERVIEW:
             data = {
@@ -309,9 +342,39 @@ class NovelSerializer:
         outlines = outlines_map or {outline.chapter_number: outline for outline in project.outlines}
         chapters = chapters_map or {chapter.chapter_number: chapter for chapter in project.chapters}
 
-        outline = outlines.get(chapter_number)
-        chapter = chapters.get(chapter_number)
+        return NovelSerializer.build_chapter_schema_from(
+            chapter_number,
+            outline=outlines.get(chapter_number),
+            chapter=chapters.get(chapter_number),
+            include_content=include_content,
+        )
+
+    @staticmethod
+    def build_chapter_schema_from(
+        chapter_number: int,
+        *,
+        outline: Optional[ChapterOutline],
+        chapter: Optional[Chapter],
+        include_content: bool = True,
+    ) -> ChapterSchema:
+        """
+        由单个章节大纲与章节记录构建章节Schema
+
+        不依赖项目对象，单章节接口可只查询目标章节。
+
+        Args:
+            chapter_number: 章节号
+            outline: 章节大纲（可为None）
+            chapter: 章节记录（可为None；include_content=True 时需预加载
+                versions、selected_version、evaluations）
+            include_content: 是否包含完整内容（默认True）
 
+        Returns:
+            ChapterSchema: 章节Schema
+
+        Raises:
+            ValueError: 章节不存在
+        """
         if not outline and not chapter:
             raise ValueError(f"章节 {chapter_number} 不存在")
 
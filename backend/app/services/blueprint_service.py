@@ -28,6 +28,7 @@ from ..services.vector_store_service import VectorStoreService
 from ..services.chapter_ingest_service import ChapterIngestionService
 from ..utils.json_utils import parse_llm_json_safe
 from .blueprint_base import BlueprintServiceBase
+from .entity_matcher import invalidate_entity_matcher
 from ..utils.exception_helpers import log_exception
 
 logger = logging.getLogger(__name__)
@@ -116,6 +117,7 @@ class BlueprintService(BlueprintServiceBase):
         await self._replace_blueprint_characters(project_id, blueprint.characters)
         await self._replace_blueprint_relationships(project_id, blueprint.relationships)
         await self._replace_chapter_outlines(project_id, blueprint.chapter_outline)
+        invalidate_entity_matcher(project_id)
 
     async def patch_blueprint(self, project_id: str, patch: Dict) -> None:
         """
@@ -146,6 +148,7 @@ class BlueprintService(BlueprintServiceBase):
             await self._replace_blueprint_relationships(project_id, patch["relationships"])
         if "chapter_outline" in patch and patch["chapter_outline"] is not None:
             await self._replace_chapter_outlines(project_id, patch["chapter_outline"])
+        invalidate_entity_matcher(project_id)
 
     async def cleanup_old_blueprint_data(
         self,
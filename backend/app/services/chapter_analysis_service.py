@@ -6,7 +6,7 @@
 """
 
 import logging
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -14,6 +14,7 @@ from ..schemas.novel import ChapterAnalysisData
 from ..services.llm_service import LLMService
 from ..services.llm_wrappers import call_llm_json, LLMProfile
 from ..services.prompt_service import PromptService
+from ..services.queue import RequestPriority
 from ..utils.json_utils import parse_llm_json_with_context
 
 logger = logging.getLogger(__name__)
@@ -115,6 +116,13 @@ class ChapterAnalysisService:
             timeout=timeout,
         )
 
+    async def load_system_prompt(self) -> Optional[str]:
+        """加载章节分析提示词"""
+        return await self.prompt_service.get_prompt_or_default(
+            "chapter_analysis",
+            logger=logger,
+        )
+
     async def analyze_chapter(
         self,
         content: str,
@@ -123,6 +131,10 @@ class ChapterAnalysisService:
         novel_title: str,
         user_id: Optional[int] = None,
         timeout: float = 300.0,
+        *,
+        system_prompt: Optional[str] = None,
+        cached_config: Optional[Dict[str, Optional[str]]] = None,
+        priority: RequestPriority = RequestPriority.NORMAL,
     ) -> Optional[ChapterAnalysisData]:
         """
         分析章节内容，提取结构化信息
@@ -134,6 +146,9 @@ class ChapterAnalysisService:
             novel_title: 小说标题
             user_id: 用户ID（用于LLM配置）
             timeout: 超时时间（秒）
+            system_prompt: 预先加载的分析提示词（可选，批量分析时只查询一次）
+            cached_config: 预先解析的LLM配置（可选，并发分析时避免共享Session查询）
+            priority: 排队优先级（批量任务使用 BACKGROUND）
 
         Returns:
             ChapterAnalysisData: 分析结果，失败返回None
@@ -147,10 +162,8 @@ class ChapterAnalysisService:
             return None
 
         # 获取分析提示词
-        system_prompt = await self.prompt_service.get_prompt_or_default(
-            "chapter_analysis",
-            logger=logger,
-        )
+        if system_prompt is None:
+            system_prompt = await self.load_system_prompt()
         if not system_prompt:
             logger.error("未找到chapter_analysis提示词，跳过章节分析")
             return None
@@ -177,6 +190,8 @@ class ChapterAnalysisService:
                 user_content=user_message,
                 user_id=user_id or 0,
                 timeout_override=timeout,
+                cached_config=cached_config,
+                priority=priority,
             )
 
             # 解析JSON响应
@@ -267,8 +267,10 @@ class EnhancedChapterContextService:
         """
         # 1. 构建增强查询
         blueprint_characters = []
+        world_setting = None
         if blueprint_info:
             blueprint_characters = blueprint_info.characters
+            world_setting = blueprint_info.world_setting
 
         enhanced_query = self._query_builder.build_queries(
             outline=outline,
@@ -276,6 +278,8 @@ class EnhancedChapterContextService:
             prev_chapter_analysis=prev_chapter_analysis,
             pending_foreshadowing=pending_foreshadowing,
             writing_notes=writing_notes,
+            world_setting=world_setting,
+            project_id=project_id,
         )
 
         logger.debug(
@@ -294,8 +298,16 @@ class EnhancedChapterContextService:
                 user_id=user_id,
             )
 
-            if main_embedding:
-                # 性能优化：并行执行chunk和summary的时序感知检索
+            # 词法检索：主查询文本 + 实体关键词（角色/地点/物品），与向量检索做排名融合
+            # 未开启或 SQLite 不支持 FTS5 时全部走向量检索
+            lexical_enabled = (
+                settings.rag_lexical_search_enabled
+                and await self._vector_store.lexical_search_available()
+            )
+            entity_keywords = self._entity_keywords(enhanced_query) if lexical_enabled else []
+
+            if main_embedding or entity_keywords:
+                # 性能优化：并行执行chunk和summary的时序感知检索（摘要检索需要向量）
                 chunks, summaries = await asyncio.gather(
                     self._temporal_retriever.retrieve_chunks_with_temporal(
                         project_id=project_id,
@@ -303,6 +315,8 @@ class EnhancedChapterContextService:
                         target_chapter=chapter_number,
                         total_chapters=total_chapters,
                         top_k=top_k_chunks,
+                        query_text=enhanced_query.main_query if lexical_enabled else None,
+                        keywords=entity_keywords,
                     ),
                     self._temporal_retriever.retrieve_summaries_with_temporal(
                         project_id=project_id,
@@ -310,7 +324,7 @@ class EnhancedChapterContextService:
                         target_chapter=chapter_number,
                         total_chapters=total_chapters,
                         top_k=top_k_summaries,
-                    ),
+                    ) if main_embedding else asyncio.sleep(0, result=[]),
                 )
 
                 logger.info(
@@ -323,6 +337,7 @@ class EnhancedChapterContextService:
                     await self._supplement_character_retrieval(
                         project_id=project_id,
                         character_queries=enhanced_query.character_queries,
+                        character_names=self._character_names(enhanced_query) if lexical_enabled else None,
                         chapter_number=chapter_number,
                         total_chapters=total_chapters,
                         user_id=user_id,
@@ -360,6 +375,26 @@ class EnhancedChapterContextService:
             compressed_context=compressed_context,
         )
 
+    @staticmethod
+    def _character_names(enhanced_query: EnhancedQuery) -> List[str]:
+        """从实体提示中取出角色名（去掉“名字(身份)”形式的身份后缀并去重）"""
+        names: List[str] = []
+        for hint in enhanced_query.entity_hints.get("characters", []):
+            name = hint.split("(", 1)[0].strip()
+            if name and name not in names:
+                names.append(name)
+        return names
+
+    @classmethod
+    def _entity_keywords(cls, enhanced_query: EnhancedQuery) -> List[str]:
+        """词法检索使用的实体关键词：角色名、地点、物品"""
+        keywords = cls._character_names(enhanced_query)
+        for category in ("locations", "items"):
+            for value in enhanced_query.entity_hints.get(category, []):
+                if value and value not in keywords:
+                    keywords.append(value)
+        return keywords
+
     async def _supplement_character_retrieval(
         self,
         project_id: str,
@@ -369,17 +404,37 @@ class EnhancedChapterContextService:
         user_id: int,
         existing_chunks: List[RetrievedChunk],
         max_additional: int,
+        character_names: Optional[List[str]] = None,
     ) -> None:
         """补充角色相关的检索结果
 
         当主查询结果不足时，使用角色查询补充检索
 
-        性能优化：并行获取多个角色查询的embedding和检索结果
+        提供角色名时按角色名做词法检索，无需为每个角色请求嵌入；
+        未提供角色名或词法检索没有命中时，并行获取多个角色查询的embedding和检索结果
         """
         if not self._temporal_retriever or max_additional <= 0:
             return
 
         existing_contents = {c.content[:ContextConstants.CONTENT_DEDUP_PREFIX_LENGTH] for c in existing_chunks}
+
+        if character_names:
+            all_char_chunks = await asyncio.gather(*[
+                self._temporal_retriever.retrieve_chunks_with_temporal(
+                    project_id=project_id,
+                    query_embedding=None,
+                    target_chapter=chapter_number,
+                    total_chapters=total_chapters,
+                    top_k=ContextConstants.CHARACTER_RETRIEVAL_TOP_K,
+                    keywords=[name],
+                )
+                for name in character_names[:ContextConstants.MAX_CHARACTER_QUERIES]
+            ])
+            if any(all_char_chunks):
+                self._merge_supplement_chunks(all_char_chunks, existing_chunks, existing_contents, max_additional)
+                return
+            logger.debug("角色名词法检索无结果，改用向量检索补充: project=%s", project_id)
+
         queries_to_process = character_queries[:ContextConstants.MAX_CHARACTER_QUERIES]
 
         if not queries_to_process:
@@ -414,8 +469,16 @@ class EnhancedChapterContextService:
             for _, embedding in valid_pairs
         ]
         all_char_chunks = await asyncio.gather(*retrieval_tasks)
+        self._merge_supplement_chunks(all_char_chunks, existing_chunks, existing_contents, max_additional)
 
-        # 去重并添加
+    @staticmethod
+    def _merge_supplement_chunks(
+        all_char_chunks: List[List[RetrievedChunk]],
+        existing_chunks: List[RetrievedChunk],
+        existing_contents: set,
+        max_additional: int,
+    ) -> None:
+        """去重并添加补充检索结果"""
         for char_chunks in all_char_chunks:
             for chunk in char_chunks:
                 if chunk.content[:ContextConstants.CONTENT_DEDUP_PREFIX_LENGTH] not in existing_contents:
@@ -251,23 +251,21 @@ class ChapterEvaluationService:
                     )
 
                     if query_embedding:
-                        # 检索相关历史片段
+                        # 检索相关历史片段（只检索当前章节之前的片段）
                         chunks = await self.vector_store.query_chunks(
                             project_id=project.id,
                             embedding=query_embedding,
                             top_k=5,
+                            max_chapter=chapter_number - 1,
                         )
-                        # 过滤：只保留当前章节之前的片段
-                        chunks = [c for c in chunks if c.chapter_number < chapter_number]
 
-                        # 检索相关摘要
+                        # 检索相关摘要（只检索当前章节之前的摘要）
                         summaries = await self.vector_store.query_summaries(
                             project_id=project.id,
                             embedding=query_embedding,
                             top_k=3,
+                            max_chapter=chapter_number - 1,
                         )
-                        # 过滤：只保留当前章节之前的摘要
-                        summaries = [s for s in summaries if s.chapter_number < chapter_number]
 
                         # 格式化检索结果
                         for chunk in chunks:
@@ -25,6 +25,7 @@ from ...utils.blueprint_utils import prepare_blueprint_for_generation
 from ...utils.writer_helpers import extract_tail_excerpt
 from ...exceptions import LLMConfigurationError
 from ..llm_service import LLMService
+from ..queue import RequestPriority
 
 from .context import ChapterGenerationContext
 from .prompt_builder import ChapterPromptBuilder
@@ -379,6 +380,8 @@ class ChapterGenerationService:
                         temperature=settings.llm_temp_summary,
                         user_id=user_id,
                         timeout=LLMConstants.SUMMARY_GENERATION_TIMEOUT,
+                        # 补全历史摘要属于后台批量工作，不应挤占交互请求的槽位
+                        priority=RequestPriority.BACKGROUND,
                     )
                     return (chapter, remove_think_tags(summary), None)
                 except Exception as exc:
@@ -134,7 +134,7 @@ class ContentOptimizationAgent:
 
         # 同步会话进度状态
         if self.optimization_session:
-            self.session_manager.update_progress(
+            await self.session_manager.update_progress(
                 session_id,
                 current_paragraph=state.current_index,
                 total_paragraphs=len(state.paragraphs),
@@ -281,7 +281,7 @@ class ContentOptimizationAgent:
 
                 # 同步会话进度（在工具执行后，段落索引可能已变化）
                 if self.optimization_session:
-                    self.session_manager.update_progress(
+                    await self.session_manager.update_progress(
                         self.optimization_session.session_id,
                         current_paragraph=state.current_index,
                         total_paragraphs=len(state.paragraphs),
@@ -315,7 +315,7 @@ class ContentOptimizationAgent:
                             })
 
                             # 暂停会话
-                            self.session_manager.pause_session(self.optimization_session.session_id)
+                            await self.session_manager.pause_session(self.optimization_session.session_id)
 
                             # 等待用户操作（继续或取消）
                             can_continue = await self.session_manager.wait_if_paused(
@@ -484,7 +484,7 @@ class ContentOptimizationAgent:
                 })
 
                 # 暂停会话，等待用户选择
-                self.session_manager.pause_session(self.optimization_session.session_id)
+                await self.session_manager.pause_session(self.optimization_session.session_id)
 
                 can_continue = await self.session_manager.wait_if_paused(
                     self.optimization_session.session_id,
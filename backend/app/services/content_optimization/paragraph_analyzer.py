@@ -9,6 +9,13 @@ import re
 from typing import List, Optional, Tuple
 
 from .schemas import ParagraphAnalysis
+from ..entity_matcher import (
+    KIND_CHARACTER,
+    KIND_LOCATION,
+    EntityMatch,
+    EntityMatcher,
+    get_entity_matcher,
+)
 from ..scene_descriptor import SceneDescriptor
 
 logger = logging.getLogger(__name__)
@@ -18,18 +25,53 @@ MIN_PARAGRAPH_LENGTH = 50
 # 最大段落长度（字符），超过此长度会尝试拆分
 MAX_PARAGRAPH_LENGTH = 800
 
+# 未匹配到已知角色时的人物称谓模式（两字或三字名）
+_CHARACTER_FALLBACK_PATTERNS = (
+    re.compile(r'([A-Z][a-z]+)'),  # 英文名
+    re.compile(r'([\u4e00-\u9fa5]{2,4})(?:道|说|想|看|走|笑|哭|问|答)'),  # 动作前的名字
+)
+
+# 场景模式（按优先级）
+_SCENE_PATTERNS = (
+    re.compile(r'在([\u4e00-\u9fa5]{2,8}(?:里|中|内|外|上|下|旁|边))'),
+    re.compile(r'([\u4e00-\u9fa5]{2,6}(?:殿|宫|府|院|室|房|堂|阁|楼|亭|园|山|河|湖|海))'),
+    re.compile(r'来到([\u4e00-\u9fa5]{2,8})'),
+    re.compile(r'走进([\u4e00-\u9fa5]{2,8})'),
+)
+
+# 时间标记：固定词表用自动机一次扫描，带数词的模式用正则（按优先级）
+_TIME_OF_DAY = "time_of_day"
+_RELATIVE_DAY = "relative_day"
+_TIME_KEYWORD_MATCHER = EntityMatcher(
+    [(word, word, _TIME_OF_DAY) for word in (
+        "清晨", "早上", "上午", "中午", "下午", "傍晚", "黄昏", "夜晚", "深夜", "凌晨",
+        "子时", "丑时", "寅时", "卯时", "辰时", "巳时", "午时", "未时", "申时", "酉时", "戌时", "亥时",
+    )]
+    + [(word, word, _RELATIVE_DAY) for word in ("次日", "翌日", "当天", "那天", "今日", "明日", "昨日")]
+)
+_TIME_PATTERNS = (
+    re.compile(r'(第[一二三四五六七八九十百千]+[天日年月])'),
+    re.compile(r'([一二三四五六七八九十]+[天日年月](?:后|前|之后|之前))'),
+)
+
 
 class ParagraphAnalyzer:
     """段落分析器"""
 
-    def __init__(self, known_characters: Optional[List[str]] = None):
+    def __init__(
+        self,
+        known_characters: Optional[List[str]] = None,
+        matcher: Optional[EntityMatcher] = None,
+    ):
         """
         初始化段落分析器
 
         Args:
             known_characters: 已知角色名列表（用于角色识别）
+            matcher: 项目实体匹配器（角色、别名、地点）；默认按 known_characters 构建
         """
         self.known_characters = known_characters or []
+        self.matcher = matcher or get_entity_matcher(self.known_characters)
 
     def split_paragraphs(self, content: str, merge_short: bool = False) -> List[str]:
         """
@@ -173,11 +215,14 @@ class ParagraphAnalyzer:
         Returns:
             段落分析结果
         """
+        # 一次扫描段落，得到已知实体的全部命中
+        matches = self.matcher.find_all(paragraph)
+
         # 提取角色
-        characters = self._extract_characters(paragraph)
+        characters = self._extract_characters(paragraph, matches)
 
         # 提取场景
-        scene = self._extract_scene(paragraph)
+        scene = self._extract_scene(paragraph, matches)
 
         # 提取时间标记
         time_marker = self._extract_time_marker(paragraph)
@@ -198,59 +243,64 @@ class ParagraphAnalyzer:
             key_actions=key_actions,
         )
 
-    def _extract_characters(self, text: str) -> List[str]:
+    def _extract_characters(
+        self,
+        text: str,
+        matches: Optional[List[EntityMatch]] = None,
+    ) -> List[str]:
         """
         从文本中提取角色
 
-        优先匹配已知角色，然后尝试提取常见的角色称谓模式
+        优先匹配已知角色（含别名），然后尝试提取常见的角色称谓模式
 
         Args:
             text: 文本内容
+            matches: 已扫描得到的实体命中（未提供时扫描 text）
 
         Returns:
-            角色名列表
+            角色名列表（按出现顺序）
         """
-        found = []
+        if matches is None:
+            matches = self.matcher.find_all(text)
 
         # 匹配已知角色
-        for char in self.known_characters:
-            if char in text:
-                found.append(char)
+        found = EntityMatcher.names(matches, KIND_CHARACTER)
 
         # 如果没有匹配到已知角色，尝试提取常见模式
         if not found:
-            # 匹配常见的人物称谓模式（两字或三字名）
             # 注意：这是一个简化的实现，实际使用中可能需要NER
-            patterns = [
-                r'([A-Z][a-z]+)',  # 英文名
-                r'([\u4e00-\u9fa5]{2,4})(?:道|说|想|看|走|笑|哭|问|答)',  # 动作前的名字
-            ]
-            for pattern in patterns:
-                matches = re.findall(pattern, text)
-                found.extend(matches[:3])  # 限制数量
+            for pattern in _CHARACTER_FALLBACK_PATTERNS:
+                for name in pattern.findall(text)[:3]:  # 限制数量
+                    if name not in found:
+                        found.append(name)
 
-        return list(set(found))[:5]  # 去重并限制数量
+        return found[:5]  # 限制数量
 
-    def _extract_scene(self, text: str) -> Optional[str]:
+    def _extract_scene(
+        self,
+        text: str,
+        matches: Optional[List[EntityMatch]] = None,
+    ) -> Optional[str]:
         """
         提取场景/地点
 
         Args:
             text: 文本内容
+            matches: 已扫描得到的实体命中（未提供时扫描 text）
 
         Returns:
             场景描述
         """
-        # 常见的场景关键词
-        scene_patterns = [
-            r'在([\u4e00-\u9fa5]{2,8}(?:里|中|内|外|上|下|旁|边))',
-            r'([\u4e00-\u9fa5]{2,6}(?:殿|宫|府|院|室|房|堂|阁|楼|亭|园|山|河|湖|海))',
-            r'来到([\u4e00-\u9fa5]{2,8})',
-            r'走进([\u4e00-\u9fa5]{2,8})',
-        ]
+        if matches is None:
+            matches = self.matcher.find_all(text)
+
+        # 优先使用世界观中的已知地点
+        known_locations = EntityMatcher.names(matches, KIND_LOCATION)
+        if known_locations:
+            return known_locations[0]
 
-        for pattern in scene_patterns:
-            match = re.search(pattern, text)
+        for pattern in _SCENE_PATTERNS:
+            match = pattern.search(text)
             if match:
                 return match.group(1)
 
@@ -266,19 +316,22 @@ class ParagraphAnalyzer:
         Returns:
             时间标记
         """
-        # 时间相关的关键词模式
-        time_patterns = [
-            r'(清晨|早上|上午|中午|下午|傍晚|黄昏|夜晚|深夜|凌晨|午时|子时|丑时|寅时|卯时|辰时|巳时|午时|未时|申时|酉时|戌时|亥时)',
-            r'(第[一二三四五六七八九十百千]+[天日年月])',
-            r'([一二三四五六七八九十]+[天日年月](?:后|前|之后|之前))',
-            r'(次日|翌日|当天|那天|今日|明日|昨日)',
-        ]
+        keyword_matches = _TIME_KEYWORD_MATCHER.find_all(text)
 
-        for pattern in time_patterns:
-            match = re.search(pattern, text)
+        # 优先级：时段词 > 第N天 > N天后 > 相对日期词
+        time_of_day = EntityMatcher.names(keyword_matches, _TIME_OF_DAY)
+        if time_of_day:
+            return time_of_day[0]
+
+        for pattern in _TIME_PATTERNS:
+            match = pattern.search(text)
             if match:
                 return match.group(1)
 
+        relative_day = EntityMatcher.names(keyword_matches, _RELATIVE_DAY)
+        if relative_day:
+            return relative_day[0]
+
         return None
 
     def _analyze_emotion_tone(self, text: str) -> Optional[str]:
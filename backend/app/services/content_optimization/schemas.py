@@ -314,6 +314,7 @@ class OptimizationContext(BaseModel):
     chapter_number: int = Field(..., description="章节号")
     blueprint_core: Optional[str] = Field(default=None, description="蓝图核心信息")
     character_names: List[str] = Field(default_factory=list, description="已知角色名")
+    location_names: List[str] = Field(default_factory=list, description="世界观中的已知地点")
     style_guide: Optional[str] = Field(default=None, description="风格指南")
     prev_chapter_ending: Optional[str] = Field(default=None, description="前章结尾")
     total_chapters: int = Field(default=0, description="小说总章节数（用于时序感知检索）")
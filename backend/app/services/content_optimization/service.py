@@ -65,7 +65,7 @@ class ContentOptimizationService:
         """
         user_id = int(user_id)
         # 创建优化会话（用于review模式的暂停/继续控制）
-        opt_session = self.session_manager.create_session(
+        opt_session = await self.session_manager.create_session(
             project_id=project_id,
             chapter_number=chapter_number,
             user_id=user_id,
@@ -91,9 +91,9 @@ class ContentOptimizationService:
 
         finally:
             # 清理会话
-            self.session_manager.remove_session(opt_session.session_id)
+            await self.session_manager.remove_session(opt_session.session_id)
 
-    def continue_session(self, session_id: str) -> bool:
+    async def continue_session(self, session_id: str) -> bool:
         """
         继续暂停的会话
 
@@ -103,9 +103,9 @@ class ContentOptimizationService:
         Returns:
             是否成功继续
         """
-        return self.session_manager.resume_session(session_id)
+        return await self.session_manager.resume_session(session_id)
 
-    def cancel_session(self, session_id: str) -> bool:
+    async def cancel_session(self, session_id: str) -> bool:
         """
         取消会话
 
@@ -115,9 +115,9 @@ class ContentOptimizationService:
         Returns:
             是否成功取消
         """
-        return self.session_manager.cancel_session(session_id)
+        return await self.session_manager.cancel_session(session_id)
 
-    def get_session(self, session_id: str) -> Optional[OptimizationSession]:
+    async def get_session(self, session_id: str) -> Optional[OptimizationSession]:
         """
         获取会话信息
 
@@ -127,7 +127,7 @@ class ContentOptimizationService:
         Returns:
             会话对象或None
         """
-        return self.session_manager.get_session(session_id)
+        return await self.session_manager.find_session(session_id)
 
     async def get_paragraph_preview(
         self,
@@ -3,6 +3,10 @@
 
 管理正文优化的会话状态，支持暂停/继续控制。
 使用asyncio.Event实现线程安全的等待/通知机制。
+
+多 worker 部署时，SSE 流所在的 worker 持有会话对象，而继续/取消请求可能落到其他 worker。
+会话元信息（用户、进度、暂停状态）发布到共享状态后端，其他 worker 据此校验权限并写入
+继续/取消信号；持有会话的 worker 在暂停等待期间轮询信号。
 """
 
 import asyncio
@@ -11,7 +15,9 @@ import threading
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
+
+from ..shared_state import get_shared_state
 
 logger = logging.getLogger(__name__)
 
@@ -69,11 +75,72 @@ class OptimizationSessionManager:
     # 会话超时时间（分钟）
     SESSION_TIMEOUT_MINUTES = 30
 
+    # 暂停等待期间轮询跨 worker 信号的间隔（秒）
+    SIGNAL_POLL_INTERVAL = 0.5
+
     def __init__(self):
         self._sessions: Dict[str, OptimizationSession] = {}
         self._cleanup_task: Optional[asyncio.Task] = None
 
-    def create_session(
+    # ------------------------------------------------------------------
+    # 跨 worker 共享
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _meta_key(session_id: str) -> str:
+        return f"opt_session:{session_id}"
+
+    @staticmethod
+    def _signal_key(session_id: str, signal: str) -> str:
+        return f"opt_session:{session_id}:{signal}"
+
+    async def _publish(self, session: OptimizationSession) -> None:
+        """发布会话元信息（非分布式后端时跳过）"""
+        backend = get_shared_state()
+        if not backend.distributed:
+            return
+        await backend.set_value(
+            self._meta_key(session.session_id),
+            {
+                "project_id": session.project_id,
+                "chapter_number": session.chapter_number,
+                "user_id": session.user_id,
+                "created_at": session.created_at.isoformat(),
+                "is_paused": session.is_paused,
+                "is_cancelled": session.is_cancelled,
+                "current_paragraph": session.current_paragraph,
+                "total_paragraphs": session.total_paragraphs,
+            },
+            ttl=self.SESSION_TIMEOUT_MINUTES * 60,
+        )
+
+    async def _poll_signals(self, session: OptimizationSession) -> None:
+        """读取其他 worker 写入的取消/继续信号并应用到本地会话"""
+        backend = get_shared_state()
+        if not backend.distributed:
+            return
+        if await backend.pop_value(self._signal_key(session.session_id, "cancel")) is not None:
+            await self.cancel_session(session.session_id)
+            return
+        resume = await backend.pop_value(self._signal_key(session.session_id, "resume"))
+        if resume is not None:
+            await self.resume_session(session.session_id, content=resume.get("content"))
+
+    async def _send_signal(self, session_id: str, signal: str, payload: Dict[str, Any]) -> bool:
+        """向持有会话的 worker 发送信号；会话不存在时返回 False"""
+        backend = get_shared_state()
+        if not backend.distributed:
+            return False
+        if await backend.get_value(self._meta_key(session_id)) is None:
+            return False
+        await backend.set_value(
+            self._signal_key(session_id, signal),
+            payload,
+            ttl=self.SESSION_TIMEOUT_MINUTES * 60,
+        )
+        return True
+
+    async def create_session(
         self,
         project_id: str,
         chapter_number: int,
@@ -97,6 +164,7 @@ class OptimizationSessionManager:
             user_id=int(user_id),
         )
         self._sessions[session_id] = session
+        await self._publish(session)
 
         logger.info(
             "创建优化会话: session_id=%s, project=%s, chapter=%d",
@@ -106,10 +174,38 @@ class OptimizationSessionManager:
         return session
 
     def get_session(self, session_id: str) -> Optional[OptimizationSession]:
-        """获取会话"""
+        """获取本 worker 持有的会话"""
         return self._sessions.get(session_id)
 
-    def pause_session(self, session_id: str) -> bool:
+    async def find_session(self, session_id: str) -> Optional[OptimizationSession]:
+        """
+        查找会话（本 worker 优先，其次读取其他 worker 发布的元信息快照）
+
+        快照只用于权限校验与状态展示，不能用于暂停控制。
+        """
+        session = self._sessions.get(session_id)
+        if session is not None:
+            return session
+
+        backend = get_shared_state()
+        if not backend.distributed:
+            return None
+        meta = await backend.get_value(self._meta_key(session_id))
+        if meta is None:
+            return None
+        return OptimizationSession(
+            session_id=session_id,
+            project_id=meta["project_id"],
+            chapter_number=meta["chapter_number"],
+            user_id=meta["user_id"],
+            created_at=datetime.fromisoformat(meta["created_at"]),
+            is_paused=meta["is_paused"],
+            is_cancelled=meta["is_cancelled"],
+            current_paragraph=meta["current_paragraph"],
+            total_paragraphs=meta["total_paragraphs"],
+        )
+
+    async def pause_session(self, session_id: str) -> bool:
         """
         暂停会话
 
@@ -130,11 +226,12 @@ class OptimizationSessionManager:
 
         session.is_paused = True
         session.pause_event.clear()  # 清除事件，使await会阻塞
+        await self._publish(session)
 
         logger.info("暂停会话: %s", session_id)
         return True
 
-    def resume_session(self, session_id: str, content: Optional[str] = None) -> bool:
+    async def resume_session(self, session_id: str, content: Optional[str] = None) -> bool:
         """
         继续会话
 
@@ -147,6 +244,10 @@ class OptimizationSessionManager:
         """
         session = self._sessions.get(session_id)
         if not session:
+            # 会话可能由其他 worker 持有
+            if await self._send_signal(session_id, "resume", {"content": content}):
+                logger.info("已向其他 worker 发送继续信号: %s", session_id)
+                return True
             logger.warning("尝试继续不存在的会话: %s", session_id)
             return False
 
@@ -161,11 +262,12 @@ class OptimizationSessionManager:
 
         session.is_paused = False
         session.pause_event.set()  # 设置事件，解除await阻塞
+        await self._publish(session)
 
         logger.info("继续会话: %s", session_id)
         return True
 
-    def cancel_session(self, session_id: str) -> bool:
+    async def cancel_session(self, session_id: str) -> bool:
         """
         取消会话
 
@@ -177,6 +279,9 @@ class OptimizationSessionManager:
         """
         session = self._sessions.get(session_id)
         if not session:
+            if await self._send_signal(session_id, "cancel", {}):
+                logger.info("已向其他 worker 发送取消信号: %s", session_id)
+                return True
             logger.warning("尝试取消不存在的会话: %s", session_id)
             return False
 
@@ -184,11 +289,12 @@ class OptimizationSessionManager:
         # 如果会话处于暂停状态，需要解除阻塞让它可以检测到取消
         if session.is_paused:
             session.pause_event.set()
+        await self._publish(session)
 
         logger.info("取消会话: %s", session_id)
         return True
 
-    def remove_session(self, session_id: str):
+    async def remove_session(self, session_id: str):
         """
         移除会话
 
@@ -199,7 +305,16 @@ class OptimizationSessionManager:
             del self._sessions[session_id]
             logger.info("移除会话: %s", session_id)
 
-    def update_progress(
+        backend = get_shared_state()
+        if backend.distributed:
+            for key in (
+                self._meta_key(session_id),
+                self._signal_key(session_id, "resume"),
+                self._signal_key(session_id, "cancel"),
+            ):
+                await backend.delete_value(key)
+
+    async def update_progress(
         self,
         session_id: str,
         current_paragraph: int,
@@ -222,6 +337,7 @@ class OptimizationSessionManager:
 
         session.current_paragraph = current_paragraph
         session.total_paragraphs = total_paragraphs
+        await self._publish(session)
         return True
 
     async def wait_if_paused(
@@ -244,6 +360,8 @@ class OptimizationSessionManager:
         if not session:
             return False
 
+        await self._poll_signals(session)
+
         if session.is_cancelled:
             return False
 
@@ -251,11 +369,27 @@ class OptimizationSessionManager:
             return True
 
         try:
-            # 等待继续信号，带超时
-            await asyncio.wait_for(
-                session.pause_event.wait(),
-                timeout=timeout
-            )
+            if get_shared_state().distributed:
+                # 分段等待，期间轮询其他 worker 写入的继续/取消信号
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + timeout
+                while not session.pause_event.is_set():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError
+                    try:
+                        await asyncio.wait_for(
+                            session.pause_event.wait(),
+                            timeout=min(self.SIGNAL_POLL_INTERVAL, remaining),
+                        )
+                    except asyncio.TimeoutError:
+                        await self._poll_signals(session)
+            else:
+                # 等待继续信号，带超时
+                await asyncio.wait_for(
+                    session.pause_event.wait(),
+                    timeout=timeout
+                )
 
             # 检查是否被取消
             if session.is_cancelled:
@@ -267,7 +401,7 @@ class OptimizationSessionManager:
             logger.warning("会话等待超时: %s", session_id)
             return False
 
-    def cleanup_expired_sessions(self):
+    async def cleanup_expired_sessions(self):
         """清理过期会话"""
         now = datetime.now()
         timeout = timedelta(minutes=self.SESSION_TIMEOUT_MINUTES)
@@ -279,7 +413,7 @@ class OptimizationSessionManager:
         ]
 
         for session_id in expired:
-            self.remove_session(session_id)
+            await self.remove_session(session_id)
 
         if expired:
             logger.info("清理了 %d 个过期会话", len(expired))
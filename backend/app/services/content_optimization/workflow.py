@@ -21,6 +21,7 @@ from .agent import ContentOptimizationAgent
 from .tool_executor import ToolExecutor, AgentState
 from .session_manager import OptimizationSession
 from ...utils.sse_helpers import sse_event
+from ..entity_matcher import get_entity_matcher
 
 logger = logging.getLogger(__name__)
 
@@ -85,7 +86,15 @@ class ContentOptimizationWorkflow:
             context = await self._load_context(project_id, chapter_number)
 
             # 初始化段落分析器
-            paragraph_analyzer = ParagraphAnalyzer(known_characters=context.character_names)
+            matcher = get_entity_matcher(
+                context.character_names,
+                locations=context.location_names,
+                project_id=project_id,
+            )
+            paragraph_analyzer = ParagraphAnalyzer(
+                known_characters=context.character_names,
+                matcher=matcher,
+            )
 
             # 阶段2: 分段
             all_paragraphs = paragraph_analyzer.split_paragraphs(request.content)
@@ -219,6 +228,15 @@ class ContentOptimizationWorkflow:
                 c.name for c in project.characters if c.name
             ]
 
+        # 获取世界观中的关键地点（用于场景识别）
+        location_names = []
+        if project and project.blueprint and isinstance(project.blueprint.world_setting, dict):
+            location_names = [
+                loc.get("name") if isinstance(loc, dict) else loc
+                for loc in project.blueprint.world_setting.get("key_locations") or []
+            ]
+            location_names = [name for name in location_names if isinstance(name, str) and name]
+
         # 获取前章结尾
         prev_chapter_ending = None
         if chapter_number > 1:
@@ -246,6 +264,7 @@ class ContentOptimizationWorkflow:
             chapter_number=chapter_number,
             blueprint_core=blueprint_core,
             character_names=character_names,
+            location_names=location_names,
             style_guide=style_guide,
             prev_chapter_ending=prev_chapter_ending,
             total_chapters=total_chapters,
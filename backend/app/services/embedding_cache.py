@@ -0,0 +1,362 @@
+"""
+嵌入向量缓存
+
+按 (模型, 文本内容哈希) 复用已经生成过的嵌入向量，避免强制重建、完整性修复、
+重复检索时对相同文本反复调用嵌入服务。
+
+两级结构：
+- 内存 LRU：热点查询（如每章都会检索的角色名）直接命中
+- 磁盘 SQLite：与 vectors.db 同目录的 embedding_cache.db，进程重启后仍可复用
+
+磁盘层按最近使用时间做容量淘汰，所有磁盘操作在线程池中执行，不阻塞事件循环。
+"""
+
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 每累计写入多少条后检查一次磁盘容量
+_EVICTION_CHECK_INTERVAL = 512
+# 触发淘汰后保留的容量比例（留出余量，避免频繁淘汰）
+_EVICTION_TARGET_RATIO = 0.9
+
+
+def compute_text_hash(text: str) -> str:
+    """计算文本内容哈希（与入库记录 get_content_hash 同算法，取完整摘要以降低碰撞）"""
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+
+def _resolve_cache_path() -> Path:
+    """解析缓存文件路径：本地向量库时放在 vectors.db 同目录，否则放在 storage 目录"""
+    url = settings.vector_db_url or ""
+    if url.startswith("file:"):
+        path_part = url.split("file:", 1)[1]
+        path_obj = Path(path_part).expanduser()
+        if not path_obj.is_absolute():
+            path_obj = settings.storage_dir.parent / path_part
+        return path_obj.resolve().parent / "embedding_cache.db"
+    return settings.storage_dir / "embedding_cache.db"
+
+
+class EmbeddingCache:
+    """
+    嵌入向量两级缓存（内存 LRU + SQLite）
+
+    键为 (model_key, content_hash)，model_key 由调用方组合提供方与模型名，
+    避免不同提供方的同名模型互相污染。
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        *,
+        memory_entries: Optional[int] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self._path = path or _resolve_cache_path()
+        self._memory_entries = (
+            settings.embedding_cache_memory_entries if memory_entries is None else memory_entries
+        )
+        self._max_entries = max_entries or settings.embedding_cache_max_entries
+
+        self._memory: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_lock = threading.Lock()
+        self._disk_available = True
+        self._writes_since_check = 0
+
+        self._stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # 对外接口
+    # ------------------------------------------------------------------
+
+    async def get_many(self, model_key: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        批量查询缓存
+
+        Returns:
+            与 texts 等长的列表，未命中位置为 None
+        """
+        hashes = [compute_text_hash(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        disk_lookup: Dict[str, List[int]] = {}
+
+        with self._memory_lock:
+            for idx, content_hash in enumerate(hashes):
+                key = (model_key, content_hash)
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    results[idx] = vector
+                    self._stats["memory_hits"] += 1
+                else:
+                    disk_lookup.setdefault(content_hash, []).append(idx)
+
+        if disk_lookup:
+            found = await asyncio.to_thread(self._disk_get, model_key, list(disk_lookup))
+            for content_hash, indices in disk_lookup.items():
+                vector = found.get(content_hash)
+                if vector is None:
+                    self._stats["misses"] += len(indices)
+                    continue
+                self._stats["disk_hits"] += len(indices)
+                self._remember(model_key, content_hash, vector)
+                for idx in indices:
+                    results[idx] = vector
+
+        return results
+
+    async def get(self, model_key: str, text: str) -> Optional[List[float]]:
+        """查询单条缓存"""
+        return (await self.get_many(model_key, [text]))[0]
+
+    async def set_many(
+        self,
+        model_key: str,
+        items: Sequence[Tuple[str, List[float]]],
+    ) -> None:
+        """批量写入缓存（items 为 (text, embedding)，空向量会被忽略）"""
+        entries = [
+            (compute_text_hash(text), list(embedding))
+            for text, embedding in items
+            if embedding
+        ]
+        if not entries:
+            return
+
+        for content_hash, vector in entries:
+            self._remember(model_key, content_hash, vector)
+
+        await asyncio.to_thread(self._disk_set, model_key, entries)
+
+    async def set(self, model_key: str, text: str, embedding: List[float]) -> None:
+        """写入单条缓存"""
+        await self.set_many(model_key, [(text, embedding)])
+
+    def get_stats(self) -> Dict[str, object]:
+        """获取命中统计（用于诊断缓存效果）"""
+        lookups = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["misses"]
+        hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+        with self._memory_lock:
+            memory_size = len(self._memory)
+        return {
+            **self._stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_size": memory_size,
+            "path": str(self._path),
+            "disk_available": self._disk_available,
+        }
+
+    async def clear(self, model_key: Optional[str] = None) -> None:
+        """清空缓存（指定 model_key 时只清除该模型的条目）"""
+        with self._memory_lock:
+            if model_key is None:
+                self._memory.clear()
+            else:
+                for key in [k for k in self._memory if k[0] == model_key]:
+                    del self._memory[key]
+        await asyncio.to_thread(self._disk_clear, model_key)
+
+    def close(self) -> None:
+        """关闭磁盘连接"""
+        with self._disk_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------------
+    # 内存层
+    # ------------------------------------------------------------------
+
+    def _remember(self, model_key: str, content_hash: str, vector: List[float]) -> None:
+        """写入内存 LRU，超出容量时淘汰最久未使用的条目"""
+        if self._memory_entries <= 0:
+            return
+        key = (model_key, content_hash)
+        with self._memory_lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._memory_entries:
+                self._memory.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # 磁盘层（在线程池中执行）
+    # ------------------------------------------------------------------
+
+    def _get_conn(self) -> Optional[sqlite3.Connection]:
+        """延迟打开 SQLite 连接并建表，失败时降级为纯内存缓存"""
+        if self._conn is not None or not self._disk_available:
+            return self._conn
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._path), check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    model_key TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    dimension INTEGER NOT NULL,
+                    embedding BLOB NOT NULL,
+                    last_used_at REAL NOT NULL,
+                    PRIMARY KEY (model_key, content_hash)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_used "
+                "ON embedding_cache(last_used_at)"
+            )
+            conn.commit()
+            self._conn = conn
+            logger.info("嵌入缓存已启用: %s", self._path)
+        except Exception as exc:
+            self._disk_available = False
+            logger.warning("嵌入缓存磁盘层不可用，仅使用内存缓存: path=%s error=%s", self._path, exc)
+        return self._conn
+
+    def _disk_get(self, model_key: str, hashes: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        with self._disk_lock:
+            conn = self._get_conn()
+            if conn is None:
+                return found
+            try:
+                # SQLite 变量数上限默认 999，分批查询
+                for start in range(0, len(hashes), 500):
+                    part = hashes[start:start + 500]
+                    placeholders = ",".join("?" for _ in part)
+                    rows = conn.execute(
+                        f"SELECT content_hash, embedding FROM embedding_cache "
+                        f"WHERE model_key = ? AND content_hash IN ({placeholders})",
+                        [model_key, *part],
+                    ).fetchall()
+                    for content_hash, blob in rows:
+                        vector = array("f")
+                        vector.frombytes(blob)
+                        found[content_hash] = vector.tolist()
+                if found:
+                    now = time.time()
+                    conn.executemany(
+                        "UPDATE embedding_cache SET last_used_at = ? "
+                        "WHERE model_key = ? AND content_hash = ?",
+                        [(now, model_key, content_hash) for content_hash in found],
+                    )
+                    conn.commit()
+            except Exception as exc:
+                logger.warning("读取嵌入缓存失败: %s", exc)
+        return found
+
+    def _disk_set(self, model_key: str, entries: List[Tuple[str, List[float]]]) -> None:
+        with self._disk_lock:
+            conn = self._get_conn()
+            if conn is None:
+                return
+            now = time.time()
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache "
+                    "(model_key, content_hash, dimension, embedding, last_used_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (model_key, content_hash, len(vector), array("f", vector).tobytes(), now)
+                        for content_hash, vector in entries
+                    ],
+                )
+                conn.commit()
+            except Exception as exc:
+                logger.warning("写入嵌入缓存失败: %s", exc)
+                return
+
+            self._stats["writes"] += len(entries)
+            self._writes_since_check += len(entries)
+            if self._writes_since_check >= _EVICTION_CHECK_INTERVAL:
+                self._writes_since_check = 0
+                self._evict_if_needed(conn)
+
+    def _evict_if_needed(self, conn: sqlite3.Connection) -> None:
+        """磁盘条目超出上限时，按最近使用时间淘汰到目标比例"""
+        try:
+            total = conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+            if total <= self._max_entries:
+                return
+            target = int(self._max_entries * _EVICTION_TARGET_RATIO)
+            excess = total - target
+            conn.execute(
+                "DELETE FROM embedding_cache WHERE rowid IN ("
+                "SELECT rowid FROM embedding_cache ORDER BY last_used_at ASC LIMIT ?)",
+                (excess,),
+            )
+            conn.commit()
+            self._stats["evictions"] += excess
+            logger.info("嵌入缓存淘汰: 删除=%d 剩余=%d", excess, target)
+        except Exception as exc:
+            logger.warning("嵌入缓存淘汰失败: %s", exc)
+
+    def _disk_clear(self, model_key: Optional[str]) -> None:
+        with self._disk_lock:
+            conn = self._get_conn()
+            if conn is None:
+                return
+            try:
+                if model_key is None:
+                    conn.execute("DELETE FROM embedding_cache")
+                else:
+                    conn.execute("DELETE FROM embedding_cache WHERE model_key = ?", (model_key,))
+                conn.commit()
+            except Exception as exc:
+                logger.warning("清空嵌入缓存失败: %s", exc)
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """获取全局嵌入缓存实例（未启用时返回 None）"""
+    global _embedding_cache
+    if not settings.embedding_cache_enabled:
+        return None
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache()
+    return _embedding_cache
+
+
+def close_embedding_cache() -> None:
+    """关闭全局嵌入缓存（应用关闭时调用）"""
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is not None:
+            _embedding_cache.close()
+            _embedding_cache = None
+
+
+__all__ = [
+    "EmbeddingCache",
+    "compute_text_hash",
+    "get_embedding_cache",
+    "close_embedding_cache",
+]
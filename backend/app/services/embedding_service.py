@@ -9,13 +9,12 @@ import asyncio
 import logging
 import threading
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import httpx
 from openai import (
     APIConnectionError,
     APITimeoutError,
-    AsyncOpenAI,
     AuthenticationError,
     BadRequestError,
     RateLimitError,
@@ -26,13 +25,17 @@ from ..core.config import settings
 from ..exceptions import LLMConfigurationError, InvalidParameterError
 from ..repositories.embedding_config_repository import EmbeddingConfigRepository
 from ..utils.encryption import decrypt_api_key
+from ..utils.http_client_pool import get_http_client_pool
+from .embedding_cache import get_embedding_cache
 
 logger = logging.getLogger(__name__)
 
 try:  # pragma: no cover - 运行环境未安装时兼容
     from ollama import AsyncClient as OllamaAsyncClient
+    from ollama import ResponseError as OllamaResponseError
 except ImportError:  # pragma: no cover - Ollama 为可选依赖
     OllamaAsyncClient = None
+    OllamaResponseError = Exception
 
 # 本地嵌入模型支持（延迟导入，避免启动时加载 PyTorch）
 # sentence-transformers 依赖 PyTorch，首次导入需要 10-60 秒
@@ -535,6 +538,13 @@ embedding_preloader = EmbeddingPreloader.instance()
 class EmbeddingService:
     """嵌入向量服务，负责文本向量化"""
 
+    # 各提供方单次批量请求包含的默认文本数（可通过 EMBEDDING_BATCH_SIZE 统一覆盖）
+    DEFAULT_BATCH_SIZES: Dict[str, int] = {
+        "openai": 64,
+        "ollama": 32,
+        "local": 32,
+    }
+
     def __init__(self, session: AsyncSession):
         self.session = session
         self._embedding_repo = EmbeddingConfigRepository(session)
@@ -547,6 +557,7 @@ class EmbeddingService:
         user_id: Optional[int] = None,
         model: Optional[str] = None,
         max_retries: int = 3,
+        config: Optional[Dict[str, Any]] = None,
     ) -> List[float]:
         """
         生成文本向量，用于章节 RAG 检索。
@@ -554,21 +565,216 @@ class EmbeddingService:
         只使用数据库中激活的嵌入配置，不再回退到环境变量。
         支持 OpenAI 兼容 API 和本地 Ollama 两种提供方。
         对于可重试错误（网络/超时/限流），会进行最多 max_retries 次重试。
+        相同 模型+文本 的向量会命中嵌入缓存，不再重复调用提供方。
 
         Args:
             text: 要嵌入的文本
             user_id: 用户ID
             model: 可选的模型名称覆盖
             max_retries: 最大重试次数，默认3次
+            config: 预先解析的嵌入配置（见 resolve_config），提供时不再查询数据库
 
         Returns:
             嵌入向量列表，失败时返回空列表
 
+        Raises:
+            LLMConfigurationError: 当没有配置激活的嵌入模型时抛出
+        """
+        provider, target_model, api_key, base_url = await self._resolve_request_params(user_id, model, config)
+
+        cache = get_embedding_cache()
+        cache_key = self._cache_model_key(provider, target_model)
+        if cache and text:
+            cached = await cache.get(cache_key, text)
+            if cached:
+                return cached
+
+        async def _request() -> List[float]:
+            if provider == "ollama":
+                return await self._get_ollama_embedding(
+                    text=text,
+                    target_model=target_model,
+                    base_url=base_url,
+                )
+            if provider == "local":
+                return await self._get_local_embedding(
+                    text=text,
+                    target_model=target_model,
+                )
+            return await self._get_openai_embedding(
+                text=text,
+                target_model=target_model,
+                api_key=api_key,
+                base_url=base_url,
+                user_id=user_id,
+            )
+
+        embedding = await self._request_with_retry(
+            _request,
+            target_model=target_model,
+            max_retries=max_retries,
+        )
+        if cache and text and embedding:
+            await cache.set(cache_key, text, embedding)
+        return embedding or []
+
+    async def get_embeddings(
+        self,
+        texts: List[str],
+        *,
+        user_id: Optional[int] = None,
+        model: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: int = 3,
+        config: Optional[Dict[str, Any]] = None,
+    ) -> List[Optional[List[float]]]:
+        """
+        批量生成文本向量
+
+        按批次向提供方发送多输入请求（OpenAI 兼容 API 的 input 列表、Ollama 的 /api/embed、
+        本地模型的单次 encode），批次之间并发执行且受 max_concurrency 限制。
+        请求前先查询嵌入缓存，只有未命中的文本才会发送给提供方。
+        某个批次整体失败时会退化为逐条请求，仍失败的条目以 None 占位，保证结果与输入索引对齐。
+
+        Args:
+            texts: 要嵌入的文本列表
+            user_id: 用户ID
+            model: 可选的模型名称覆盖
+            batch_size: 每批文本数，默认按提供方取值
+            max_concurrency: 同时进行的批次数，默认读取配置（local 提供方固定为1）
+            max_retries: 每个批次的最大重试次数
+            config: 预先解析的嵌入配置（见 resolve_config），提供时不再查询数据库。
+                并发调用方应提前解析并传入，避免多个任务同时使用同一个数据库会话
+
+        Returns:
+            与 texts 等长的向量列表，失败或空文本位置为 None
+
+        Raises:
+            LLMConfigurationError: 当没有配置激活的嵌入模型时抛出
+        """
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        pending = [idx for idx, text in enumerate(texts) if text and text.strip()]
+        if not pending:
+            return results
+
+        provider, target_model, api_key, base_url = await self._resolve_request_params(user_id, model, config)
+
+        # 先查缓存，只对未命中的文本发起请求
+        cache = get_embedding_cache()
+        cache_key = self._cache_model_key(provider, target_model)
+        if cache:
+            cached = await cache.get_many(cache_key, [texts[i] for i in pending])
+            for idx, vector in zip(pending, cached):
+                results[idx] = vector
+            pending = [idx for idx in pending if results[idx] is None]
+            if not pending:
+                return results
+
+        size = batch_size or self.get_batch_size(provider)
+        if provider == "local":
+            # 本地模型共享同一份权重，并发 encode 只会争抢算力
+            concurrency = 1
+        else:
+            concurrency = max_concurrency or settings.embedding_batch_concurrency
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def _request(batch_texts: List[str]) -> List[List[float]]:
+            if provider == "ollama":
+                return await self._get_ollama_embeddings(
+                    texts=batch_texts,
+                    target_model=target_model,
+                    base_url=base_url,
+                )
+            if provider == "local":
+                return await self._get_local_embeddings(
+                    texts=batch_texts,
+                    target_model=target_model,
+                )
+            return await self._get_openai_embeddings(
+                texts=batch_texts,
+                target_model=target_model,
+                api_key=api_key,
+                base_url=base_url,
+                user_id=user_id,
+            )
+
+        async def _run_batch(indices: List[int]) -> None:
+            batch_texts = [texts[i] for i in indices]
+            async with semaphore:
+                vectors = await self._request_with_retry(
+                    lambda: _request(batch_texts),
+                    target_model=target_model,
+                    max_retries=max_retries,
+                )
+
+                if vectors is None or len(vectors) != len(batch_texts):
+                    if len(batch_texts) > 1:
+                        logger.warning(
+                            "批量嵌入请求失败，退化为逐条请求: model=%s batch=%d",
+                            target_model,
+                            len(batch_texts),
+                        )
+                    vectors = []
+                    for text in batch_texts:
+                        single = await self._request_with_retry(
+                            lambda text=text: _request([text]),
+                            target_model=target_model,
+                            max_retries=max_retries,
+                        )
+                        vectors.append(single[0] if single else None)
+
+            for idx, vector in zip(indices, vectors):
+                results[idx] = vector or None
+
+        batches = [pending[i:i + size] for i in range(0, len(pending), size)]
+        await asyncio.gather(*(_run_batch(indices) for indices in batches))
+
+        if cache:
+            await cache.set_many(
+                cache_key,
+                [(texts[idx], results[idx]) for idx in pending if results[idx]],
+            )
+
+        failed = sum(1 for idx in pending if results[idx] is None)
+        logger.debug(
+            "批量嵌入完成: model=%s total=%d batches=%d failed=%d",
+            target_model,
+            len(pending),
+            len(batches),
+            failed,
+        )
+        return results
+
+    @staticmethod
+    def _cache_model_key(provider: str, target_model: str) -> str:
+        """缓存键中的模型部分：同名模型在不同提供方下向量不通用"""
+        return f"{provider}:{target_model}"
+
+    def get_batch_size(self, provider: Optional[str] = None) -> int:
+        """获取批量嵌入的单批文本数（配置优先，其次按提供方默认值）"""
+        if settings.embedding_batch_size:
+            return settings.embedding_batch_size
+        key = (provider or "openai").lower()
+        return self.DEFAULT_BATCH_SIZES.get(key, self.DEFAULT_BATCH_SIZES["openai"])
+
+    async def _resolve_request_params(
+        self,
+        user_id: Optional[int],
+        model: Optional[str],
+        config: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, str, Optional[str], Optional[str]]:
+        """
+        解析一次嵌入请求所需的参数（未传入 config 时查询数据库中的激活配置）
+
+        Returns:
+            (provider, target_model, api_key, base_url)
+
         Raises:
             LLMConfigurationError: 当没有配置激活的嵌入模型时抛出
         """
         # 从数据库获取激活的嵌入配置（唯一配置来源）
-        embedding_config = await self._resolve_config(user_id)
+        embedding_config = config if config is not None else await self.resolve_config(user_id)
 
         if not embedding_config:
             logger.error("未配置嵌入模型，请在设置页面添加并激活嵌入模型配置")
@@ -587,48 +793,38 @@ class EmbeddingService:
                 target_model = "BAAI/bge-base-zh-v1.5"
             else:
                 target_model = "text-embedding-3-small"
-        api_key = embedding_config.get("api_key")
-        base_url = embedding_config.get("base_url")
+        return provider, target_model, embedding_config.get("api_key"), embedding_config.get("base_url")
+
+    async def _request_with_retry(
+        self,
+        request: Callable[[], Awaitable[Any]],
+        *,
+        target_model: str,
+        max_retries: int,
+    ) -> Optional[Any]:
+        """
+        执行嵌入请求并对可重试错误（网络/超时/限流）做指数退避重试
+
+        Returns:
+            请求结果；不可重试错误或重试耗尽时返回 None
 
-        # 重试逻辑
-        last_error: Optional[Exception] = None
+        Raises:
+            LLMConfigurationError: 配置错误直接抛出，不做重试
+        """
         for attempt in range(max_retries + 1):
             try:
-                if provider == "ollama":
-                    embedding = await self._get_ollama_embedding(
-                        text=text,
-                        target_model=target_model,
-                        base_url=base_url,
-                    )
-                elif provider == "local":
-                    embedding = await self._get_local_embedding(
-                        text=text,
-                        target_model=target_model,
-                    )
-                else:
-                    embedding = await self._get_openai_embedding(
-                        text=text,
-                        target_model=target_model,
-                        api_key=api_key,
-                        base_url=base_url,
-                        user_id=user_id,
+                result = await request()
+                if result and attempt > 0:
+                    logger.info(
+                        "嵌入请求在第 %d 次重试后成功: model=%s",
+                        attempt,
+                        target_model,
                     )
-
-                if embedding:
-                    if attempt > 0:
-                        logger.info(
-                            "嵌入请求在第 %d 次重试后成功: model=%s",
-                            attempt,
-                            target_model,
-                        )
-                    return embedding
-                else:
-                    return []
+                return result
 
             except LLMConfigurationError:
                 raise
             except Exception as exc:
-                last_error = exc
                 if not self._is_retryable_error(exc):
                     logger.error(
                         "嵌入请求失败（不可重试）: model=%s error=%s",
@@ -636,7 +832,7 @@ class EmbeddingService:
                         exc,
                         exc_info=True,
                     )
-                    return []
+                    return None
 
                 if attempt < max_retries:
                     delay = 2 ** attempt
@@ -657,7 +853,30 @@ class EmbeddingService:
                         exc,
                     )
 
-        return []
+        return None
+
+    def _remember_dimension(self, target_model: str, embedding: List[float]) -> None:
+        """缓存向量维度"""
+        dimension = len(embedding)
+        if dimension:
+            self._dimension_cache[target_model] = dimension
+
+    @staticmethod
+    def _resolve_ollama_base_url(base_url: Optional[str]) -> Optional[str]:
+        """Ollama 地址缺省时回退到环境配置"""
+        if base_url:
+            return base_url
+        base_url_any = settings.ollama_embedding_base_url or settings.embedding_base_url
+        return str(base_url_any) if base_url_any else None
+
+    @staticmethod
+    def _normalize_openai_base_url(base_url: Optional[str]) -> Optional[str]:
+        """自动补全 /v1 后缀（OpenAI SDK 需要）"""
+        if base_url:
+            base_url = base_url.rstrip("/")
+            if not base_url.endswith("/v1"):
+                base_url = f"{base_url}/v1"
+        return base_url
 
     async def _get_ollama_embedding(
         self,
@@ -670,11 +889,7 @@ class EmbeddingService:
             logger.error("未安装 ollama 依赖，无法调用本地嵌入模型。")
             raise LLMConfigurationError("缺少 Ollama 依赖，请先安装 ollama 包")
 
-        if not base_url:
-            base_url_any = settings.ollama_embedding_base_url or settings.embedding_base_url
-            base_url = str(base_url_any) if base_url_any else None
-
-        client = OllamaAsyncClient(host=base_url)
+        client = OllamaAsyncClient(host=self._resolve_ollama_base_url(base_url))
         response = await client.embeddings(model=target_model, prompt=text)
 
         embedding: Optional[List[float]]
@@ -690,13 +905,50 @@ class EmbeddingService:
         if not isinstance(embedding, list):
             embedding = list(embedding)
 
-        # 缓存向量维度
-        dimension = len(embedding)
-        if dimension:
-            self._dimension_cache[target_model] = dimension
-
+        self._remember_dimension(target_model, embedding)
         return embedding
 
+    async def _get_ollama_embeddings(
+        self,
+        texts: List[str],
+        target_model: str,
+        base_url: Optional[str],
+    ) -> List[List[float]]:
+        """
+        调用 Ollama /api/embed 批量生成嵌入向量
+
+        旧版 Ollama 不支持 /api/embed（返回 404），此时退化为逐条调用 /api/embeddings。
+        """
+        if OllamaAsyncClient is None:
+            logger.error("未安装 ollama 依赖，无法调用本地嵌入模型。")
+            raise LLMConfigurationError("缺少 Ollama 依赖，请先安装 ollama 包")
+
+        client = OllamaAsyncClient(host=self._resolve_ollama_base_url(base_url))
+        try:
+            response = await client.embed(model=target_model, input=texts)
+        except OllamaResponseError as exc:
+            if getattr(exc, "status_code", None) != 404:
+                raise
+            logger.info("Ollama 不支持 /api/embed，退化为逐条请求: model=%s", target_model)
+            return [
+                await self._get_ollama_embedding(text, target_model, base_url)
+                for text in texts
+            ]
+
+        if isinstance(response, dict):
+            raw_embeddings = response.get("embeddings")
+        else:
+            raw_embeddings = getattr(response, "embeddings", None)
+
+        embeddings = [list(e) if e else [] for e in (raw_embeddings or [])]
+        if not embeddings:
+            logger.warning("Ollama 批量嵌入返回空数据: model=%s", target_model)
+            return []
+
+        if embeddings[0]:
+            self._remember_dimension(target_model, embeddings[0])
+        return embeddings
+
     async def _get_local_embedding(
         self,
         text: str,
@@ -715,6 +967,30 @@ class EmbeddingService:
         Returns:
             嵌入向量列表
         """
+        embeddings = await self._get_local_embeddings([text], target_model)
+        if not embeddings or not embeddings[0]:
+            logger.warning("本地模型返回空向量: model=%s", target_model)
+            return []
+
+        embedding = embeddings[0]
+        logger.debug("本地嵌入生成成功: model=%s, dimension=%d", target_model, len(embedding))
+        return embedding
+
+    async def _get_local_embeddings(
+        self,
+        texts: List[str],
+        target_model: str,
+    ) -> List[List[float]]:
+        """
+        使用 sentence-transformers 在本地批量生成嵌入向量（单次 encode 调用）
+
+        Args:
+            texts: 要嵌入的文本列表
+            target_model: 模型名称（如 BAAI/bge-small-zh-v1.5）
+
+        Returns:
+            与 texts 等长的嵌入向量列表
+        """
         if not _check_sentence_transformers():
             logger.error("未安装 sentence-transformers 依赖，无法使用本地嵌入模型")
             raise LLMConfigurationError(
@@ -751,27 +1027,23 @@ class EmbeddingService:
                     raise
 
             model = _local_model_cache[target_model]
-            # 生成嵌入向量
-            embedding = model.encode(text, normalize_embeddings=True)
-            return embedding.tolist()
+            # 一次 encode 整个批次，由模型内部按 batch_size 切分
+            matrix = model.encode(
+                texts,
+                batch_size=max(1, len(texts)),
+                normalize_embeddings=True,
+            )
+            return matrix.tolist()
 
         try:
-            embedding = await loop.run_in_executor(None, _load_and_encode)
+            embeddings = await loop.run_in_executor(None, _load_and_encode)
         except Exception as exc:
             logger.error("本地嵌入生成失败: model=%s, error=%s", target_model, exc)
             raise LLMConfigurationError(f"本地嵌入模型调用失败: {str(exc)}") from exc
 
-        if not embedding:
-            logger.warning("本地模型返回空向量: model=%s", target_model)
-            return []
-
-        # 缓存向量维度
-        dimension = len(embedding)
-        if dimension:
-            self._dimension_cache[target_model] = dimension
-
-        logger.debug("本地嵌入生成成功: model=%s, dimension=%d", target_model, dimension)
-        return embedding
+        if embeddings and embeddings[0]:
+            self._remember_dimension(target_model, embeddings[0])
+        return embeddings
 
     async def _get_openai_embedding(
         self,
@@ -782,24 +1054,41 @@ class EmbeddingService:
         user_id: Optional[int],
     ) -> List[float]:
         """调用 OpenAI 兼容 API 生成嵌入向量"""
+        embeddings = await self._get_openai_embeddings(
+            texts=[text],
+            target_model=target_model,
+            api_key=api_key,
+            base_url=base_url,
+            user_id=user_id,
+        )
+        return embeddings[0] if embeddings else []
+
+    async def _get_openai_embeddings(
+        self,
+        texts: List[str],
+        target_model: str,
+        api_key: Optional[str],
+        base_url: Optional[str],
+        user_id: Optional[int],
+    ) -> List[List[float]]:
+        """调用 OpenAI 兼容 API 批量生成嵌入向量（input 传列表，按返回 index 对齐）"""
         if not api_key:
             raise LLMConfigurationError(
                 "嵌入模型配置缺少 API Key。请在「设置 - 嵌入模型」中检查配置。"
             )
 
-        # 自动补全 /v1 后缀（OpenAI SDK 需要）
-        if base_url:
-            base_url = base_url.rstrip("/")
-            if not base_url.endswith("/v1"):
-                base_url = f"{base_url}/v1"
-
-        client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+        pool = get_http_client_pool()
+        client = pool.get_openai_client(
+            api_key=api_key,
+            base_url=self._normalize_openai_base_url(base_url),
+        )
 
         try:
-            response = await client.embeddings.create(
-                input=text,
-                model=target_model,
-            )
+            async with pool.in_use(client):
+                response = await client.embeddings.create(
+                    input=texts,
+                    model=target_model,
+                )
         except AuthenticationError as exc:
             logger.error(
                 "OpenAI 嵌入认证失败: model=%s user_id=%s",
@@ -822,22 +1111,28 @@ class EmbeddingService:
             logger.warning("OpenAI 嵌入请求返回空数据: model=%s user_id=%s", target_model, user_id)
             return []
 
-        embedding = response.data[0].embedding
-
-        if not isinstance(embedding, list):
-            embedding = list(embedding)
-
-        # 缓存向量维度
-        dimension = len(embedding)
-        if dimension:
-            self._dimension_cache[target_model] = dimension
-
-        return embedding
-
-    async def _resolve_config(self, user_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        # 部分兼容服务返回顺序与输入不一致，按 index 回填
+        embeddings: List[List[float]] = [[] for _ in texts]
+        for position, item in enumerate(response.data):
+            index = getattr(item, "index", None)
+            if not isinstance(index, int) or not 0 <= index < len(texts):
+                index = position
+            if index < len(texts):
+                embedding = item.embedding
+                embeddings[index] = embedding if isinstance(embedding, list) else list(embedding)
+
+        first = next((e for e in embeddings if e), None)
+        if first:
+            self._remember_dimension(target_model, first)
+        return embeddings
+
+    async def resolve_config(self, user_id: Optional[int]) -> Optional[Dict[str, Any]]:
         """
         解析嵌入模型配置
 
+        会查询数据库（使用本服务的会话）。并发批量嵌入前可先调用一次，
+        再把结果通过 config 参数传给 get_embeddings / get_embedding。
+
         Args:
             user_id: 用户ID
 
@@ -0,0 +1,326 @@
+"""
+实体匹配器
+
+在大纲/段落中查找已知实体（角色名、别名、地点、势力）。逐个名字做 `name in text`
+的代价是 O(名字数 × 文本长度)，角色多、段落多时开销明显。这里把所有名字编译成一个
+Aho–Corasick 自动机，一次扫描文本即可得到全部命中及其位置。
+
+自动机按项目缓存（LRU），缓存项同时保存构建时的实体列表：实体变化时自动重建，
+蓝图更新时也会主动失效（invalidate_entity_matcher）。
+"""
+
+import re
+import threading
+from collections import OrderedDict, deque
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+# 实体类型
+KIND_CHARACTER = "character"
+KIND_LOCATION = "location"
+KIND_FACTION = "faction"
+
+# 最多缓存的自动机数量
+MAX_CACHED_MATCHERS = 64
+
+# 别名字符串的分隔符（"小林、林哥, 阿风"）
+_ALIAS_SEPARATOR = re.compile(r"[,，、/;；|]+")
+
+# (表层文本, 规范名, 类型)
+EntityEntry = Tuple[str, str, str]
+
+
+class EntityMatch(NamedTuple):
+    """一次命中"""
+
+    start: int
+    end: int
+    text: str
+    name: str
+    kind: str
+
+
+class AhoCorasick:
+    """
+    Aho–Corasick 多模式匹配自动机
+
+    状态转移用字典表示（中文字符集很大，不适合稠密转移表）；每个状态的输出已合并失败链上的输出，
+    扫描时无需回溯失败链收集结果。
+    """
+
+    __slots__ = ("_patterns", "_goto", "_fail", "_output")
+
+    def __init__(self, patterns: Sequence[str]):
+        self._patterns = list(patterns)
+        goto: List[Dict[str, int]] = [{}]
+        output: List[Tuple[int, ...]] = [()]
+
+        for index, pattern in enumerate(self._patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append(())
+                state = next_state
+            output[state] += (index,)
+
+        # 广度优先计算失败指针，浅层状态先于深层状态完成，输出可直接合并
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                if output[fail[next_state]]:
+                    output[next_state] += output[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        扫描文本
+
+        Yields:
+            (起始位置, 结束位置, 模式下标)，按结束位置递增；重叠的命中全部返回
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        patterns = self._patterns
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                end = position + 1
+                for index in output[state]:
+                    yield end - len(patterns[index]), end, index
+
+
+class EntityMatcher:
+    """已知实体匹配器"""
+
+    def __init__(self, entries: Iterable[EntityEntry]):
+        surfaces: List[str] = []
+        targets: List[List[Tuple[str, str]]] = []
+        index_of: Dict[str, int] = {}
+        for surface, name, kind in entries:
+            if not surface:
+                continue
+            index = index_of.get(surface)
+            if index is None:
+                index = index_of[surface] = len(surfaces)
+                surfaces.append(surface)
+                targets.append([])
+            if (name, kind) not in targets[index]:
+                targets[index].append((name, kind))
+
+        self._surfaces = surfaces
+        self._targets = targets
+        self._automaton = AhoCorasick(surfaces)
+
+    @property
+    def pattern_count(self) -> int:
+        return len(self._surfaces)
+
+    def find_all(self, text: Optional[str]) -> List[EntityMatch]:
+        """一次扫描返回全部命中（含重叠，如"林风"与"林风儿"）"""
+        if not text or not self._surfaces:
+            return []
+        matches: List[EntityMatch] = []
+        for start, end, index in self._automaton.iter_matches(text):
+            surface = self._surfaces[index]
+            for name, kind in self._targets[index]:
+                matches.append(EntityMatch(start, end, surface, name, kind))
+        return matches
+
+    @staticmethod
+    def names(matches: Iterable[EntityMatch], kind: Optional[str] = None) -> List[str]:
+        """命中的规范名（去重，按首次出现位置排序）"""
+        first_seen: Dict[str, int] = {}
+        for match in matches:
+            if kind is not None and match.kind != kind:
+                continue
+            if match.name not in first_seen or match.start < first_seen[match.name]:
+                first_seen[match.name] = match.start
+        return sorted(first_seen, key=first_seen.__getitem__)
+
+    def find_names(self, text: Optional[str], kind: Optional[str] = None) -> List[str]:
+        """文本中出现的实体规范名"""
+        return self.names(self.find_all(text), kind)
+
+
+def _field(item: Any, key: str) -> Any:
+    if isinstance(item, Mapping):
+        return item.get(key)
+    return getattr(item, key, None)
+
+
+def _split_aliases(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [alias.strip() for alias in _ALIAS_SEPARATOR.split(value) if alias.strip()]
+    if isinstance(value, (list, tuple, set)):
+        return [str(alias).strip() for alias in value if alias and str(alias).strip()]
+    return []
+
+
+def _character_aliases(character: Any) -> List[str]:
+    aliases = _split_aliases(_field(character, "aliases"))
+    extra = _field(character, "extra")
+    if isinstance(extra, Mapping):
+        aliases.extend(_split_aliases(extra.get("aliases")))
+    return aliases
+
+
+def _named_items(items: Any) -> List[str]:
+    """world_setting 中的列表项：字符串或 {"name": ...}"""
+    names: List[str] = []
+    if not isinstance(items, (list, tuple)):
+        return names
+    for item in items:
+        name = item if isinstance(item, str) else _field(item, "name")
+        if isinstance(name, str) and name.strip():
+            names.append(name.strip())
+    return names
+
+
+def collect_entity_entries(
+    characters: Iterable[Any] = (),
+    world_setting: Optional[Mapping[str, Any]] = None,
+    *,
+    locations: Iterable[str] = (),
+) -> Tuple[EntityEntry, ...]:
+    """
+    收集实体条目
+
+    Args:
+        characters: 角色（名字字符串、蓝图角色字典或 ORM 对象；别名取自 aliases 或 extra.aliases）
+        world_setting: 世界观设定（取 key_locations、factions 的名称）
+        locations: 额外的地点名
+
+    Returns:
+        (表层文本, 规范名, 类型) 元组，顺序稳定，可直接作为缓存指纹比较
+    """
+    entries: List[EntityEntry] = []
+    for character in characters or ():
+        name = character if isinstance(character, str) else _field(character, "name")
+        if not isinstance(name, str) or not name.strip():
+            continue
+        name = name.strip()
+        entries.append((name, name, KIND_CHARACTER))
+        if not isinstance(character, str):
+            entries.extend((alias, name, KIND_CHARACTER) for alias in _character_aliases(character))
+
+    location_names = list(locations or ())
+    if isinstance(world_setting, Mapping):
+        location_names.extend(_named_items(world_setting.get("key_locations")))
+        entries.extend(
+            (faction, faction, KIND_FACTION) for faction in _named_items(world_setting.get("factions"))
+        )
+    entries.extend((location, location, KIND_LOCATION) for location in location_names if location)
+    return tuple(entries)
+
+
+class EntityMatcherCache:
+    """按项目缓存的实体匹配器（线程安全的 LRU）"""
+
+    def __init__(self, max_entries: int = MAX_CACHED_MATCHERS):
+        self._max_entries = max_entries
+        self._items: "OrderedDict[Tuple[Hashable, int], Tuple[Tuple[EntityEntry, ...], EntityMatcher]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        characters: Iterable[Any] = (),
+        world_setting: Optional[Mapping[str, Any]] = None,
+        *,
+        locations: Iterable[str] = (),
+        project_id: Optional[str] = None,
+    ) -> EntityMatcher:
+        """
+        获取匹配器
+
+        缓存键为 (project_id, 实体指纹)；同一项目的不同实体组合（如只含角色名的段落分析）各自缓存，
+        命中时再比较完整实体列表，避免哈希碰撞。
+        """
+        entries = collect_entity_entries(characters, world_setting, locations=locations)
+        key = (project_id, hash(entries))
+        with self._lock:
+            cached = self._items.get(key)
+            if cached is not None and cached[0] == entries:
+                self._items.move_to_end(key)
+                return cached[1]
+
+        matcher = EntityMatcher(entries)
+        with self._lock:
+            self._items[key] = (entries, matcher)
+            self._items.move_to_end(key)
+            while len(self._items) > self._max_entries:
+                self._items.popitem(last=False)
+        return matcher
+
+    def invalidate(self, project_id: Optional[str] = None) -> None:
+        """清除指定项目（None 表示全部）的匹配器"""
+        with self._lock:
+            if project_id is None:
+                self._items.clear()
+                return
+            for key in [key for key in self._items if key[0] == project_id]:
+                del self._items[key]
+
+
+_matcher_cache = EntityMatcherCache()
+
+
+def get_entity_matcher(
+    characters: Iterable[Any] = (),
+    world_setting: Optional[Mapping[str, Any]] = None,
+    *,
+    locations: Iterable[str] = (),
+    project_id: Optional[str] = None,
+) -> EntityMatcher:
+    """获取（或构建并缓存）实体匹配器"""
+    return _matcher_cache.get(characters, world_setting, locations=locations, project_id=project_id)
+
+
+def invalidate_entity_matcher(project_id: Optional[str] = None) -> None:
+    """蓝图变化时清除项目的实体匹配器缓存"""
+    _matcher_cache.invalidate(project_id)
+
+
+__all__ = [
+    "AhoCorasick",
+    "EntityMatch",
+    "EntityMatcher",
+    "KIND_CHARACTER",
+    "KIND_FACTION",
+    "KIND_LOCATION",
+    "collect_entity_entries",
+    "get_entity_matcher",
+    "invalidate_entity_matcher",
+]
@@ -0,0 +1,316 @@
+"""
+图片后处理（解码/裁切/编码）
+
+PIL 的解码与编码是 CPU 密集操作，直接在 async 函数中执行会阻塞事件循环。
+这里的同步函数只在专用线程池中执行（run_image_task），线程数由 IMAGE_PROCESSING_WORKERS 控制，
+与 asyncio.to_thread 使用的默认线程池隔离，避免大批量后处理占满文件 I/O 等通用任务的线程。
+PIL 在解码、缩放、编码时会释放 GIL，线程池即可获得并行度，也无需在打包后的桌面端处理多进程启动问题。
+
+衍生图（缩略图/预览图）与原图放在同一目录，文件名为 `<原图名>.thumb.webp` / `<原图名>.preview.webp`，
+删除原图时一并删除；WebP 编码不可用时退回 JPEG。
+"""
+
+import asyncio
+import functools
+import hashlib
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, NamedTuple, Optional, Tuple, TypeVar
+
+from ...core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 比例误差低于该值时不裁切
+_ASPECT_TOLERANCE = 0.05
+
+# 计算文件哈希时的读取块大小
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# 衍生图类型（与文件名后缀对应）
+DERIVATIVE_THUMBNAIL = "thumb"
+DERIVATIVE_PREVIEW = "preview"
+
+_DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", ".webp"),
+    "jpeg": ("JPEG", ".jpg"),
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.image_processing_workers,
+                    thread_name_prefix="image-proc",
+                )
+    return _executor
+
+
+async def run_image_task(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """在图片处理线程池中执行同步函数"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_image_executor() -> None:
+    """关闭图片处理线程池（应用关闭时调用）"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_aspect_ratio(target_ratio: Optional[str]) -> Optional[float]:
+    """解析 "16:9" 形式的宽高比，无效时返回 None"""
+    if not target_ratio or ":" not in target_ratio:
+        return None
+    parts = target_ratio.split(":")
+    if len(parts) != 2:
+        return None
+    try:
+        w_ratio, h_ratio = float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+    if h_ratio == 0:
+        return None
+    return w_ratio / h_ratio
+
+
+def compute_crop_box(
+    width: int,
+    height: int,
+    target_aspect: float,
+) -> Optional[Tuple[int, int, int, int]]:
+    """
+    计算中心裁切区域
+
+    Returns:
+        (left, top, right, bottom)；比例已接近目标或尺寸无效时返回 None
+    """
+    if width == 0 or height == 0:
+        return None
+
+    current_aspect = width / height
+    if abs(current_aspect - target_aspect) / max(target_aspect, 0.01) < _ASPECT_TOLERANCE:
+        logger.debug("图片比例 %.2f 接近目标 %.2f，无需裁切", current_aspect, target_aspect)
+        return None
+
+    if current_aspect > target_aspect:
+        # 图片太宽，裁左右
+        new_width = int(height * target_aspect)
+        left = (width - new_width) // 2
+        logger.debug("图片太宽，中心裁切: %dx%d -> %dx%d", width, height, new_width, height)
+        return (left, 0, left + new_width, height)
+
+    # 图片太高，裁上下
+    new_height = int(width / target_aspect)
+    top = (height - new_height) // 2
+    logger.debug("图片太高，中心裁切: %dx%d -> %dx%d", width, height, width, new_height)
+    return (0, top, width, top + new_height)
+
+
+def crop_to_aspect_ratio(image_content: bytes, target_ratio: str) -> bytes:
+    """
+    将图片裁切到目标宽高比（中心裁切，同步执行）
+
+    失败或无需裁切时返回原始内容；输出保持原图格式（未知格式按 PNG）。
+    """
+    try:
+        from PIL import Image
+
+        target_aspect = parse_aspect_ratio(target_ratio)
+        if target_aspect is None:
+            logger.debug("无效的宽高比格式: %s，跳过裁切", target_ratio)
+            return image_content
+
+        with Image.open(io.BytesIO(image_content)) as img:
+            crop_box = compute_crop_box(img.width, img.height, target_aspect)
+            if crop_box is None:
+                return image_content
+            output = io.BytesIO()
+            img.crop(crop_box).save(output, format=img.format or "PNG")
+            return output.getvalue()
+    except Exception as e:
+        logger.warning("图片裁切失败，使用原图: %s", e)
+        return image_content
+
+
+def crop_file_to_aspect_ratio(path: Path, target_ratio: str) -> bool:
+    """
+    将图片文件原地裁切到目标宽高比（同步执行）
+
+    Returns:
+        是否进行了裁切；失败时保留原文件
+    """
+    try:
+        from PIL import Image
+
+        target_aspect = parse_aspect_ratio(target_ratio)
+        if target_aspect is None:
+            logger.debug("无效的宽高比格式: %s，跳过裁切", target_ratio)
+            return False
+
+        with Image.open(path) as img:
+            crop_box = compute_crop_box(img.width, img.height, target_aspect)
+            if crop_box is None:
+                return False
+            img_format = img.format or "PNG"
+            cropped = img.crop(crop_box)
+            cropped.load()
+
+        # 先写到旁路文件再替换，裁切失败不会损坏原文件
+        cropped_path = path.with_name(path.name + ".crop")
+        try:
+            cropped.save(cropped_path, format=img_format)
+            cropped_path.replace(path)
+        finally:
+            cropped_path.unlink(missing_ok=True)
+        return True
+    except Exception as e:
+        logger.warning("图片裁切失败，使用原图: %s", e)
+        return False
+
+
+def hash_file(path: Path) -> Tuple[int, str]:
+    """计算文件大小与 SHA-256（同步执行）"""
+    digest = hashlib.sha256()
+    size = 0
+    with path.open("rb") as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            digest.update(chunk)
+    return size, digest.hexdigest()
+
+
+def finalize_image_file(path: Path, target_ratio: Optional[str]) -> Tuple[int, str]:
+    """
+    下载完成后的后处理：按需裁切，然后计算大小与哈希（同步执行）
+
+    Returns:
+        (文件大小, SHA-256 十六进制)
+    """
+    if target_ratio:
+        crop_file_to_aspect_ratio(path, target_ratio)
+    return hash_file(path)
+
+
+class DerivativeResult(NamedTuple):
+    """衍生图生成结果"""
+
+    width: int
+    height: int
+    thumbnail_path: Path
+    preview_path: Path
+
+
+def _resolve_derivative_format(fmt: str) -> Tuple[str, str]:
+    """返回 (PIL格式名, 扩展名)；WebP 不可用时退回 JPEG"""
+    fmt = (fmt or "webp").lower()
+    if fmt == "webp":
+        from PIL import features
+
+        if not features.check("webp"):
+            fmt = "jpeg"
+    return _DERIVATIVE_FORMATS.get(fmt, _DERIVATIVE_FORMATS["jpeg"])
+
+
+def derivative_path(path: Path, kind: str, fmt: str) -> Path:
+    """原图对应的衍生图路径，如 img_x.png -> img_x.png.thumb.webp"""
+    _, suffix = _resolve_derivative_format(fmt)
+    return path.with_name(f"{path.name}.{kind}{suffix}")
+
+
+def _save_derivative(img: Any, target: Path, pil_format: str, quality: int) -> None:
+    """编码衍生图：先写旁路文件再替换，避免读到半截文件"""
+    if pil_format == "JPEG":
+        if img.mode in ("RGBA", "LA", "P"):
+            # JPEG 不支持透明通道，铺白底
+            from PIL import Image
+
+            rgba = img.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            img = background
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        params = {"quality": quality, "optimize": True, "progressive": True}
+    else:
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "A" in img.getbands() or img.mode == "P" else "RGB")
+        params = {"quality": quality, "method": 4}
+
+    temp_path = target.with_name(target.name + ".tmp")
+    try:
+        img.save(temp_path, format=pil_format, **params)
+        temp_path.replace(target)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def generate_derivatives(
+    path: Path,
+    *,
+    thumbnail_size: int,
+    preview_size: int,
+    fmt: str = "webp",
+    quality: int = 80,
+) -> DerivativeResult:
+    """
+    生成缩略图与预览图（同步执行）
+
+    原图只解码一次：先缩到预览尺寸，再由预览图缩出缩略图；尺寸为长边上限，不放大。
+
+    Returns:
+        原图宽高与两张衍生图的路径
+    """
+    from PIL import Image
+
+    pil_format, _ = _resolve_derivative_format(fmt)
+    thumbnail_path = derivative_path(path, DERIVATIVE_THUMBNAIL, fmt)
+    preview_path = derivative_path(path, DERIVATIVE_PREVIEW, fmt)
+
+    with Image.open(path) as img:
+        width, height = img.size
+        # JPEG 原图可在解码阶段直接降采样
+        img.draft("RGB", (preview_size, preview_size))
+        preview = img.copy()
+
+    preview.thumbnail((preview_size, preview_size), Image.Resampling.LANCZOS)
+    _save_derivative(preview, preview_path, pil_format, quality)
+
+    preview.thumbnail((thumbnail_size, thumbnail_size), Image.Resampling.LANCZOS)
+    _save_derivative(preview, thumbnail_path, pil_format, quality)
+
+    return DerivativeResult(width, height, thumbnail_path, preview_path)
+
+
+__all__ = [
+    "DERIVATIVE_PREVIEW",
+    "DERIVATIVE_THUMBNAIL",
+    "DerivativeResult",
+    "compute_crop_box",
+    "crop_file_to_aspect_ratio",
+    "crop_to_aspect_ratio",
+    "derivative_path",
+    "finalize_image_file",
+    "generate_derivatives",
+    "hash_file",
+    "parse_aspect_ratio",
+    "run_image_task",
+    "shutdown_image_executor",
+]
@@ -0,0 +1,97 @@
+"""
+图片生成进度广播
+
+供应商在生成过程中通过 report_progress() 上报进度（如 ComfyUI 的节点执行与采样步数），
+由 ImageProgressHub 按用户分发给 SSE 订阅者（GET /image-generation/progress/stream）。
+
+调用上下文（用户、项目、章节、场景/页码）通过 ContextVar 传递：生成服务在调用供应商时进入
+image_progress_scope()，供应商内部无需感知业务参数。没有进入作用域时 report_progress() 为空操作。
+进度只在当前进程内广播，多 worker 部署时订阅者只能看到同一 worker 上的任务。
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 单个订阅者的缓冲事件数，消费过慢时丢弃最旧的事件
+_SUBSCRIBER_QUEUE_SIZE = 256
+
+_progress_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("image_progress_scope", default=None)
+
+
+class ImageProgressHub:
+    """按用户分发进度事件（所有操作在事件循环线程中进行）"""
+
+    def __init__(self):
+        self._subscribers: Dict[int, List[asyncio.Queue]] = {}
+
+    def publish(self, user_id: int, event: Dict[str, Any]) -> None:
+        for queue in self._subscribers.get(user_id, ()):
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(event)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[asyncio.Queue]:
+        """订阅用户的进度事件，退出时自动取消订阅"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, []).append(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id, [])
+            if queue in queues:
+                queues.remove(queue)
+            if not queues:
+                self._subscribers.pop(user_id, None)
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return bool(self._subscribers.get(user_id))
+
+
+_hub = ImageProgressHub()
+
+
+def get_progress_hub() -> ImageProgressHub:
+    """获取进度广播单例"""
+    return _hub
+
+
+def report_progress(event: Dict[str, Any]) -> None:
+    """上报当前生成任务的进度（不在生成作用域内或无人订阅时忽略）"""
+    scope = _progress_scope.get()
+    if scope is None or not _hub.has_subscribers(scope["user_id"]):
+        return
+    _hub.publish(scope["user_id"], {**scope, **event, "timestamp": time.time()})
+
+
+@asynccontextmanager
+async def image_progress_scope(user_id: int, **fields: Any) -> AsyncIterator[None]:
+    """
+    进入生成作用域：作用域内的 report_progress() 事件附带 user_id 与 fields（project_id、chapter_number 等）
+
+    进入与退出时分别上报 started / finished 事件。
+    """
+    token = _progress_scope.set({"user_id": int(user_id), **fields})
+    report_progress({"stage": "started"})
+    try:
+        yield
+    finally:
+        report_progress({"stage": "finished"})
+        _progress_scope.reset(token)
+
+
+__all__ = [
+    "ImageProgressHub",
+    "get_progress_hub",
+    "image_progress_scope",
+    "report_progress",
+]
@@ -16,6 +16,7 @@ from typing import AsyncIterator, Callable, Dict, Any, List, Optional
 import httpx
 
 from ....models.image_config import ImageGenerationConfig
+from ....utils.http_client_pool import get_http_client_pool
 from ..schemas import ImageGenerationRequest
 
 
@@ -47,6 +48,7 @@ class ReferenceImageInfo:
     file_path: str  # 图片文件路径
     base64_data: Optional[str] = None  # Base64编码数据（可选，运行时填充）
     strength: float = 0.7  # 参考图影响强度
+    content_hash: Optional[str] = None  # 内容哈希（可选，用于复用已上传的参考图）
 
 
 class BaseImageProvider(ABC):
@@ -281,9 +283,12 @@ class BaseImageProvider(ABC):
         for_test: bool = False,
     ) -> AsyncIterator[httpx.AsyncClient]:
         """
-        创建配置好的HTTP客户端（工厂方法）
+        获取配置好的HTTP客户端（工厂方法）
 
         统一管理超时设置、请求头等配置，避免重复代码。
+        客户端来自进程级共享连接池，按 (供应商地址, API Key, 代理配置, 超时) 复用，
+        同一配置的多次生成保持长连接，不再每次重新建立 TCP/TLS 与代理连接。
+        退出上下文时不关闭客户端（由连接池空闲回收，应用关闭时统一关闭）。
 
         Args:
             config: 供应商配置
@@ -308,11 +313,16 @@ class BaseImageProvider(ABC):
         proxy_url = extra_params.get("proxy")
         disable_proxy = extra_params.get("disable_proxy", False)
 
-        async with httpx.AsyncClient(
-            timeout=timeout,
-            proxy=proxy_url,
+        pool = get_http_client_pool()
+        client = pool.get_http_client(
+            config.api_base_url,
+            config.api_key,
+            purpose=f"image_provider:{self.PROVIDER_TYPE}",
+            proxy=proxy_url or None,
             trust_env=not disable_proxy,  # 默认使用系统代理
-        ) as client:
+            timeout=timeout,
+        )
+        async with pool.in_use(client):
             yield client
 
     def get_auth_headers(
@@ -5,7 +5,7 @@ ComfyUI图片生成供应商
 
 ComfyUI API工作流程：
 1. POST /prompt 提交工作流JSON
-2. 轮询 /history/{prompt_id} 获取执行状态
+2. 通过共享的 /ws 事件流等待完成并上报节点进度（连接不可用或中断时轮询 /history/{prompt_id}）
 3. 从 /view 端点获取生成的图片
 
 配置说明：
@@ -21,6 +21,7 @@ ComfyUI API工作流程：
   - width: 图片宽度
   - height: 图片高度
   - seed: 随机种子（-1为随机）
+  - use_websocket: 是否使用 /ws 事件流跟踪任务（默认 true，全局开关 COMFYUI_WEBSOCKET_ENABLED）
 """
 
 import asyncio
@@ -29,13 +30,17 @@ import json
 import logging
 import random
 import uuid
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import httpx
 
 from .base import BaseImageProvider, ProviderTestResult, ProviderGenerateResult, ReferenceImageInfo
+from .comfyui_ws import ComfyUIEventStream, ComfyUISocketLost, get_event_stream
 from .factory import ImageProviderFactory
+from ....core.config import settings
 from ....models.image_config import ImageGenerationConfig
+from ..progress import report_progress
+from ..reference_cache import get_uploaded_reference_registry, hash_reference_bytes
 from ..schemas import ImageGenerationRequest, get_size_for_ratio
 
 logger = logging.getLogger(__name__)
@@ -44,6 +49,11 @@ logger = logging.getLogger(__name__)
 COMFYUI_POLL_INTERVAL = 1.0  # 轮询间隔（秒）
 COMFYUI_MAX_POLL_TIME = 300.0  # 最大轮询时间（秒）
 
+# 事件流模式下的兜底检查间隔（秒）：长时间没有结束事件时查询一次 /history，防止事件丢失
+COMFYUI_WS_SAFETY_CHECK_INTERVAL = 30.0
+# 收到结束事件后 /history 可能尚未写入，短暂重试
+COMFYUI_HISTORY_RETRY_DELAYS = (0.05, 0.1, 0.2, 0.5, 1.0)
+
 
 @ImageProviderFactory.register("comfyui")
 class ComfyUIProvider(BaseImageProvider):
@@ -264,7 +274,7 @@ class ComfyUIProvider(BaseImageProvider):
         流程：
         1. 构建工作流
         2. 提交到队列
-        3. 轮询等待完成
+        3. 等待完成（事件流，必要时轮询）
         4. 获取生成的图片
         """
         try:
@@ -293,8 +303,9 @@ class ComfyUIProvider(BaseImageProvider):
         # 构建工作流
         workflow = self._build_workflow(config, request)
 
-        # 生成客户端ID（用于追踪任务）
-        client_id = str(uuid.uuid4())
+        # 客户端ID：事件流可用时使用共享连接的ID，使执行事件推送到该连接
+        stream = await self._open_event_stream(config, base_url)
+        client_id = stream.client_id if stream else str(uuid.uuid4())
 
         async with self.create_http_client(config) as client:
             # 1. 提交工作流到队列
@@ -303,9 +314,9 @@ class ComfyUIProvider(BaseImageProvider):
             )
             logger.info("ComfyUI任务已提交: prompt_id=%s", prompt_id)
 
-            # 2. 轮询等待完成
-            outputs = await self._poll_for_completion(
-                client, base_url, prompt_id, config
+            # 2. 等待完成
+            outputs = await self._wait_for_completion(
+                client, base_url, prompt_id, config, workflow, stream
             )
             logger.info("ComfyUI任务完成: prompt_id=%s", prompt_id)
 
@@ -521,12 +532,196 @@ class ComfyUIProvider(BaseImageProvider):
         result = response.json()
         return result["prompt_id"]
 
+    async def _open_event_stream(
+        self,
+        config: ImageGenerationConfig,
+        base_url: str,
+    ) -> Optional[ComfyUIEventStream]:
+        """获取已连接的共享事件流；未启用或连接不可用时返回 None（使用轮询）"""
+        extra_params = config.extra_params or {}
+        if not settings.comfyui_websocket_enabled or not extra_params.get("use_websocket", True):
+            return None
+        headers = self.get_auth_headers(config, content_type="", accept="")
+        stream = get_event_stream(base_url, headers)
+        if await stream.ensure_connected():
+            return stream
+        return None
+
+    async def _wait_for_completion(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        prompt_id: str,
+        config: ImageGenerationConfig,
+        workflow: Dict[str, Any],
+        stream: Optional[ComfyUIEventStream],
+    ) -> Dict[str, Any]:
+        """
+        等待任务完成
+
+        优先使用事件流；事件流不可用或中途断开时，在剩余时间内轮询 /history。
+
+        Returns:
+            输出节点的结果信息
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + COMFYUI_MAX_POLL_TIME
+
+        if stream is not None:
+            try:
+                return await self._wait_via_event_stream(
+                    client, base_url, prompt_id, config, workflow, stream, deadline
+                )
+            except ComfyUISocketLost:
+                logger.warning("ComfyUI 事件连接中断，改用轮询: prompt_id=%s", prompt_id)
+
+        return await self._poll_for_completion(
+            client, base_url, prompt_id, config,
+            max_wait=max(deadline - loop.time(), 0.0),
+        )
+
+    async def _wait_via_event_stream(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        prompt_id: str,
+        config: ImageGenerationConfig,
+        workflow: Dict[str, Any],
+        stream: ComfyUIEventStream,
+        deadline: float,
+    ) -> Dict[str, Any]:
+        """通过事件流等待任务结束，期间把节点进度上报到进度广播"""
+        loop = asyncio.get_running_loop()
+        node_types = {
+            node_id: node.get("class_type", "")
+            for node_id, node in workflow.items()
+            if isinstance(node, dict)
+        }
+        finished_nodes: set = set()
+        outputs: Dict[str, Any] = {}
+
+        def on_event(event_type: str, data: Dict[str, Any]) -> None:
+            node_id = data.get("node")
+            if event_type == "execution_cached":
+                finished_nodes.update(data.get("nodes") or [])
+                report_progress({
+                    "provider": self.PROVIDER_TYPE,
+                    "prompt_id": prompt_id,
+                    "stage": "cached",
+                    "nodes_done": len(finished_nodes),
+                    "nodes_total": len(node_types),
+                })
+            elif event_type == "executing" and node_id is not None:
+                report_progress({
+                    "provider": self.PROVIDER_TYPE,
+                    "prompt_id": prompt_id,
+                    "stage": "executing",
+                    "node": node_id,
+                    "node_class": node_types.get(node_id, ""),
+                    "nodes_done": len(finished_nodes),
+                    "nodes_total": len(node_types),
+                })
+            elif event_type == "progress":
+                value, maximum = data.get("value", 0), data.get("max", 0)
+                report_progress({
+                    "provider": self.PROVIDER_TYPE,
+                    "prompt_id": prompt_id,
+                    "stage": "progress",
+                    "node": node_id,
+                    "node_class": node_types.get(node_id, ""),
+                    "value": value,
+                    "max": maximum,
+                    "percent": round(value * 100 / maximum, 1) if maximum else None,
+                })
+            elif event_type == "executed" and node_id is not None:
+                finished_nodes.add(node_id)
+                if isinstance(data.get("output"), dict):
+                    outputs[node_id] = data["output"]
+
+        future = stream.register(prompt_id, on_event)
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                try:
+                    await asyncio.wait_for(
+                        asyncio.shield(future),
+                        timeout=min(COMFYUI_WS_SAFETY_CHECK_INTERVAL, remaining),
+                    )
+                    break
+                except asyncio.TimeoutError:
+                    # 兜底：结束事件可能丢失（如服务端重启），查询一次历史
+                    history_outputs = await self._check_history(client, base_url, prompt_id, config)
+                    if history_outputs is not None:
+                        return history_outputs
+        finally:
+            stream.unregister(prompt_id)
+
+        if any(output.get("images") for output in outputs.values()):
+            return outputs
+
+        # 输出节点被缓存等情况下事件中没有结果，读取历史记录
+        for delay in COMFYUI_HISTORY_RETRY_DELAYS:
+            history_outputs = await self._check_history(client, base_url, prompt_id, config)
+            if history_outputs is not None:
+                return history_outputs
+            await asyncio.sleep(delay)
+        return await self._poll_for_completion(
+            client, base_url, prompt_id, config,
+            max_wait=max(deadline - loop.time(), 0.0),
+        )
+
+    async def _check_history(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        prompt_id: str,
+        config: ImageGenerationConfig,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        查询一次任务历史
+
+        Returns:
+            已完成时返回输出节点结果；未完成返回 None；执行出错时抛出异常
+        """
+        response = await client.get(
+            f"{base_url}/history/{prompt_id}",
+            headers=self.get_auth_headers(config, content_type=""),
+        )
+
+        if response.status_code != 200:
+            return None
+        history = response.json()
+        if prompt_id not in history:
+            return None
+        task_info = history[prompt_id]
+
+        # 检查是否完成
+        status = task_info.get("status", {})
+        if status.get("completed", False):
+            return task_info.get("outputs", {})
+
+        # 检查是否出错
+        if status.get("status_str") == "error":
+            messages = status.get("messages", [])
+            error_msg = "生成失败"
+            if messages:
+                for msg in messages:
+                    if len(msg) >= 2 and msg[0] == "execution_error":
+                        error_detail = msg[1]
+                        error_msg = error_detail.get("exception_message", error_msg)
+                        break
+            raise Exception(error_msg)
+        return None
+
     async def _poll_for_completion(
         self,
         client: httpx.AsyncClient,
         base_url: str,
         prompt_id: str,
         config: ImageGenerationConfig,
+        max_wait: float = COMFYUI_MAX_POLL_TIME,
     ) -> Dict[str, Any]:
         """
         轮询等待任务完成
@@ -538,36 +733,12 @@ class ComfyUIProvider(BaseImageProvider):
 
         while True:
             elapsed = asyncio.get_event_loop().time() - start_time
-            if elapsed > COMFYUI_MAX_POLL_TIME:
+            if elapsed > max_wait:
                 raise asyncio.TimeoutError()
 
-            response = await client.get(
-                f"{base_url}/history/{prompt_id}",
-                headers=self.get_auth_headers(config, content_type=""),
-            )
-
-            if response.status_code == 200:
-                history = response.json()
-                if prompt_id in history:
-                    task_info = history[prompt_id]
-
-                    # 检查是否完成
-                    status = task_info.get("status", {})
-                    if status.get("completed", False):
-                        outputs = task_info.get("outputs", {})
-                        return outputs
-
-                    # 检查是否出错
-                    if status.get("status_str") == "error":
-                        messages = status.get("messages", [])
-                        error_msg = "生成失败"
-                        if messages:
-                            for msg in messages:
-                                if len(msg) >= 2 and msg[0] == "execution_error":
-                                    error_detail = msg[1]
-                                    error_msg = error_detail.get("exception_message", error_msg)
-                                    break
-                        raise Exception(error_msg)
+            outputs = await self._check_history(client, base_url, prompt_id, config)
+            if outputs is not None:
+                return outputs
 
             await asyncio.sleep(COMFYUI_POLL_INTERVAL)
 
@@ -666,19 +837,19 @@ class ComfyUIProvider(BaseImageProvider):
         extra_params = config.extra_params or {}
 
         async with self.create_http_client(config) as client:
-            # 1. 上传参考图到 ComfyUI
+            # 1. 上传参考图到 ComfyUI（已上传过的立绘直接复用）
             uploaded_filename = await self._upload_reference_image(
                 client, base_url, ref_image, config
             )
-            logger.info("ComfyUI 参考图已上传: %s", uploaded_filename)
 
             # 2. 构建 img2img 工作流
             workflow = self._build_img2img_workflow(
                 config, request, uploaded_filename, ref_image.strength
             )
 
-            # 3. 生成客户端ID
-            client_id = str(uuid.uuid4())
+            # 3. 客户端ID（事件流可用时使用共享连接的ID）
+            stream = await self._open_event_stream(config, base_url)
+            client_id = stream.client_id if stream else str(uuid.uuid4())
 
             # 4. 提交工作流
             prompt_id = await self._queue_prompt(
@@ -686,9 +857,9 @@ class ComfyUIProvider(BaseImageProvider):
             )
             logger.info("ComfyUI img2img 任务已提交: prompt_id=%s", prompt_id)
 
-            # 5. 轮询等待完成
-            outputs = await self._poll_for_completion(
-                client, base_url, prompt_id, config
+            # 5. 等待完成
+            outputs = await self._wait_for_completion(
+                client, base_url, prompt_id, config, workflow, stream
             )
             logger.info("ComfyUI img2img 任务完成: prompt_id=%s", prompt_id)
 
@@ -709,36 +880,52 @@ class ComfyUIProvider(BaseImageProvider):
         """
         上传参考图到 ComfyUI
 
+        文件名由内容哈希决定，同一立绘在同一 ComfyUI 地址只上传一次（见 UploadedReferenceRegistry）。
+
         Returns:
             上传后的文件名
         """
-        # 生成唯一文件名
-        unique_id = uuid.uuid4().hex[:12]
-        filename = f"ref_{unique_id}.png"
-
         # 读取参考图数据（支持 base64 / 文件路径）
         image_data = self._load_reference_image_bytes(ref_image)
+        content_hash = ref_image.content_hash or hash_reference_bytes(image_data)
+        filename = f"ref_{content_hash[:16]}.png"
 
-        # 上传到 ComfyUI 的 /upload/image 端点
-        files = {
-            "image": (filename, image_data, "image/png"),
-        }
-        data = {
-            "overwrite": "true",
-        }
+        async def upload() -> str:
+            # 上传到 ComfyUI 的 /upload/image 端点
+            files = {
+                "image": (filename, image_data, "image/png"),
+            }
+            data = {
+                "overwrite": "true",
+            }
+
+            result = await self._request_json(
+                client,
+                "POST",
+                f"{base_url}/upload/image",
+                files=files,
+                data=data,
+                error_message="上传参考图失败",
+                status_message_template="{message}: HTTP {status}",
+                error_paths=[["error"]],
+                error_fallback=False,
+            )
+            logger.info("ComfyUI 参考图已上传: %s", result.get("name", filename))
+            return result.get("name", filename)
+
+        async def verify(name: str) -> bool:
+            # HEAD /view 只确认文件存在，不下载内容
+            response = await client.head(
+                f"{base_url}/view",
+                params={"filename": name, "type": "input"},
+                headers=self.get_auth_headers(config, content_type="", accept=""),
+            )
+            return response.status_code == 200
 
-        result = await self._request_json(
-            client,
-            "POST",
-            f"{base_url}/upload/image",
-            files=files,
-            data=data,
-            error_message="上传参考图失败",
-            status_message_template="{message}: HTTP {status}",
-            error_paths=[["error"]],
-            error_fallback=False,
+        server_key = f"{base_url}|{config.api_key or ''}"
+        return await get_uploaded_reference_registry().get_or_upload(
+            server_key, content_hash, upload, verify, candidate_name=filename,
         )
-        return result.get("name", filename)
 
     def _build_img2img_workflow(
         self,
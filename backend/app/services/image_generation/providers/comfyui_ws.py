@@ -0,0 +1,247 @@
+"""
+ComfyUI 事件流
+
+ComfyUI 通过 /ws?clientId=<id> 向提交任务时使用同一 client_id 的连接推送执行事件：
+- execution_start / execution_cached / executing / progress / executed
+- execution_success / execution_error / execution_interrupted（旧版以 executing 且 node 为空表示结束）
+
+每个 ComfyUI 地址只维持一条共享连接，所有任务都以该连接的 client_id 提交，事件按 prompt_id 分发给等待者。
+连接断开时等待者收到 ComfyUISocketLost，由调用方改用 /history 轮询；下次提交任务时再尝试重连。
+需要 websockets>=13（使用 websockets.asyncio 客户端，见 requirements.txt），未安装或版本过低时调用方直接使用轮询。
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from websockets.asyncio.client import connect as ws_connect
+except ImportError:  # pragma: no cover - 可选依赖
+    ws_connect = None
+
+# 建立连接的超时（秒）
+COMFYUI_WS_CONNECT_TIMEOUT = 5.0
+# 连接失败后多久内不再重试（秒），期间直接轮询
+COMFYUI_WS_RETRY_DELAY = 30.0
+# 单条消息上限（预览图为二进制消息，直接丢弃，但仍需完整接收）
+COMFYUI_WS_MAX_MESSAGE_SIZE = 32 * 1024 * 1024
+# 记录最近结束的任务数：任务可能在提交请求返回前就已结束
+_RECENT_FINISHED = 256
+
+EventCallback = Callable[[str, Dict[str, Any]], None]
+
+
+class ComfyUISocketLost(Exception):
+    """事件连接中断，调用方应改用轮询"""
+
+
+class ComfyUIEventStream:
+    """单个 ComfyUI 地址的共享事件连接"""
+
+    def __init__(self, base_url: str, headers: Optional[Dict[str, str]] = None):
+        self.base_url = base_url
+        self.client_id = uuid.uuid4().hex
+        self._headers = headers or {}
+        self._loop = asyncio.get_running_loop()
+        self._ws: Any = None
+        self._reader: Optional[asyncio.Task] = None
+        self._connect_lock = asyncio.Lock()
+        self._retry_at = 0.0
+        # prompt_id -> (Future, 事件回调, 登记时的上下文)
+        self._waiters: Dict[
+            str, Tuple[asyncio.Future, Optional[EventCallback], Optional[contextvars.Context]]
+        ] = {}
+        self._finished: "OrderedDict[str, Optional[str]]" = OrderedDict()
+
+    @property
+    def ws_url(self) -> str:
+        if self.base_url.startswith("https://"):
+            url = "wss://" + self.base_url[len("https://"):]
+        elif self.base_url.startswith("http://"):
+            url = "ws://" + self.base_url[len("http://"):]
+        else:
+            url = self.base_url
+        return f"{url}/ws?clientId={self.client_id}"
+
+    @property
+    def connected(self) -> bool:
+        return self._reader is not None and not self._reader.done()
+
+    def bound_to_running_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    async def ensure_connected(self) -> bool:
+        """确保连接可用；不可用（未安装 websockets、连接失败且在退避期内）时返回 False"""
+        if self.connected:
+            return True
+        if ws_connect is None or self._loop.time() < self._retry_at:
+            return False
+
+        async with self._connect_lock:
+            if self.connected:
+                return True
+            try:
+                ws = await asyncio.wait_for(
+                    ws_connect(
+                        self.ws_url,
+                        additional_headers=self._headers or None,
+                        max_size=COMFYUI_WS_MAX_MESSAGE_SIZE,
+                        ping_interval=20,
+                    ),
+                    timeout=COMFYUI_WS_CONNECT_TIMEOUT,
+                )
+            except Exception as exc:
+                self._retry_at = self._loop.time() + COMFYUI_WS_RETRY_DELAY
+                logger.warning("ComfyUI 事件连接失败，改用轮询: %s (%s)", self.base_url, exc)
+                return False
+
+            self._ws = ws
+            # 共享连接不继承首个任务的上下文；回调在各自登记时的上下文中执行
+            self._reader = asyncio.create_task(self._read_loop(ws), context=contextvars.Context())
+            logger.info("ComfyUI 事件连接已建立: %s", self.base_url)
+            return True
+
+    async def _read_loop(self, ws: Any) -> None:
+        try:
+            async for message in ws:
+                if isinstance(message, (bytes, bytearray)):
+                    continue  # 采样预览图
+                try:
+                    payload = json.loads(message)
+                except ValueError:
+                    continue
+                if isinstance(payload, dict):
+                    self._dispatch(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("ComfyUI 事件连接中断: %s (%s)", self.base_url, exc)
+        finally:
+            self._ws = None
+            for prompt_id, (future, _, _) in self._waiters.items():
+                if not future.done():
+                    future.set_exception(ComfyUISocketLost(prompt_id))
+
+    def _dispatch(self, payload: Dict[str, Any]) -> None:
+        event_type = payload.get("type")
+        data = payload.get("data")
+        if not isinstance(data, dict):
+            return
+        prompt_id = data.get("prompt_id")
+        if not prompt_id:
+            return  # status 等全局消息
+
+        waiter = self._waiters.get(prompt_id)
+        if waiter is not None and waiter[1] is not None:
+            _, callback, context = waiter
+            try:
+                context.run(callback, event_type, data)
+            except Exception as exc:
+                logger.debug("ComfyUI 事件回调异常: %s", exc)
+
+        if event_type == "execution_success" or (event_type == "executing" and data.get("node") is None):
+            self._finish(prompt_id, None)
+        elif event_type == "execution_error":
+            self._finish(prompt_id, data.get("exception_message") or "生成失败")
+        elif event_type == "execution_interrupted":
+            self._finish(prompt_id, "任务已被中断")
+
+    def _finish(self, prompt_id: str, error: Optional[str]) -> None:
+        if prompt_id in self._finished:
+            return
+        self._finished[prompt_id] = error
+        while len(self._finished) > _RECENT_FINISHED:
+            self._finished.popitem(last=False)
+        waiter = self._waiters.get(prompt_id)
+        if waiter is not None:
+            self._resolve(waiter[0], error)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, error: Optional[str]) -> None:
+        if future.done():
+            return
+        if error is None:
+            future.set_result(None)
+        else:
+            future.set_exception(Exception(error))
+
+    def register(self, prompt_id: str, on_event: Optional[EventCallback] = None) -> asyncio.Future:
+        """
+        登记等待的任务
+
+        on_event 在调用 register 时的上下文中执行（进度上报依赖该上下文中的用户/项目/页码）。
+
+        Returns:
+            任务结束时完成的 Future：成功为 None，执行出错抛出 Exception，连接中断抛出 ComfyUISocketLost
+        """
+        future = self._loop.create_future()
+        context = contextvars.copy_context() if on_event is not None else None
+        self._waiters[prompt_id] = (future, on_event, context)
+        if prompt_id in self._finished:
+            self._resolve(future, self._finished[prompt_id])
+        elif not self.connected:
+            future.set_exception(ComfyUISocketLost(prompt_id))
+        return future
+
+    def unregister(self, prompt_id: str) -> None:
+        entry = self._waiters.pop(prompt_id, None)
+        if entry is not None and entry[0].done() and not entry[0].cancelled():
+            # 取出异常，避免未读取的异常告警
+            entry[0].exception()
+
+    async def close(self) -> None:
+        reader, self._reader = self._reader, None
+        if reader is not None:
+            reader.cancel()
+            try:
+                await reader
+            except (asyncio.CancelledError, Exception):
+                pass
+        ws, self._ws = self._ws, None
+        if ws is not None:
+            try:
+                await ws.close()
+            except Exception:
+                pass
+        for prompt_id, (future, _, _) in self._waiters.items():
+            if not future.done():
+                future.set_exception(ComfyUISocketLost(prompt_id))
+
+
+_streams: Dict[Tuple[str, str], ComfyUIEventStream] = {}
+
+
+def get_event_stream(base_url: str, headers: Optional[Dict[str, str]] = None) -> ComfyUIEventStream:
+    """获取 ComfyUI 地址对应的共享事件连接（不同认证信息各自独立）"""
+    key = (base_url, (headers or {}).get("Authorization", ""))
+    stream = _streams.get(key)
+    if stream is None or not stream.bound_to_running_loop():
+        stream = ComfyUIEventStream(base_url, headers)
+        _streams[key] = stream
+    return stream
+
+
+async def close_event_streams() -> None:
+    """关闭所有事件连接（应用关闭时调用）"""
+    streams = list(_streams.values())
+    _streams.clear()
+    for stream in streams:
+        if stream.bound_to_running_loop():
+            await stream.close()
+
+
+__all__ = [
+    "ComfyUIEventStream",
+    "ComfyUISocketLost",
+    "close_event_streams",
+    "get_event_stream",
+]
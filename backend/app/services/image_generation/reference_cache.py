@@ -0,0 +1,229 @@
+"""
+参考图缓存
+
+同一章节的各个画格/页面反复使用同一批角色立绘作为参考图，这里避免重复的磁盘读取与上传：
+
+- ReferenceBytesCache：按 (路径, 修改时间, 大小) 缓存参考图字节、Base64 与内容哈希（LRU，按总字节数限制）
+- UploadedReferenceRegistry：按供应商地址记录「内容哈希 -> 已上传文件名」，同一立绘每个会话只上传一次；
+  超过校验间隔后复用前先向服务端确认文件仍然存在（服务重启/清理输入目录后自动重新上传）
+"""
+
+import asyncio
+import base64
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from ...core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 每个供应商地址最多记录的已上传参考图数
+MAX_UPLOADED_REFERENCES_PER_SERVER = 512
+
+
+@dataclass(frozen=True)
+class CachedReference:
+    """已加载的参考图"""
+    data: bytes
+    base64_data: str
+    content_hash: str
+
+
+def hash_reference_bytes(data: bytes) -> str:
+    """参考图内容哈希（sha256 十六进制）"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ReferenceBytesCache:
+    """参考图字节 LRU（仅在事件循环线程中使用）"""
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max_bytes
+        self._total_bytes = 0
+        self._items: "OrderedDict[Tuple[str, int, int], CachedReference]" = OrderedDict()
+        self._pending: Dict[Tuple[str, int, int], asyncio.Task] = {}
+
+    async def load(self, path: Path) -> CachedReference:
+        """读取参考图（文件修改后缓存自动失效）"""
+        stat = await asyncio.to_thread(path.stat)
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+
+        cached = self._items.get(key)
+        if cached is not None:
+            self._items.move_to_end(key)
+            return cached
+
+        # 并发生成的多个页面同时请求同一张立绘时只读取一次；单个调用方取消不影响其他等待者
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.create_task(self._read(path, key))
+            self._pending[key] = task
+        return await asyncio.shield(task)
+
+    async def _read(self, path: Path, key: Tuple[str, int, int]) -> CachedReference:
+        try:
+            data = await asyncio.to_thread(path.read_bytes)
+            cached = await asyncio.to_thread(_build_cached_reference, data)
+        finally:
+            self._pending.pop(key, None)
+        self._store(key, cached)
+        return cached
+
+    def _store(self, key: Tuple[str, int, int], cached: CachedReference) -> None:
+        size = len(cached.data) + len(cached.base64_data)
+        if size > self._max_bytes:
+            return
+        # 同一路径的旧版本直接移除
+        for stale in [k for k in self._items if k[0] == key[0]]:
+            self._evict(stale)
+        self._items[key] = cached
+        self._total_bytes += size
+        while self._total_bytes > self._max_bytes and self._items:
+            self._evict(next(iter(self._items)))
+
+    def _evict(self, key: Tuple[str, int, int]) -> None:
+        cached = self._items.pop(key)
+        self._total_bytes -= len(cached.data) + len(cached.base64_data)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._total_bytes = 0
+
+
+def _build_cached_reference(data: bytes) -> CachedReference:
+    return CachedReference(
+        data=data,
+        base64_data=base64.b64encode(data).decode("utf-8"),
+        content_hash=hash_reference_bytes(data),
+    )
+
+
+@dataclass
+class _UploadedReference:
+    name: str
+    verified_at: float
+
+
+class UploadedReferenceRegistry:
+    """按供应商地址记录已上传的参考图（仅在事件循环线程中使用）"""
+
+    def __init__(self, verify_interval: float):
+        self._verify_interval = verify_interval
+        self._servers: Dict[str, "OrderedDict[str, _UploadedReference]"] = {}
+        self._pending: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    async def get_or_upload(
+        self,
+        server_key: str,
+        content_hash: str,
+        upload: Callable[[], Awaitable[str]],
+        verify: Callable[[str], Awaitable[bool]],
+        candidate_name: Optional[str] = None,
+    ) -> str:
+        """
+        获取参考图在服务端的文件名，必要时上传
+
+        Args:
+            server_key: 供应商地址（含认证信息区分）
+            content_hash: 参考图内容哈希
+            upload: 上传回调，返回服务端文件名
+            verify: 校验回调，确认服务端文件仍然存在
+            candidate_name: 按内容哈希确定的文件名；未记录时先确认服务端是否已有（如本进程重启前上传过）
+
+        Returns:
+            服务端文件名
+        """
+        key = (server_key, content_hash)
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._resolve(server_key, content_hash, upload, verify, candidate_name)
+            )
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _resolve(
+        self,
+        server_key: str,
+        content_hash: str,
+        upload: Callable[[], Awaitable[str]],
+        verify: Callable[[str], Awaitable[bool]],
+        candidate_name: Optional[str],
+    ) -> str:
+        uploads = self._servers.setdefault(server_key, OrderedDict())
+        entry = uploads.get(content_hash)
+
+        if entry is not None:
+            uploads.move_to_end(content_hash)
+            if time.monotonic() - entry.verified_at < self._verify_interval:
+                return entry.name
+            if await self._safe_verify(verify, entry.name):
+                entry.verified_at = time.monotonic()
+                return entry.name
+            logger.info("参考图已不在服务端，重新上传: %s", entry.name)
+            uploads.pop(content_hash, None)
+        elif candidate_name and await self._safe_verify(verify, candidate_name):
+            self._remember(uploads, content_hash, candidate_name)
+            return candidate_name
+
+        name = await upload()
+        self._remember(uploads, content_hash, name)
+        return name
+
+    @staticmethod
+    async def _safe_verify(verify: Callable[[str], Awaitable[bool]], name: str) -> bool:
+        try:
+            return await verify(name)
+        except Exception as exc:
+            logger.debug("校验已上传参考图失败: %s (%s)", name, exc)
+            return False
+
+    @staticmethod
+    def _remember(uploads: "OrderedDict[str, _UploadedReference]", content_hash: str, name: str) -> None:
+        uploads[content_hash] = _UploadedReference(name=name, verified_at=time.monotonic())
+        uploads.move_to_end(content_hash)
+        while len(uploads) > MAX_UPLOADED_REFERENCES_PER_SERVER:
+            uploads.popitem(last=False)
+
+    def invalidate(self, server_key: Optional[str] = None) -> None:
+        """清除指定地址（None 表示全部）的上传记录"""
+        if server_key is None:
+            self._servers.clear()
+        else:
+            self._servers.pop(server_key, None)
+
+
+_bytes_cache: Optional[ReferenceBytesCache] = None
+_upload_registry: Optional[UploadedReferenceRegistry] = None
+
+
+def get_reference_bytes_cache() -> ReferenceBytesCache:
+    """获取参考图字节缓存单例"""
+    global _bytes_cache
+    if _bytes_cache is None:
+        _bytes_cache = ReferenceBytesCache(settings.reference_image_cache_mb * 1024 * 1024)
+    return _bytes_cache
+
+
+def get_uploaded_reference_registry() -> UploadedReferenceRegistry:
+    """获取已上传参考图记录单例"""
+    global _upload_registry
+    if _upload_registry is None:
+        _upload_registry = UploadedReferenceRegistry(settings.reference_upload_verify_interval)
+    return _upload_registry
+
+
+__all__ = [
+    "CachedReference",
+    "ReferenceBytesCache",
+    "UploadedReferenceRegistry",
+    "get_reference_bytes_cache",
+    "get_uploaded_reference_registry",
+    "hash_reference_bytes",
+]
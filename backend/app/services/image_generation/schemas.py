@@ -211,6 +211,8 @@ class GeneratedImageInfo(BaseModel):
     file_name: str
     file_path: str
     url: str  # 访问URL
+    thumbnail_url: Optional[str] = None  # 缩略图URL（网格使用）
+    preview_url: Optional[str] = None  # 预览图URL（单图查看使用）
     scene_id: int  # 场景ID
     panel_id: Optional[str] = None  # 画格ID
     image_type: str = "panel"  # 图片类型: "panel"(单画格) 或 "page"(整页)
@@ -9,10 +9,9 @@ import asyncio
 import time
 import uuid
 import base64
-import hashlib
 import logging
 from pathlib import Path
-from typing import Optional, List, TYPE_CHECKING, Any
+from typing import Optional, Dict, List, Tuple, TYPE_CHECKING, Any
 
 import httpx
 
@@ -21,13 +20,19 @@ from .fs_utils import (
     async_is_dir,
     async_iterdir,
     async_mkdir,
-    async_read_bytes,
     async_rename,
     async_rmdir,
     async_unlink,
     async_write_bytes,
     get_images_root,
 )
+from .image_processing import (
+    DerivativeResult,
+    crop_to_aspect_ratio,
+    finalize_image_file,
+    generate_derivatives,
+    run_image_task,
+)
 
 
 from sqlalchemy import select, or_
@@ -40,11 +45,14 @@ from .schemas import (
     PageImageGenerationRequest,
     DEFAULT_MANGA_NEGATIVE_PROMPT,
 )
+from .progress import image_progress_scope
+from .reference_cache import get_reference_bytes_cache
 from .providers import ImageProviderFactory
 from .providers.base import ReferenceImageInfo
 from ...models.image_config import GeneratedImage
+from ...utils.http_client_pool import close_http_client_pool, get_http_client_pool
 from ...core.config import settings
-from ...services.queue import ImageRequestQueue
+from ...services.queue import ImageRequestQueue, RequestPriority
 
 if TYPE_CHECKING:
     from .config_service import ImageConfigService
@@ -61,6 +69,27 @@ NEGATIVE_PROMPT_QUALITY_KEYWORDS = [
 ]
 
 
+# 单张图片（下载或Base64数据）的大小上限
+MAX_IMAGE_DOWNLOAD_SIZE = 50 * 1024 * 1024  # 50MB
+
+# 流式下载的读取块大小
+IMAGE_DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# 衍生图补生成时每批处理的图片数（每批提交一次）
+DERIVATIVE_BACKFILL_BATCH_SIZE = 50
+
+# 衍生图访问路由（{kind} 为 thumbnail 或 preview）
+IMAGE_DERIVATIVE_URL = "/api/image-generation/images/{image_id}/{kind}"
+
+
+def build_derivative_urls(image_id: int) -> Dict[str, str]:
+    """构建图片的缩略图与预览图访问URL（键与 GeneratedImageInfo 字段一致）"""
+    return {
+        "thumbnail_url": IMAGE_DERIVATIVE_URL.format(image_id=image_id, kind="thumbnail"),
+        "preview_url": IMAGE_DERIVATIVE_URL.format(image_id=image_id, kind="preview"),
+    }
+
+
 def _is_complete_negative_prompt(negative_prompt: str) -> bool:
     """检测负面提示词是否足够完整（由 LLM 生成）"""
     if not negative_prompt:
@@ -90,49 +119,19 @@ class HTTPClientManager:
     HTTP客户端管理器
 
     提供全局共享的httpx.AsyncClient，支持连接池复用。
-    避免每次请求都创建新的TCP连接，提高性能。
-    使用双重检查锁定模式确保线程安全。
+    客户端由进程级共享连接池（utils.http_client_pool）统一创建与回收，
+    与各图片供应商的客户端（BaseImageProvider.create_http_client）同池管理，应用关闭时随连接池一起关闭。
     """
-    _client: Optional[httpx.AsyncClient] = None
-    _lock: Optional[asyncio.Lock] = None
-
-    @classmethod
-    def _get_lock(cls) -> asyncio.Lock:
-        """获取锁实例（必须在事件循环运行时调用）"""
-        if cls._lock is None:
-            cls._lock = asyncio.Lock()
-        return cls._lock
 
     @classmethod
     async def get_client(cls) -> httpx.AsyncClient:
-        """获取共享的HTTP客户端（懒加载，线程安全）"""
-        # 第一次检查（无锁，快速路径）
-        if cls._client is not None:
-            return cls._client
-
-        # 需要创建客户端，获取锁
-        async with cls._get_lock():
-            # 第二次检查（持锁，确保只创建一次）
-            if cls._client is None:
-                cls._client = httpx.AsyncClient(
-                    timeout=60.0,
-                    limits=httpx.Limits(
-                        max_keepalive_connections=20,  # 保持活跃的连接数
-                        max_connections=50,            # 最大连接数
-                        keepalive_expiry=30.0,         # 连接过期时间（秒）
-                    ),
-                    http2=False,  # 禁用HTTP/2，避免需要额外安装h2包
-                )
-                logger.info("HTTP客户端已创建，连接池配置: max_connections=50, keepalive=20")
-        return cls._client
+        """获取共享的HTTP客户端（图片下载等通用请求）"""
+        return get_http_client_pool().get_http_client(purpose="image_download")
 
     @classmethod
     async def close_client(cls) -> None:
         """关闭HTTP客户端（应用关闭时调用）"""
-        if cls._client is not None:
-            await cls._client.aclose()
-            cls._client = None
-            logger.info("HTTP客户端已关闭")
+        await close_http_client_pool()
 
 
 class ImageGenerationService:
@@ -235,6 +234,15 @@ class ImageGenerationService:
                 except Exception as exc:
                     logger.warning("%s: %s - %s", warn_message, file_path, exc)
 
+            # 衍生图与原图同目录，一并删除，避免残留文件阻止空目录清理
+            for derived in (image.thumbnail_path, image.preview_path):
+                if not derived:
+                    continue
+                try:
+                    await async_unlink(get_images_root() / derived, missing_ok=True)
+                except Exception as exc:
+                    logger.warning("%s: %s - %s", warn_message, derived, exc)
+
             await self.session.delete(image)
             deleted_count += 1
 
@@ -445,7 +453,14 @@ class ImageGenerationService:
 
             # 通过队列控制并发
             queue = ImageRequestQueue.get_instance()
-            async with queue.request_slot():
+            async with queue.request_slot(RequestPriority.NORMAL, user_id), image_progress_scope(
+                user_id,
+                kind="scene",
+                project_id=project_id,
+                chapter_number=chapter_number,
+                scene_id=scene_id,
+                panel_id=request.panel_id,
+            ):
                 # 检查是否需要使用 img2img
                 if request.reference_image_paths and len(request.reference_image_paths) > 0:
                     logger.info(
@@ -599,7 +614,13 @@ class ImageGenerationService:
 
             # 通过队列控制并发
             queue = ImageRequestQueue.get_instance()
-            async with queue.request_slot():
+            async with queue.request_slot(RequestPriority.NORMAL, user_id), image_progress_scope(
+                user_id,
+                kind="page",
+                project_id=project_id,
+                chapter_number=chapter_number,
+                page_number=page_number,
+            ):
                 # 检查是否需要使用 img2img
                 if request.reference_image_paths and len(request.reference_image_paths) > 0:
                     reference_images = await self._prepare_reference_images(
@@ -717,7 +738,7 @@ class ImageGenerationService:
         准备参考图信息
 
         读取图片文件并转换为 Base64 格式。
-        使用异步文件操作避免阻塞事件循环。
+        使用异步文件操作避免阻塞事件循环，已读取的立绘按文件修改时间缓存在内存中。
 
         Args:
             image_paths: 图片路径列表
@@ -761,14 +782,14 @@ class ImageGenerationService:
                     )
                     continue
 
-                # 异步读取并转换为 Base64
-                image_content = await async_read_bytes(full_path)
-                b64_data = base64.b64encode(image_content).decode("utf-8")
+                # 读取并转换为 Base64（同一立绘在各画格间复用，走内存缓存）
+                cached = await get_reference_bytes_cache().load(full_path)
 
                 reference_images.append(ReferenceImageInfo(
                     file_path=str(full_path),
-                    base64_data=b64_data,
+                    base64_data=cached.base64_data,
                     strength=strength,
+                    content_hash=cached.content_hash,
                 ))
 
                 logger.debug("已加载参考图: %s", path)
@@ -789,6 +810,7 @@ class ImageGenerationService:
 
         核心优化：解决AI生图模型不严格遵循宽高比的问题。
         通过后处理强制裁切，确保图片比例与画格匹配，消除留白。
+        解码/裁切/编码在图片处理线程池中执行，不阻塞事件循环。
 
         Args:
             image_content: 原始图片bytes
@@ -797,74 +819,124 @@ class ImageGenerationService:
         Returns:
             裁切后的图片bytes
         """
-        try:
-            from PIL import Image
-            import io
+        return await run_image_task(crop_to_aspect_ratio, image_content, target_ratio)
+
+    async def _fetch_image_to_file(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        save_dir: Path,
+        scene_id: int,
+        target_aspect_ratio: Optional[str],
+    ) -> Optional[Tuple[Path, int]]:
+        """
+        获取单张图片并落盘
 
-            # 解析目标比例
-            if ":" not in target_ratio:
-                logger.debug("无效的宽高比格式: %s，跳过裁切", target_ratio)
-                return image_content
+        HTTP 图片以流式写入临时文件（不在内存中保留完整响应），Base64 数据URL解码后写入；
+        随后在图片处理线程池中裁切并计算哈希，最后原子重命名为正式文件名。
 
-            parts = target_ratio.split(":")
-            if len(parts) != 2:
-                return image_content
+        Returns:
+            (文件路径, 文件大小)；失败返回 None
+        """
+        unique_id = uuid.uuid4().hex[:12]  # 12位足够避免冲突
+        temp_path = save_dir / f".tmp_{unique_id}.png"
 
-            try:
-                w_ratio, h_ratio = float(parts[0]), float(parts[1])
-                if h_ratio == 0:
-                    return image_content
-                target_aspect = w_ratio / h_ratio
-            except ValueError:
-                return image_content
-
-            # 打开图片
-            img = Image.open(io.BytesIO(image_content))
-            if img.width == 0 or img.height == 0:
-                return image_content
-
-            current_aspect = img.width / img.height
-
-            # 如果比例相近（误差<5%），不裁切
-            if abs(current_aspect - target_aspect) / max(target_aspect, 0.01) < 0.05:
-                logger.debug(
-                    "图片比例 %.2f 接近目标 %.2f，无需裁切",
-                    current_aspect, target_aspect
-                )
-                return image_content
-
-            # 中心裁切
-            if current_aspect > target_aspect:
-                # 图片太宽，裁左右
-                new_width = int(img.height * target_aspect)
-                left = (img.width - new_width) // 2
-                crop_box = (left, 0, left + new_width, img.height)
-                logger.debug(
-                    "图片太宽，中心裁切: %dx%d -> %dx%d",
-                    img.width, img.height, new_width, img.height
-                )
+        try:
+            # 检查是否是Base64数据URL
+            if url.startswith("data:image/"):
+                # 解析Base64数据URL
+                # 格式: data:image/png;base64,<base64_data>
+                try:
+                    header, b64_data = url.split(",", 1)
+                    # 安全检查：限制Base64数据大小
+                    if len(b64_data) > MAX_IMAGE_DOWNLOAD_SIZE:
+                        logger.warning(
+                            "Base64图片数据过大: %d bytes (max: %d), scene_id=%d",
+                            len(b64_data), MAX_IMAGE_DOWNLOAD_SIZE, scene_id
+                        )
+                        return None
+                    image_content = await run_image_task(base64.b64decode, b64_data)
+                except Exception as e:
+                    logger.warning(
+                        "解析Base64图片数据失败: %s, scene_id=%d", e, scene_id
+                    )
+                    return None
+                await async_write_bytes(temp_path, image_content)
             else:
-                # 图片太高，裁上下
-                new_height = int(img.width / target_aspect)
-                top = (img.height - new_height) // 2
-                crop_box = (0, top, img.width, top + new_height)
-                logger.debug(
-                    "图片太高，中心裁切: %dx%d -> %dx%d",
-                    img.width, img.height, img.width, new_height
-                )
+                # 标准HTTP下载：边下载边写入临时文件
+                if not await self._stream_to_file(client, url, temp_path, scene_id):
+                    return None
+
+            # 后处理：裁切到目标宽高比（解决AI生图不遵循比例的问题），并计算内容哈希
+            file_size, digest = await run_image_task(
+                finalize_image_file, temp_path, target_aspect_ratio
+            )
 
-            cropped = img.crop(crop_box)
+            # 原子写入：临时文件写完后再重命名（防止写入中断导致文件损坏）
+            file_path = save_dir / f"img_{unique_id}_{digest[:8]}.png"
+            await async_rename(temp_path, file_path)  # rename在大多数文件系统上是原子操作
+            return file_path, file_size
+        except Exception:
+            # 异步清理临时文件
+            await async_unlink(temp_path, missing_ok=True)
+            raise
+
+    @staticmethod
+    async def _stream_to_file(
+        client: httpx.AsyncClient,
+        url: str,
+        path: Path,
+        scene_id: int,
+    ) -> bool:
+        """流式下载到文件，返回是否成功（超过大小上限视为失败）"""
+        async with client.stream("GET", url, timeout=60.0) as response:
+            if response.status_code != 200:
+                logger.warning(f"下载图片失败: {url}, status={response.status_code}")
+                return False
+
+            handle = await asyncio.to_thread(path.open, "wb")
+            try:
+                received = 0
+                async for chunk in response.aiter_bytes(IMAGE_DOWNLOAD_CHUNK_SIZE):
+                    received += len(chunk)
+                    if received > MAX_IMAGE_DOWNLOAD_SIZE:
+                        logger.warning(
+                            "下载图片过大: >%d bytes, scene_id=%d, url=%s",
+                            MAX_IMAGE_DOWNLOAD_SIZE, scene_id, url
+                        )
+                        break
+                    await asyncio.to_thread(handle.write, chunk)
+            finally:
+                await asyncio.to_thread(handle.close)
 
-            # 转回bytes
-            output = io.BytesIO()
-            # 保持原始格式，如果是PNG则保持PNG
-            img_format = img.format or "PNG"
-            cropped.save(output, format=img_format)
-            return output.getvalue()
+        if received > MAX_IMAGE_DOWNLOAD_SIZE:
+            await async_unlink(path, missing_ok=True)
+            return False
+        return True
 
+    async def _generate_derivatives(self, file_path: Path) -> Optional[DerivativeResult]:
+        """在图片处理线程池中生成缩略图与预览图；失败只记录日志（原图仍可用）"""
+        try:
+            return await run_image_task(
+                generate_derivatives,
+                file_path,
+                thumbnail_size=settings.image_thumbnail_size,
+                preview_size=settings.image_preview_size,
+                fmt=settings.image_derivative_format,
+                quality=settings.image_derivative_quality,
+            )
         except Exception as e:
-            logger.warning("图片裁切失败，使用原图: %s", e)
-            return image_content
+            logger.warning("生成衍生图失败: %s - %s", file_path, e)
+            return None
+
+    @staticmethod
+    def _apply_derivatives(image: GeneratedImage, derivatives: DerivativeResult) -> None:
+        """将衍生图信息写入图片记录（路径相对于图片根目录）"""
+        root = get_images_root()
+        image.width = derivatives.width
+        image.height = derivatives.height
+        image.thumbnail_path = str(derivatives.thumbnail_path.relative_to(root))
+        image.preview_path = str(derivatives.preview_path.relative_to(root))
 
     async def _download_and_save_images(
         self,
@@ -884,10 +956,11 @@ class ImageGenerationService:
         """下载并保存图片
 
         支持两种URL格式：
-        1. 标准HTTP(S) URL：从远程服务器下载图片
+        1. 标准HTTP(S) URL：从远程服务器流式下载图片
         2. Base64数据URL（data:image/png;base64,...）：直接解码保存
 
-        使用异步文件操作避免阻塞事件循环。
+        多个URL并发下载（最多 IMAGE_DOWNLOAD_CONCURRENCY 个），图片后处理在专用线程池中执行；
+        数据库记录在全部文件落盘后按URL顺序串行写入。
 
         Args:
             chapter_version_id: 章节版本ID，用于版本追溯
@@ -906,60 +979,33 @@ class ImageGenerationService:
 
         # 使用共享的HTTP客户端（连接池复用）
         client = await HTTPClientManager.get_client()
+        semaphore = asyncio.Semaphore(settings.image_download_concurrency)
 
-        for i, url in enumerate(image_urls):
-            try:
-                # 检查是否是Base64数据URL
-                if url.startswith("data:image/"):
-                    # 解析Base64数据URL
-                    # 格式: data:image/png;base64,<base64_data>
-                    try:
-                        header, b64_data = url.split(",", 1)
-                        # 安全检查：限制Base64数据大小（50MB）
-                        MAX_BASE64_SIZE = 50 * 1024 * 1024  # 50MB
-                        if len(b64_data) > MAX_BASE64_SIZE:
-                            logger.warning(
-                                "Base64图片数据过大: %d bytes (max: %d), scene_id=%d",
-                                len(b64_data), MAX_BASE64_SIZE, scene_id
-                            )
-                            continue
-                        image_content = base64.b64decode(b64_data)
-                    except Exception as e:
-                        logger.warning(
-                            "解析Base64图片数据失败: %s, scene_id=%d", e, scene_id
-                        )
-                        continue
-                else:
-                    # 标准HTTP下载
-                    response = await client.get(url)
-                    if response.status_code != 200:
-                        logger.warning(f"下载图片失败: {url}, status={response.status_code}")
-                        continue
-                    image_content = response.content
-
-                # 后处理：裁切到目标宽高比（解决AI生图不遵循比例的问题）
-                if target_aspect_ratio:
-                    image_content = await self._crop_to_aspect_ratio(
-                        image_content, target_aspect_ratio
-                    )
-
-                # 生成唯一文件名（使用UUID保证唯一性，避免并发冲突）
-                unique_id = uuid.uuid4().hex[:12]  # 12位足够避免冲突
-                content_hash = hashlib.sha256(image_content).hexdigest()[:8]
-                file_name = f"img_{unique_id}_{content_hash}.png"
-                file_path = save_dir / file_name
-
-                # 原子写入：先写入临时文件，再重命名（防止写入中断导致文件损坏）
-                temp_path = save_dir / f".tmp_{unique_id}.png"
+        async def fetch(url: str) -> Optional[Tuple[Path, int, Optional[DerivativeResult]]]:
+            async with semaphore:
                 try:
-                    await async_write_bytes(temp_path, image_content)
-                    await async_rename(temp_path, file_path)  # rename在大多数文件系统上是原子操作
-                except Exception:
-                    # 异步清理临时文件
-                    if await async_exists(temp_path):
-                        await async_unlink(temp_path)
-                    raise
-
+                    saved = await self._fetch_image_to_file(
+                        client, url, save_dir, scene_id, target_aspect_ratio
+                    )
+                except Exception as e:
+                    error_msg = str(e) if str(e) else f"{type(e).__name__}"
+                    logger.error(f"保存图片失败: {error_msg}", exc_info=True)
+                    return None
+                if saved is None:
+                    return None
+                derivatives = await self._generate_derivatives(saved[0])
+                return saved[0], saved[1], derivatives
+
+        # 下载期间标记客户端在用，避免大批量下载时被空闲回收关闭
+        async with get_http_client_pool().in_use(client):
+            saved_files = await asyncio.gather(*(fetch(url) for url in image_urls))
+
+        for url, saved in zip(image_urls, saved_files):
+            if saved is None:
+                continue
+            file_path, file_size, derivatives = saved
+            file_name = file_path.name
+            try:
                 # 创建数据库记录
                 # 对于Base64数据URL，source_url存储为空（数据太大）
                 source_url_to_save = url if not url.startswith("data:") else None
@@ -971,7 +1017,7 @@ class ImageGenerationService:
                     chapter_version_id=chapter_version_id,  # 版本追溯
                     file_name=file_name,
                     file_path=str(file_path.relative_to(get_images_root())),
-                    file_size=len(image_content),
+                    file_size=file_size,
                     mime_type="image/png",
                     prompt=prompt,
                     negative_prompt=negative_prompt,
@@ -980,6 +1026,8 @@ class ImageGenerationService:
                     source_url=source_url_to_save,
                     image_type=image_type,  # 图片类型：panel或page
                 )
+                if derivatives is not None:
+                    self._apply_derivatives(image_record, derivatives)
                 self.session.add(image_record)
                 await self.session.flush()
 
@@ -992,8 +1040,11 @@ class ImageGenerationService:
                         file_name=file_name,
                         file_path=str(file_path),
                         url=access_url,
+                        **build_derivative_urls(image_record.id),
                         scene_id=scene_id,
                         panel_id=panel_id,
+                        width=image_record.width,
+                        height=image_record.height,
                         prompt=prompt,
                         created_at=image_record.created_at,
                     )
@@ -1215,6 +1266,80 @@ class ImageGenerationService:
         await self.session.flush()
         return True
 
+    # ==================== 衍生图 ====================
+
+    async def ensure_derivatives(self, image: GeneratedImage) -> bool:
+        """
+        确保图片的缩略图与预览图存在（缺失时生成并写回记录，不提交）
+
+        Returns:
+            衍生图是否可用；原图不存在或生成失败时返回 False
+        """
+        root = get_images_root()
+        if image.thumbnail_path and image.preview_path:
+            if (
+                await async_exists(root / image.thumbnail_path)
+                and await async_exists(root / image.preview_path)
+            ):
+                return True
+
+        file_path = root / image.file_path
+        if not await async_exists(file_path):
+            return False
+
+        derivatives = await self._generate_derivatives(file_path)
+        if derivatives is None:
+            return False
+        self._apply_derivatives(image, derivatives)
+        await self.session.flush()
+        return True
+
+    async def backfill_derivatives(
+        self,
+        project_id: Optional[str] = None,
+        batch_size: int = DERIVATIVE_BACKFILL_BATCH_SIZE,
+    ) -> int:
+        """
+        为缺少衍生图的历史图片补生成缩略图与预览图
+
+        按ID游标分批处理，每批提交一次；原图缺失或处理失败的记录本轮跳过，不会重复处理。
+
+        Args:
+            project_id: 只处理指定项目（默认全部）
+            batch_size: 每批处理的图片数
+
+        Returns:
+            成功生成衍生图的图片数量
+        """
+        last_id = 0
+        generated = 0
+        while True:
+            query = select(GeneratedImage).where(
+                GeneratedImage.id > last_id,
+                or_(
+                    GeneratedImage.thumbnail_path.is_(None),
+                    GeneratedImage.preview_path.is_(None),
+                ),
+            )
+            if project_id:
+                query = query.where(GeneratedImage.project_id == project_id)
+            result = await self.session.execute(
+                query.order_by(GeneratedImage.id).limit(batch_size)
+            )
+            images = list(result.scalars().all())
+            if not images:
+                break
+
+            for image in images:
+                if await self.ensure_derivatives(image):
+                    generated += 1
+            last_id = images[-1].id
+            await self.session.commit()
+
+        if generated:
+            logger.info("衍生图补生成完成: project_id=%s, count=%d", project_id or "*", generated)
+        return generated
+
     # ==================== 提示词预览 ====================
 
     async def preview_prompt(
@@ -1372,3 +1497,57 @@ class ImageGenerationService:
                 "success": False,
                 "error": error_msg,
             }
+
+
+# ==================== 衍生图后台补生成 ====================
+
+# 同一时间只运行一个补生成任务（多次触发时后到的直接跳过）
+_backfill_lock = asyncio.Lock()
+_backfill_task: Optional["asyncio.Task[int]"] = None
+
+
+async def run_derivative_backfill(project_id: Optional[str] = None) -> int:
+    """
+    后台补生成衍生图（使用独立的数据库会话）
+
+    Returns:
+        成功生成衍生图的图片数量；已有任务在运行时返回 0
+    """
+    if _backfill_lock.locked():
+        logger.info("衍生图补生成任务已在运行，跳过: project_id=%s", project_id or "*")
+        return 0
+
+    from ...db.session import AsyncSessionLocal
+
+    async with _backfill_lock:
+        async with AsyncSessionLocal() as session:
+            try:
+                return await ImageGenerationService(session).backfill_derivatives(project_id)
+            except Exception as e:
+                await session.rollback()
+                logger.error("衍生图补生成失败: %s", e, exc_info=True)
+                return 0
+
+
+def schedule_derivative_backfill(project_id: Optional[str] = None) -> None:
+    """调度后台补生成任务（不阻塞当前流程）"""
+    global _backfill_task
+    if _backfill_task is not None and not _backfill_task.done():
+        return
+    _backfill_task = asyncio.create_task(
+        run_derivative_backfill(project_id),
+        name="image-derivative-backfill",
+    )
+
+
+async def cancel_derivative_backfill() -> None:
+    """取消后台补生成任务（应用关闭时调用）"""
+    global _backfill_task
+    task, _backfill_task = _backfill_task, None
+    if task is None or task.done():
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
@@ -4,17 +4,21 @@
 协调外部小说导入和智能分析的完整流程。
 """
 
+import asyncio
 import json
 import logging
 import math
-from typing import Any, Dict, List, Optional
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ...core.config import settings
 from ...core.constants import NovelConstants
 from ...core.state_machine import ProjectStatus
 from ...services.llm_service import LLMService
 from ...services.llm_wrappers import call_llm_json, LLMProfile
+from ...services.queue import RequestPriority
 from ...services.prompt_service import PromptService
 from ...services.chapter_analysis_service import ChapterAnalysisService
 from ...services.summary_service import SummaryService
@@ -23,11 +27,13 @@ from ...services.part_outline.service import PartOutlineService
 from ...services.chapter_version_service import ChapterVersionService
 from ...repositories.novel_repository import NovelRepository
 from ...repositories.chapter_outline_repository import ChapterOutlineRepository
+from ...repositories.chapter_repository import ChapterRepository
+from ...repositories.chapter_version_repository import ChapterVersionRepository
 from ...utils.content_normalizer import count_chinese_characters
 from ...utils.json_utils import parse_llm_json_safe
 from ...exceptions import PermissionDeniedError
 
-from .txt_parser import TxtParser
+from .txt_parser import ParsedChapter, TxtParser
 from .progress_tracker import ProgressTracker
 from .models import ChapterSummary, ImportResult
 
@@ -62,6 +68,12 @@ class ImportAnalysisService:
     MAX_SUMMARIES_FOR_BLUEPRINT = 50
     MAX_SUMMARY_LENGTH = 150
 
+    # 导入时每批写入的章节数，及从上传流读取的块大小
+    IMPORT_BATCH_SIZE = 200
+    STREAM_BLOCK_SIZE = 1024 * 1024
+    # 导入章节的大纲占位摘要（生成摘要阶段据此判断是否需要生成）
+    IMPORTED_OUTLINE_SUMMARY = "（导入章节，待分析）"
+
     def __init__(
         self,
         session: AsyncSession,
@@ -77,6 +89,8 @@ class ImportAnalysisService:
         # 仓储与标准服务
         self.novel_repo = NovelRepository(session)
         self.chapter_outline_repo = ChapterOutlineRepository(session)
+        self.chapter_repo = ChapterRepository(session)
+        self.chapter_version_repo = ChapterVersionRepository(session)
         self.chapter_version_service = ChapterVersionService(session)
         self.chapter_analysis_service = ChapterAnalysisService(session)
         self.summary_service = SummaryService(llm_service)
@@ -90,60 +104,56 @@ class ImportAnalysisService:
         user_id: int,
     ) -> ImportResult:
         """
-        导入TXT文件
+        导入TXT文件（已完整读入内存的字节）
 
-        流程:
-        1. 解析文件编码和章节
-        2. 创建ChapterOutline + Chapter + ChapterVersion
-        3. 设置项目为导入状态
+        按块交给 import_txt_stream 处理，解析与写入流程相同。
         """
-        # 1. 解析TXT
-        parse_result = self.parser.parse(file_content)
+        async def blocks() -> AsyncIterator[bytes]:
+            for offset in range(0, len(file_content), self.STREAM_BLOCK_SIZE):
+                yield file_content[offset:offset + self.STREAM_BLOCK_SIZE]
 
-        if not parse_result.chapters:
-            raise ValueError("无法从文件中识别任何章节")
+        return await self.import_txt_stream(project_id, blocks(), user_id)
+
+    async def import_txt_stream(
+        self,
+        project_id: str,
+        blocks: AsyncIterable[bytes],
+        user_id: int,
+    ) -> ImportResult:
+        """
+        流式导入TXT文件
+
+        流程:
+        1. 校验项目归属
+        2. 逐块增量解码并识别章节边界（不在内存中保留全文）
+        3. 每 IMPORT_BATCH_SIZE 章批量写入 ChapterOutline + Chapter + ChapterVersion 并提交
+        4. 设置项目为导入状态
 
-        # 2. 获取项目
-        project = await self.novel_repo.get_by_id(project_id)
+        按批提交以缩短单个事务；导入中途失败时已提交的章节会保留，重新导入会覆盖同章节号的数据。
+        """
+        # 1. 获取项目（仅校验归属，不加载章节树）
+        project = await self.novel_repo.get(id=project_id)
         if not project:
             raise ValueError(f"项目不存在: {project_id}")
         if int(getattr(project, "user_id", 0) or 0) != int(user_id):
             raise PermissionDeniedError("无权访问该项目")
 
-        # 3. 创建章节数据
-        chapters_info = []
-        for parsed_chapter in parse_result.chapters:
-            # 创建或更新章节大纲
-            await self.chapter_outline_repo.upsert_outline(
-                project_id=project_id,
-                chapter_number=parsed_chapter.chapter_number,
-                title=parsed_chapter.title,
-                summary="（导入章节，待分析）",
-            )
-
-            # 创建或更新章节版本
-            chapter = await self.chapter_version_service.get_or_create_chapter(
-                project_id=project_id,
-                chapter_number=parsed_chapter.chapter_number,
-            )
-            versions = await self.chapter_version_service.replace_chapter_versions(
-                chapter,
-                [parsed_chapter.content],
-                metadata=None,
-            )
-
-            if versions:
-                selected = versions[0]
-                chapter.selected_version_id = selected.id
-                chapter.selected_version = selected
-                chapter.word_count = count_chinese_characters(parsed_chapter.content)
-                chapter.status = "successful" if parsed_chapter.content.strip() else "waiting_for_confirm"
-
-            chapters_info.append({
-                "chapter_number": parsed_chapter.chapter_number,
-                "title": parsed_chapter.title,
-                "word_count": parsed_chapter.word_count,
-            })
+        # 2-3. 解析并分批写入章节数据
+        stream = self.parser.open_stream()
+        chapters_info: List[Dict[str, Any]] = []
+        pending: List[ParsedChapter] = []
+
+        async for block in blocks:
+            pending.extend(stream.feed(block))
+            if len(pending) >= self.IMPORT_BATCH_SIZE:
+                await self._write_imported_chapters(project_id, pending, chapters_info)
+                pending = []
+        pending.extend(stream.close())
+        if pending:
+            await self._write_imported_chapters(project_id, pending, chapters_info)
+
+        if not chapters_info:
+            raise ValueError("无法从文件中识别任何章节")
 
         # 4. 更新项目状态
         project.is_imported = True
@@ -155,22 +165,73 @@ class ImportAnalysisService:
         logger.info(
             "项目 %s 导入完成，共 %d 章，编码: %s，模式: %s",
             project_id,
-            len(parse_result.chapters),
-            parse_result.encoding,
-            parse_result.pattern_name,
+            len(chapters_info),
+            stream.encoding,
+            stream.pattern_name,
         )
 
         return ImportResult(
-            total_chapters=len(parse_result.chapters),
+            total_chapters=len(chapters_info),
             chapters=chapters_info,
             parse_info={
-                "encoding": parse_result.encoding,
-                "pattern_used": parse_result.pattern_name,
-                "total_characters": parse_result.total_characters,
-                "warnings": parse_result.warnings,
+                "encoding": stream.encoding,
+                "pattern_used": stream.pattern_name,
+                "total_characters": stream.total_characters,
+                "warnings": stream.warnings,
             },
         )
 
+    async def _write_imported_chapters(
+        self,
+        project_id: str,
+        parsed_chapters: List[ParsedChapter],
+        chapters_info: List[Dict[str, Any]],
+    ) -> None:
+        """批量写入一批解析出的章节（大纲、章节、唯一版本）并提交"""
+        await self.chapter_outline_repo.bulk_upsert(
+            project_id,
+            [
+                {
+                    "chapter_number": parsed.chapter_number,
+                    "title": parsed.title,
+                    "summary": self.IMPORTED_OUTLINE_SUMMARY,
+                }
+                for parsed in parsed_chapters
+            ],
+        )
+
+        chapter_ids = await self.chapter_repo.ensure_chapter_ids(
+            project_id,
+            [parsed.chapter_number for parsed in parsed_chapters],
+        )
+        version_ids = await self.chapter_version_repo.replace_single_versions(
+            {chapter_ids[parsed.chapter_number]: parsed.content for parsed in parsed_chapters}
+        )
+
+        updates = []
+        for parsed in parsed_chapters:
+            chapter_id = chapter_ids[parsed.chapter_number]
+            updates.append({
+                "id": chapter_id,
+                "selected_version_id": version_ids[chapter_id],
+                "word_count": count_chinese_characters(parsed.content),
+                "status": "successful" if parsed.content.strip() else "waiting_for_confirm",
+            })
+            chapters_info.append({
+                "chapter_number": parsed.chapter_number,
+                "title": parsed.title,
+                "word_count": parsed.word_count,
+            })
+        await self.chapter_repo.bulk_update(updates)
+
+        await self.session.commit()
+        logger.debug(
+            "项目 %s 已写入第 %d-%d 章",
+            project_id,
+            parsed_chapters[0].chapter_number,
+            parsed_chapters[-1].chapter_number,
+        )
+
     async def start_analysis(
         self,
         project_id: str,
@@ -357,12 +418,94 @@ class ImportAnalysisService:
             return content
         return content[:self.MAX_CONTENT_LENGTH] + "..."
 
-    async def _get_chapter_title(self, project_id: str, chapter_number: int) -> str:
+    @staticmethod
+    def _chapter_title(titles: Dict[int, str], chapter_number: int) -> str:
         """获取章节标题（优先使用大纲）"""
-        outline = await self.chapter_outline_repo.get_by_project_and_number(
-            project_id, chapter_number
-        )
-        return outline.title if outline else f"第{chapter_number}章"
+        return titles.get(chapter_number) or f"第{chapter_number}章"
+
+    async def _load_chapter_titles(self, project_id: str) -> Dict[int, str]:
+        """一次查询预加载全部章节大纲标题"""
+        outlines = await self.chapter_outline_repo.list_by_project(project_id)
+        return {o.chapter_number: o.title for o in outlines if o.title}
+
+    async def _run_chapter_tasks(
+        self,
+        *,
+        project_id: str,
+        stage: str,
+        chapters: List[Any],
+        worker: Callable[[Any], Awaitable[Any]],
+        apply: Callable[[Any, Any], Awaitable[None]],
+        describe: Callable[[Any], str],
+        completed: int,
+        total: int,
+    ) -> bool:
+        """
+        以有限并发执行逐章LLM任务
+
+        worker 只调用LLM、不访问数据库会话，最多同时运行 import_analysis_concurrency 个；
+        apply 在当前协程中按完成顺序串行写回结果。每完成 import_analysis_commit_batch 章
+        更新一次进度、提交并检查取消状态。取消时不再派发新任务并放弃进行中的任务，
+        已提交的结果保留，恢复分析时会跳过这些章节。
+
+        Returns:
+            是否已被取消
+        """
+        concurrency = settings.import_analysis_concurrency
+        batch_size = settings.import_analysis_commit_batch
+        remaining = deque(chapters)
+        pending: Set[asyncio.Task] = set()
+        uncommitted = 0
+
+        async def run(chapter: Any) -> Tuple[Any, Any]:
+            return chapter, await worker(chapter)
+
+        if chapters:
+            await self.progress.update(
+                project_id=project_id,
+                stage=stage,
+                completed=completed,
+                total=total,
+                message=describe(chapters[0]),
+            )
+            await self.session.commit()
+
+        try:
+            while remaining or pending:
+                while remaining and len(pending) < concurrency:
+                    pending.add(asyncio.create_task(run(remaining.popleft())))
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: t.result()[0].chapter_number):
+                    chapter, result = task.result()
+                    await apply(chapter, result)
+                    completed += 1
+                    uncommitted += 1
+
+                if uncommitted >= batch_size or not (remaining or pending):
+                    next_chapter = next(iter(remaining), None)
+                    await self.progress.update(
+                        project_id=project_id,
+                        stage=stage,
+                        completed=completed,
+                        total=total,
+                        message=describe(next_chapter) if next_chapter else None,
+                    )
+                    await self.session.commit()
+                    uncommitted = 0
+                    if await self.progress.is_cancelled(project_id):
+                        logger.info(
+                            "项目 %s 分析已取消，放弃 %d 个进行中的章节任务",
+                            project_id, len(pending),
+                        )
+                        return True
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        return False
 
     async def _generate_analysis_data(
         self,
@@ -371,58 +514,71 @@ class ImportAnalysisService:
         project_title: str,
         user_id: int,
     ) -> None:
-        """逐章生成分析数据"""
+        """逐章生成分析数据（有限并发，分批提交）"""
         total = len(chapters)
         chapters_with_data = sum(1 for c in chapters if c.analysis_data)
-        chapters_to_process = [c for c in chapters if not c.analysis_data]
+        chapters_to_process = []
+        empty_count = 0
+        for chapter in chapters:
+            if chapter.analysis_data:
+                continue
+            content = chapter.selected_version.content if chapter.selected_version else ""
+            if content.strip():
+                chapters_to_process.append(chapter)
+            else:
+                logger.warning("章节 %d 内容为空，跳过分析", chapter.chapter_number)
+                empty_count += 1
 
         logger.info(
             "开始逐章生成分析数据，共 %d 章，已有数据 %d 章，需生成 %d 章",
             total, chapters_with_data, len(chapters_to_process)
         )
 
-        processed_count = chapters_with_data
+        if await self.progress.is_cancelled(project_id):
+            return
 
-        for chapter in chapters_to_process:
-            if await self.progress.is_cancelled(project_id):
-                return
+        titles = await self._load_chapter_titles(project_id)
+        # 提示词与LLM配置在派发前解析一次，并发任务不再访问共享会话
+        system_prompt = await self.chapter_analysis_service.load_system_prompt()
+        llm_config = await self.llm_service.resolve_llm_config_cached(user_id)
 
+        async def analyze(chapter: Any) -> Any:
             chapter_num = chapter.chapter_number
-            title = await self._get_chapter_title(project_id, chapter_num)
-            content = chapter.selected_version.content if chapter.selected_version else ""
-            if not content.strip():
-                logger.warning("章节 %d 内容为空，跳过分析", chapter_num)
-                processed_count += 1
-                continue
-
-            await self.progress.update(
-                project_id=project_id,
-                stage='generating_analysis_data',
-                completed=processed_count,
-                total=total,
-                message=f"正在分析第{chapter_num}章: {title}",
-            )
-            await self.session.commit()
-
             try:
-                analysis_data = await self.chapter_analysis_service.analyze_and_store_chapter_analysis(
-                    chapter=chapter,
-                    content=self._truncate_content(content),
-                    title=title,
+                return await self.chapter_analysis_service.analyze_chapter(
+                    content=self._truncate_content(chapter.selected_version.content),
+                    title=self._chapter_title(titles, chapter_num),
                     chapter_number=chapter_num,
                     novel_title=project_title,
                     user_id=user_id,
                     timeout=180.0,
+                    system_prompt=system_prompt,
+                    cached_config=llm_config,
+                    priority=RequestPriority.BACKGROUND,
                 )
-                if analysis_data:
-                    logger.debug("章节 %d 分析数据生成成功", chapter_num)
-                else:
-                    logger.warning("章节 %d 分析数据为空", chapter_num)
             except Exception as exc:
                 logger.warning("章节 %d 分析数据生成失败: %s", chapter_num, exc)
+                return None
 
-            processed_count += 1
-            await self.session.commit()
+        async def store(chapter: Any, analysis_data: Any) -> None:
+            if analysis_data:
+                chapter.analysis_data = analysis_data.model_dump()
+                logger.debug("章节 %d 分析数据生成成功", chapter.chapter_number)
+            else:
+                logger.warning("章节 %d 分析数据为空", chapter.chapter_number)
+
+        cancelled = await self._run_chapter_tasks(
+            project_id=project_id,
+            stage='generating_analysis_data',
+            chapters=chapters_to_process,
+            worker=analyze,
+            apply=store,
+            describe=lambda c: f"正在分析第{c.chapter_number}章: {self._chapter_title(titles, c.chapter_number)}",
+            completed=chapters_with_data + empty_count,
+            total=total,
+        )
+        if cancelled:
+            return
 
         await self.progress.update(
             project_id=project_id,
@@ -439,20 +595,20 @@ class ImportAnalysisService:
         chapters: List[Any],
         user_id: int,
     ) -> List[ChapterSummary]:
-        """逐章生成摘要（复用 SummaryService）"""
+        """逐章生成摘要（复用 SummaryService，有限并发，分批提交）"""
         summaries: List[ChapterSummary] = []
         total = len(chapters)
-        DEFAULT_SUMMARY = "（导入章节，待分析）"
 
         outlines = await self.chapter_outline_repo.list_by_project(project_id)
         outline_map = {o.chapter_number: o for o in outlines}
+        titles = {o.chapter_number: o.title for o in outlines if o.title}
 
         chapters_with_summary = []
         chapters_to_process = []
 
         for chapter in chapters:
             outline = outline_map.get(chapter.chapter_number)
-            has_outline_summary = outline and outline.summary and outline.summary != DEFAULT_SUMMARY
+            has_outline_summary = outline and outline.summary and outline.summary != self.IMPORTED_OUTLINE_SUMMARY
             has_real_summary = chapter.real_summary and chapter.real_summary.strip()
 
             if has_outline_summary or has_real_summary:
@@ -478,32 +634,32 @@ class ImportAnalysisService:
             if not chapter.real_summary:
                 chapter.real_summary = existing_summary
 
-        processed_count = len(chapters_with_summary)
+        if await self.progress.is_cancelled(project_id):
+            return summaries
 
-        for chapter in chapters_to_process:
-            if await self.progress.is_cancelled(project_id):
-                return summaries
+        # 提示词与LLM配置在派发前解析一次，并发任务不再访问共享会话
+        system_prompt = None
+        llm_config = None
+        if chapters_to_process:
+            system_prompt = await self.prompt_service.get_prompt("extraction")
+            llm_config = await self.llm_service.resolve_llm_config_cached(user_id)
 
-            chapter_num = chapter.chapter_number
-            title = await self._get_chapter_title(project_id, chapter_num)
+        async def summarize(chapter: Any) -> str:
             content = chapter.selected_version.content if chapter.selected_version else ""
-
-            await self.progress.update(
-                project_id=project_id,
-                stage='analyzing_chapters',
-                completed=processed_count,
-                total=total,
-                message=f"正在生成第{chapter_num}章摘要: {title}",
-            )
-            await self.session.commit()
-
             summary_text = await self.summary_service.generate_summary(
                 self._truncate_content(content),
                 user_id,
+                system_prompt=system_prompt,
+                cached_config=llm_config,
+                priority=RequestPriority.BACKGROUND,
             )
             if not summary_text:
                 summary_text = content[:200] + "..." if len(content) > 200 else content
+            return summary_text
 
+        async def store(chapter: Any, summary_text: str) -> None:
+            chapter_num = chapter.chapter_number
+            title = self._chapter_title(titles, chapter_num)
             summaries.append(ChapterSummary(
                 chapter_number=chapter_num,
                 title=title,
@@ -519,8 +675,18 @@ class ImportAnalysisService:
                 summary=summary_text,
             )
 
-            processed_count += 1
-            await self.session.commit()
+        cancelled = await self._run_chapter_tasks(
+            project_id=project_id,
+            stage='analyzing_chapters',
+            chapters=chapters_to_process,
+            worker=summarize,
+            apply=store,
+            describe=lambda c: f"正在生成第{c.chapter_number}章摘要: {self._chapter_title(titles, c.chapter_number)}",
+            completed=len(chapters_with_summary),
+            total=total,
+        )
+        if cancelled:
+            return summaries
 
         await self.progress.update(
             project_id=project_id,
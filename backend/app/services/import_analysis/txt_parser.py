@@ -18,8 +18,20 @@ TXT文件解析器
 
         parser = MyParser()
         result = parser.parse(file_bytes)
+
+    3. 流式解析（大文件，逐块喂入字节，边解析边产出章节）：
+        stream = DefaultTxtParser().open_stream()
+        for block in blocks:
+            for chapter in stream.feed(block):
+                ...
+        for chapter in stream.close():
+            ...
+        # stream.encoding / stream.pattern_name / stream.warnings 在 close() 后可用
+
+    自定义解析器无需实现流式接口，open_stream() 默认会缓存全部字节并在 close() 时整体解析。
 """
 
+import codecs
 import re
 import logging
 from abc import ABC, abstractmethod
@@ -66,6 +78,41 @@ class ParseResult:
         return len(self.chapters)
 
 
+class ChapterStream:
+    """增量解析会话
+
+    通过 feed() 逐块喂入文件字节，返回已经确定边界的章节；close() 返回剩余章节。
+    章节号按产出顺序从1连续编号。解析信息（编码、模式、字数、警告）在 close() 之后完整可用。
+
+    基类实现缓存全部字节并在 close() 时调用 parser.parse()，适用于任意自定义解析器；
+    DefaultTxtParser 提供真正的增量实现。
+    """
+
+    def __init__(self, parser: "BaseTxtParser", encoding: Optional[str] = None):
+        self._parser = parser
+        self._requested_encoding = encoding
+        self._buffer = bytearray()
+        self.encoding = encoding or ""
+        self.pattern_name = ""
+        self.total_characters = 0
+        self.warnings: List[str] = []
+
+    def feed(self, data: bytes) -> List[ParsedChapter]:
+        """喂入一块字节，返回已完整解析的章节"""
+        self._buffer.extend(data)
+        return []
+
+    def close(self) -> List[ParsedChapter]:
+        """结束输入，返回剩余章节"""
+        result = self._parser.parse(bytes(self._buffer), self._requested_encoding)
+        self._buffer = bytearray()
+        self.encoding = result.encoding
+        self.pattern_name = result.pattern_name
+        self.total_characters = result.total_characters
+        self.warnings = result.warnings
+        return result.chapters
+
+
 class BaseTxtParser(ABC):
     """TXT解析器基类
 
@@ -208,6 +255,18 @@ class BaseTxtParser(ABC):
             warnings=warnings,
         )
 
+    def open_stream(self, encoding: Optional[str] = None) -> ChapterStream:
+        """
+        创建增量解析会话
+
+        Args:
+            encoding: 指定编码，如果为None则根据开头的字节自动检测
+
+        Returns:
+            ChapterStream: 解析会话（默认实现在 close() 时整体解析）
+        """
+        return ChapterStream(self, encoding)
+
 
 # ============================================================================
 # 默认实现
@@ -380,36 +439,10 @@ class DefaultTxtParser(BaseTxtParser):
         chapters = []
 
         # 获取模式信息
-        pattern_info = None
-        for p, name, num_group, title_group in self._compiled_patterns:
-            if p.pattern == pattern.pattern:
-                pattern_info = (num_group, title_group)
-                break
-
-        if pattern_info is None:
-            pattern_info = (1, 2)
-
-        num_group, title_group = pattern_info
+        num_group, title_group = self._pattern_groups(pattern)
 
         for i, match in enumerate(matches):
-            # 提取章节号
-            try:
-                num_str = match.group(num_group)
-                if num_str.isdigit():
-                    chapter_number = int(num_str)
-                else:
-                    chapter_number = cn_to_arabic(num_str)
-            except (IndexError, ValueError):
-                chapter_number = i + 1
-
-            # 提取标题
-            try:
-                title = match.group(title_group).strip() if title_group else ""
-            except (IndexError, AttributeError):
-                title = ""
-
-            if not title:
-                title = f"第{chapter_number}章"
+            chapter_number, title = self._heading_info(match, i, num_group, title_group)
 
             # 计算内容范围
             start_pos = match.end()
@@ -429,6 +462,45 @@ class DefaultTxtParser(BaseTxtParser):
 
         return chapters
 
+    @staticmethod
+    def _heading_info(
+        match: re.Match,
+        index: int,
+        num_group: int,
+        title_group: int,
+    ) -> Tuple[int, str]:
+        """从章节标题匹配中提取章节号和标题"""
+        # 提取章节号
+        try:
+            num_str = match.group(num_group)
+            if num_str.isdigit():
+                chapter_number = int(num_str)
+            else:
+                chapter_number = cn_to_arabic(num_str)
+        except (IndexError, ValueError):
+            chapter_number = index + 1
+
+        # 提取标题
+        try:
+            title = match.group(title_group).strip() if title_group else ""
+        except (IndexError, AttributeError):
+            title = ""
+
+        if not title:
+            title = f"第{chapter_number}章"
+        return chapter_number, title
+
+    def _pattern_groups(self, pattern: re.Pattern) -> Tuple[int, int]:
+        """获取模式的章节号/标题分组序号"""
+        for p, name, num_group, title_group in self._compiled_patterns:
+            if p.pattern == pattern.pattern:
+                return num_group, title_group
+        return 1, 2
+
+    def open_stream(self, encoding: Optional[str] = None) -> ChapterStream:
+        """创建增量解析会话（逐行识别章节，内存占用与单章长度相当）"""
+        return _DefaultChapterStream(self, encoding)
+
     def _split_by_length(self, content: str, target_length: int = 5000) -> List[ParsedChapter]:
         """按固定字数分割"""
         chapters = []
@@ -468,6 +540,322 @@ class DefaultTxtParser(BaseTxtParser):
         return chapters
 
 
+# ============================================================================
+# 默认解析器的增量实现
+# ============================================================================
+
+# 标题行与正文之间可能出现的分隔行（各章节模式分隔符的并集）。
+# 章节模式中的 [\s：:·]* 可以跨行匹配，标题行后只有分隔符时，全文正则会把下一行当作标题；
+# 增量解析时需要向后看到第一个非分隔行才能得到与全文解析一致的结果。
+_SEPARATOR_LINE = re.compile(r'^[\s：:·.]*$')
+
+# GBK 解码器换成其超集 GB18030：对 GBK 字节解码结果相同，且能容忍个别 GB18030 扩展字符
+_STREAM_DECODER_ALIASES = {'gbk': 'GB18030', 'gb2312': 'GB18030'}
+
+# 在中途被截断的头部字节上检测编码时，至少积累这么多字节
+_ENCODING_PROBE_BYTES = 64 * 1024
+
+
+class _DefaultChapterStream(ChapterStream):
+    """DefaultTxtParser 的增量解析会话
+
+    - 增量解码：按检测到的编码创建增量解码器，跨块的多字节字符与 \\r\\n 均能正确拼接
+    - 模式检测：缓存开头 SAMPLE_CHARS 个字符，在样本上选出匹配最多的章节模式；
+      文件不超过样本大小时结果与 parse() 完全一致
+    - 章节切分：逐行匹配所选模式，只保留当前章节的行；标题行可能跨行时向后看到第一个非分隔行
+    - 过短章节合并到前一章，因此章节会延后一章产出
+    """
+
+    SAMPLE_CHARS = 1_000_000
+
+    def __init__(self, parser: "DefaultTxtParser", encoding: Optional[str] = None):
+        super().__init__(parser, encoding)
+        self._parser: DefaultTxtParser = parser
+        self._head = bytearray()
+        self._decoder: Optional[codecs.IncrementalDecoder] = None
+        self._bom_checked = False
+        self._pending_cr = False
+        self._tail = ""
+        self._lines: List[str] = []
+        self._sample_chars = 0
+        self._decided = False
+        self._closed = False
+
+        # 按模式切分的状态
+        self._pattern: Optional[re.Pattern] = None
+        self._num_group = 1
+        self._title_group = 2
+        self._offset = 0  # self._lines[0] 在预处理后全文中的起始位置
+        self._headings = 0
+        self._current: Optional[Tuple[int, str, int]] = None  # (章节号, 标题, 正文起始位置)
+        self._body: List[str] = []
+
+        # 按字数切分的状态
+        self._auto_number = 1
+        self._auto_length = 0
+
+        self._last_valid: Optional[ParsedChapter] = None
+        self._emitted = 0
+
+    # ------------------------------------------------------------------
+    # 对外接口
+    # ------------------------------------------------------------------
+
+    def feed(self, data: bytes) -> List[ParsedChapter]:
+        if self._closed:
+            raise ValueError("解析会话已关闭")
+        if not data:
+            return []
+        if self._decoder is None:
+            self._head.extend(data)
+            if len(self._head) < _ENCODING_PROBE_BYTES:
+                return []
+            data = bytes(self._head)
+            self._head = bytearray()
+            self._open_decoder(data, final=False)
+        return self._push_text(self._decode(data, final=False), final=False)
+
+    def close(self) -> List[ParsedChapter]:
+        if self._closed:
+            return []
+        self._closed = True
+        if self._decoder is None:
+            data = bytes(self._head)
+            self._head = bytearray()
+            self._open_decoder(data, final=True)
+            text = self._decode(data, final=True)
+        else:
+            text = self._decode(b"", final=True)
+        out = self._push_text(text, final=True)
+        out.extend(self._finish())
+        return out
+
+    # ------------------------------------------------------------------
+    # 解码与预处理
+    # ------------------------------------------------------------------
+
+    def _open_decoder(self, head: bytes, final: bool) -> None:
+        """根据开头字节确定编码并创建增量解码器"""
+        if not final:
+            # 截到最后一个换行，避免检测时因多字节字符被截断而误判
+            # （\n、\r 不会出现在 UTF-8/GBK 多字节字符内部）
+            cut = max(head.rfind(b"\n"), head.rfind(b"\r"))
+            probe = head[:cut + 1] if cut > 0 else head
+        else:
+            probe = head
+
+        candidates = []
+        if self._requested_encoding:
+            candidates.append(self._requested_encoding)
+        else:
+            candidates.append(self._parser.detect_encoding(probe))
+        candidates.extend(['utf-8', 'GBK', 'GB18030'])
+
+        last_error: Optional[Exception] = None
+        for encoding in candidates:
+            try:
+                decoder = self._make_decoder(encoding)
+                decoder.decode(head, final)
+            except (UnicodeDecodeError, LookupError) as e:
+                last_error = e
+                continue
+            self.encoding = encoding
+            self._decoder = self._make_decoder(encoding)
+            return
+        raise ValueError(f"无法解码文件内容: {last_error}")
+
+    @staticmethod
+    def _make_decoder(encoding: str) -> codecs.IncrementalDecoder:
+        name = _STREAM_DECODER_ALIASES.get(encoding.lower(), encoding)
+        return codecs.getincrementaldecoder(name)(errors="strict")
+
+    def _decode(self, data: bytes, final: bool) -> str:
+        try:
+            return self._decoder.decode(data, final)
+        except UnicodeDecodeError as e:
+            raise ValueError(f"无法解码文件内容（编码 {self.encoding}）: {e}") from e
+
+    def _push_text(self, text: str, final: bool) -> List[ParsedChapter]:
+        """预处理一段解码后的文本并切分为行"""
+        if not self._bom_checked and text:
+            text = text.lstrip('\ufeff')
+            self._bom_checked = bool(text)
+
+        # 统一换行符；块末尾的 \r 可能与下一块开头的 \n 组成 \r\n
+        if self._pending_cr:
+            text = "\r" + text
+            self._pending_cr = False
+        if not final and text.endswith("\r"):
+            text = text[:-1]
+            self._pending_cr = True
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+
+        self.total_characters += count_chinese_characters(text)
+
+        parts = (self._tail + text).split('\n')
+        self._tail = parts.pop()
+        if final:
+            parts.append(self._tail)
+            self._tail = ""
+        self._lines.extend(parts)
+
+        if not self._decided:
+            self._sample_chars += len(text)
+            if self._sample_chars < self.SAMPLE_CHARS and not final:
+                return []
+            self._decide_pattern()
+        return self._drain(final)
+
+    # ------------------------------------------------------------------
+    # 章节切分
+    # ------------------------------------------------------------------
+
+    def _decide_pattern(self) -> None:
+        """在缓存的样本上选出章节模式"""
+        self._decided = True
+        sample = '\n'.join(self._lines)
+        best_pattern, pattern_name, matches = self._parser._detect_best_pattern(sample)
+        if not matches or len(matches) < 2:
+            self.pattern_name = "auto_split"
+            self.warnings.append("无法识别章节分隔，已按5000字自动分割")
+            return
+        self._pattern = best_pattern
+        self.pattern_name = pattern_name
+        self._num_group, self._title_group = self._parser._pattern_groups(best_pattern)
+
+    def _drain(self, final: bool) -> List[ParsedChapter]:
+        """处理已缓存的完整行"""
+        out: List[ParsedChapter] = []
+        lines = self._lines
+        i = 0
+
+        if self._pattern is None:
+            for line in lines:
+                self._auto_split_line(line, out)
+            self._lines = []
+            return out
+
+        while i < len(lines):
+            match, consumed = self._match_heading(lines, i, final)
+            if consumed < 0:
+                break  # 需要更多行才能判断
+            if match is None:
+                if self._current is not None:
+                    self._body.append(lines[i])
+                # 第一个章节标题之前的内容（前言等）与 parse() 一样丢弃
+                self._offset += len(lines[i]) + 1
+                i += 1
+                continue
+
+            self._close_current(out)
+            chapter_number, title = self._parser._heading_info(
+                match, self._headings, self._num_group, self._title_group
+            )
+            self._headings += 1
+            self._current = (chapter_number, title, self._offset + match.end())
+            for line in lines[i:i + consumed]:
+                self._offset += len(line) + 1
+            i += consumed
+
+        del lines[:i]
+        return out
+
+    def _match_heading(
+        self,
+        lines: List[str],
+        i: int,
+        final: bool,
+    ) -> Tuple[Optional[re.Match], int]:
+        """
+        判断第 i 行是否为章节标题
+
+        Returns:
+            (匹配结果, 消耗的行数)；消耗行数为 -1 表示需要等待更多行
+        """
+        pattern = self._pattern
+        line = lines[i]
+        match = pattern.match(line)
+        if match and match.group(self._title_group).strip():
+            return match, 1
+        # 标题行后只有分隔符时，贪婪的分隔符会跨行匹配，正则把后续第一个非分隔行当作标题
+        if not pattern.match(line + "\nX"):
+            return None, 0
+
+        j = i + 1
+        while j < len(lines) and _SEPARATOR_LINE.match(lines[j]):
+            j += 1
+        if j >= len(lines) and not final:
+            return None, -1
+
+        window = '\n'.join(lines[i:j + 1])
+        match = pattern.match(window)
+        if match is None:
+            return None, 0
+        return match, window.count('\n', 0, match.end()) + 1
+
+    def _close_current(self, out: List[ParsedChapter]) -> None:
+        if self._current is None:
+            return
+        chapter_number, title, start_pos = self._current
+        self._accept(ParsedChapter(
+            chapter_number=chapter_number,
+            title=title,
+            content='\n'.join(self._body).strip(),
+            start_pos=start_pos,
+        ), out)
+        self._current = None
+        self._body = []
+
+    def _auto_split_line(self, line: str, out: List[ParsedChapter]) -> None:
+        """按固定字数切分（与 _split_by_length 一致）"""
+        line_length = count_chinese_characters(line)
+        if self._auto_length + line_length > 5000 and self._body:
+            self._flush_auto_chapter(out)
+            self._body = [line]
+            self._auto_length = line_length
+        else:
+            self._body.append(line)
+            self._auto_length += line_length
+
+    def _flush_auto_chapter(self, out: List[ParsedChapter]) -> None:
+        number = self._auto_number
+        self._accept(ParsedChapter(
+            chapter_number=number,
+            title=f"第{number}章",
+            content='\n'.join(self._body),
+        ), out)
+        self._auto_number += 1
+
+    def _accept(self, chapter: ParsedChapter, out: List[ParsedChapter]) -> None:
+        """过短的章节合并到前一章，合格章节延后一章产出"""
+        if chapter.word_count >= self._parser.MIN_CHAPTER_CHARS:
+            if self._last_valid is not None:
+                self._emit(self._last_valid, out)
+            self._last_valid = chapter
+        elif self._last_valid is not None:
+            prev = self._last_valid
+            prev.content += "\n\n" + chapter.content
+            prev.word_count += chapter.word_count
+
+    def _emit(self, chapter: ParsedChapter, out: List[ParsedChapter]) -> None:
+        self._emitted += 1
+        chapter.chapter_number = self._emitted
+        out.append(chapter)
+
+    def _finish(self) -> List[ParsedChapter]:
+        out: List[ParsedChapter] = []
+        if self._pattern is None:
+            if self._body:
+                self._flush_auto_chapter(out)
+        else:
+            self._close_current(out)
+        self._body = []
+        if self._last_valid is not None:
+            self._emit(self._last_valid, out)
+            self._last_valid = None
+        return out
+
+
 # ============================================================================
 # 简单分隔符解析器示例（供用户参考）
 # ============================================================================
@@ -0,0 +1,150 @@
+"""
+词法检索工具
+
+为 rag_chunks 配套的 FTS5 全文索引提供分词与查询构建，以及多路检索结果的倒数排名融合（RRF）。
+
+中文没有空格分词，SQLite FTS5 自带的 unicode61 分词器会把整段汉字当作一个词。
+这里在写入前把文本切成 CJK 二元组（bigram），拉丁字母/数字按单词切分，以空格连接后交给 FTS5，
+查询时用同样的规则生成词项：
+- 普通查询文本：各二元组以 OR 连接，由 bm25 排序
+- 实体关键词（角色名、地名、伏笔关键词）：关键词的二元组序列作为短语匹配，保证命中完整名称
+"""
+
+import hashlib
+import re
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+# 匹配 CJK 统一表意文字（含扩展A与兼容区）连续片段，或拉丁字母/数字单词
+_TOKEN_PATTERN = re.compile(r"[㐀-䶿一-鿿豈-﫿]+|[a-z0-9_]+")
+
+# 单次查询最多使用的词项数，避免超长大纲生成过大的 MATCH 表达式
+MAX_QUERY_TERMS = 64
+
+# RRF 平滑常数（原论文推荐值）
+DEFAULT_RRF_K = 60
+
+K = TypeVar("K", bound=Hashable)
+
+
+def _is_cjk(segment: str) -> bool:
+    return not segment[0].isascii()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    将文本切分为索引词项
+
+    CJK 片段切为重叠二元组（单字片段保留单字），拉丁字母/数字按单词切分并转小写。
+    """
+    if not text:
+        return []
+    tokens: List[str] = []
+    for segment in _TOKEN_PATTERN.findall(text.lower()):
+        if _is_cjk(segment):
+            if len(segment) == 1:
+                tokens.append(segment)
+            else:
+                tokens.extend(segment[i:i + 2] for i in range(len(segment) - 1))
+        else:
+            tokens.append(segment)
+    return tokens
+
+
+def tokenize_for_index(*parts: Optional[str]) -> str:
+    """生成写入 FTS5 的文本（词项以空格分隔）"""
+    tokens: List[str] = []
+    for part in parts:
+        tokens.extend(tokenize(part))
+    return " ".join(tokens)
+
+
+def fts_rowid(chunk_id: str) -> int:
+    """
+    片段在 FTS 表中的 rowid（由 chunk_id 哈希得到的 63 位整数）
+
+    rag_chunks 以 TEXT 主键存储，其隐式 rowid 在 VACUUM 后可能重排，不能用来关联 FTS 行；
+    按 chunk_id 确定 rowid 后，写入/删除可直接按 rowid 定位，无需扫描 FTS 表。
+    """
+    digest = hashlib.blake2b(chunk_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") & 0x7FFFFFFFFFFFFFFF
+
+
+def build_match_query(
+    text: Optional[str] = None,
+    keywords: Optional[Iterable[str]] = None,
+    *,
+    max_terms: int = MAX_QUERY_TERMS,
+) -> Optional[str]:
+    """
+    构建 FTS5 MATCH 表达式
+
+    Args:
+        text: 普通查询文本（拆成二元组，任一命中即可）
+        keywords: 实体关键词（每个关键词作为一个短语整体匹配）
+        max_terms: 最多使用的词项数（关键词优先）
+
+    Returns:
+        MATCH 表达式；没有可用词项时返回 None
+    """
+    terms: List[str] = []
+    seen = set()
+
+    for keyword in keywords or ():
+        keyword_tokens = tokenize(keyword)
+        if not keyword_tokens:
+            continue
+        phrase = " ".join(keyword_tokens)
+        if phrase not in seen:
+            seen.add(phrase)
+            terms.append(f'"{phrase}"')
+
+    for token in tokenize(text):
+        if len(terms) >= max_terms:
+            break
+        if token not in seen:
+            seen.add(token)
+            terms.append(f'"{token}"')
+
+    if not terms:
+        return None
+    # 词项只含汉字、小写字母、数字和下划线，无需额外转义
+    return " OR ".join(terms[:max_terms])
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[K]],
+    *,
+    k: int = DEFAULT_RRF_K,
+    weights: Optional[Sequence[float]] = None,
+) -> List[Tuple[K, float]]:
+    """
+    倒数排名融合
+
+    score(d) = Σ weight_i / (k + rank_i(d))，rank 从 1 开始；同分时按首次出现的顺序。
+
+    Args:
+        rankings: 多路检索的结果键列表（各自按相关度降序）
+        k: 平滑常数
+        weights: 各路权重（默认均为 1）
+
+    Returns:
+        [(键, 融合得分)]，按得分降序
+    """
+    scores: Dict[K, float] = {}
+    for list_idx, ranking in enumerate(rankings):
+        weight = weights[list_idx] if weights else 1.0
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + weight / (k + rank)
+    # dict 保持插入顺序，sorted 稳定，因此同分按首次出现排序
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+__all__ = [
+    "DEFAULT_RRF_K",
+    "MAX_QUERY_TERMS",
+    "build_match_query",
+    "fts_rowid",
+    "reciprocal_rank_fusion",
+    "tokenize",
+    "tokenize_for_index",
+]
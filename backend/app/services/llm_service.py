@@ -30,7 +30,8 @@ from ..exceptions import (
 )
 from ..repositories.llm_config_repository import LLMConfigRepository
 from ..services.prompt_service import PromptService
-from ..services.queue import LLMRequestQueue
+from ..services.queue import LLMRequestQueue, RequestPriority
+from ..services.shared_state import VersionWatcher
 from ..utils.llm_tool import ChatMessage, ContentCollectMode, LLMClient
 from ..utils.encryption import decrypt_api_key
 from ..utils.exception_helpers import log_exception
@@ -51,12 +52,14 @@ class LLMConfigCache:
     - 缓存命中时避免数据库查询
     - TTL过期后自动刷新
     - 支持手动清除缓存（配置变更时）
+    - 多 worker 部署时通过共享版本号感知其他 worker 的配置变更
     """
 
     def __init__(self, ttl: int = _CONFIG_CACHE_TTL):
         self._cache: Dict[int, Tuple[Dict[str, Optional[str]], float]] = {}
         self._ttl = ttl
         self._lock = asyncio.Lock()
+        self._watcher = VersionWatcher("llm_config", settings.shared_state_sync_interval)
 
     async def get(self, user_id: int) -> Optional[Dict[str, Optional[str]]]:
         """获取缓存的配置
@@ -67,6 +70,12 @@ class LLMConfigCache:
         Returns:
             缓存的配置字典，如果不存在或已过期则返回None
         """
+        if await self._watcher.changed():
+            async with self._lock:
+                self._cache.clear()
+            logger.debug("检测到其他 worker 修改了LLM配置，本地缓存已清除")
+            return None
+
         async with self._lock:
             if user_id not in self._cache:
                 return None
@@ -103,6 +112,7 @@ class LLMConfigCache:
             elif user_id in self._cache:
                 del self._cache[user_id]
                 logger.debug("LLM配置缓存已清除: user_id=%s", user_id)
+        await self._watcher.bump()
 
 
 # 全局配置缓存实例
@@ -150,6 +160,7 @@ class LLMService:
         skip_usage_tracking: bool = False,
         skip_daily_limit_check: bool = False,
         cached_config: Optional[Dict[str, Optional[str]]] = None,
+        priority: RequestPriority = RequestPriority.NORMAL,
     ) -> str:
         """
         获取LLM响应（非流式）
@@ -165,6 +176,7 @@ class LLMService:
             skip_usage_tracking: 跳过使用量追踪
             skip_daily_limit_check: 跳过每日限额检查
             cached_config: 缓存的LLM配置
+            priority: 排队优先级（后台批量任务使用 BACKGROUND）
 
         Returns:
             LLM响应文本
@@ -180,6 +192,7 @@ class LLMService:
             skip_usage_tracking=skip_usage_tracking,
             skip_daily_limit_check=skip_daily_limit_check,
             cached_config=cached_config,
+            priority=priority,
         )
 
     async def stream_llm_response(
@@ -222,8 +235,9 @@ class LLMService:
         )
 
         # 通过队列控制并发
+        # 流式响应由用户实时等待，优先放行
         queue = LLMRequestQueue.get_instance()
-        async with queue.request_slot():
+        async with queue.request_slot(RequestPriority.INTERACTIVE, user_id):
             try:
                 async for chunk in client.stream_chat(
                     messages=chat_messages,
@@ -251,6 +265,8 @@ class LLMService:
         user_id: Optional[int] = None,
         timeout: float = 180.0,
         system_prompt: Optional[str] = None,
+        cached_config: Optional[Dict[str, Optional[str]]] = None,
+        priority: RequestPriority = RequestPriority.NORMAL,
     ) -> str:
         """
         生成章节摘要
@@ -261,6 +277,8 @@ class LLMService:
             user_id: 用户ID
             timeout: 超时时间
             system_prompt: 自定义系统提示词
+            cached_config: 缓存的LLM配置
+            priority: 排队优先级（批量补全摘要时使用 BACKGROUND）
 
         Returns:
             摘要文本
@@ -273,7 +291,14 @@ class LLMService:
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": chapter_content},
         ]
-        return await self._stream_and_collect(messages, temperature=temperature, user_id=user_id, timeout=timeout)
+        return await self._stream_and_collect(
+            messages,
+            temperature=temperature,
+            user_id=user_id,
+            timeout=timeout,
+            cached_config=cached_config,
+            priority=priority,
+        )
 
     async def _stream_and_collect(
         self,
@@ -288,6 +313,7 @@ class LLMService:
         skip_usage_tracking: bool = False,
         skip_daily_limit_check: bool = False,
         cached_config: Optional[Dict[str, Optional[str]]] = None,
+        priority: RequestPriority = RequestPriority.NORMAL,
     ) -> str:
         """
         流式收集LLM响应，支持自动重试网络错误
@@ -303,6 +329,7 @@ class LLMService:
             skip_usage_tracking: 跳过使用量追踪
             skip_daily_limit_check: 跳过每日限额检查
             cached_config: 缓存的LLM配置
+            priority: 排队优先级
 
         Returns:
             收集到的响应文本
@@ -315,7 +342,7 @@ class LLMService:
 
         # 通过队列控制并发
         queue = LLMRequestQueue.get_instance()
-        async with queue.request_slot():
+        async with queue.request_slot(priority, user_id):
             return await self._do_stream_and_collect(
                 messages=messages,
                 config=config,
@@ -388,12 +415,16 @@ class LLMService:
                 self._validate_llm_response(result, config, user_id)
 
                 logger.info(
-                    "LLM response success: model=%s user_id=%s chars=%d chunks=%d attempts=%d",
+                    "LLM response success: model=%s user_id=%s chars=%d chunks=%d attempts=%d "
+                    "ttft=%s tps=%s duration=%.2fs",
                     config.get("model"),
                     user_id,
                     len(result.content),
                     result.chunk_count,
                     attempt + 1,
+                    f"{result.time_to_first_token:.2f}s" if result.time_to_first_token is not None else "-",
+                    f"{result.tokens_per_second:.1f}" if result.tokens_per_second is not None else "-",
+                    result.duration,
                 )
                 return result.content
 
@@ -12,6 +12,7 @@ from typing import Any, Dict, List, Optional, Union
 
 from ..core.config import settings
 from ..core.constants import LLMConstants
+from .queue import RequestPriority
 
 logger = logging.getLogger(__name__)
 
@@ -209,6 +210,8 @@ async def call_llm(
     timeout_override: Optional[float] = None,
     response_format: Optional[str] = None,
     extra_messages: Optional[List[Dict[str, str]]] = None,
+    cached_config: Optional[Dict[str, Optional[str]]] = None,
+    priority: RequestPriority = RequestPriority.NORMAL,
 ) -> str:
     """
     统一的LLM调用入口
@@ -225,6 +228,8 @@ async def call_llm(
         timeout_override: 覆盖默认timeout（可选）
         response_format: 响应格式（可选，如"json_object"）
         extra_messages: 额外的对话历史消息（可选）
+        cached_config: 预先解析的LLM配置（可选，并发调用时避免共享Session查询）
+        priority: 排队优先级（后台批量任务使用 BACKGROUND）
 
     Returns:
         str: LLM响应文本
@@ -279,6 +284,8 @@ async def call_llm(
         response_format=fmt,
         max_tokens=max_tokens,
         user_id=user_id,
+        cached_config=cached_config,
+        priority=priority,
     )
 
 
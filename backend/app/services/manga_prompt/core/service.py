@@ -10,15 +10,19 @@
 4. 提示词构建 - 生成AI绘图提示词
 """
 
+import asyncio
 import logging
 import time
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.llm_service import LLMService
 from app.services.prompt_service import PromptService
+from app.db.session import AsyncSessionLocal
 from app.services.image_generation.service import ImageGenerationService
+from app.services.image_generation.schemas import PageImageGenerationRequest
+from app.services.queue import ImageRequestQueue
 from app.services.character_portrait_service import CharacterPortraitService
 from app.repositories.chapter_repository import ChapterRepository
 from app.repositories.manga_prompt_repository import MangaPromptRepository
@@ -500,6 +504,7 @@ class MangaPromptServiceV2:
             cp_data["storyboard"] = storyboard.to_dict()
             cp_data.pop("designed_pages", None)  # 清理中间数据
             cp_data.pop("completed_prompt_pages", None)  # 清理中间数据
+            cp_data.pop("completed_page_images", None)  # 分镜已重新设计，旧整页图片记录失效
         elif cp_data.get("storyboard"):
             # 从断点恢复 storyboard
             storyboard = StoryboardResult.from_dict(cp_data["storyboard"])
@@ -729,6 +734,7 @@ class MangaPromptServiceV2:
             cp_data.pop("designed_pages", None)
             cp_data.pop("storyboard", None)
             cp_data.pop("completed_prompt_pages", None)
+            cp_data.pop("completed_page_images", None)
 
         elif start_from_stage == "planning":
             # 从规划开始，保留 chapter_info，清理后续数据
@@ -736,21 +742,24 @@ class MangaPromptServiceV2:
             cp_data.pop("designed_pages", None)
             cp_data.pop("storyboard", None)
             cp_data.pop("completed_prompt_pages", None)
+            cp_data.pop("completed_page_images", None)
 
         elif start_from_stage == "storyboard":
             # 从分镜开始，保留 chapter_info 和 page_plan，清理后续数据
             cp_data.pop("designed_pages", None)
             cp_data.pop("storyboard", None)
             cp_data.pop("completed_prompt_pages", None)
+            cp_data.pop("completed_page_images", None)
 
         elif start_from_stage == "prompt_building":
             # 从提示词构建开始，只清理提示词相关数据
             cp_data.pop("completed_prompt_pages", None)
+            cp_data.pop("completed_page_images", None)
 
         elif start_from_stage == "page_prompt_building":
-            # 从整页提示词构建开始，不需要清理数据
-            # 只需要重新生成 page_prompts 字段
-            pass
+            # 从整页提示词构建开始，只需要重新生成 page_prompts 字段
+            # 整页图片会被清理，已完成记录随之失效
+            cp_data.pop("completed_page_images", None)
 
         logger.debug(f"已清理 {start_from_stage} 阶段之后的数据")
         return cp_data
@@ -1091,6 +1100,10 @@ class MangaPromptServiceV2:
     ) -> tuple:
         """批量生成所有整页图片
 
+        各页以有限并发生成（并发数与图片请求队列的最大并发一致，实际调用仍受队列控制），
+        每页使用独立的数据库会话；每页完成后在主会话中串行保存断点，
+        已完成的页码及耗时记录在 cp_data["completed_page_images"]，恢复时跳过。
+
         Args:
             user_id: 用户ID
             project_id: 项目ID
@@ -1103,7 +1116,7 @@ class MangaPromptServiceV2:
             cp_data: 断点数据
 
         Returns:
-            (generated_count, failed_count): 成功数和失败数的元组
+            (generated_count, failed_count): 成功数和失败数的元组（不含恢复时跳过的页）
         """
         from .page_prompt_builder import build_page_prompt_for_generation
 
@@ -1120,86 +1133,149 @@ class MangaPromptServiceV2:
             if hasattr(char, 'portrait_path') and char.portrait_path:
                 character_portraits[name] = char.portrait_path
 
-        for page in result.pages:
-            page_number = page.page_number
-
-            # 检查是否已取消
-            if chapter_id:
-                await self._raise_if_cancelled(chapter_id)
+        # 断点中已完成的页（页码字符串 -> 耗时秒数），且图片记录仍存在
+        completed_pages: Dict[str, float] = dict(cp_data.get("completed_page_images") or {})
+        if completed_pages:
+            existing_images = await self.image_service.get_chapter_images(project_id, chapter_number)
+            existing_pages = {
+                str(img.scene_id) for img in existing_images if img.image_type == "page"
+            }
+            completed_pages = {
+                page: seconds for page, seconds in completed_pages.items() if page in existing_pages
+            }
+        cp_data["completed_page_images"] = completed_pages
 
-            # 更新进度
-            await save_checkpoint_callback(
-                "page_image_generation",
-                {
-                    "stage": "page_image_generation",
-                    "current": generated_count + failed_count,
-                    "total": total_pages,
-                    "message": f"正在生成第 {page_number} 页图片..."
-                },
-                cp_data
+        pending_pages = [
+            page for page in result.pages if str(page.page_number) not in completed_pages
+        ]
+        if len(pending_pages) < len(result.pages):
+            logger.info(
+                "从断点恢复整页图片生成: 已完成 %d 页，待生成 %d 页",
+                len(result.pages) - len(pending_pages), len(pending_pages)
             )
 
-            try:
-                # 构建整页提示词（优先使用 LLM 结果）
-                page_prompt = page_prompts_map.get(page_number)
-                if page_prompt and page_prompt.full_page_prompt:
-                    page_prompt_data = {
-                        "full_page_prompt": page_prompt.full_page_prompt,
-                        "negative_prompt": page_prompt.negative_prompt,
-                        "aspect_ratio": page_prompt.aspect_ratio,
-                        "reference_image_paths": page_prompt.reference_image_paths or [],
-                        "layout_template": page_prompt.layout_template,
-                        "layout_description": page_prompt.layout_description,
-                        "panel_summaries": page_prompt.panel_summaries or [],
-                    }
-                else:
-                    logger.warning(
-                        "整页提示词缺失，回退使用规则拼装: page=%d",
-                        page_number
-                    )
-                    page_prompt_data = build_page_prompt_for_generation(
-                        page=page,
-                        chapter_info=chapter_info,
-                        style=result.style,
-                        character_portraits=character_portraits,
-                    )
-
-                # 调用图片生成服务
-                from app.services.image_generation.schemas import PageImageGenerationRequest
-                gen_request = PageImageGenerationRequest(
-                    full_page_prompt=page_prompt_data["full_page_prompt"],
-                    negative_prompt=page_prompt_data.get("negative_prompt", ""),
-                    layout_template=page_prompt_data.get("layout_template", ""),
-                    layout_description=page_prompt_data.get("layout_description", ""),
-                    ratio=page_prompt_data.get("aspect_ratio", "3:4"),
+        def build_request(page) -> PageImageGenerationRequest:
+            page_number = page.page_number
+            # 构建整页提示词（优先使用 LLM 结果）
+            page_prompt = page_prompts_map.get(page_number)
+            if page_prompt and page_prompt.full_page_prompt:
+                page_prompt_data = {
+                    "full_page_prompt": page_prompt.full_page_prompt,
+                    "negative_prompt": page_prompt.negative_prompt,
+                    "aspect_ratio": page_prompt.aspect_ratio,
+                    "reference_image_paths": page_prompt.reference_image_paths or [],
+                    "layout_template": page_prompt.layout_template,
+                    "layout_description": page_prompt.layout_description,
+                    "panel_summaries": page_prompt.panel_summaries or [],
+                }
+            else:
+                logger.warning(
+                    "整页提示词缺失，回退使用规则拼装: page=%d",
+                    page_number
+                )
+                page_prompt_data = build_page_prompt_for_generation(
+                    page=page,
+                    chapter_info=chapter_info,
                     style=result.style,
-                    chapter_version_id=source_version_id,
-                    reference_image_paths=page_prompt_data.get("reference_image_paths", []),
-                    panel_summaries=page_prompt_data.get("panel_summaries", []),
-                    dialogue_language=result.dialogue_language or "chinese",
+                    character_portraits=character_portraits,
                 )
 
-                merged_request = await self.image_service.prepare_page_request(
-                    project_id, gen_request
-                )
-                gen_result = await self.image_service.generate_page_image(
-                    user_id=user_id,
-                    project_id=project_id,
-                    chapter_number=chapter_number,
-                    page_number=page_number,
-                    request=merged_request,
-                )
+            return PageImageGenerationRequest(
+                full_page_prompt=page_prompt_data["full_page_prompt"],
+                negative_prompt=page_prompt_data.get("negative_prompt", ""),
+                layout_template=page_prompt_data.get("layout_template", ""),
+                layout_description=page_prompt_data.get("layout_description", ""),
+                ratio=page_prompt_data.get("aspect_ratio", "3:4"),
+                style=result.style,
+                chapter_version_id=source_version_id,
+                reference_image_paths=page_prompt_data.get("reference_image_paths", []),
+                panel_summaries=page_prompt_data.get("panel_summaries", []),
+                dialogue_language=result.dialogue_language or "chinese",
+            )
+
+        concurrency = max(1, ImageRequestQueue.get_instance().max_concurrent)
+        semaphore = asyncio.Semaphore(concurrency)
+        # 取消检查与断点保存都使用主会话，需串行访问
+        main_session_lock = asyncio.Lock()
+
+        async def raise_if_cancelled() -> None:
+            if not chapter_id:
+                return
+            async with main_session_lock:
+                await self._raise_if_cancelled(chapter_id)
+
+        async def generate_page(page) -> Tuple[int, bool, float, Optional[str]]:
+            """生成单页图片（独立会话），返回 (页码, 是否成功, 耗时, 错误信息)"""
+            page_number = page.page_number
+            await raise_if_cancelled()
+            async with semaphore:
+                # 排队期间任务可能已被取消，调用供应商前再确认一次
+                await raise_if_cancelled()
+                start_time = time.perf_counter()
+                async with AsyncSessionLocal() as page_session:
+                    try:
+                        image_service = ImageGenerationService(page_session)
+                        merged_request = await image_service.prepare_page_request(
+                            project_id, build_request(page)
+                        )
+                        gen_result = await image_service.generate_page_image(
+                            user_id=user_id,
+                            project_id=project_id,
+                            chapter_number=chapter_number,
+                            page_number=page_number,
+                            request=merged_request,
+                        )
+                        await page_session.commit()
+                        error = None if gen_result.success else gen_result.error_message
+                        return page_number, gen_result.success, time.perf_counter() - start_time, error
+                    except Exception as e:
+                        await page_session.rollback()
+                        logger.error(f"第 {page_number} 页图片生成异常: {e}")
+                        return page_number, False, time.perf_counter() - start_time, str(e)
+
+        logger.info(
+            "开始生成整页图片: 待生成 %d 页, 并发 %d", len(pending_pages), concurrency
+        )
+        tasks = [asyncio.create_task(generate_page(page)) for page in pending_pages]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                page_number, success, elapsed, error = await next_done
 
-                if gen_result.success:
+                if success:
                     generated_count += 1
-                    logger.debug(f"第 {page_number} 页图片生成成功")
+                    completed_pages[str(page_number)] = round(elapsed, 2)
+                    logger.debug(f"第 {page_number} 页图片生成成功，耗时 {elapsed:.1f}s")
+                    message = f"第 {page_number} 页图片完成（{elapsed:.1f}s）"
                 else:
                     failed_count += 1
-                    logger.warning(f"第 {page_number} 页图片生成失败: {gen_result.error_message}")
-
-            except Exception as e:
-                failed_count += 1
-                logger.error(f"第 {page_number} 页图片生成异常: {e}")
+                    logger.warning(f"第 {page_number} 页图片生成失败: {error}")
+                    message = f"第 {page_number} 页图片失败（{elapsed:.1f}s）"
+
+                # 串行保存断点（回调内会检查取消状态）
+                async with main_session_lock:
+                    await save_checkpoint_callback(
+                        "page_image_generation",
+                        {
+                            "stage": "page_image_generation",
+                            "current": len(completed_pages) + failed_count,
+                            "total": total_pages,
+                            "message": message,
+                            "page_timings": completed_pages,
+                        },
+                        cp_data
+                    )
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if completed_pages:
+            timings = list(completed_pages.values())
+            logger.info(
+                "整页图片耗时: 平均 %.1fs, 最长 %.1fs (%d 页)",
+                sum(timings) / len(timings), max(timings), len(timings)
+            )
 
         # 最终进度
         await save_checkpoint_callback(
@@ -1208,7 +1284,8 @@ class MangaPromptServiceV2:
                 "stage": "completed",
                 "current": total_pages,
                 "total": total_pages,
-                "message": f"完成: {generated_count} 张图片"
+                "message": f"完成: {len(completed_pages)} 张图片",
+                "page_timings": completed_pages,
             },
             cp_data
         )
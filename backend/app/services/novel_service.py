@@ -15,10 +15,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.state_machine import ProjectStatus
 from ..exceptions import ResourceNotFoundError, InvalidParameterError
-from ..serializers.novel_serializer import NovelSerializer
+from ..serializers.novel_serializer import (
+    NovelSerializer,
+    PROJECT_SCHEMA_RELATIONS,
+    SECTION_RELATIONS,
+)
 from ..models import Chapter, ChapterOutline, ChapterVersion, NovelBlueprint, NovelProject
 from ..repositories.novel_repository import NovelRepository
-from ..repositories.chapter_repository import ChapterOutlineRepository
+from ..repositories.chapter_repository import ChapterOutlineRepository, ChapterRepository
 from .project_service_base import ProjectServiceBase
 from ..schemas.novel import (
     Chapter as ChapterSchema,
@@ -55,6 +59,7 @@ class NovelService(ProjectServiceBase):
         self.session = session
         self.repo = NovelRepository(session)
         self.chapter_outline_repo = ChapterOutlineRepository(session)
+        self.chapter_repo = ChapterRepository(session)
         # 组合ChapterVersionService，委托章节版本管理
         self._chapter_version_service = ChapterVersionService(session)
         super().__init__(
@@ -289,13 +294,12 @@ class NovelService(ProjectServiceBase):
         project_id: str,
         user_id: Optional[int] = None
     ) -> NovelProjectSchema:
-        """获取项目Schema"""
+        """获取项目Schema（章节只加载元数据，不加载版本正文与评审）"""
         if user_id is not None:
-            project = await self.ensure_project_owner(project_id, user_id)
-        else:
-            project = await self.repo.get_by_id(project_id)
-            if not project:
-                raise ResourceNotFoundError("项目", project_id)
+            await self.ensure_project_access(project_id, user_id)
+        project = await self.repo.get_with_partial_relations(project_id, PROJECT_SCHEMA_RELATIONS)
+        if not project:
+            raise ResourceNotFoundError("项目", project_id)
         return await NovelSerializer.serialize_project(project)
 
     async def get_section_data(
@@ -304,13 +308,14 @@ class NovelService(ProjectServiceBase):
         section: NovelSectionType,
         user_id: Optional[int] = None,
     ) -> NovelSectionResponse:
-        """获取项目的某个section数据"""
+        """获取项目的某个section数据（只加载该section用到的关联）"""
         if user_id is not None:
-            project = await self.ensure_project_owner(project_id, user_id)
-        else:
-            project = await self.repo.get_by_id(project_id)
-            if not project:
-                raise ResourceNotFoundError("项目", project_id)
+            await self.ensure_project_access(project_id, user_id)
+        project = await self.repo.get_with_partial_relations(
+            project_id, SECTION_RELATIONS.get(section, ())
+        )
+        if not project:
+            raise ResourceNotFoundError("项目", project_id)
         return NovelSerializer.build_section_response(project, section)
 
     async def get_chapter_schema(
@@ -319,14 +324,18 @@ class NovelService(ProjectServiceBase):
         chapter_number: int,
         user_id: Optional[int] = None,
     ) -> ChapterSchema:
-        """获取章节Schema"""
+        """获取章节Schema（只查询目标章节的大纲、版本与评审）"""
         if user_id is not None:
-            project = await self.ensure_project_owner(project_id, user_id)
-        else:
-            project = await self.repo.get_by_id(project_id)
-            if not project:
-                raise ResourceNotFoundError("项目", project_id)
-        return NovelSerializer.build_chapter_schema(project, chapter_number)
+            await self.ensure_project_access(project_id, user_id)
+        elif await self.repo.get_owner_id(project_id) is None:
+            raise ResourceNotFoundError("项目", project_id)
+        outline = await self.chapter_outline_repo.get_by_project_and_number(project_id, chapter_number)
+        chapter = await self.chapter_repo.get_with_versions_by_number(project_id, chapter_number)
+        return NovelSerializer.build_chapter_schema_from(
+            chapter_number,
+            outline=outline,
+            chapter=chapter,
+        )
 
     async def list_projects_for_user(
         self,
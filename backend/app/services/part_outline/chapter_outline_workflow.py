@@ -8,6 +8,7 @@ import logging
 from typing import Any, Dict, List, Optional, Callable, Awaitable
 
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
 from ...core.constants import LLMConstants, GenerationStatus
 from ...models.part_outline import PartOutline
@@ -131,6 +132,8 @@ class ChapterOutlineWorkflow:
 
         # 使用章节大纲生成专用提示词，回退到blueprint
         system_prompt = await self._resolve_system_prompt()
+        # 已有大纲按章节号索引（一次构建，批次内 O(1) 判断是否存在）
+        existing_outlines = {o.chapter_number: o for o in project.outlines}
         all_generated_chapters: List[Dict[str, Any]] = []
         current_chapter = start_chapter
 
@@ -182,29 +185,32 @@ class ChapterOutlineWorkflow:
             # 解析响应
             chapters_data = self.parser.parse_chapter_outlines(response)
 
-            # 保存章节大纲
+            # 保存章节大纲（整批一条 upsert 语句）
+            batch_rows: List[Dict[str, Any]] = []
             for chapter_data in chapters_data:
                 chapter_number = chapter_data.get("chapter_number")
                 if not chapter_number:
                     continue
 
-                if not regenerate:
-                    existing = next(
-                        (o for o in project.outlines if o.chapter_number == chapter_number),
-                        None,
-                    )
-                    if existing:
-                        logger.info("章节 %d 大纲已存在，跳过", chapter_number)
-                        continue
-
-                await self.chapter_outline_repo.upsert_outline(
-                    project_id=project_id,
-                    chapter_number=chapter_number,
-                    title=chapter_data.get("title", ""),
-                    summary=chapter_data.get("summary", "")
-                )
+                if not regenerate and chapter_number in existing_outlines:
+                    logger.info("章节 %d 大纲已存在，跳过", chapter_number)
+                    continue
+
+                batch_rows.append({
+                    "chapter_number": chapter_number,
+                    "title": chapter_data.get("title", ""),
+                    "summary": chapter_data.get("summary", ""),
+                })
                 all_generated_chapters.append(chapter_data)
 
+            await self.chapter_outline_repo.bulk_upsert(project_id, batch_rows)
+            # 批量语句不经过 ORM，同步会话中已加载的大纲实例（不产生额外 SQL）
+            for row in batch_rows:
+                outline = existing_outlines.get(row["chapter_number"])
+                if outline is not None:
+                    set_committed_value(outline, "title", row["title"])
+                    set_committed_value(outline, "summary", row["summary"])
+
             logger.info("成功生成第 %d-%d 章大纲", current_chapter, batch_end)
 
             # 更新进度
@@ -4,16 +4,18 @@
 负责长篇小说的分层大纲生成，作为协调者委托具体职责给各子模块。
 """
 
+import asyncio
 import logging
 import math
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...core.state_machine import ProjectStatus, ProjectStateMachine
 from ...core.config import settings
 from ...core.constants import NovelConstants, LLMConstants, GenerationStatus
+from ...db.session import AsyncSessionLocal
 from ...exceptions import (
     ResourceNotFoundError,
     InvalidParameterError,
@@ -35,6 +37,7 @@ from ...serializers.part_outline_serializer import build_part_outline_schema
 from ..llm_service import LLMService
 from ..llm_wrappers import call_llm_json, LLMProfile
 from ..prompt_service import PromptService
+from ..queue import LLMRequestQueue
 from ..novel_service import NovelService
 from ..prompt_builder import PromptBuilder
 from ..vector_store_service import VectorStoreService
@@ -512,7 +515,16 @@ class PartOutlineService:
         max_concurrent: int = 3,
     ) -> PartOutlineGenerationProgress:
         """
-        批量生成多个部分的章节大纲
+        批量生成多个部分的章节大纲（并发模式）
+
+        每个部分在独立的数据库会话中生成（状态、进度、取消检查互不干扰），
+        并发数取 max_concurrent 与 LLM 队列并发上限中的较小值。部分按编号顺序启动，
+        用户可随时取消其中某个部分（cancel_part_generation），其他部分继续生成。
+
+        取舍：同时生成的部分互相看不到对方的章节大纲，后一部分的首批章节无法参考上一部分
+        最后几章的具体内容，部分交界处的衔接只依据上一部分大纲的摘要与结尾钩子，
+        不如串行生成（generate_part_chapters 逐部分调用）连贯。需要严格衔接时可将
+        max_concurrent 设为 1。
 
         Args:
             project_id: 项目ID
@@ -523,14 +535,8 @@ class PartOutlineService:
         Returns:
             PartOutlineGenerationProgress: 生成进度
         """
-        logger.info("开始批量生成章节大纲（串行模式）")
-
         if part_numbers:
-            parts = []
-            for pn in part_numbers:
-                part = await self.repo.get_by_part_number(project_id, pn)
-                if part:
-                    parts.append(part)
+            parts = await self.repo.get_by_part_numbers(project_id, part_numbers)
         else:
             parts = await self.repo.get_pending_parts(project_id)
 
@@ -543,35 +549,53 @@ class PartOutlineService:
                 status="completed",
             )
 
-        logger.info("共有 %d 个部分待生成", len(parts))
-
-        results = []
-        for part in parts:
-            try:
-                logger.info("开始生成第 %d 部分", part.part_number)
-                chapters = await self.generate_part_chapters(
-                    project_id=project_id,
-                    user_id=user_id,
-                    part_number=part.part_number,
-                    regenerate=False,
-                )
-                results.append({"success": True, "part_number": part.part_number, "chapters": len(chapters)})
-            except Exception as exc:
-                log_exception(
-                    exc,
-                    "批量生成部分章节",
-                    level="error",
-                    project_id=project_id,
-                    part_number=part.part_number,
-                    user_id=user_id
-                )
-                results.append({"success": False, "part_number": part.part_number, "error": str(exc)})
+        concurrency = max(1, min(max_concurrent, LLMRequestQueue.get_instance().max_concurrent, len(parts)))
+        logger.info("开始批量生成章节大纲：共 %d 个部分，并发 %d", len(parts), concurrency)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def generate_part(part_number: int) -> Dict[str, Any]:
+            """在独立会话中生成单个部分的章节大纲"""
+            async with semaphore:
+                async with AsyncSessionLocal() as part_session:
+                    part_service = PartOutlineService(part_session, vector_store=self._vector_store)
+                    try:
+                        logger.info("开始生成第 %d 部分", part_number)
+                        chapters = await part_service.generate_part_chapters(
+                            project_id=project_id,
+                            user_id=user_id,
+                            part_number=part_number,
+                            regenerate=False,
+                        )
+                        return {"success": True, "part_number": part_number, "chapters": len(chapters)}
+                    except Exception as exc:
+                        await part_session.rollback()
+                        log_exception(
+                            exc,
+                            "批量生成部分章节",
+                            level="error",
+                            project_id=project_id,
+                            part_number=part_number,
+                            user_id=user_id
+                        )
+                        return {"success": False, "part_number": part_number, "error": str(exc)}
+
+        tasks = [asyncio.create_task(generate_part(part.part_number)) for part in parts]
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
         completed = sum(1 for r in results if r["success"])
         failed = len(results) - completed
 
         logger.info("批量生成完成，成功=%d，失败=%d", completed, failed)
 
+        # 各部分在独立会话中更新，丢弃本会话中的旧状态后重新读取
+        self.session.expire_all()
         all_parts = await self.repo.get_by_project_id(project_id)
 
         all_completed = all(p.generation_status == GenerationStatus.COMPLETED for p in all_parts)
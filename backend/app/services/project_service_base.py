@@ -53,6 +53,22 @@ class ProjectServiceBase:
             raise PermissionDeniedError("无权访问该项目")
         return project
 
+    async def ensure_project_access(self, project_id: str, user_id: int) -> None:
+        """
+        仅校验项目归属，不加载项目关联数据
+
+        仓储未提供 get_owner_id 时退回 ensure_project_owner。
+        """
+        get_owner_id = getattr(self.repo, "get_owner_id", None)
+        if get_owner_id is None:
+            await self.ensure_project_owner(project_id, user_id)
+            return
+        owner_id = await get_owner_id(project_id)
+        if owner_id is None:
+            raise ResourceNotFoundError(self.resource_name, project_id)
+        if owner_id != user_id:
+            raise PermissionDeniedError("无权访问该项目")
+
     def _is_backward_transition(self, current_status: str, new_status: str) -> bool:
         """判断是否为回退转换（使用状态机统一定义）"""
         return ProjectStateMachine.check_backward_transition(current_status, new_status)
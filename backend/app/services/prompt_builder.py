@@ -179,12 +179,19 @@ class PromptBuilder:
 
         # 获取上一部分的ending_hook
         prev_part_hook = None
+        prev_part_summary = None
         if part_outline.part_number > 1:
             prev_part_outline = await self.part_outline_repo.get_by_part_number(
                 project.id, part_outline.part_number - 1
             )
             if prev_part_outline:
                 prev_part_hook = prev_part_outline.ending_hook
+                # 上一部分的章节大纲尚未生成（批量并发生成时常见）时，以其部分摘要衔接前文
+                has_prev_chapter = any(
+                    ch.get("chapter_number") == actual_start - 1 for ch in (previous_chapters or [])
+                )
+                if not has_prev_chapter:
+                    prev_part_summary = prev_part_outline.summary
 
         # 获取下一部分的summary
         next_part_summary = None
@@ -240,6 +247,9 @@ class PromptBuilder:
                 prompt += f"\n- 第{summary.get('chapter_number', '?')}章 {summary.get('title', '')}：{summary.get('summary', '')}{score}"
 
         # 添加上下文信息
+        if prev_part_summary:
+            prompt += f"\n\n## 上一部分概要\n{prev_part_summary}"
+
         if prev_part_hook:
             prompt += f"\n\n## 上一部分结尾\n{prev_part_hook}"
 
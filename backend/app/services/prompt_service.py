@@ -14,9 +14,11 @@ from typing import Any, Dict, List, Optional
 import yaml
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.config import settings
 from ..models import Prompt
 from ..repositories.prompt_repository import PromptRepository
 from ..schemas.prompt import PromptCreate, PromptRead, PromptUpdate
+from .shared_state import VersionWatcher
 from ..utils.prompt_include import parse_yaml_frontmatter, resolve_prompt_includes
 
 logger = logging.getLogger(__name__)
@@ -30,6 +32,8 @@ class PromptCache:
     1. 只初始化一次
     2. 数据库查询不在锁内执行
     3. 多个协程安全访问
+
+    多 worker 部署时，写操作递增共享版本号，其他 worker 在下次 ensure_loaded 时发现变化并重新加载。
     """
 
     def __init__(self):
@@ -37,6 +41,7 @@ class PromptCache:
         self._lock = asyncio.Lock()
         self._loaded = False
         self._loading = False  # 防止并发加载
+        self._watcher = VersionWatcher("prompts", settings.shared_state_sync_interval)
 
     async def ensure_loaded(self, loader_func) -> None:
         """
@@ -45,6 +50,11 @@ class PromptCache:
         Args:
             loader_func: 异步加载函数，返回提示词列表
         """
+        if self._loaded and await self._watcher.changed():
+            async with self._lock:
+                self._loaded = False
+            logger.debug("检测到其他 worker 修改了提示词，重新加载缓存")
+
         # 第一次检查（无锁）
         if self._loaded:
             return
@@ -81,20 +91,24 @@ class PromptCache:
         """获取缓存项（同步方法，无锁）"""
         return self._cache.get(name)
 
-    async def set(self, name: str, value: PromptRead) -> None:
-        """设置缓存项"""
+    async def set(self, name: str, value: PromptRead, *, broadcast: bool = True) -> None:
+        """设置缓存项（broadcast=False 用于读穿透回填，不通知其他 worker）"""
         async with self._lock:
             self._cache[name] = value
+        if broadcast:
+            await self._watcher.bump()
 
     async def remove(self, name: str) -> None:
         """移除缓存项"""
         async with self._lock:
             self._cache.pop(name, None)
+        await self._watcher.bump()
 
     async def invalidate(self) -> None:
         """使缓存失效，下次访问时重新加载"""
         async with self._lock:
             self._loaded = False
+        await self._watcher.bump()
 
     @property
     def is_loaded(self) -> bool:
@@ -291,7 +305,7 @@ class PromptService:
 
         # 更新缓存
         prompt_read = PromptRead.model_validate(prompt)
-        await self._cache.set(name, prompt_read)
+        await self._cache.set(name, prompt_read, broadcast=False)
         return prompt_read.content
 
     async def get_prompt_or_fallback(
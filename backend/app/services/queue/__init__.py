@@ -4,10 +4,12 @@
 提供LLM和图片生成的并发控制功能。
 """
 
+from .limiter import RequestPriority
 from .llm_queue import LLMRequestQueue
 from .image_queue import ImageRequestQueue
 
 __all__ = [
+    "RequestPriority",
     "LLMRequestQueue",
     "ImageRequestQueue",
 ]
@@ -1,13 +1,20 @@
 """
 请求队列基类
 
-提供基于Semaphore的并发控制和状态跟踪功能。
+提供基于公平优先级限制器的并发控制和状态跟踪功能。
+
+多 worker 部署（共享状态后端为 sqlite/redis）时，每个 worker 的本地限制器之外还需取得
+共享租约槽位，使 max_concurrent 成为所有 worker 合计的上限。
 """
 
 import asyncio
 import logging
+import os
+import uuid
 from contextlib import asynccontextmanager
-from typing import Dict, Optional
+from typing import Any, Dict, Hashable, Optional
+
+from .limiter import FairPriorityLimiter, RequestPriority
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +23,11 @@ class RequestQueue:
     """
     请求队列基类
 
-    使用asyncio.Semaphore实现并发控制，支持：
+    使用 FairPriorityLimiter 实现并发控制，支持：
     - 最大并发数限制
-    - 队列状态跟踪（活跃数、等待数、已处理数）
-    - 动态调整并发数
+    - 请求优先级与按用户公平轮转
+    - 队列状态跟踪（活跃数、等待数、已处理数、等待时长分布）
+    - 动态调整并发数（对正在等待的请求同样生效）
     """
 
     def __init__(self, name: str, max_concurrent: int = 3):
@@ -31,107 +39,161 @@ class RequestQueue:
             max_concurrent: 最大并发数
         """
         self.name = name
-        self._max_concurrent = max_concurrent
-        self._semaphore = asyncio.Semaphore(max_concurrent)
-        self._lock = asyncio.Lock()
+        self._limiter = FairPriorityLimiter(max_concurrent)
 
         # 状态计数器
-        self._active_count = 0      # 正在执行的请求数
-        self._waiting_count = 0     # 等待中的请求数
         self._total_processed = 0   # 已处理总数
 
         logger.info(
             "队列 %s 已初始化: max_concurrent=%d",
-            self.name, self._max_concurrent
+            self.name, max_concurrent
         )
 
-    async def acquire(self) -> None:
+    async def acquire(
+        self,
+        priority: RequestPriority = RequestPriority.NORMAL,
+        user_id: Optional[Hashable] = None,
+    ) -> None:
         """
         获取执行槽位
 
         如果当前并发数已达上限，将阻塞等待直到有槽位释放。
-        """
-        async with self._lock:
-            self._waiting_count += 1
 
+        Args:
+            priority: 请求优先级
+            user_id: 发起请求的用户（同优先级内按用户轮转）
+        """
         logger.debug(
-            "队列 %s: 请求等待槽位 (active=%d, waiting=%d)",
-            self.name, self._active_count, self._waiting_count
+            "队列 %s: 请求等待槽位 (active=%d, waiting=%d, priority=%s)",
+            self.name, self._limiter.active, self._limiter.waiting, priority.name
         )
 
-        await self._semaphore.acquire()
-
-        async with self._lock:
-            self._waiting_count -= 1
-            self._active_count += 1
+        await self._limiter.acquire(priority, user_id)
 
         logger.debug(
             "队列 %s: 获取到槽位 (active=%d, waiting=%d)",
-            self.name, self._active_count, self._waiting_count
+            self.name, self._limiter.active, self._limiter.waiting
         )
 
     async def release(self) -> None:
         """释放执行槽位"""
-        async with self._lock:
-            self._active_count -= 1
-            self._total_processed += 1
+        self._release()
 
-        self._semaphore.release()
+    def _release(self) -> None:
+        self._total_processed += 1
+        self._limiter.release()
 
         logger.debug(
             "队列 %s: 释放槽位 (active=%d, total=%d)",
-            self.name, self._active_count, self._total_processed
+            self.name, self._limiter.active, self._total_processed
         )
 
     @asynccontextmanager
-    async def request_slot(self):
+    async def request_slot(
+        self,
+        priority: RequestPriority = RequestPriority.NORMAL,
+        user_id: Optional[Hashable] = None,
+    ):
         """
         上下文管理器，自动管理槽位的获取和释放
 
         使用示例：
-            async with queue.request_slot():
+            async with queue.request_slot(RequestPriority.BACKGROUND, user_id):
                 await do_something()
         """
-        await self.acquire()
+        await self.acquire(priority, user_id)
+        lease: Optional[str] = None
+        renew_task: Optional[asyncio.Task] = None
         try:
+            lease = await self._acquire_shared_slot()
+            if lease is not None:
+                renew_task = asyncio.create_task(self._renew_shared_slot(lease))
             yield
         finally:
-            await self.release()
+            # 同步释放：即使所在任务正被取消也不会丢失槽位
+            self._release()
+            if renew_task is not None:
+                renew_task.cancel()
+            if lease is not None:
+                await self._release_shared_slot(lease)
+
+    @property
+    def _shared_slot_name(self) -> str:
+        return f"queue:{self.name}"
 
-    def get_status(self) -> Dict[str, int]:
+    async def _acquire_shared_slot(self) -> Optional[str]:
+        """
+        获取跨 worker 的共享槽位
+
+        Returns:
+            租约持有者标识；非分布式后端返回 None
+        """
+        from ..shared_state import get_shared_state
+        from ...core.config import settings
+
+        backend = get_shared_state()
+        if not backend.distributed:
+            return None
+
+        holder = f"{os.getpid()}:{uuid.uuid4().hex}"
+        delay = 0.05
+        while not await backend.try_acquire_slot(
+            self._shared_slot_name, holder, self.max_concurrent, settings.shared_state_slot_ttl
+        ):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+        return holder
+
+    async def _renew_shared_slot(self, holder: str) -> None:
+        """持有期间定期续期租约（长时间的生成请求不会因租约过期被其他 worker 挤占）"""
+        from ..shared_state import get_shared_state
+        from ...core.config import settings
+
+        ttl = settings.shared_state_slot_ttl
+        while True:
+            await asyncio.sleep(ttl / 3)
+            try:
+                await get_shared_state().refresh_slot(self._shared_slot_name, holder, ttl)
+            except Exception as exc:
+                logger.warning("队列 %s: 续期共享槽位失败: %s", self.name, exc)
+
+    async def _release_shared_slot(self, holder: str) -> None:
+        from ..shared_state import get_shared_state
+
+        try:
+            await get_shared_state().release_slot(self._shared_slot_name, holder)
+        except Exception as exc:
+            # 释放失败时租约会在到期后自动回收
+            logger.warning("队列 %s: 释放共享槽位失败: %s", self.name, exc)
+
+    def get_status(self) -> Dict[str, Any]:
         """
         获取队列状态
 
         Returns:
-            包含 active, waiting, max_concurrent, total_processed 的字典
+            包含 active, waiting, max_concurrent, total_processed 以及
+            按优先级的等待数、等待时长直方图的字典
         """
         return {
-            "active": self._active_count,
-            "waiting": self._waiting_count,
-            "max_concurrent": self._max_concurrent,
+            "active": self._limiter.active,
+            "waiting": self._limiter.waiting,
+            "max_concurrent": self._limiter.limit,
             "total_processed": self._total_processed,
+            **self._limiter.get_stats(),
         }
 
     def set_max_concurrent(self, value: int) -> None:
         """
         动态调整最大并发数
 
-        注意：调整后立即生效，但不会中断正在执行的请求。
+        调整后立即生效（包括正在等待的请求），但不会中断正在执行的请求。
         如果新值小于当前活跃数，新请求将等待直到活跃数降低。
 
         Args:
             value: 新的最大并发数
         """
-        if value < 1:
-            raise ValueError("最大并发数必须大于0")
-
-        old_value = self._max_concurrent
-        self._max_concurrent = value
-
-        # 重建Semaphore
-        # 注意：这里简单重建，当前等待的请求会继续等待旧的semaphore
-        # 更复杂的实现可以考虑使用自定义的可调整Semaphore
-        self._semaphore = asyncio.Semaphore(value)
+        old_value = self._limiter.limit
+        self._limiter.set_limit(value)
 
         logger.info(
             "队列 %s: 调整最大并发数 %d -> %d",
@@ -141,7 +203,7 @@ class RequestQueue:
     @property
     def max_concurrent(self) -> int:
         """获取当前最大并发数"""
-        return self._max_concurrent
+        return self._limiter.limit
 
 
 class ConfigurableRequestQueue(RequestQueue):
@@ -0,0 +1,216 @@
+"""
+公平优先级并发限制器
+
+替代 asyncio.Semaphore 用于请求队列，支持：
+- 运行时调整并发上限（等待中的请求按新上限放行，释放不会落到旧对象上）
+- 优先级：交互请求优先于普通请求，普通请求优先于后台批量任务
+- 同一优先级内按用户轮转（每个用户内部 FIFO），避免单个用户的批量任务占满槽位
+- 老化：等待过久的低优先级请求逐级提升，防止饿死
+- 取消安全：等待中被取消的请求会移出队列；已分配到槽位后才被取消的请求会把槽位转交给下一个
+- 等待时长直方图，用于 get_status 诊断
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RequestPriority(IntEnum):
+    """请求优先级（数值越小越优先）"""
+    INTERACTIVE = 0  # 用户正在等待结果的请求（流式对话、章节生成）
+    NORMAL = 1       # 默认
+    BACKGROUND = 2   # 后台批量任务（批量摘要、索引等）
+
+
+# 等待时长直方图分桶上界（毫秒），最后一个桶收纳所有更长的等待
+WAIT_HISTOGRAM_BUCKETS_MS = (10, 100, 500, 1000, 5000, 10000, 30000, 60000)
+
+# 等待多少秒提升一个优先级
+DEFAULT_AGING_SECONDS = 30.0
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    priority: RequestPriority
+    user_key: Hashable
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class FairPriorityLimiter:
+    """
+    可调整上限的公平优先级并发限制器
+
+    所有操作都在事件循环线程中同步完成，不需要额外的锁。
+    """
+
+    def __init__(self, limit: int, *, aging_seconds: float = DEFAULT_AGING_SECONDS):
+        if limit < 1:
+            raise ValueError("最大并发数必须大于0")
+        self._limit = limit
+        self._aging_seconds = aging_seconds
+        self._active = 0
+        # 优先级 -> (用户 -> 该用户的等待队列)；OrderedDict 的顺序即轮转顺序
+        self._queues: Dict[RequestPriority, "OrderedDict[Hashable, Deque[_Waiter]]"] = {
+            priority: OrderedDict() for priority in RequestPriority
+        }
+        self._waiting = 0
+
+        self._histogram: List[int] = [0] * (len(WAIT_HISTOGRAM_BUCKETS_MS) + 1)
+        self._wait_total_ms = 0.0
+        self._wait_max_ms = 0.0
+        self._granted = 0
+        self._cancelled = 0
+
+    # ------------------------------------------------------------------
+    # 对外接口
+    # ------------------------------------------------------------------
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    async def acquire(
+        self,
+        priority: RequestPriority = RequestPriority.NORMAL,
+        user_key: Hashable = None,
+    ) -> None:
+        """获取一个槽位，必要时排队等待"""
+        if self._active < self._limit and self._waiting == 0:
+            self._active += 1
+            self._record_wait(0.0)
+            return
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(future=loop.create_future(), priority=priority, user_key=user_key)
+        self._queues[priority].setdefault(user_key, deque()).append(waiter)
+        self._waiting += 1
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 槽位已分配但调用方在拿到之前被取消：把槽位交还
+                self.release()
+            else:
+                self._remove_waiter(waiter)
+            self._cancelled += 1
+            raise
+
+    def release(self) -> None:
+        """释放一个槽位并唤醒下一个等待者"""
+        if self._active <= 0:
+            logger.warning("并发限制器释放次数多于获取次数，已忽略")
+            return
+        self._active -= 1
+        self._dispatch()
+
+    def set_limit(self, value: int) -> None:
+        """
+        调整并发上限
+
+        调大时立即放行等待者；调小时不中断正在执行的请求，活跃数降到新上限以下后才继续放行。
+        """
+        if value < 1:
+            raise ValueError("最大并发数必须大于0")
+        self._limit = value
+        self._dispatch()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取等待统计"""
+        labels = [f"<={bound}ms" for bound in WAIT_HISTOGRAM_BUCKETS_MS]
+        labels.append(f">{WAIT_HISTOGRAM_BUCKETS_MS[-1]}ms")
+        return {
+            "waiting_by_priority": {
+                priority.name.lower(): sum(len(q) for q in self._queues[priority].values())
+                for priority in RequestPriority
+            },
+            "wait_histogram": dict(zip(labels, self._histogram)),
+            "wait_avg_ms": round(self._wait_total_ms / self._granted, 1) if self._granted else 0.0,
+            "wait_max_ms": round(self._wait_max_ms, 1),
+            "cancelled": self._cancelled,
+        }
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    def _dispatch(self) -> None:
+        """在有空闲槽位时按优先级与用户轮转放行等待者"""
+        while self._active < self._limit and self._waiting:
+            waiter = self._pop_next()
+            if waiter is None:
+                break
+            self._waiting -= 1
+            if waiter.future.done():
+                # 已被取消的等待者（理论上已移除，这里兜底）
+                continue
+            self._active += 1
+            self._record_wait((time.monotonic() - waiter.enqueued_at) * 1000)
+            waiter.future.set_result(None)
+
+    def _pop_next(self) -> Optional[_Waiter]:
+        """选出下一个放行的等待者"""
+        now = time.monotonic()
+        best_priority: Optional[RequestPriority] = None
+        best_rank: Optional[Tuple[int, float]] = None
+        for priority, users in self._queues.items():
+            if not users:
+                continue
+            oldest = min(queue[0].enqueued_at for queue in users.values())
+            promoted = int((now - oldest) / self._aging_seconds) if self._aging_seconds > 0 else 0
+            # 同等有效优先级时等待最久的一级先放行
+            rank = (max(int(priority) - promoted, 0), oldest)
+            if best_rank is None or rank < best_rank:
+                best_rank = rank
+                best_priority = priority
+        if best_priority is None:
+            return None
+
+        users = self._queues[best_priority]
+        user_key, queue = next(iter(users.items()))
+        waiter = queue.popleft()
+        if queue:
+            # 轮转：该用户排到本优先级队尾
+            users.move_to_end(user_key)
+        else:
+            del users[user_key]
+        return waiter
+
+    def _remove_waiter(self, waiter: _Waiter) -> None:
+        users = self._queues[waiter.priority]
+        queue = users.get(waiter.user_key)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            return
+        self._waiting -= 1
+        if not queue:
+            del users[waiter.user_key]
+
+    def _record_wait(self, wait_ms: float) -> None:
+        self._granted += 1
+        self._wait_total_ms += wait_ms
+        if wait_ms > self._wait_max_ms:
+            self._wait_max_ms = wait_ms
+        for idx, bound in enumerate(WAIT_HISTOGRAM_BUCKETS_MS):
+            if wait_ms <= bound:
+                self._histogram[idx] += 1
+                return
+        self._histogram[-1] += 1
@@ -12,6 +12,7 @@ from typing import List, Optional, Dict, Any
 from ...schemas.novel import (
     ChapterAnalysisData,
 )
+from ..entity_matcher import KIND_LOCATION, EntityMatch, EntityMatcher, get_entity_matcher
 from .utils import extract_involved_characters, build_outline_text
 
 
@@ -78,6 +79,8 @@ class EnhancedQueryBuilder:
         prev_chapter_analysis: Optional[ChapterAnalysisData] = None,
         pending_foreshadowing: Optional[List[Dict[str, Any]]] = None,
         writing_notes: Optional[str] = None,
+        world_setting: Optional[Dict[str, Any]] = None,
+        project_id: Optional[str] = None,
     ) -> EnhancedQuery:
         """
         构建多维查询
@@ -88,6 +91,8 @@ class EnhancedQueryBuilder:
             prev_chapter_analysis: 前一章的分析数据
             pending_foreshadowing: 待回收的伏笔列表
             writing_notes: 用户的写作指令
+            world_setting: 世界观设定（用于识别大纲中的已知地点）
+            project_id: 项目ID（用于缓存实体匹配器）
 
         Returns:
             EnhancedQuery: 多维查询结构
@@ -95,9 +100,14 @@ class EnhancedQueryBuilder:
         # 1. 构建主查询
         main_query = self._build_main_query(outline, writing_notes)
 
+        # 一次扫描大纲，得到角色/别名/地点的全部命中
+        matcher = get_entity_matcher(blueprint_characters, world_setting, project_id=project_id)
+        outline_matches = matcher.find_all(build_outline_text(outline))
+        known_locations = EntityMatcher.names(outline_matches, KIND_LOCATION)
+
         # 2. 提取并构建角色查询
         involved_characters = self._extract_involved_characters(
-            outline, blueprint_characters
+            outline, blueprint_characters, outline_matches
         )
         character_queries = self._build_character_queries(
             involved_characters, prev_chapter_analysis
@@ -109,11 +119,13 @@ class EnhancedQueryBuilder:
         )
 
         # 4. 构建场景查询
-        location_query = self._build_location_query(outline, prev_chapter_analysis)
+        location_query = self._build_location_query(
+            outline, prev_chapter_analysis, known_locations
+        )
 
         # 5. 提取实体提示
         entity_hints = self._extract_entity_hints(
-            involved_characters, outline, prev_chapter_analysis
+            involved_characters, outline, prev_chapter_analysis, known_locations
         )
 
         return EnhancedQuery(
@@ -151,15 +163,17 @@ class EnhancedQueryBuilder:
         self,
         outline: Dict[str, Any],
         blueprint_characters: List[Dict[str, Any]],
+        outline_matches: Optional[List[EntityMatch]] = None,
     ) -> List[Dict[str, Any]]:
         """从大纲中提取涉及的角色
 
-        通过匹配角色名称在大纲文本中出现来确定涉及的角色
+        通过匹配角色名称（及别名）在大纲文本中出现来确定涉及的角色
         """
         return extract_involved_characters(
             outline=outline,
             blueprint_characters=blueprint_characters,
             include_details=False,
+            matches=outline_matches,
         )
 
     def _build_character_queries(
@@ -266,12 +280,13 @@ class EnhancedQueryBuilder:
         self,
         outline: Dict[str, Any],
         prev_chapter_analysis: Optional[ChapterAnalysisData] = None,
+        known_locations: Optional[List[str]] = None,
     ) -> Optional[str]:
         """构建场景相关查询"""
-        outline_text = build_outline_text(outline)
-
-        # 尝试从大纲中提取地点
-        location = self._extract_location_from_text(outline_text)
+        # 优先使用大纲中出现的世界观已知地点，其次用模式匹配提取
+        location = known_locations[0] if known_locations else None
+        if not location:
+            location = self._extract_location_from_text(build_outline_text(outline))
 
         # 如果没有从大纲提取到，尝试从前一章分析中获取
         if not location and prev_chapter_analysis:
@@ -313,6 +328,7 @@ class EnhancedQueryBuilder:
         involved_characters: List[Dict[str, Any]],
         outline: Dict[str, Any],
         prev_chapter_analysis: Optional[ChapterAnalysisData] = None,
+        known_locations: Optional[List[str]] = None,
     ) -> Dict[str, List[str]]:
         """提取实体提示，用于增强检索"""
         hints = {
@@ -331,10 +347,17 @@ class EnhancedQueryBuilder:
                 if identity:
                     hints["characters"].append(f"{char_name}({identity})")
 
+        # 大纲中出现的已知地点
+        if known_locations:
+            hints["locations"].extend(known_locations)
+
         # 从前一章分析中获取地点和物品提示
         if prev_chapter_analysis and prev_chapter_analysis.metadata:
             if prev_chapter_analysis.metadata.locations:
-                hints["locations"].extend(prev_chapter_analysis.metadata.locations)
+                hints["locations"].extend(
+                    loc for loc in prev_chapter_analysis.metadata.locations
+                    if loc not in hints["locations"]
+                )
             if prev_chapter_analysis.metadata.items:
                 hints["items"].extend(prev_chapter_analysis.metadata.items)
 
@@ -7,7 +7,7 @@
 
 import math
 from dataclasses import dataclass
-from typing import List, Sequence, Tuple
+from typing import List, Optional, Sequence, Tuple
 
 from ..vector_store_service import RetrievedChunk, RetrievedSummary, VectorStoreService
 
@@ -175,16 +175,19 @@ class TemporalAwareRetriever:
     async def retrieve_chunks_with_temporal(
         self,
         project_id: str,
-        query_embedding: Sequence[float],
+        query_embedding: Optional[Sequence[float]],
         target_chapter: int,
         total_chapters: int,
         top_k: int = 10,
         candidate_multiplier: float = 2.0,
+        query_text: Optional[str] = None,
+        keywords: Optional[Sequence[str]] = None,
     ) -> List[RetrievedChunk]:
         """带时序感知的chunk检索
 
         流程：
-        1. 先检索更多候选（top_k * candidate_multiplier）
+        1. 先检索更多候选（top_k * candidate_multiplier），未来章节在检索时即被排除；
+           提供 query_text / keywords 时使用向量+词法混合检索（query_embedding 可为空，此时只做词法检索）
         2. 计算每个候选的综合得分（相似度 + 时序）
         3. 应用临近章节加分
         4. 按综合得分重新排序，返回top_k
@@ -196,23 +199,32 @@ class TemporalAwareRetriever:
             total_chapters: 小说总章节数
             top_k: 返回数量
             candidate_multiplier: 候选倍数
+            query_text: 词法检索的查询文本（可选）
+            keywords: 词法检索的实体关键词（可选，整词匹配）
 
         Returns:
             重排序后的检索结果
         """
-        # 获取更多候选
+        # 获取更多候选；当前章节及之后的内容在检索时排除（不应检索到未来章节）
         candidate_k = int(top_k * candidate_multiplier)
-        candidates = await self.vector_store.query_chunks(
-            project_id=project_id,
-            embedding=query_embedding,
-            top_k=candidate_k,
-        )
-
-        if not candidates:
-            return []
-
-        # 过滤掉当前章节及之后的内容（不应检索到未来章节）
-        candidates = [c for c in candidates if c.chapter_number < target_chapter]
+        if query_text or keywords:
+            candidates = await self.vector_store.query_chunks_hybrid(
+                project_id=project_id,
+                embedding=query_embedding,
+                query_text=query_text,
+                keywords=keywords,
+                top_k=candidate_k,
+                max_chapter=target_chapter - 1,
+            )
+        elif query_embedding:
+            candidates = await self.vector_store.query_chunks(
+                project_id=project_id,
+                embedding=query_embedding,
+                top_k=candidate_k,
+                max_chapter=target_chapter - 1,
+            )
+        else:
+            candidates = []
 
         if not candidates:
             return []
@@ -252,6 +264,7 @@ class TemporalAwareRetriever:
                     "_original_similarity": item.chunk.score,
                     "_temporal_score": item.temporal_score,
                 },
+                chunk_id=item.chunk.chunk_id,
             )
             results.append(updated_chunk)
 
@@ -279,20 +292,15 @@ class TemporalAwareRetriever:
         Returns:
             重排序后的摘要检索结果
         """
-        # 获取更多候选
+        # 获取更多候选；当前章节及之后的内容在检索时排除
         candidate_k = int(top_k * candidate_multiplier)
         candidates = await self.vector_store.query_summaries(
             project_id=project_id,
             embedding=query_embedding,
             top_k=candidate_k,
+            max_chapter=target_chapter - 1,
         )
 
-        if not candidates:
-            return []
-
-        # 过滤掉当前章节及之后的内容
-        candidates = [s for s in candidates if s.chapter_number < target_chapter]
-
         if not candidates:
             return []
 
@@ -6,35 +6,50 @@ RAG模块公共工具函数
 
 from typing import Any, Dict, List, Optional
 
+from ..entity_matcher import KIND_CHARACTER, EntityMatch, EntityMatcher, get_entity_matcher
+
 
 def extract_involved_characters(
     outline: Dict[str, Any],
     blueprint_characters: List[Dict[str, Any]],
     include_details: bool = False,
+    *,
+    matcher: Optional[EntityMatcher] = None,
+    matches: Optional[List[EntityMatch]] = None,
 ) -> List[Dict[str, Any]]:
     """
     从大纲中提取涉及的角色
 
-    通过匹配角色名称在大纲文本中出现来确定涉及的角色。
+    通过匹配角色名称（及别名）在大纲文本中出现来确定涉及的角色。
 
     Args:
         outline: 章节大纲 {"title": str, "summary": str, ...}
         blueprint_characters: 蓝图角色列表 [{"name": str, "identity": str, ...}]
         include_details: 是否包含角色详细信息（identity, personality, goals）
+        matcher: 实体匹配器（默认按角色列表从缓存获取）
+        matches: 调用方已对大纲文本扫描得到的命中（提供时不再扫描）
 
     Returns:
-        涉及角色列表
+        涉及角色列表（保持蓝图中的顺序）
     """
-    # 组合大纲文本
-    outline_text = " ".join([
-        outline.get("title", ""),
-        outline.get("summary", ""),
-    ])
+    if matches is None:
+        # 组合大纲文本
+        outline_text = " ".join([
+            outline.get("title", ""),
+            outline.get("summary", ""),
+        ])
+        if matcher is None:
+            matcher = get_entity_matcher(blueprint_characters)
+        matches = matcher.find_all(outline_text)
+
+    found_names = set(EntityMatcher.names(matches, KIND_CHARACTER))
+    if not found_names:
+        return []
 
     involved = []
     for char in blueprint_characters:
         char_name = char.get("name", "")
-        if char_name and char_name in outline_text:
+        if char_name and char_name in found_names:
             if include_details:
                 # 返回详细信息（用于上下文构建）
                 involved.append({
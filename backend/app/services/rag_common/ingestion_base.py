@@ -4,9 +4,15 @@ RAG入库通用基础实现
 提供通用的入库结果数据结构与基础入库流程，供编码/小说项目复用。
 """
 
+import asyncio
+import copy
+import inspect
 import logging
+import time
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Set, Type
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Type, Union
+
+from ...core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +30,28 @@ class IngestionResult:
     error_message: str = ""
 
 
+@dataclass
+class IngestionProgress:
+    """单个数据类型的入库进度（供进度回调使用）"""
+    data_type: Any
+    phase: str                       # started / embedding / completed / failed
+    total_records: int = 0           # 该类型的总记录数（记录生成后才已知）
+    processed_records: int = 0       # 已完成嵌入并写入（或失败）的记录数
+    added_count: int = 0             # 已写入向量库的记录数
+    failed_count: int = 0            # 失败的记录数
+    elapsed_seconds: float = 0.0     # 该类型已耗时
+
+    @property
+    def records_per_second(self) -> float:
+        """入库吞吐（记录/秒）"""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.processed_records / self.elapsed_seconds
+
+
+ProgressCallback = Callable[[IngestionProgress], Union[None, Awaitable[None]]]
+
+
 @dataclass
 class TypeChangeDetail:
     """单个数据类型的变动详情"""
@@ -83,8 +111,11 @@ class BaseProjectIngestionService:
         splitter: Optional[Any] = None,
         log_title: Optional[str] = None,
         logger_obj: Optional[logging.Logger] = None,
+        session_factory: Optional[Callable[[], Any]] = None,
     ):
         self.session = session
+        # 多类型并行入库时为每个类型创建独立会话（默认与 session 绑定同一引擎）
+        self._session_factory = session_factory
         self.vector_store = vector_store
         self.llm_service = llm_service
         self.user_id = self._to_int(user_id, default=1)
@@ -104,6 +135,14 @@ class BaseProjectIngestionService:
         self._log_title = log_title or self.LOG_TITLE
         self._logger = logger_obj or self.LOGGER_OBJ or logger
 
+        # 所有数据类型共享的嵌入批次并发上限（克隆实例共用同一个信号量）
+        self._embedding_slots: Optional[asyncio.Semaphore] = None
+        self._progress_callback: Optional[ProgressCallback] = None
+        # 嵌入配置只解析一次：并发的嵌入批次（含克隆实例）共用 llm_service 的会话，不能各自查询数据库
+        self._embedding_config: Optional[Dict[str, Any]] = None
+        self._embedding_config_resolved = False
+        self._embedding_config_lock = asyncio.Lock()
+
     # ==================== 子类需要实现的方法 ====================
 
     def _get_ingest_method_map(self) -> Dict[Any, Callable[..., Any]]:
@@ -160,25 +199,36 @@ class BaseProjectIngestionService:
     async def _batch_get_embeddings(
         self,
         texts: List[str],
-        batch_size: int = 10,
+        batch_size: Optional[int] = None,
     ) -> List[Optional[List[float]]]:
         """批量获取 embedding（失败时以 None 占位，保持索引对齐）"""
-        embeddings: List[Optional[List[float]]] = []
-
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            for text in batch:
-                try:
-                    embedding = await self.llm_service.get_embedding(
-                        text,
-                        user_id=self.user_id,
-                    )
-                    embeddings.append(embedding)
-                except Exception as exc:
-                    self._logger.warning("生成embedding失败: %s", str(exc))
-                    embeddings.append(None)
+        if not texts:
+            return []
 
-        return embeddings
+        try:
+            embedding_config = await self._ensure_embedding_config()
+            if embedding_config is None:
+                self._logger.warning("未配置嵌入模型，跳过 %d 条文本的embedding", len(texts))
+                return [None] * len(texts)
+            return await self.llm_service.embedding_service.get_embeddings(
+                texts,
+                user_id=self.user_id,
+                batch_size=batch_size,
+                config=embedding_config,
+            )
+        except Exception as exc:
+            self._logger.warning("批量生成embedding失败: %s", str(exc))
+            return [None] * len(texts)
+
+    async def _ensure_embedding_config(self) -> Optional[Dict[str, Any]]:
+        """解析并缓存嵌入配置（加锁，保证会话上同一时间只有一次查询）"""
+        if self._embedding_config_resolved:
+            return self._embedding_config
+        async with self._embedding_config_lock:
+            if not self._embedding_config_resolved:
+                self._embedding_config = await self.llm_service.embedding_service.resolve_config(self.user_id)
+                self._embedding_config_resolved = True
+        return self._embedding_config
 
     async def _get_sentence_embeddings(self, sentences: List[str]) -> Any:
         """为语义分块器提供句子嵌入矩阵（失败句子用零向量占位）。"""
@@ -187,17 +237,7 @@ class BaseProjectIngestionService:
         if not sentences:
             return np.array([])
 
-        raw_embeddings: List[Optional[List[float]]] = []
-        for sentence in sentences:
-            try:
-                embedding = await self.llm_service.get_embedding(
-                    sentence,
-                    user_id=self.user_id,
-                )
-                raw_embeddings.append(embedding or None)
-            except Exception as exc:
-                self._logger.warning("获取句子嵌入失败: %s", str(exc))
-                raw_embeddings.append(None)
+        raw_embeddings = await self._batch_get_embeddings(sentences)
 
         dim = next((len(e) for e in raw_embeddings if e), 1536)
         embeddings = [
@@ -206,13 +246,68 @@ class BaseProjectIngestionService:
         ]
         return np.array(embeddings)
 
+    def _get_embedding_slots(self) -> asyncio.Semaphore:
+        if self._embedding_slots is None:
+            self._embedding_slots = asyncio.Semaphore(settings.rag_ingest_max_inflight_embeddings)
+        return self._embedding_slots
+
+    def _get_embedding_batch_size(self) -> int:
+        embedding_service = getattr(self.llm_service, "embedding_service", None)
+        get_batch_size = getattr(embedding_service, "get_batch_size", None)
+        return get_batch_size() if get_batch_size else 32
+
+    async def _emit_progress(self, progress: IngestionProgress) -> None:
+        """调用进度回调（支持同步/异步回调，回调异常不影响入库）"""
+        if self._progress_callback is None:
+            return
+        try:
+            outcome = self._progress_callback(progress)
+            if inspect.isawaitable(outcome):
+                await outcome
+        except Exception as exc:
+            self._logger.debug("入库进度回调失败: %s", exc)
+
+    def _build_chunk_record(self, record: Any, embedding: Any, idx: int, project_id: str) -> Dict[str, Any]:
+        """把一条入库记录与其 embedding 组装为向量库 chunk"""
+        chunk_id = record.get_chunk_id()
+        metadata = {
+            **record.metadata,
+            "data_type": record.data_type.value,
+            "paragraph_hash": record.get_content_hash(),
+            "length": len(record.content),
+            "source_id": record.source_id,
+        }
+        metadata = self._prepare_metadata_for_vector_store(metadata)
+
+        chapter_number, chapter_title = self._get_source_info(record)
+        chapter_number_int = self._to_int(chapter_number, default=0)
+
+        chunk_index = record.metadata.get("section_index", idx)
+        chunk_index_int = self._to_int(chunk_index, default=idx)
+
+        return {
+            "id": chunk_id,
+            "project_id": project_id,
+            "chapter_number": chapter_number_int,
+            "chunk_index": chunk_index_int,
+            "chapter_title": chapter_title,
+            "content": record.content,
+            "embedding": self._prepare_embedding_for_vector_store(embedding),
+            "metadata": metadata,
+        }
+
     async def _ingest_records(
         self,
         records: List[Any],
         result: IngestionResult,
         project_id: str,
     ) -> IngestionResult:
-        """将记录入库到向量库（通用骨架实现）"""
+        """
+        将记录入库到向量库（流水线实现）
+
+        记录按嵌入批次切分，各批次并发生成 embedding（受全局在途批次数限制），
+        每个批次完成后立即写入向量库，而不是等全部 embedding 完成后一次性写入。
+        """
         if not records:
             return result
 
@@ -221,67 +316,74 @@ class BaseProjectIngestionService:
             result.error_message = "向量库未启用"
             return result
 
-        embeddings = await self._batch_get_embeddings([r.content for r in records])
-        if len(embeddings) != len(records):
-            result.success = False
-            result.error_message = "生成embedding数量不匹配"
-            return result
-
-        chunk_records: List[Dict[str, Any]] = []
-        for idx, (record, embedding) in enumerate(zip(records, embeddings)):
-            if not embedding:
-                result.failed_count += 1
-                continue
+        started_at = time.perf_counter()
+        batch_size = max(1, self._get_embedding_batch_size())
+        slots = self._get_embedding_slots()
+        progress = IngestionProgress(
+            data_type=result.data_type,
+            phase="embedding",
+            total_records=len(records),
+        )
+        sample_logged = False
+
+        async def run_batch(start: int) -> None:
+            nonlocal sample_logged
+            batch = records[start:start + batch_size]
+            async with slots:
+                embeddings = await self._batch_get_embeddings(
+                    [r.content for r in batch],
+                    batch_size=len(batch),
+                )
 
-            chunk_id = record.get_chunk_id()
-            metadata = {
-                **record.metadata,
-                "data_type": record.data_type.value,
-                "paragraph_hash": record.get_content_hash(),
-                "length": len(record.content),
-                "source_id": record.source_id,
-            }
-            metadata = self._prepare_metadata_for_vector_store(metadata)
-
-            chapter_number, chapter_title = self._get_source_info(record)
-            chapter_number_int = self._to_int(chapter_number, default=0)
-
-            chunk_index = record.metadata.get("section_index", idx)
-            chunk_index_int = self._to_int(chunk_index, default=idx)
-
-            chunk_records.append(
-                {
-                    "id": chunk_id,
-                    "project_id": project_id,
-                    "chapter_number": chapter_number_int,
-                    "chunk_index": chunk_index_int,
-                    "chapter_title": chapter_title,
-                    "content": record.content,
-                    "embedding": self._prepare_embedding_for_vector_store(embedding),
-                    "metadata": metadata,
-                }
-            )
+            if len(embeddings) != len(batch):
+                result.failed_count += len(batch)
+                result.success = False
+                result.error_message = "生成embedding数量不匹配"
+                chunk_records: List[Dict[str, Any]] = []
+            else:
+                chunk_records = []
+                for offset, (record, embedding) in enumerate(zip(batch, embeddings)):
+                    if not embedding:
+                        result.failed_count += 1
+                        continue
+                    chunk_records.append(
+                        self._build_chunk_record(record, embedding, start + offset, project_id)
+                    )
 
-        try:
             if chunk_records:
-                self._log_ingest_sample(result, chunk_records)
+                if not sample_logged:
+                    sample_logged = True
+                    self._log_ingest_sample(result, chunk_records)
+                try:
+                    await self.vector_store.upsert_chunks(records=chunk_records)
+                    result.added_count += len(chunk_records)
+                except Exception as exc:
+                    result.success = False
+                    result.error_message = str(exc)
+                    result.failed_count += len(chunk_records)
+                    self._logger.error(
+                        "入库失败: type=%s error=%s",
+                        result.data_type.value,
+                        str(exc),
+                    )
 
-            await self.vector_store.upsert_chunks(records=chunk_records)
-            result.added_count = len(chunk_records)
-            self._logger.info(
-                "入库完成: type=%s count=%d",
-                result.data_type.value,
-                result.added_count,
-            )
-        except Exception as exc:
-            result.success = False
-            result.error_message = str(exc)
-            self._logger.error(
-                "入库失败: type=%s error=%s",
-                result.data_type.value,
-                str(exc),
-            )
+            progress.processed_records += len(batch)
+            progress.added_count = result.added_count
+            progress.failed_count = result.failed_count
+            progress.elapsed_seconds = time.perf_counter() - started_at
+            await self._emit_progress(progress)
 
+        await asyncio.gather(*(run_batch(start) for start in range(0, len(records), batch_size)))
+
+        elapsed = time.perf_counter() - started_at
+        self._logger.info(
+            "入库完成: type=%s count=%d failed=%d elapsed=%.2fs rate=%.1f条/秒",
+            result.data_type.value,
+            result.added_count,
+            result.failed_count,
+            elapsed,
+            len(records) / elapsed if elapsed > 0 else 0.0,
+        )
         return result
 
     # ==================== 通用流程实现 ====================
@@ -289,18 +391,27 @@ class BaseProjectIngestionService:
     async def ingest_full_project(
         self,
         project_id: str,
-        force: bool = False
+        force: bool = False,
+        *,
+        progress_callback: Optional[ProgressCallback] = None,
+        max_parallel_types: Optional[int] = None,
     ) -> Dict[str, IngestionResult]:
         """
         完整入库 - 遍历所有数据类型
 
+        多个数据类型并发处理（每个类型使用独立的数据库会话，只读取已提交的数据），
+        所有类型共享同一个嵌入批次并发上限。
+
         Args:
             project_id: 项目ID
             force: 是否强制全量入库（默认False，只入库不完整的类型）
+            progress_callback: 按类型上报进度的回调（同步或异步函数）
+            max_parallel_types: 同时处理的类型数，默认读取配置（1 表示顺序执行）
 
         Returns:
-            各类型的入库结果字典
+            各类型的入库结果字典（按数据类型枚举顺序）
         """
+        self._progress_callback = progress_callback
         self._logger.info(
             "=== %s === project=%s force=%s vector_store=%s",
             self._log_title, project_id, force,
@@ -364,32 +475,99 @@ class BaseProjectIngestionService:
         # 遍历需要入库的类型
         types_to_process = incomplete_types if incomplete_types else set(self.data_type_enum.all_types())
 
-        for data_type in self.data_type_enum.all_types():
-            if data_type not in types_to_process:
+        parallel = max_parallel_types or settings.rag_ingest_parallel_types
+        session_factory = self._resolve_session_factory() if parallel > 1 else None
+        if session_factory is None:
+            parallel = 1
+        type_slots = asyncio.Semaphore(parallel)
+        self._get_embedding_slots()  # 先创建，保证克隆实例共享同一个信号量
+        # 在分发前用当前会话解析一次嵌入配置，克隆实例直接复用（每次入库重新解析，配置变更即时生效）
+        self._embedding_config_resolved = False
+        try:
+            await self._ensure_embedding_config()
+        except Exception as exc:
+            self._logger.warning("获取嵌入模型配置失败: %s", exc)
+
+        async def run_type(data_type: Any) -> IngestionResult:
+            async with type_slots:
+                started_at = time.perf_counter()
+                await self._emit_progress(IngestionProgress(data_type=data_type, phase="started"))
+                try:
+                    if session_factory is None:
+                        result = await self.ingest_by_type(project_id, data_type)
+                    else:
+                        async with session_factory() as type_session:
+                            worker = self._clone_with_session(type_session)
+                            result = await worker.ingest_by_type(project_id, data_type)
+                except Exception as e:
+                    self._logger.error(
+                        "入库类型 %s 失败: project=%s error=%s",
+                        data_type.value, project_id, str(e)
+                    )
+                    result = IngestionResult(
+                        success=False,
+                        data_type=data_type,
+                        error_message=str(e)
+                    )
+
+                elapsed = time.perf_counter() - started_at
+                await self._emit_progress(IngestionProgress(
+                    data_type=data_type,
+                    phase="completed" if result.success else "failed",
+                    total_records=result.total_records,
+                    processed_records=result.total_records,
+                    added_count=result.added_count,
+                    failed_count=result.failed_count,
+                    elapsed_seconds=elapsed,
+                ))
+                return result
+
+        ordered_types = list(self.data_type_enum.all_types())
+        pending = [data_type for data_type in ordered_types if data_type in types_to_process]
+        started_at = time.perf_counter()
+        type_results = await asyncio.gather(*(run_type(data_type) for data_type in pending))
+        results_by_type = dict(zip(pending, type_results))
+
+        for data_type in ordered_types:
+            if data_type in results_by_type:
+                results[data_type.value] = results_by_type[data_type]
+            else:
                 # 跳过已完整的类型
                 results[data_type.value] = IngestionResult(
                     success=True,
                     data_type=data_type,
                     skipped_count=1,
                 )
-                continue
-
-            try:
-                result = await self.ingest_by_type(project_id, data_type)
-                results[data_type.value] = result
-            except Exception as e:
-                self._logger.error(
-                    "入库类型 %s 失败: project=%s error=%s",
-                    data_type.value, project_id, str(e)
-                )
-                results[data_type.value] = IngestionResult(
-                    success=False,
-                    data_type=data_type,
-                    error_message=str(e)
-                )
 
+        self._logger.info(
+            "项目 %s 入库结束: types=%d parallel=%d elapsed=%.2fs",
+            project_id, len(pending), parallel, time.perf_counter() - started_at
+        )
         return results
 
+    def _resolve_session_factory(self) -> Optional[Callable[[], Any]]:
+        """获取用于并行入库的会话工厂（未显式提供时按当前会话的引擎创建）"""
+        if self._session_factory is not None:
+            return self._session_factory
+        bind = getattr(self.session, "bind", None)
+        if bind is None:
+            return None
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        self._session_factory = async_sessionmaker(bind=bind, expire_on_commit=False)
+        return self._session_factory
+
+    def _clone_with_session(self, session: Any) -> "BaseProjectIngestionService":
+        """
+        创建共享配置、嵌入并发上限与进度回调，但使用独立会话的浅拷贝
+
+        克隆实例的 llm_service 仍绑定原会话，嵌入配置须在克隆前解析（_ensure_embedding_config），
+        克隆实例只发起嵌入请求，不再经 llm_service 查询数据库。
+        """
+        worker = copy.copy(self)
+        worker.session = session
+        return worker
+
     async def ingest_by_type(
         self,
         project_id: str,
@@ -51,6 +51,12 @@ class SemanticChunkConfig:
     # 重叠句子数
     overlap_sentences: int = 1
 
+    # 带状相似度：只计算距离小于 max_chunk_sentences 的句对，不构建 N×N 矩阵
+    banded_similarity: bool = True
+
+    # 向量化动态规划；关闭时使用逐点计算的参考实现（用于基准对比）
+    vectorized_dp: bool = True
+
 
 @dataclass
 class ChunkResult:
@@ -165,28 +171,8 @@ class SemanticChunker:
         if not isinstance(embeddings, np.ndarray):
             embeddings = np.array(embeddings)
 
-        # Step 3: 构建结构增强相关度矩阵
-        sim_matrix = self._build_similarity_matrix(embeddings)
-        enhanced_matrix = self._apply_structure_enhancement(sim_matrix, cfg)
-
-        # Step 4: 计算二维前缀和
-        prefix_sum = self._compute_prefix_sum(enhanced_matrix)
-
-        # Step 5: 动态规划找最优切分
-        n = len(valid_sentences)
-        dp, path = self._dynamic_programming(
-            n, prefix_sum, valid_sentences, cfg
-        )
-
-        # Step 6: 回溯获取切分点
-        cut_points = self._backtrack(n, path)
-
-        # Step 7: 生成分块结果
-        results = self._generate_chunks(
-            valid_sentences, cut_points, dp, prefix_sum, cfg
-        )
-
-        return results
+        # Step 3-7: 相关度 -> 动态规划 -> 回溯 -> 生成分块
+        return self._segment(valid_sentences, embeddings, cfg)
 
     def chunk_text_sync(
         self,
@@ -226,24 +212,63 @@ class SemanticChunker:
         if not isinstance(embeddings, np.ndarray):
             embeddings = np.array(embeddings)
 
-        # 构建结构增强相关度矩阵
-        sim_matrix = self._build_similarity_matrix(embeddings)
-        enhanced_matrix = self._apply_structure_enhancement(sim_matrix, cfg)
+        return self._segment(sentences, embeddings, cfg)
 
-        # 计算二维前缀和
-        prefix_sum = self._compute_prefix_sum(enhanced_matrix)
+    def _segment(
+        self,
+        sentences: List[str],
+        embeddings: np.ndarray,
+        config: SemanticChunkConfig
+    ) -> List[ChunkResult]:
+        """
+        根据句子嵌入计算最优切分并生成分块
+
+        Args:
+            sentences: 句子列表
+            embeddings: 句子嵌入矩阵 [N, D]
+            config: 配置
 
-        # 动态规划找最优切分
+        Returns:
+            分块结果列表
+        """
         n = len(sentences)
-        dp, path = self._dynamic_programming(n, prefix_sum, sentences, cfg)
 
-        # 回溯获取切分点
-        cut_points = self._backtrack(n, path)
+        if not config.vectorized_dp:
+            # 参考实现：完整矩阵 + 逐点前缀和 + 逐点动态规划
+            sim_matrix = self._build_similarity_matrix(embeddings)
+            enhanced_matrix = self._apply_structure_enhancement(sim_matrix, config)
+            prefix_sum = self._compute_prefix_sum(enhanced_matrix)
+            dp, path = self._dynamic_programming(n, prefix_sum, sentences, config)
+            cut_points = self._backtrack(n, path)
+            return self._generate_chunks(
+                sentences, cut_points,
+                lambda start, end: self._block_score(prefix_sum, start, end, config.gamma),
+                config,
+            )
+
+        # 块大小不会超过 width，块得分只需要距离小于 width 的句对
+        width = self._band_width(n, config)
+        if config.banded_similarity:
+            band = self._build_band_matrix(embeddings, width, config)
+            block_sums = self._block_sums_from_band(band, width)
+        else:
+            sim_matrix = self._build_similarity_matrix(embeddings)
+            enhanced_matrix = self._apply_structure_enhancement(sim_matrix, config)
+            prefix_sum = self._compute_prefix_sum_vectorized(enhanced_matrix)
+            block_sums = self._block_sums_from_prefix(prefix_sum, width)
 
-        # 生成分块结果
-        results = self._generate_chunks(sentences, cut_points, dp, prefix_sum, cfg)
+        length_norm = np.arange(width + 1, dtype=np.float64) ** config.gamma
+        length_norm[0] = 1.0
 
-        return results
+        dp, path = self._dynamic_programming_vectorized(
+            n, block_sums, length_norm, sentences, config
+        )
+        cut_points = self._backtrack(n, path)
+        return self._generate_chunks(
+            sentences, cut_points,
+            lambda start, end: float(block_sums[end, end - start] / length_norm[end - start]),
+            config,
+        )
 
     def _split_sentences(self, text: str, novel_mode: bool = True) -> List[str]:
         """
@@ -525,6 +550,122 @@ class SemanticChunker:
 
         return prefix
 
+    def _compute_prefix_sum_vectorized(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        计算二维前缀和（向量化版本）
+
+        Args:
+            matrix: 输入矩阵 [N, N]
+
+        Returns:
+            前缀和矩阵 [N+1, N+1]
+        """
+        n = matrix.shape[0]
+        prefix = np.zeros((n + 1, n + 1), dtype=np.float64)
+        prefix[1:, 1:] = np.cumsum(np.cumsum(matrix, axis=0), axis=1)
+        return prefix
+
+    @staticmethod
+    def _band_width(n: int, config: SemanticChunkConfig) -> int:
+        """块的最大句子数（不足一个最小块的开头部分也算在内）"""
+        return max(1, min(n, max(config.max_chunk_sentences, config.min_chunk_sentences)))
+
+    def _build_band_matrix(
+        self,
+        embeddings: np.ndarray,
+        width: int,
+        config: SemanticChunkConfig
+    ) -> np.ndarray:
+        """
+        构建带状结构增强相关度矩阵
+
+        只计算距离 d < width 的句对：band[a, d] = M'[a, a+d]，超出范围的位置为0。
+        增强公式与 _apply_structure_enhancement 相同。
+
+        Args:
+            embeddings: 句子嵌入矩阵 [N, D]
+            width: 带宽
+            config: 配置
+
+        Returns:
+            带状矩阵 [N, width]
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float64)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms = np.where(norms == 0, 1, norms)
+        normalized = embeddings / norms
+
+        n = normalized.shape[0]
+        band = np.zeros((n, width), dtype=np.float64)
+        band[:, 0] = np.einsum('ij,ij->i', normalized, normalized)
+
+        for d in range(1, min(width, n)):
+            diag = np.einsum('ij,ij->i', normalized[:-d], normalized[d:])
+            factor = config.alpha * np.log1p(d)
+            band[:n - d, d] = np.where(
+                diag > config.gate_threshold,
+                diag + diag * factor,
+                diag
+            )
+
+        return band
+
+    def _block_sums_from_band(self, band: np.ndarray, width: int) -> np.ndarray:
+        """
+        由带状矩阵计算所有块的区域和
+
+        block_sums[e, L] = SumRegion(e-L, e-L, e-1, e-1)，L <= min(e, width)。
+        按容斥递推：
+        S(s, e) = S(s, e-1) + S(s+1, e) - S(s+1, e-1) + 2 * M'[s, e-1]
+
+        Args:
+            band: 带状矩阵 [N, width]
+            width: 带宽
+
+        Returns:
+            块区域和表 [N+1, width+1]
+        """
+        n = band.shape[0]
+        sums = np.zeros((n + 1, width + 1), dtype=np.float64)
+        sums[1:, 1] = band[:, 0]
+
+        for length in range(2, width + 1):
+            ends = np.arange(length, n + 1)
+            sums[ends, length] = (
+                sums[ends - 1, length - 1]
+                + sums[ends, length - 1]
+                - sums[ends - 1, length - 2]
+                + 2 * band[ends - length, length - 1]
+            )
+
+        return sums
+
+    def _block_sums_from_prefix(self, prefix: np.ndarray, width: int) -> np.ndarray:
+        """
+        由二维前缀和计算所有块的区域和（格式同 _block_sums_from_band）
+
+        Args:
+            prefix: 前缀和矩阵 [N+1, N+1]
+            width: 带宽
+
+        Returns:
+            块区域和表 [N+1, width+1]
+        """
+        n = prefix.shape[0] - 1
+        sums = np.zeros((n + 1, width + 1), dtype=np.float64)
+
+        for length in range(1, width + 1):
+            ends = np.arange(length, n + 1)
+            starts = ends - length
+            sums[ends, length] = (
+                prefix[ends, ends]
+                - prefix[starts, ends]
+                - prefix[ends, starts]
+                + prefix[starts, starts]
+            )
+
+        return sums
+
     def _sum_region(
         self,
         prefix: np.ndarray,
@@ -670,6 +811,74 @@ class SemanticChunker:
 
         return dp, path
 
+    def _dynamic_programming_vectorized(
+        self,
+        n: int,
+        block_sums: np.ndarray,
+        length_norm: np.ndarray,
+        sentences: List[str],
+        config: SemanticChunkConfig
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        动态规划找最优切分（向量化版本）
+
+        与 _dynamic_programming 的状态转移、约束和平局规则（取最小的 j）一致，
+        每个 i 对整个 j 窗口一次性计算得分。
+
+        Args:
+            n: 句子数量
+            block_sums: 块区域和表 [N+1, width+1]
+            length_norm: 长度归一化分母，length_norm[L] = L^gamma
+            sentences: 句子列表
+            config: 配置
+
+        Returns:
+            (DP数组, 路径数组)
+        """
+        dp = np.zeros(n + 1, dtype=np.float64)
+        path = np.zeros(n + 1, dtype=np.int32)
+
+        char_lengths = np.zeros(n + 1, dtype=np.int64)
+        char_lengths[1:] = np.cumsum([len(s) for s in sentences])
+
+        min_sents = config.min_chunk_sentences
+        max_sents = config.max_chunk_sentences
+
+        for i in range(1, n + 1):
+            j_min = max(0, i - max_sents)
+            j_max = i - min_sents
+
+            if j_max < j_min:
+                dp[i] = dp[i - 1]
+                path[i] = -1
+                continue
+
+            js = np.arange(j_min, j_max + 1)
+            lengths = i - js
+            scores = dp[js] + block_sums[i, lengths] / length_norm[lengths]
+
+            # 第一阶段：严格遵守字符数约束（最后一块可以短一些）
+            chunk_chars = char_lengths[i] - char_lengths[js]
+            valid = chunk_chars <= config.max_chunk_chars
+            if i < n:
+                valid &= chunk_chars >= config.min_chunk_chars
+
+            if valid.any():
+                best = int(np.argmax(np.where(valid, scores, -np.inf)))
+            else:
+                # 第二阶段：放宽字符约束，保持句子数约束
+                best = int(np.argmax(scores))
+
+            dp[i] = scores[best]
+            path[i] = js[best]
+
+        logger.debug(
+            "DP完成: n=%d, min_sentences=%d, max_sentences=%d, best=%.4f",
+            n, min_sents, max_sents, dp[n]
+        )
+
+        return dp, path
+
     def _backtrack(self, n: int, path: np.ndarray) -> List[int]:
         """
         回溯获取切分点
@@ -708,8 +917,7 @@ class SemanticChunker:
         self,
         sentences: List[str],
         cut_points: List[int],
-        dp: np.ndarray,
-        prefix: np.ndarray,
+        density_func: Callable[[int, int], float],
         config: SemanticChunkConfig
     ) -> List[ChunkResult]:
         """
@@ -718,8 +926,7 @@ class SemanticChunker:
         Args:
             sentences: 句子列表
             cut_points: 切分点列表
-            dp: DP数组
-            prefix: 前缀和矩阵
+            density_func: 块得分函数 (start, end) -> score
             config: 配置
 
         Returns:
@@ -754,7 +961,7 @@ class SemanticChunker:
                 chunk_content += '。'
 
             # 计算密度得分
-            density = self._block_score(prefix, start, end, config.gamma)
+            density = density_func(start, end)
 
             results.append(ChunkResult(
                 content=chunk_content,
@@ -0,0 +1,71 @@
+"""
+跨 worker 共享状态
+
+按 SHARED_STATE_BACKEND 选择后端：
+- memory：单进程（默认），不做跨进程协调
+- sqlite：同机多 worker，共享 storage/shared_state.db
+- redis：跨主机多 worker，需要安装 redis 包
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional
+
+from ...core.config import settings
+from .base import SharedStateBackend, VersionWatcher
+from .memory_backend import MemorySharedState
+
+logger = logging.getLogger(__name__)
+
+_backend: Optional[SharedStateBackend] = None
+
+
+def _create_backend() -> SharedStateBackend:
+    kind = settings.shared_state_backend
+    if kind == "sqlite":
+        from .sqlite_backend import SQLiteSharedState
+
+        path = (
+            Path(settings.shared_state_sqlite_path)
+            if settings.shared_state_sqlite_path
+            else settings.storage_dir / "shared_state.db"
+        )
+        return SQLiteSharedState(path)
+
+    if kind == "redis":
+        if not settings.shared_state_redis_url:
+            logger.warning("SHARED_STATE_BACKEND=redis 但未配置 SHARED_STATE_REDIS_URL，退回内存后端")
+            return MemorySharedState()
+        try:
+            from .redis_backend import RedisSharedState
+
+            return RedisSharedState(settings.shared_state_redis_url)
+        except RuntimeError as exc:
+            logger.warning("%s，退回内存后端", exc)
+            return MemorySharedState()
+
+    return MemorySharedState()
+
+
+def get_shared_state() -> SharedStateBackend:
+    """获取共享状态后端单例"""
+    global _backend
+    if _backend is None:
+        _backend = _create_backend()
+    return _backend
+
+
+async def close_shared_state() -> None:
+    """关闭共享状态后端（应用关闭时调用）"""
+    global _backend
+    backend, _backend = _backend, None
+    if backend is not None:
+        await backend.close()
+
+
+__all__ = [
+    "SharedStateBackend",
+    "VersionWatcher",
+    "close_shared_state",
+    "get_shared_state",
+]
@@ -0,0 +1,126 @@
+"""
+共享状态后端接口
+
+多 worker 部署（uvicorn --workers N）时，进程内存中的缓存、并发计数和会话状态彼此不可见。
+共享状态后端为这些状态提供跨进程的最小原语：
+
+- 版本计数器：配置/提示词等缓存变更时递增，其他 worker 发现版本变化后清空本地缓存
+- 租约槽位：带过期时间的分布式信号量，用于跨 worker 的请求并发上限；进程崩溃后租约自动过期
+- 键值存储：带过期时间的 JSON 值，用于优化会话的元信息与暂停/继续/取消信号
+
+单进程部署使用内存后端（distributed=False），调用方据此跳过跨进程协调，行为与原来一致。
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+
+class SharedStateBackend(ABC):
+    """共享状态后端基类"""
+
+    # 是否跨进程共享（内存后端为 False）
+    distributed: bool = False
+
+    # -------------------- 版本计数器 --------------------
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        """计数器加一并返回新值（不存在时从 0 开始）"""
+
+    @abstractmethod
+    async def get_counter(self, key: str) -> int:
+        """读取计数器（不存在时为 0）"""
+
+    # -------------------- 租约槽位 --------------------
+
+    @abstractmethod
+    async def try_acquire_slot(self, name: str, holder: str, limit: int, ttl: float) -> bool:
+        """
+        尝试获取一个槽位
+
+        过期的租约先被清理；当前有效租约数小于 limit 时登记 holder 并返回 True。
+        """
+
+    @abstractmethod
+    async def refresh_slot(self, name: str, holder: str, ttl: float) -> None:
+        """续期租约"""
+
+    @abstractmethod
+    async def release_slot(self, name: str, holder: str) -> None:
+        """释放租约"""
+
+    # -------------------- 键值存储 --------------------
+
+    @abstractmethod
+    async def set_value(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        """写入 JSON 值（ttl 秒后过期）"""
+
+    @abstractmethod
+    async def get_value(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取值（不存在或已过期时返回 None）"""
+
+    @abstractmethod
+    async def pop_value(self, key: str) -> Optional[Dict[str, Any]]:
+        """原子地读取并删除值"""
+
+    @abstractmethod
+    async def delete_value(self, key: str) -> None:
+        """删除值"""
+
+    async def close(self) -> None:
+        """释放连接等资源"""
+
+
+class VersionWatcher:
+    """
+    共享版本观察者
+
+    本地缓存持有一个观察者：changed() 最多每 check_interval 秒读取一次共享计数器，
+    发现与上次看到的值不同就返回 True，调用方据此清空本地缓存。
+    非分布式后端下始终返回 False，不产生额外开销。
+    """
+
+    def __init__(self, key: str, check_interval: float):
+        self.key = key
+        self.check_interval = check_interval
+        self._seen: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def changed(self) -> bool:
+        from . import get_shared_state
+
+        backend = get_shared_state()
+        if not backend.distributed:
+            return False
+
+        now = time.monotonic()
+        if self._seen is not None and now - self._checked_at < self.check_interval:
+            return False
+
+        async with self._lock:
+            if self._seen is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return False
+            version = await backend.get_counter(self.key)
+            self._checked_at = time.monotonic()
+            previous, self._seen = self._seen, version
+            # 首次读取只记录基线
+            return previous is not None and previous != version
+
+    async def bump(self) -> None:
+        """通知其他 worker 缓存已变更"""
+        from . import get_shared_state
+
+        backend = get_shared_state()
+        if not backend.distributed:
+            return
+        self._seen = await backend.incr(self.key)
+        self._checked_at = time.monotonic()
+
+
+__all__ = [
+    "SharedStateBackend",
+    "VersionWatcher",
+]
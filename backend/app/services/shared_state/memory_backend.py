@@ -0,0 +1,73 @@
+"""
+内存共享状态后端（单进程）
+
+不跨进程共享，distributed=False；调用方在此后端下跳过跨 worker 协调。
+实现完整接口，便于单进程下的调用路径与多进程一致。
+"""
+
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .base import SharedStateBackend
+
+
+class MemorySharedState(SharedStateBackend):
+    """进程内实现（所有操作在事件循环线程中同步完成）"""
+
+    distributed = False
+
+    def __init__(self):
+        self._counters: Dict[str, int] = {}
+        self._slots: Dict[str, Dict[str, float]] = {}
+        self._values: Dict[str, Tuple[Dict[str, Any], float]] = {}
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def try_acquire_slot(self, name: str, holder: str, limit: int, ttl: float) -> bool:
+        now = time.time()
+        leases = self._slots.setdefault(name, {})
+        for expired in [h for h, expires_at in leases.items() if expires_at <= now]:
+            del leases[expired]
+        if len(leases) >= limit:
+            return False
+        leases[holder] = now + ttl
+        return True
+
+    async def refresh_slot(self, name: str, holder: str, ttl: float) -> None:
+        leases = self._slots.get(name)
+        if leases and holder in leases:
+            leases[holder] = time.time() + ttl
+
+    async def release_slot(self, name: str, holder: str) -> None:
+        leases = self._slots.get(name)
+        if leases:
+            leases.pop(holder, None)
+
+    async def set_value(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        self._values[key] = (value, time.time() + ttl)
+
+    async def get_value(self, key: str) -> Optional[Dict[str, Any]]:
+        item = self._values.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at <= time.time():
+            del self._values[key]
+            return None
+        return value
+
+    async def pop_value(self, key: str) -> Optional[Dict[str, Any]]:
+        value = await self.get_value(key)
+        self._values.pop(key, None)
+        return value
+
+    async def delete_value(self, key: str) -> None:
+        self._values.pop(key, None)
+
+
+__all__ = ["MemorySharedState"]
@@ -0,0 +1,101 @@
+"""
+Redis 共享状态后端（跨主机多 worker）
+
+需要安装 redis 包（redis.asyncio），兼容任何实现 Redis 协议的服务（Redis/Valkey/KeyDB 等）。
+槽位使用有序集合（成员为持有者，分值为过期时间），获取操作由 Lua 脚本原子完成。
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from .base import SharedStateBackend
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # pragma: no cover - 可选依赖
+    redis_asyncio = None
+
+# KEYS[1]=槽位集合；ARGV: now, limit, expires_at, holder
+_ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], ARGV[3], ARGV[4])
+    return 1
+end
+return 0
+"""
+
+# KEYS[1]=槽位集合；ARGV: expires_at, holder（仅续期仍持有的租约）
+_REFRESH_SCRIPT = """
+if redis.call('ZSCORE', KEYS[1], ARGV[2]) then
+    redis.call('ZADD', KEYS[1], ARGV[1], ARGV[2])
+end
+return 0
+"""
+
+
+class RedisSharedState(SharedStateBackend):
+    """基于 Redis 的共享状态"""
+
+    distributed = True
+
+    def __init__(self, url: str, *, prefix: str = "afn:"):
+        if redis_asyncio is None:
+            raise RuntimeError("使用 Redis 共享状态后端需要安装 redis 包: pip install redis")
+        self._client = redis_asyncio.from_url(url, decode_responses=True)
+        self._prefix = prefix
+        self._acquire = self._client.register_script(_ACQUIRE_SCRIPT)
+        self._refresh = self._client.register_script(_REFRESH_SCRIPT)
+        logger.info("共享状态使用 Redis 后端")
+
+    def _key(self, kind: str, key: str) -> str:
+        return f"{self._prefix}{kind}:{key}"
+
+    async def incr(self, key: str) -> int:
+        return int(await self._client.incr(self._key("counter", key)))
+
+    async def get_counter(self, key: str) -> int:
+        value = await self._client.get(self._key("counter", key))
+        return int(value) if value is not None else 0
+
+    async def try_acquire_slot(self, name: str, holder: str, limit: int, ttl: float) -> bool:
+        now = time.time()
+        key = self._key("slots", name)
+        acquired = await self._acquire(keys=[key], args=[now, limit, now + ttl, holder])
+        return bool(acquired)
+
+    async def refresh_slot(self, name: str, holder: str, ttl: float) -> None:
+        await self._refresh(keys=[self._key("slots", name)], args=[time.time() + ttl, holder])
+
+    async def release_slot(self, name: str, holder: str) -> None:
+        await self._client.zrem(self._key("slots", name), holder)
+
+    async def set_value(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        await self._client.set(
+            self._key("value", key),
+            json.dumps(value, ensure_ascii=False),
+            px=max(1, int(ttl * 1000)),
+        )
+
+    async def get_value(self, key: str) -> Optional[Dict[str, Any]]:
+        payload = await self._client.get(self._key("value", key))
+        return json.loads(payload) if payload is not None else None
+
+    async def pop_value(self, key: str) -> Optional[Dict[str, Any]]:
+        redis_key = self._key("value", key)
+        async with self._client.pipeline(transaction=True) as pipe:
+            payload, _ = await pipe.get(redis_key).delete(redis_key).execute()
+        return json.loads(payload) if payload is not None else None
+
+    async def delete_value(self, key: str) -> None:
+        await self._client.delete(self._key("value", key))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+__all__ = ["RedisSharedState"]
@@ -0,0 +1,210 @@
+"""
+SQLite 共享状态后端（同机多 worker）
+
+多个 worker 进程打开同一个 SQLite 文件，依靠 SQLite 的文件锁实现跨进程互斥：
+读-改-写操作在 BEGIN IMMEDIATE 事务中完成（立即获取写锁），保证槽位计数等操作的原子性。
+所有操作在线程池中执行，不阻塞事件循环。适用于单机 Docker / 本地部署；跨主机请使用 Redis 后端。
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .base import SharedStateBackend
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteSharedState(SharedStateBackend):
+    """基于 SQLite 文件的共享状态"""
+
+    distributed = True
+
+    def __init__(self, path: Path, *, busy_timeout: float = 10.0):
+        self._path = Path(path)
+        self._busy_timeout = busy_timeout
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # 连接与事务
+    # ------------------------------------------------------------------
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            # isolation_level=None：由这里显式控制事务边界
+            conn = sqlite3.connect(
+                str(self._path),
+                check_same_thread=False,
+                timeout=self._busy_timeout,
+                isolation_level=None,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS shared_counters (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS shared_slots (
+                    name TEXT NOT NULL,
+                    holder TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (name, holder)
+                );
+                CREATE TABLE IF NOT EXISTS shared_values (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                """
+            )
+            self._conn = conn
+            logger.info("共享状态使用 SQLite 后端: %s", self._path)
+        return self._conn
+
+    def _run(self, func, *args):
+        """在单个写事务中执行 func(conn, *args)"""
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(conn, *args)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+    async def _call(self, func, *args):
+        return await asyncio.to_thread(self._run, func, *args)
+
+    # ------------------------------------------------------------------
+    # 版本计数器
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _incr(conn: sqlite3.Connection, key: str) -> int:
+        conn.execute(
+            "INSERT INTO shared_counters (key, value) VALUES (?, 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1",
+            (key,),
+        )
+        return conn.execute("SELECT value FROM shared_counters WHERE key = ?", (key,)).fetchone()[0]
+
+    @staticmethod
+    def _get_counter(conn: sqlite3.Connection, key: str) -> int:
+        row = conn.execute("SELECT value FROM shared_counters WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    async def incr(self, key: str) -> int:
+        return await self._call(self._incr, key)
+
+    async def get_counter(self, key: str) -> int:
+        return await asyncio.to_thread(self._read, self._get_counter, key)
+
+    def _read(self, func, *args):
+        """只读操作不需要写锁"""
+        with self._lock:
+            return func(self._get_conn(), *args)
+
+    # ------------------------------------------------------------------
+    # 租约槽位
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _try_acquire(conn: sqlite3.Connection, name: str, holder: str, limit: int, ttl: float) -> bool:
+        now = time.time()
+        conn.execute("DELETE FROM shared_slots WHERE name = ? AND expires_at <= ?", (name, now))
+        active = conn.execute(
+            "SELECT COUNT(*) FROM shared_slots WHERE name = ?", (name,)
+        ).fetchone()[0]
+        if active >= limit:
+            return False
+        conn.execute(
+            "INSERT OR REPLACE INTO shared_slots (name, holder, expires_at) VALUES (?, ?, ?)",
+            (name, holder, now + ttl),
+        )
+        return True
+
+    @staticmethod
+    def _refresh(conn: sqlite3.Connection, name: str, holder: str, ttl: float) -> None:
+        conn.execute(
+            "UPDATE shared_slots SET expires_at = ? WHERE name = ? AND holder = ?",
+            (time.time() + ttl, name, holder),
+        )
+
+    @staticmethod
+    def _release(conn: sqlite3.Connection, name: str, holder: str) -> None:
+        conn.execute("DELETE FROM shared_slots WHERE name = ? AND holder = ?", (name, holder))
+
+    async def try_acquire_slot(self, name: str, holder: str, limit: int, ttl: float) -> bool:
+        return await self._call(self._try_acquire, name, holder, limit, ttl)
+
+    async def refresh_slot(self, name: str, holder: str, ttl: float) -> None:
+        await self._call(self._refresh, name, holder, ttl)
+
+    async def release_slot(self, name: str, holder: str) -> None:
+        await self._call(self._release, name, holder)
+
+    # ------------------------------------------------------------------
+    # 键值存储
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _set(conn: sqlite3.Connection, key: str, payload: str, ttl: float) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO shared_values (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, payload, time.time() + ttl),
+        )
+
+    @staticmethod
+    def _get(conn: sqlite3.Connection, key: str) -> Optional[str]:
+        row = conn.execute(
+            "SELECT value FROM shared_values WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    @classmethod
+    def _pop(cls, conn: sqlite3.Connection, key: str) -> Optional[str]:
+        payload = cls._get(conn, key)
+        conn.execute("DELETE FROM shared_values WHERE key = ?", (key,))
+        return payload
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, key: str) -> None:
+        # 顺带清理已过期的条目，避免表无限增长
+        conn.execute(
+            "DELETE FROM shared_values WHERE key = ? OR expires_at <= ?", (key, time.time())
+        )
+
+    async def set_value(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        await self._call(self._set, key, json.dumps(value, ensure_ascii=False), ttl)
+
+    async def get_value(self, key: str) -> Optional[Dict[str, Any]]:
+        payload = await asyncio.to_thread(self._read, self._get, key)
+        return json.loads(payload) if payload is not None else None
+
+    async def pop_value(self, key: str) -> Optional[Dict[str, Any]]:
+        payload = await self._call(self._pop, key)
+        return json.loads(payload) if payload is not None else None
+
+    async def delete_value(self, key: str) -> None:
+        await self._call(self._delete, key)
+
+    async def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+__all__ = ["SQLiteSharedState"]
@@ -5,11 +5,12 @@
 """
 
 import logging
-from typing import Optional, TYPE_CHECKING
+from typing import Dict, Optional, TYPE_CHECKING
 
 from ..core.config import settings
 from ..core.constants import LLMConstants
 from ..utils.json_utils import remove_think_tags
+from .queue import RequestPriority
 
 if TYPE_CHECKING:
     from ..models.novel import Chapter
@@ -62,6 +63,10 @@ class SummaryService:
         content: str,
         user_id: int,
         timeout: Optional[float] = None,
+        *,
+        system_prompt: Optional[str] = None,
+        cached_config: Optional[Dict[str, Optional[str]]] = None,
+        priority: RequestPriority = RequestPriority.NORMAL,
     ) -> Optional[str]:
         """
         生成内容摘要
@@ -70,6 +75,9 @@ class SummaryService:
             content: 章节内容
             user_id: 用户ID
             timeout: 超时时间（秒），默认使用配置值
+            system_prompt: 预先加载的摘要提示词（可选）
+            cached_config: 预先解析的LLM配置（可选，并发批量生成时避免共享Session查询）
+            priority: 排队优先级（批量任务使用 BACKGROUND）
 
         Returns:
             生成的摘要，失败时返回None
@@ -83,6 +91,9 @@ class SummaryService:
                 temperature=settings.llm_temp_summary,
                 user_id=user_id,
                 timeout=timeout or LLMConstants.SUMMARY_GENERATION_TIMEOUT,
+                system_prompt=system_prompt,
+                cached_config=cached_config,
+                priority=priority,
             )
             return remove_think_tags(summary) if summary else None
         except Exception as exc:
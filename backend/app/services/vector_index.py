@@ -0,0 +1,564 @@
+"""
+进程内向量索引
+
+当 libsql 缺少 vector_distance_cosine 时，VectorStoreService 原本每次查询都要全表读取
+embedding BLOB 并在 Python 中计算相似度。本模块为每个 (表, 项目) 维护一份常驻内存的索引：
+
+- 连续的 float32 矩阵，行向量在写入时即归一化，查询只需一次矩阵-向量乘积
+- top-k 使用 argpartition 选取，避免全量排序
+- 向量数较大时可切换为 IVF（球面 k-means 粗量化 + nprobe 探查）近似检索
+- 首次查询时延迟构建，由 upsert/delete 增量同步，超出内存预算时按 LRU 淘汰
+- 支持在排序前按章节范围与行级条件过滤，候选名额只分配给满足条件的行
+
+索引为进程级共享（VectorStoreService 在各请求中会被多次实例化）。
+"""
+
+import asyncio
+import logging
+import math
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 索引键：(表名, 项目ID)
+IndexKey = Tuple[str, str]
+# 索引条目：(行ID, 行数据, 向量)
+IndexEntry = Tuple[str, Dict[str, Any], Sequence[float]]
+# 整表快照：(行ID列表, 行数据列表, 已按行归一化的 float32 矩阵)
+IndexSnapshot = Tuple[List[str], List[Dict[str, Any]], np.ndarray]
+# 章节范围过滤：(最小章节号, 最大章节号)，均为闭区间，None 表示不限
+ChapterRange = Tuple[Optional[int], Optional[int]]
+# 行级过滤条件
+RowPredicate = Callable[[Dict[str, Any]], bool]
+
+# 初始容量与删除压缩阈值
+_INITIAL_CAPACITY = 256
+_COMPACT_RATIO = 0.25
+_COMPACT_MIN_DELETED = 64
+
+# IVF 训练参数
+_IVF_MIN_LISTS = 16
+_IVF_MAX_LISTS = 4096
+_IVF_TRAIN_ITERATIONS = 10
+_IVF_SAMPLES_PER_LIST = 64
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """按行 L2 归一化（零向量保持为零，使其相似度恒为0、距离恒为1）"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _chapter_of(row: Optional[Dict[str, Any]]) -> int:
+    if not row:
+        return 0
+    try:
+        return int(row.get("chapter_number") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """返回分数最高的 top_k 个下标（降序）；先 argpartition 再对 k 个结果排序"""
+    if top_k >= scores.shape[0]:
+        return np.argsort(-scores, kind="stable")
+    part = np.argpartition(-scores, top_k - 1)[:top_k]
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+class ProjectVectorIndex:
+    """单个 (表, 项目) 的向量索引（精确检索 + 可选 IVF）"""
+
+    def __init__(self, dimension: int, *, ivf_threshold: int = 0, ivf_nprobe: int = 32):
+        self.dimension = dimension
+        self._ivf_threshold = ivf_threshold
+        self._ivf_nprobe = ivf_nprobe
+
+        self._matrix = np.zeros((_INITIAL_CAPACITY, dimension), dtype=np.float32)
+        self._alive = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+        # 章节号与矩阵行一一对应，用于向量化的章节范围过滤
+        self._chapters = np.zeros(_INITIAL_CAPACITY, dtype=np.int64)
+        self._size = 0
+        self._deleted = 0
+        self._ids: List[Optional[str]] = []
+        self._rows: List[Optional[Dict[str, Any]]] = []
+        self._positions: Dict[str, int] = {}
+        self._payload_bytes = 0
+
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments: Optional[np.ndarray] = None
+        self._ivf_trained_size = 0
+
+    # ------------------------------------------------------------------
+    # 状态
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._size - self._deleted
+
+    @property
+    def uses_ivf(self) -> bool:
+        return self._centroids is not None
+
+    @property
+    def nbytes(self) -> int:
+        """估算内存占用（矩阵 + 行数据文本）"""
+        extra = self._assignments.nbytes if self._assignments is not None else 0
+        if self._centroids is not None:
+            extra += self._centroids.nbytes
+        return (
+            self._matrix.nbytes + self._alive.nbytes + self._chapters.nbytes
+            + extra + self._payload_bytes
+        )
+
+    # ------------------------------------------------------------------
+    # 写入与删除
+    # ------------------------------------------------------------------
+
+    def load(self, ids: List[str], rows: List[Dict[str, Any]], matrix: np.ndarray) -> None:
+        """
+        用整表快照初始化索引（构建时使用）
+
+        matrix 须为已按行归一化的 float32 矩阵，索引直接接管其内存，不再逐行复制或归一化。
+        """
+        count = matrix.shape[0]
+        self._matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self._alive = np.ones(count, dtype=bool)
+        self._chapters = np.fromiter((_chapter_of(row) for row in rows), dtype=np.int64, count=count)
+        self._size = count
+        self._deleted = 0
+        self._ids = list(ids)
+        self._rows = list(rows)
+        self._positions = {entry_id: idx for idx, entry_id in enumerate(self._ids)}
+        self._payload_bytes = sum(self._estimate_row_bytes(row) for row in self._rows)
+        if count:
+            self._after_write(list(range(count)))
+
+    def upsert(self, entries: Iterable[IndexEntry]) -> int:
+        """写入或覆盖条目，返回实际写入数（维度不一致的向量会被跳过）"""
+        written = 0
+        changed: List[int] = []
+        for entry_id, row, vector in entries:
+            values = np.asarray(vector, dtype=np.float32)
+            if values.ndim != 1 or values.shape[0] != self.dimension:
+                logger.debug(
+                    "向量索引跳过维度不一致的条目: id=%s dim=%s expected=%d",
+                    entry_id,
+                    values.shape,
+                    self.dimension,
+                )
+                continue
+
+            position = self._positions.get(entry_id)
+            if position is None:
+                position = self._append_slot()
+                self._ids.append(entry_id)
+                self._rows.append(row)
+                self._positions[entry_id] = position
+            else:
+                self._payload_bytes -= self._estimate_row_bytes(self._rows[position])
+                self._rows[position] = row
+
+            norm = float(np.linalg.norm(values))
+            self._matrix[position] = values / norm if norm else values
+            self._alive[position] = True
+            self._chapters[position] = _chapter_of(row)
+            self._payload_bytes += self._estimate_row_bytes(row)
+            changed.append(position)
+            written += 1
+
+        if changed:
+            self._after_write(changed)
+        return written
+
+    def remove_ids(self, ids: Iterable[str]) -> int:
+        """按行ID删除"""
+        removed = 0
+        for entry_id in ids:
+            position = self._positions.pop(entry_id, None)
+            if position is None:
+                continue
+            self._release(position)
+            removed += 1
+        self._maybe_compact()
+        return removed
+
+    def remove_where(self, predicate: Callable[[Dict[str, Any]], bool]) -> int:
+        """删除满足条件的行（如按章节号删除）"""
+        targets = [
+            entry_id
+            for entry_id, row in zip(self._ids, self._rows)
+            if entry_id is not None and row is not None and predicate(row)
+        ]
+        return self.remove_ids(targets)
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query: Sequence[float],
+        top_k: int,
+        *,
+        chapter_range: Optional[ChapterRange] = None,
+        predicate: Optional[RowPredicate] = None,
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        检索与查询向量最相似的 top_k 行
+
+        Args:
+            query: 查询向量
+            top_k: 返回数量
+            chapter_range: 章节范围（闭区间），在排序前过滤
+            predicate: 行级过滤条件，在排序前过滤（只对章节范围内的行求值）
+
+        Returns:
+            [(行数据, 余弦距离)]，按距离升序
+        """
+        if top_k <= 0 or len(self) == 0:
+            return []
+
+        eligible = self._eligible_mask(chapter_range, predicate)
+        if eligible is not None and not eligible.any():
+            return []
+
+        query_vec = np.asarray(query, dtype=np.float32)
+        if query_vec.ndim != 1 or query_vec.shape[0] != self.dimension:
+            logger.warning(
+                "查询向量维度与索引不一致: query=%s index=%d",
+                query_vec.shape,
+                self.dimension,
+            )
+            return []
+
+        query_norm = float(np.linalg.norm(query_vec))
+        if query_norm == 0:
+            mask = self._alive[:self._size] if eligible is None else eligible
+            positions = np.flatnonzero(mask)[:top_k]
+            return [(self._rows[int(p)], 1.0) for p in positions]  # type: ignore[misc]
+        query_vec = query_vec / query_norm
+
+        candidates = self._ivf_candidates(query_vec, top_k, eligible) if self.uses_ivf else None
+        if candidates is None and eligible is not None:
+            # 过滤后精确检索：只对满足条件的行计算相似度
+            candidates = np.flatnonzero(eligible)
+        if candidates is None:
+            scores = self._matrix[:self._size] @ query_vec
+            if self._deleted:
+                scores[~self._alive[:self._size]] = -np.inf
+            limit = min(top_k, len(self))
+            best = _top_k_indices(scores, limit)
+            positions, similarities = best, scores[best]
+        else:
+            scores = self._matrix[candidates] @ query_vec
+            best = _top_k_indices(scores, min(top_k, candidates.shape[0]))
+            positions, similarities = candidates[best], scores[best]
+
+        return [
+            (self._rows[int(pos)], float(1.0 - sim))  # type: ignore[misc]
+            for pos, sim in zip(positions, similarities)
+        ]
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _estimate_row_bytes(row: Optional[Dict[str, Any]]) -> int:
+        if not row:
+            return 0
+        size = 64
+        for value in row.values():
+            if isinstance(value, str):
+                size += len(value) * 2
+            elif isinstance(value, dict):
+                # 已解析的元数据：按键值的文本长度粗略估算
+                size += sum(len(str(k)) + len(str(v)) for k, v in value.items()) * 2 + 64
+        return size
+
+    def _append_slot(self) -> int:
+        if self._size >= self._matrix.shape[0]:
+            new_capacity = max(_INITIAL_CAPACITY, self._matrix.shape[0] * 2)
+            matrix = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+            matrix[:self._size] = self._matrix[:self._size]
+            alive = np.zeros(new_capacity, dtype=bool)
+            alive[:self._size] = self._alive[:self._size]
+            chapters = np.zeros(new_capacity, dtype=np.int64)
+            chapters[:self._size] = self._chapters[:self._size]
+            self._matrix, self._alive, self._chapters = matrix, alive, chapters
+            if self._assignments is not None:
+                assignments = np.full(new_capacity, -1, dtype=np.int32)
+                assignments[:self._size] = self._assignments[:self._size]
+                self._assignments = assignments
+        position = self._size
+        self._size += 1
+        return position
+
+    def _release(self, position: int) -> None:
+        self._payload_bytes -= self._estimate_row_bytes(self._rows[position])
+        self._alive[position] = False
+        self._ids[position] = None
+        self._rows[position] = None
+        self._deleted += 1
+
+    def _maybe_compact(self) -> None:
+        """删除比例过高时压缩矩阵，回收空洞"""
+        if self._deleted < _COMPACT_MIN_DELETED or self._deleted < self._size * _COMPACT_RATIO:
+            return
+        keep = np.flatnonzero(self._alive[:self._size])
+        count = keep.shape[0]
+        capacity = max(_INITIAL_CAPACITY, 1 << max(count - 1, 1).bit_length())
+        matrix = np.zeros((capacity, self.dimension), dtype=np.float32)
+        matrix[:count] = self._matrix[keep]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:count] = True
+        chapters = np.zeros(capacity, dtype=np.int64)
+        chapters[:count] = self._chapters[keep]
+        self._chapters = chapters
+        if self._assignments is not None:
+            assignments = np.full(capacity, -1, dtype=np.int32)
+            assignments[:count] = self._assignments[keep]
+            self._assignments = assignments
+        self._ids = [self._ids[int(p)] for p in keep]
+        self._rows = [self._rows[int(p)] for p in keep]
+        self._positions = {entry_id: idx for idx, entry_id in enumerate(self._ids) if entry_id}
+        self._matrix, self._alive = matrix, alive
+        self._size, self._deleted = count, 0
+
+    def _after_write(self, changed: List[int]) -> None:
+        """写入后维护 IVF：首次达到阈值或规模翻倍时重新训练，否则只分配新行"""
+        if self._ivf_threshold <= 0 or len(self) < self._ivf_threshold:
+            return
+        if self._centroids is None or len(self) >= self._ivf_trained_size * 2:
+            self._train_ivf()
+            return
+        vectors = self._matrix[changed]
+        self._assignments[changed] = np.argmax(vectors @ self._centroids.T, axis=1)  # type: ignore[index]
+
+    def _train_ivf(self) -> None:
+        """球面 k-means 训练粗量化器，并为所有行分配聚类"""
+        alive_positions = np.flatnonzero(self._alive[:self._size])
+        count = alive_positions.shape[0]
+        if count < _IVF_MIN_LISTS:
+            # 阈值配置得很小时行数可能不足以训练，继续精确检索
+            return
+        nlist = int(min(_IVF_MAX_LISTS, max(_IVF_MIN_LISTS, math.sqrt(count)), count))
+        rng = np.random.default_rng(0)
+        sample_size = min(count, nlist * _IVF_SAMPLES_PER_LIST)
+        sample = self._matrix[rng.choice(alive_positions, size=sample_size, replace=False)]
+
+        centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+        for _ in range(_IVF_TRAIN_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = ~np.bincount(labels, minlength=nlist).astype(bool)
+            sums[empty] = centroids[empty]
+            centroids = _normalize_rows(sums).astype(np.float32)
+
+        assignments = np.full(self._matrix.shape[0], -1, dtype=np.int32)
+        # 分块分配，避免 (n, nlist) 中间矩阵过大
+        for start in range(0, self._size, 8192):
+            block = self._matrix[start:start + 8192]
+            assignments[start:start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+
+        self._centroids = centroids
+        self._assignments = assignments
+        self._ivf_trained_size = count
+        logger.info("向量索引已切换为 IVF 模式: rows=%d nlist=%d", count, nlist)
+
+    def _eligible_mask(
+        self,
+        chapter_range: Optional[ChapterRange],
+        predicate: Optional[RowPredicate],
+    ) -> Optional[np.ndarray]:
+        """满足过滤条件的行掩码；没有过滤条件时返回 None"""
+        min_chapter, max_chapter = chapter_range or (None, None)
+        if min_chapter is None and max_chapter is None and predicate is None:
+            return None
+
+        mask = self._alive[:self._size].copy()
+        chapters = self._chapters[:self._size]
+        if min_chapter is not None:
+            mask &= chapters >= min_chapter
+        if max_chapter is not None:
+            mask &= chapters <= max_chapter
+        if predicate is not None:
+            for position in np.flatnonzero(mask):
+                if not predicate(self._rows[int(position)]):  # type: ignore[arg-type]
+                    mask[position] = False
+        return mask
+
+    def _ivf_candidates(
+        self,
+        query_vec: np.ndarray,
+        top_k: int,
+        eligible: Optional[np.ndarray] = None,
+    ) -> Optional[np.ndarray]:
+        """IVF 候选集；候选不足 top_k 时返回 None 以回退精确检索"""
+        centroid_scores = self._centroids @ query_vec  # type: ignore[operator]
+        nprobe = min(self._ivf_nprobe, centroid_scores.shape[0])
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        mask = np.isin(self._assignments[:self._size], probes)  # type: ignore[index]
+        mask &= self._alive[:self._size] if eligible is None else eligible
+        candidates = np.flatnonzero(mask)
+        if candidates.shape[0] < top_k:
+            return None
+        return candidates
+
+
+class VectorIndexManager:
+    """
+    进程级向量索引管理器
+
+    - get_or_build：延迟构建，同一键的并发构建只执行一次
+    - 写操作通过 apply_* 同步到已构建的索引；未构建的索引不处理（下次查询时从库中读取）
+    - 构建期间发生写入时，构建结果仅用于本次查询，不会缓存，避免缓存过期数据
+    """
+
+    def __init__(self, memory_budget_bytes: Optional[int] = None):
+        self._memory_budget = memory_budget_bytes or settings.vector_index_memory_mb * 1024 * 1024
+        self._indexes: "OrderedDict[IndexKey, ProjectVectorIndex]" = OrderedDict()
+        self._build_locks: Dict[IndexKey, asyncio.Lock] = {}
+        self._versions: Dict[IndexKey, int] = {}
+
+    async def get_or_build(
+        self,
+        key: IndexKey,
+        loader: Callable[[], Awaitable[IndexSnapshot]],
+    ) -> Optional[ProjectVectorIndex]:
+        """获取索引，不存在时调用 loader 从数据库读取整表快照构建"""
+        index = self._touch(key)
+        if index is not None:
+            return index
+
+        lock = self._build_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            index = self._touch(key)
+            if index is not None:
+                return index
+
+            version = self._versions.setdefault(key, 0)
+            snapshot = await loader()
+            index = self._build(snapshot)
+            if index is None:
+                return None
+
+            if self._versions.get(key, 0) == version:
+                self._indexes[key] = index
+                self._enforce_budget(keep=key)
+                logger.info(
+                    "向量索引已构建: table=%s project=%s rows=%d size=%.1fMB",
+                    key[0],
+                    key[1],
+                    len(index),
+                    index.nbytes / 1024 / 1024,
+                )
+            return index
+
+    def has_index(self, key: IndexKey) -> bool:
+        """索引是否已构建"""
+        return key in self._indexes
+
+    def apply_upsert(self, key: IndexKey, entries: List[IndexEntry]) -> None:
+        """同步写入到已构建的索引"""
+        self._bump(key)
+        index = self._indexes.get(key)
+        if index is None or not entries:
+            return
+        index.upsert(entries)
+        self._enforce_budget(keep=key)
+
+    def apply_remove_ids(self, table: str, ids: Sequence[str]) -> None:
+        """按行ID同步删除（ID 不携带项目信息，需遍历该表的所有索引）"""
+        id_set = set(ids)
+        for key in list(self._versions):
+            if key[0] == table:
+                self._bump(key)
+        for key, index in list(self._indexes.items()):
+            if key[0] == table:
+                index.remove_ids(id_set)
+
+    def apply_remove_chapters(self, key: IndexKey, chapter_numbers: Set[int]) -> None:
+        """按章节号同步删除"""
+        self._bump(key)
+        index = self._indexes.get(key)
+        if index is None:
+            return
+        index.remove_where(lambda row: row.get("chapter_number") in chapter_numbers)
+
+    def invalidate(self, key: IndexKey) -> None:
+        """丢弃索引（无法增量同步的写操作后调用）"""
+        self._bump(key)
+        self._indexes.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """索引占用情况（用于诊断）"""
+        return {
+            "indexes": [
+                {
+                    "table": key[0],
+                    "project_id": key[1],
+                    "rows": len(index),
+                    "ivf": index.uses_ivf,
+                    "bytes": index.nbytes,
+                }
+                for key, index in self._indexes.items()
+            ],
+            "total_bytes": sum(index.nbytes for index in self._indexes.values()),
+            "budget_bytes": self._memory_budget,
+        }
+
+    def _touch(self, key: IndexKey) -> Optional[ProjectVectorIndex]:
+        index = self._indexes.get(key)
+        if index is not None:
+            self._indexes.move_to_end(key)
+        return index
+
+    def _bump(self, key: IndexKey) -> None:
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    @staticmethod
+    def _build(snapshot: IndexSnapshot) -> Optional[ProjectVectorIndex]:
+        ids, rows, matrix = snapshot
+        if matrix.ndim != 2 or not matrix.shape[0] or not matrix.shape[1]:
+            return None
+        index = ProjectVectorIndex(
+            matrix.shape[1],
+            ivf_threshold=settings.vector_index_ivf_threshold,
+            ivf_nprobe=settings.vector_index_ivf_nprobe,
+        )
+        index.load(ids, rows, matrix)
+        return index
+
+    def _enforce_budget(self, keep: IndexKey) -> None:
+        """超出内存预算时按 LRU 淘汰（保留当前正在使用的索引）"""
+        total = sum(index.nbytes for index in self._indexes.values())
+        for key in list(self._indexes):
+            if total <= self._memory_budget:
+                break
+            if key == keep:
+                continue
+            evicted = self._indexes.pop(key)
+            total -= evicted.nbytes
+            logger.info("向量索引超出内存预算，淘汰: table=%s project=%s", key[0], key[1])
+
+
+vector_index_manager = VectorIndexManager()
+
+
+__all__ = [
+    "ChapterRange",
+    "IndexSnapshot",
+    "RowPredicate",
+    "ProjectVectorIndex",
+    "VectorIndexManager",
+    "vector_index_manager",
+]
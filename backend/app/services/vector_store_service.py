@@ -10,12 +10,14 @@ import asyncio
 import json
 import logging
 import math
+import re
 from array import array
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, TypeVar
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar
 
 from ..core.config import settings
+from .lexical_search import build_match_query, fts_rowid, reciprocal_rank_fusion, tokenize_for_index
 
 try:  # noqa: SIM105 - 明确区分依赖缺失的情况
     import libsql_client
@@ -30,6 +32,11 @@ except ImportError:
     np = None  # type: ignore[assignment]
     NUMPY_AVAILABLE = False
 
+if NUMPY_AVAILABLE:
+    from .vector_index import vector_index_manager
+else:  # pragma: no cover - 无 numpy 时不启用进程内索引
+    vector_index_manager = None  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
 
 # P2修复: RAG检索超时和重试配置
@@ -47,6 +54,7 @@ class RetrievedChunk:
     chapter_title: Optional[str]
     score: float
     metadata: Dict[str, Any]
+    chunk_id: Optional[str] = None
 
 
 @dataclass
@@ -62,11 +70,132 @@ class RetrievedSummary:
 # 泛型类型变量，用于统一回退查询逻辑
 T = TypeVar("T", RetrievedChunk, RetrievedSummary)
 
+# 元数据过滤键只允许标识符，用于拼接 JSON 路径
+_METADATA_KEY_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+@dataclass(frozen=True)
+class _QueryFilter:
+    """
+    向量检索的过滤条件
+
+    在排序之前下推到 SQL（向量函数查询与回退全表读取）以及进程内索引，
+    使 top_k 名额只分配给满足条件的行，而不是先取候选再在应用层丢弃。
+    """
+
+    min_chapter: Optional[int] = None
+    max_chapter: Optional[int] = None
+    data_types: Tuple[str, ...] = ()
+    # (键, 值)；值为元组时表示 IN 匹配，None 表示字段不存在或为空
+    metadata: Tuple[Tuple[str, Any], ...] = ()
+
+    @classmethod
+    def build(
+        cls,
+        *,
+        min_chapter: Optional[int] = None,
+        max_chapter: Optional[int] = None,
+        data_types: Optional[Sequence[str]] = None,
+        metadata_filters: Optional[Dict[str, Any]] = None,
+    ) -> "_QueryFilter":
+        metadata: List[Tuple[str, Any]] = []
+        for key, value in (metadata_filters or {}).items():
+            if not _METADATA_KEY_PATTERN.match(key):
+                raise ValueError(f"非法的元数据过滤键: {key!r}")
+            if isinstance(value, dict):
+                raise ValueError(f"元数据过滤值不支持嵌套对象: {key!r}")
+            if isinstance(value, (list, tuple, set, frozenset)):
+                value = tuple(value)
+            metadata.append((key, value))
+        return cls(
+            min_chapter=min_chapter,
+            max_chapter=max_chapter,
+            data_types=tuple(data_types or ()),
+            metadata=tuple(metadata),
+        )
+
+    @property
+    def is_empty(self) -> bool:
+        return (
+            self.min_chapter is None
+            and self.max_chapter is None
+            and not self.data_types
+            and not self.metadata
+        )
+
+    @property
+    def chapter_range(self) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        if self.min_chapter is None and self.max_chapter is None:
+            return None
+        return self.min_chapter, self.max_chapter
+
+    @property
+    def has_metadata_conditions(self) -> bool:
+        return bool(self.data_types or self.metadata)
+
+    def to_sql(self) -> Tuple[str, Dict[str, Any]]:
+        """生成追加在 WHERE 之后的条件（以 AND 开头）与参数"""
+        clauses: List[str] = []
+        params: Dict[str, Any] = {}
+        if self.min_chapter is not None:
+            clauses.append("chapter_number >= :filter_min_chapter")
+            params["filter_min_chapter"] = self.min_chapter
+        if self.max_chapter is not None:
+            clauses.append("chapter_number <= :filter_max_chapter")
+            params["filter_max_chapter"] = self.max_chapter
+
+        conditions: List[Tuple[str, Any]] = list(self.metadata)
+        if self.data_types:
+            conditions.append(("data_type", self.data_types))
+        for idx, (key, value) in enumerate(conditions):
+            column = f"json_extract(metadata, '$.{key}')"
+            if value is None:
+                clauses.append(f"{column} IS NULL")
+            elif isinstance(value, tuple):
+                if not value:
+                    clauses.append("0")
+                    continue
+                names = [f"filter_meta_{idx}_{pos}" for pos in range(len(value))]
+                clauses.append(f"{column} IN ({', '.join(':' + name for name in names)})")
+                params.update({name: self._sql_value(item) for name, item in zip(names, value)})
+            else:
+                clauses.append(f"{column} = :filter_meta_{idx}")
+                params[f"filter_meta_{idx}"] = self._sql_value(value)
+
+        if not clauses:
+            return "", params
+        return "".join(f"\n          AND {clause}" for clause in clauses), params
+
+    def matches_metadata(self, metadata: Dict[str, Any]) -> bool:
+        """应用层判断元数据条件（进程内索引使用，与 to_sql 语义一致）"""
+        if self.data_types and metadata.get("data_type") not in self.data_types:
+            return False
+        for key, value in self.metadata:
+            actual = metadata.get(key)
+            if value is None:
+                if actual is not None:
+                    return False
+            elif isinstance(value, tuple):
+                if actual not in value:
+                    return False
+            elif actual != value:
+                return False
+        return True
+
+    @staticmethod
+    def _sql_value(value: Any) -> Any:
+        # json_extract 将 JSON 布尔值返回为 0/1
+        return int(value) if isinstance(value, bool) else value
+
 
 class VectorStoreService:
     """libsql 向量库操作工具，确保不同小说项目的数据隔离。"""
 
+    # 本进程内已确认 FTS 索引与 rag_chunks 同步的项目（服务按请求实例化，需进程级共享）
+    _lexical_synced_projects: Set[str] = set()
+
     def __init__(self) -> None:
+        self._lexical_available: Optional[bool] = None
         if not settings.vector_store_enabled:
             logger.warning("未开启向量库配置，RAG 检索将被跳过。")
             self._client = None
@@ -121,6 +250,7 @@ class VectorStoreService:
                 chapter_title TEXT,
                 content TEXT NOT NULL,
                 embedding BLOB NOT NULL,
+                embedding_normalized INTEGER NOT NULL DEFAULT 0,
                 metadata TEXT,
                 created_at INTEGER DEFAULT (unixepoch())
             )
@@ -137,6 +267,7 @@ class VectorStoreService:
                 title TEXT NOT NULL,
                 summary TEXT NOT NULL,
                 embedding BLOB NOT NULL,
+                embedding_normalized INTEGER NOT NULL DEFAULT 0,
                 created_at INTEGER DEFAULT (unixepoch())
             )
             """,
@@ -149,6 +280,13 @@ class VectorStoreService:
         try:
             for sql in statements:
                 await self._client.execute(sql)  # type: ignore[union-attr]
+            # 旧库补列：embedding_normalized=1 表示写入时已做 L2 归一化，读取时无需再归一化
+            for table in ("rag_chunks", "rag_summaries"):
+                await self._ensure_column(
+                    table,
+                    "embedding_normalized",
+                    "INTEGER NOT NULL DEFAULT 0",
+                )
             logger.info("已确保向量库表结构存在。")
         except Exception as exc:  # pragma: no cover - 初始化失败时记录日志
             logger.error("创建向量库表结构失败: %s", exc)
@@ -156,6 +294,48 @@ class VectorStoreService:
             self._schema_ready = True
             # 检测向量函数可用性
             await self._check_vector_function_availability()
+            await self._ensure_lexical_schema()
+
+    async def _ensure_column(self, table: str, column: str, definition: str) -> None:
+        """为已存在的表补充新增列（SQLite 不支持 ADD COLUMN IF NOT EXISTS）。"""
+        result = await self._client.execute(f"PRAGMA table_info({table})")  # type: ignore[union-attr]
+        existing = {row.get("name") for row in self._iter_rows(result)}
+        if column in existing:
+            return
+        await self._client.execute(  # type: ignore[union-attr]
+            f"ALTER TABLE {table} ADD COLUMN {column} {definition}"
+        )
+        logger.info("向量库表结构升级: %s 新增列 %s", table, column)
+
+    async def _ensure_lexical_schema(self) -> None:
+        """
+        创建 rag_chunks 的 FTS5 全文索引表
+
+        FTS 行以 chunk_id / project_id（不参与索引）关联 rag_chunks，rowid 由 chunk_id 哈希确定
+        （见 lexical_search.fts_rowid），不依赖 rag_chunks 可能被 VACUUM 重排的隐式 rowid；
+        body 为预先切分好的词项（见 lexical_search.tokenize_for_index）。
+        旧版本按 rag_chunks.rowid 关联的索引表会被删除重建，首次查询各项目时自动回填。
+        SQLite 未编译 FTS5 或配置关闭时，词法检索不可用，混合检索退化为纯向量检索。
+        """
+        if not settings.rag_lexical_search_enabled:
+            self._lexical_available = False
+            return
+        try:
+            result = await self._client.execute("PRAGMA table_info(rag_chunks_fts)")  # type: ignore[union-attr]
+            columns = {row.get("name") for row in self._iter_rows(result)}
+            if columns and "chunk_id" not in columns:
+                await self._client.execute("DROP TABLE rag_chunks_fts")  # type: ignore[union-attr]
+                self._lexical_synced_projects.clear()
+                logger.info("FTS 全文索引表结构已升级，将按项目重建")
+            await self._client.execute(  # type: ignore[union-attr]
+                "CREATE VIRTUAL TABLE IF NOT EXISTS rag_chunks_fts "
+                "USING fts5(body, chunk_id UNINDEXED, project_id UNINDEXED)"
+            )
+        except Exception as exc:
+            self._lexical_available = False
+            logger.warning("创建 FTS5 全文索引失败，词法检索不可用: %s", exc)
+        else:
+            self._lexical_available = True
 
     async def _check_vector_function_availability(self) -> None:
         """
@@ -324,11 +504,20 @@ class VectorStoreService:
         project_id: str,
         embedding: Sequence[float],
         top_k: Optional[int] = None,
+        min_chapter: Optional[int] = None,
+        max_chapter: Optional[int] = None,
+        data_types: Optional[Sequence[str]] = None,
+        metadata_filters: Optional[Dict[str, Any]] = None,
     ) -> List[RetrievedChunk]:
         """
         根据查询向量检索剧情片段，结果已按相似度排序。
 
         P2修复: 增加超时和重试机制，提高检索稳定性。
+
+        过滤条件在排序前生效（SQL 与回退路径一致），返回的 top_k 条均满足条件：
+        - min_chapter / max_chapter: 章节号范围（闭区间）
+        - data_types: metadata.data_type 取值之一
+        - metadata_filters: metadata 字段等值匹配（值为列表时表示取值之一）
         """
         if not self._client or not embedding:
             return []
@@ -338,16 +527,25 @@ class VectorStoreService:
         if top_k <= 0:
             return []
 
+        query_filter = _QueryFilter.build(
+            min_chapter=min_chapter,
+            max_chapter=max_chapter,
+            data_types=data_types,
+            metadata_filters=metadata_filters,
+        )
+        filter_sql, filter_params = query_filter.to_sql()
+
         blob = self._to_f32_blob(embedding)
-        sql = """
+        sql = f"""
         SELECT
+            id,
             content,
             chapter_number,
             chapter_title,
-            COALESCE(metadata, '{}') AS metadata,
+            COALESCE(metadata, '{{}}') AS metadata,
             vector_distance_cosine(embedding, :query) AS distance
         FROM rag_chunks
-        WHERE project_id = :project_id
+        WHERE project_id = :project_id{filter_sql}
         ORDER BY distance ASC
         LIMIT :limit
         """
@@ -357,6 +555,7 @@ class VectorStoreService:
                 project_id=project_id,
                 embedding=embedding,
                 top_k=top_k,
+                query_filter=query_filter,
             )
 
         def _row_mapper(row: Dict[str, Any]) -> RetrievedChunk:
@@ -366,6 +565,7 @@ class VectorStoreService:
                 chapter_title=row.get("chapter_title"),
                 score=row.get("distance", 0.0),
                 metadata=self._parse_metadata(row.get("metadata")),
+                chunk_id=row.get("id"),
             )
 
         return await self._query_with_vector_distance(
@@ -376,6 +576,7 @@ class VectorStoreService:
                 "project_id": project_id,
                 "query": blob,
                 "limit": top_k,
+                **filter_params,
             },
             top_k=top_k,
             row_mapper=_row_mapper,
@@ -388,11 +589,15 @@ class VectorStoreService:
         project_id: str,
         embedding: Sequence[float],
         top_k: Optional[int] = None,
+        min_chapter: Optional[int] = None,
+        max_chapter: Optional[int] = None,
     ) -> List[RetrievedSummary]:
         """
         根据查询向量检索章节摘要列表。
 
         P2修复: 增加超时和重试机制，提高检索稳定性。
+
+        min_chapter / max_chapter 为章节号范围（闭区间），在排序前生效。
         """
         if not self._client or not embedding:
             return []
@@ -402,15 +607,18 @@ class VectorStoreService:
         if top_k <= 0:
             return []
 
+        query_filter = _QueryFilter.build(min_chapter=min_chapter, max_chapter=max_chapter)
+        filter_sql, filter_params = query_filter.to_sql()
+
         blob = self._to_f32_blob(embedding)
-        sql = """
+        sql = f"""
         SELECT
             chapter_number,
             title,
             summary,
             vector_distance_cosine(embedding, :query) AS distance
         FROM rag_summaries
-        WHERE project_id = :project_id
+        WHERE project_id = :project_id{filter_sql}
         ORDER BY distance ASC
         LIMIT :limit
         """
@@ -420,6 +628,7 @@ class VectorStoreService:
                 project_id=project_id,
                 embedding=embedding,
                 top_k=top_k,
+                query_filter=query_filter,
             )
 
         def _row_mapper(row: Dict[str, Any]) -> RetrievedSummary:
@@ -438,6 +647,7 @@ class VectorStoreService:
                 "project_id": project_id,
                 "query": blob,
                 "limit": top_k,
+                **filter_params,
             },
             top_k=top_k,
             row_mapper=_row_mapper,
@@ -452,10 +662,14 @@ class VectorStoreService:
         success_log: str,
         error_log: str,
         item_error_logger: Callable[[Dict[str, Any], Exception], None],
-    ) -> None:
-        """批量写入模板：优先 batch/事务，失败回退逐条写入。"""
+    ) -> bool:
+        """批量写入模板：优先 batch/事务，失败回退逐条写入。
+
+        Returns:
+            是否全部写入成功（回退逐条写入时存在失败条目则为 False）
+        """
         if not self._client or not payload:
-            return
+            return False
 
         # 性能优化：使用批量事务写入
         # libsql支持batch()方法，将多个SQL语句合并为单个网络请求
@@ -472,7 +686,7 @@ class VectorStoreService:
                     success_log,
                     len(payload),
                 )
-                return
+                return True
 
             # 回退：使用事务包装的逐条执行
             await self._client.execute("BEGIN TRANSACTION")  # type: ignore[union-attr]
@@ -485,7 +699,7 @@ class VectorStoreService:
                     success_log,
                     len(payload),
                 )
-                return
+                return True
             except Exception as txn_exc:
                 await self._client.execute("ROLLBACK")  # type: ignore[union-attr]
                 raise txn_exc
@@ -515,6 +729,7 @@ class VectorStoreService:
                     failed_count,
                     len(payload),
                 )
+            return failed_count == 0
 
     async def upsert_chunks(
         self,
@@ -541,6 +756,7 @@ class VectorStoreService:
             chapter_title,
             content,
             embedding,
+            embedding_normalized,
             metadata
         ) VALUES (
             :id,
@@ -550,12 +766,14 @@ class VectorStoreService:
             :chapter_title,
             :content,
             :embedding,
+            1,
             :metadata
         )
         ON CONFLICT(id) DO UPDATE SET
             project_id=excluded.project_id,
             content=excluded.content,
             embedding=excluded.embedding,
+            embedding_normalized=excluded.embedding_normalized,
             metadata=excluded.metadata,
             chapter_title=excluded.chapter_title
         """
@@ -565,7 +783,7 @@ class VectorStoreService:
             payload.append(
                 {
                     **item,
-                    "embedding": self._to_f32_blob(embedding),
+                    "embedding": self._to_f32_blob(embedding, normalize=True),
                     "metadata": json.dumps(item.get("metadata") or {}, ensure_ascii=False),
                 }
             )
@@ -582,13 +800,27 @@ class VectorStoreService:
                 item_exc,
             )
 
-        await self._bulk_upsert(
+        written = await self._bulk_upsert(
             sql=sql,
             payload=payload,
             success_log="批量写入章节片段完成",
             error_log="批量写入 rag_chunks 失败",
             item_error_logger=_item_error_logger,
         )
+        self._sync_index_after_upsert(
+            "rag_chunks",
+            payload,
+            written=written,
+            row_builder=lambda item: {
+                "id": item.get("id"),
+                "content": item.get("content", ""),
+                "chapter_number": item.get("chapter_number", 0),
+                "chapter_title": item.get("chapter_title"),
+                # 索引中保存解析后的元数据，过滤时无需逐行解析 JSON
+                "metadata": self._parse_metadata(item.get("metadata")),
+            },
+        )
+        await self._sync_lexical_after_upsert(payload)
 
     async def upsert_summaries(
         self,
@@ -613,18 +845,21 @@ class VectorStoreService:
             chapter_number,
             title,
             summary,
-            embedding
+            embedding,
+            embedding_normalized
         ) VALUES (
             :id,
             :project_id,
             :chapter_number,
             :title,
             :summary,
-            :embedding
+            :embedding,
+            1
         )
         ON CONFLICT(id) DO UPDATE SET
             summary=excluded.summary,
             embedding=excluded.embedding,
+            embedding_normalized=excluded.embedding_normalized,
             title=excluded.title
         """
 
@@ -634,7 +869,7 @@ class VectorStoreService:
             payload.append(
                 {
                     **item,
-                    "embedding": self._to_f32_blob(embedding),
+                    "embedding": self._to_f32_blob(embedding, normalize=True),
                 }
             )
 
@@ -649,13 +884,54 @@ class VectorStoreService:
                 item_exc,
             )
 
-        await self._bulk_upsert(
+        written = await self._bulk_upsert(
             sql=sql,
             payload=payload,
             success_log="批量写入章节摘要完成",
             error_log="批量写入 rag_summaries 失败",
             item_error_logger=_item_error_logger,
         )
+        self._sync_index_after_upsert(
+            "rag_summaries",
+            payload,
+            written=written,
+            row_builder=lambda item: {
+                "id": item.get("id"),
+                "chapter_number": item.get("chapter_number", 0),
+                "title": item.get("title", ""),
+                "summary": item.get("summary", ""),
+            },
+        )
+
+    def _sync_index_after_upsert(
+        self,
+        table: str,
+        payload: List[Dict[str, Any]],
+        *,
+        written: bool,
+        row_builder: Callable[[Dict[str, Any]], Dict[str, Any]],
+    ) -> None:
+        """将写入同步到进程内向量索引；部分写入失败时直接丢弃索引，下次查询重建。"""
+        if vector_index_manager is None:
+            return
+
+        by_project: Dict[str, List[Any]] = {}
+        for item in payload:
+            by_project.setdefault(item.get("project_id", ""), []).append(item)
+
+        for project_id, items in by_project.items():
+            key = (table, project_id)
+            if not written or not vector_index_manager.has_index(key):
+                # 未构建的索引只需标记变更，下次查询时从库中读取
+                vector_index_manager.invalidate(key)
+                continue
+            vector_index_manager.apply_upsert(
+                key,
+                [
+                    (item["id"], row_builder(item), np.frombuffer(item["embedding"], dtype=np.float32))
+                    for item in items
+                ],
+            )
 
     async def delete_by_chapters(self, project_id: str, chapter_numbers: Sequence[int]) -> None:
         """根据章节编号批量删除对应的上下文数据。"""
@@ -679,8 +955,16 @@ class VectorStoreService:
           AND chapter_number IN ({placeholders})
         """
         try:
+            await self._delete_lexical_rows(
+                f"project_id = :project_id AND chapter_number IN ({placeholders})",
+                params,
+            )
             await self._client.execute(chunk_sql, params)  # type: ignore[union-attr]
             await self._client.execute(summary_sql, params)  # type: ignore[union-attr]
+            if vector_index_manager is not None:
+                chapter_set = set(chapter_numbers)
+                vector_index_manager.apply_remove_chapters(("rag_chunks", project_id), chapter_set)
+                vector_index_manager.apply_remove_chapters(("rag_summaries", project_id), chapter_set)
             logger.info(
                 "已删除章节向量: project=%s chapters=%s",
                 project_id,
@@ -719,7 +1003,9 @@ class VectorStoreService:
                 project_id, before_count
             )
 
-            # 删除 chunks
+            # 删除 chunks（先删 FTS 行，需要按主表中的片段 ID 定位）
+            await self._delete_lexical_rows("project_id = :project_id", {"project_id": project_id})
+            self._lexical_synced_projects.discard(project_id)
             chunk_sql = "DELETE FROM rag_chunks WHERE project_id = :project_id"
             await self._client.execute(chunk_sql, {"project_id": project_id})
 
@@ -727,6 +1013,10 @@ class VectorStoreService:
             summary_sql = "DELETE FROM rag_summaries WHERE project_id = :project_id"
             await self._client.execute(summary_sql, {"project_id": project_id})
 
+            if vector_index_manager is not None:
+                vector_index_manager.invalidate(("rag_chunks", project_id))
+                vector_index_manager.invalidate(("rag_summaries", project_id))
+
             # 验证删除结果
             verify_result = await self._client.execute(count_sql, {"project_id": project_id})
             after_count = 0
@@ -773,15 +1063,18 @@ class VectorStoreService:
         try:
             # 删除没有data_type字段的chunks
             # json_extract返回NULL表示字段不存在
-            sql = """
-            DELETE FROM rag_chunks
-            WHERE project_id = :project_id
+            condition = """
+            project_id = :project_id
             AND (
                 json_extract(metadata, '$.data_type') IS NULL
                 OR json_extract(metadata, '$.data_type') = ''
             )
             """
+            await self._delete_lexical_rows(condition, {"project_id": project_id})
+            sql = f"DELETE FROM rag_chunks WHERE {condition}"
             result = await self._client.execute(sql, {"project_id": project_id})
+            if vector_index_manager is not None:
+                vector_index_manager.invalidate(("rag_chunks", project_id))
             deleted_count = 0
             if hasattr(result, 'rowcount'):
                 deleted_count = result.rowcount
@@ -861,7 +1154,10 @@ class VectorStoreService:
         sql = f"DELETE FROM rag_chunks WHERE id IN ({placeholders})"
 
         try:
+            await self._delete_lexical_rows(f"id IN ({placeholders})", params)
             await self._client.execute(sql, params)  # type: ignore[union-attr]
+            if vector_index_manager is not None:
+                vector_index_manager.apply_remove_ids("rag_chunks", chunk_ids)
             logger.info("已删除 %d 个过时的chunk", len(chunk_ids))
         except Exception as exc:
             logger.warning("按ID删除chunk失败: count=%d error=%s", len(chunk_ids), exc)
@@ -932,22 +1228,391 @@ class VectorStoreService:
             )
             return {}
 
+    # ------------------------------------------------------------------
+    # 词法检索（FTS5）与混合检索
+    # ------------------------------------------------------------------
+
+    async def _execute_statements(self, statements: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """执行多条语句：支持 batch 时合并为一次请求，否则逐条执行"""
+        if not statements:
+            return
+        if hasattr(self._client, "batch"):
+            await self._client.batch(statements)  # type: ignore[union-attr]
+            return
+        for sql, params in statements:
+            await self._client.execute(sql, params)  # type: ignore[union-attr]
+
+    async def _sync_lexical_after_upsert(self, payload: List[Dict[str, Any]]) -> None:
+        """将写入的片段同步到 FTS 索引（按 chunk_id 确定的 rowid 覆盖写入）"""
+        if not self._lexical_available or not payload:
+            return
+        statements: List[Tuple[str, Dict[str, Any]]] = []
+        for item in payload:
+            chunk_id = item.get("id")
+            if not chunk_id:
+                continue
+            row_id = fts_rowid(chunk_id)
+            statements.append(("DELETE FROM rag_chunks_fts WHERE rowid = :row_id", {"row_id": row_id}))
+            statements.append((
+                "INSERT INTO rag_chunks_fts(rowid, body, chunk_id, project_id) "
+                "VALUES (:row_id, :body, :chunk_id, :project_id)",
+                {
+                    "row_id": row_id,
+                    "body": tokenize_for_index(item.get("chapter_title"), item.get("content")),
+                    "chunk_id": chunk_id,
+                    "project_id": item.get("project_id"),
+                },
+            ))
+        try:
+            await self._execute_statements(statements)
+        except Exception as exc:
+            # 索引与主表不一致时，下次词法查询会按项目重建
+            for project_id in {item.get("project_id") for item in payload}:
+                self._lexical_synced_projects.discard(project_id)
+            logger.warning("同步 FTS 全文索引失败: count=%d error=%s", len(payload), exc)
+
+    async def _delete_lexical_rows(self, condition: str, params: Dict[str, Any]) -> None:
+        """删除 rag_chunks 中满足条件的行对应的 FTS 行（须在删除 rag_chunks 之前调用）"""
+        if not self._lexical_available:
+            return
+        try:
+            result = await self._client.execute(  # type: ignore[union-attr]
+                f"SELECT id FROM rag_chunks WHERE {condition}", params
+            )
+            row_ids = [fts_rowid(row["id"]) for row in self._iter_rows(result) if row.get("id")]
+            batch_size = 500
+            for start in range(0, len(row_ids), batch_size):
+                batch = row_ids[start:start + batch_size]
+                placeholders = ",".join(f":r_{idx}" for idx in range(len(batch)))
+                await self._client.execute(  # type: ignore[union-attr]
+                    f"DELETE FROM rag_chunks_fts WHERE rowid IN ({placeholders})",
+                    {f"r_{idx}": row_id for idx, row_id in enumerate(batch)},
+                )
+        except Exception as exc:
+            logger.warning("删除 FTS 全文索引行失败: %s", exc)
+
+    async def rebuild_lexical_index(self, project_id: str) -> int:
+        """
+        按项目重建 FTS 全文索引（用于旧数据回填或修复不一致）
+
+        Returns:
+            写入索引的片段数
+        """
+        if not self._client:
+            return 0
+        await self.ensure_schema()
+        if not self._lexical_available:
+            return 0
+
+        # 按 FTS 表中记录的项目清理，连同主表中已不存在的片段一起移除
+        await self._client.execute(  # type: ignore[union-attr]
+            "DELETE FROM rag_chunks_fts WHERE project_id = :project_id",
+            {"project_id": project_id},
+        )
+        result = await self._client.execute(  # type: ignore[union-attr]
+            "SELECT id, chapter_title, content FROM rag_chunks WHERE project_id = :project_id",
+            {"project_id": project_id},
+        )
+        rows = [row for row in self._iter_rows(result) if row.get("id")]
+        batch_size = 500
+        for start in range(0, len(rows), batch_size):
+            await self._execute_statements([
+                (
+                    "INSERT OR REPLACE INTO rag_chunks_fts(rowid, body, chunk_id, project_id) "
+                    "VALUES (:row_id, :body, :chunk_id, :project_id)",
+                    {
+                        "row_id": fts_rowid(row["id"]),
+                        "body": tokenize_for_index(row.get("chapter_title"), row.get("content")),
+                        "chunk_id": row["id"],
+                        "project_id": project_id,
+                    },
+                )
+                for row in rows[start:start + batch_size]
+            ])
+        self._lexical_synced_projects.add(project_id)
+        logger.info("FTS 全文索引已重建: project=%s chunks=%d", project_id, len(rows))
+        return len(rows)
+
+    async def lexical_search_available(self) -> bool:
+        """词法检索是否可用（已配置开启且 SQLite 支持 FTS5）"""
+        if not self._client:
+            return False
+        await self.ensure_schema()
+        return bool(self._lexical_available)
+
+    async def _ensure_lexical_synced(self, project_id: str) -> bool:
+        """首次词法查询某项目时核对索引与主表的片段 ID 集合，不一致（如升级前入库的数据）则重建"""
+        if project_id in self._lexical_synced_projects:
+            return True
+        try:
+            params = {"project_id": project_id}
+            chunk_result = await self._client.execute(  # type: ignore[union-attr]
+                "SELECT id FROM rag_chunks WHERE project_id = :project_id", params
+            )
+            indexed_result = await self._client.execute(  # type: ignore[union-attr]
+                "SELECT chunk_id, rowid AS row_id FROM rag_chunks_fts WHERE project_id = :project_id",
+                params,
+            )
+            chunk_ids = {row.get("id") for row in self._iter_rows(chunk_result)}
+            indexed = list(self._iter_rows(indexed_result))
+            indexed_ids = {row.get("chunk_id") for row in indexed}
+            misplaced = any(
+                not row.get("chunk_id") or row.get("row_id") != fts_rowid(row["chunk_id"])
+                for row in indexed
+            )
+            if chunk_ids != indexed_ids or len(indexed) != len(indexed_ids) or misplaced:
+                await self.rebuild_lexical_index(project_id)
+            else:
+                self._lexical_synced_projects.add(project_id)
+            return True
+        except Exception as exc:
+            logger.warning("核对 FTS 全文索引失败: project=%s error=%s", project_id, exc)
+            return False
+
+    async def query_chunks_lexical(
+        self,
+        *,
+        project_id: str,
+        query_text: Optional[str] = None,
+        keywords: Optional[Sequence[str]] = None,
+        top_k: Optional[int] = None,
+        min_chapter: Optional[int] = None,
+        max_chapter: Optional[int] = None,
+        data_types: Optional[Sequence[str]] = None,
+        metadata_filters: Optional[Dict[str, Any]] = None,
+    ) -> List[RetrievedChunk]:
+        """
+        基于 FTS5 + bm25 的词法检索，不需要查询向量。
+
+        keywords 中的每个关键词（角色名、地名等）作为短语整体匹配，query_text 拆成二元组任一命中即可。
+        结果的 score 为 bm25 值（越小越相关），过滤条件与 query_chunks 相同。
+        """
+        if not self._client:
+            return []
+
+        await self.ensure_schema()
+        top_k = top_k or settings.vector_top_k_chunks
+        match = build_match_query(query_text, keywords)
+        if top_k <= 0 or not match or not self._lexical_available:
+            return []
+        if not await self._ensure_lexical_synced(project_id):
+            return []
+
+        query_filter = _QueryFilter.build(
+            min_chapter=min_chapter,
+            max_chapter=max_chapter,
+            data_types=data_types,
+            metadata_filters=metadata_filters,
+        )
+        filter_sql, filter_params = query_filter.to_sql()
+        sql = f"""
+        SELECT
+            c.id AS id,
+            c.content AS content,
+            c.chapter_number AS chapter_number,
+            c.chapter_title AS chapter_title,
+            COALESCE(c.metadata, '{{}}') AS metadata,
+            bm25(rag_chunks_fts) AS lexical_score
+        FROM rag_chunks_fts
+        JOIN rag_chunks AS c ON c.id = rag_chunks_fts.chunk_id
+        WHERE rag_chunks_fts MATCH :match
+          AND c.project_id = :project_id{filter_sql}
+        ORDER BY lexical_score ASC
+        LIMIT :limit
+        """
+
+        async def _do_query():
+            return await self._client.execute(  # type: ignore[union-attr]
+                sql,
+                {"match": match, "project_id": project_id, "limit": top_k, **filter_params},
+            )
+
+        try:
+            result = await self._execute_with_retry(_do_query, "RAG词法检索剧情片段")
+        except asyncio.TimeoutError:
+            logger.warning("RAG词法检索剧情片段超时，返回空结果")
+            return []
+        except Exception as exc:
+            logger.warning("词法检索剧情片段失败: %s", exc)
+            return []
+
+        return [
+            RetrievedChunk(
+                content=row.get("content", ""),
+                chapter_number=row.get("chapter_number", 0),
+                chapter_title=row.get("chapter_title"),
+                score=row.get("lexical_score", 0.0),
+                metadata=self._parse_metadata(row.get("metadata")),
+                chunk_id=row.get("id"),
+            )
+            for row in self._iter_rows(result)
+        ]
+
+    async def query_chunks_hybrid(
+        self,
+        *,
+        project_id: str,
+        embedding: Optional[Sequence[float]] = None,
+        query_text: Optional[str] = None,
+        keywords: Optional[Sequence[str]] = None,
+        top_k: Optional[int] = None,
+        candidate_k: Optional[int] = None,
+        rrf_k: Optional[int] = None,
+        min_chapter: Optional[int] = None,
+        max_chapter: Optional[int] = None,
+        data_types: Optional[Sequence[str]] = None,
+        metadata_filters: Optional[Dict[str, Any]] = None,
+    ) -> List[RetrievedChunk]:
+        """
+        向量检索与词法检索并行执行，按倒数排名融合（RRF）合并。
+
+        - 词法检索未启用、不可用（无 FTS5）或没有命中时直接返回 query_chunks 的结果，
+          score 保持原始余弦距离
+        - 只有两路都有结果时才做融合，此时 score 含义改变：为 1 - RRF得分/理论最大值，
+          取值 [0, 1)，只反映排名，越小越相关但不再是余弦距离；
+          metadata 中附带 _rrf_score / _dense_rank / _lexical_rank 便于排查
+        - 未提供 embedding 时只做词法检索（实体查询无需嵌入请求），bm25 值不可与距离比较，
+          score 同样按排名换算为上述 [0, 1) 取值
+        """
+        top_k = top_k or settings.vector_top_k_chunks
+        if top_k <= 0:
+            return []
+        candidate_k = max(candidate_k or top_k * 2, top_k)
+        filters: Dict[str, Any] = {
+            "min_chapter": min_chapter,
+            "max_chapter": max_chapter,
+            "data_types": data_types,
+            "metadata_filters": metadata_filters,
+        }
+
+        async def _dense() -> List[RetrievedChunk]:
+            if not embedding:
+                return []
+            return await self.query_chunks(
+                project_id=project_id, embedding=embedding, top_k=candidate_k, **filters
+            )
+
+        async def _lexical() -> List[RetrievedChunk]:
+            if not query_text and not keywords:
+                return []
+            return await self.query_chunks_lexical(
+                project_id=project_id,
+                query_text=query_text,
+                keywords=keywords,
+                top_k=candidate_k,
+                **filters,
+            )
+
+        dense, lexical = await asyncio.gather(_dense(), _lexical())
+        if not lexical:
+            return dense[:top_k]
+        rankings = [ranking for ranking in (dense, lexical) if ranking]
+        if not rankings:
+            return []
+
+        def _key(chunk: RetrievedChunk) -> Any:
+            return chunk.chunk_id or (chunk.chapter_number, chunk.content)
+
+        by_key: Dict[Any, RetrievedChunk] = {}
+        ranks: Dict[str, Dict[Any, int]] = {"_dense_rank": {}, "_lexical_rank": {}}
+        for name, ranking in (("_dense_rank", dense), ("_lexical_rank", lexical)):
+            for rank, chunk in enumerate(ranking, start=1):
+                key = _key(chunk)
+                by_key.setdefault(key, chunk)
+                ranks[name].setdefault(key, rank)
+
+        k = rrf_k or settings.rag_hybrid_rrf_k
+        fused = reciprocal_rank_fusion(
+            [[_key(chunk) for chunk in ranking] for ranking in rankings],
+            k=k,
+        )
+        max_score = len(rankings) / (k + 1)
+
+        results: List[RetrievedChunk] = []
+        for key, rrf_score in fused[:top_k]:
+            chunk = by_key[key]
+            metadata = {**chunk.metadata, "_rrf_score": rrf_score}
+            for name, positions in ranks.items():
+                if key in positions:
+                    metadata[name] = positions[key]
+            results.append(RetrievedChunk(
+                content=chunk.content,
+                chapter_number=chunk.chapter_number,
+                chapter_title=chunk.chapter_title,
+                score=1.0 - rrf_score / max_score,
+                metadata=metadata,
+                chunk_id=chunk.chunk_id,
+            ))
+
+        logger.debug(
+            "混合检索完成: project=%s dense=%d lexical=%d fused=%d",
+            project_id, len(dense), len(lexical), len(results),
+        )
+        return results
+
     @staticmethod
-    def _to_f32_blob(embedding: Sequence[float]) -> bytes:
-        """将向量浮点列表编码为 libsql 可识别的 float32 二进制。"""
-        return array("f", embedding).tobytes()
+    def _to_f32_blob(embedding: Sequence[float], *, normalize: bool = False) -> bytes:
+        """将向量浮点列表编码为 libsql 可识别的 float32 二进制。
+
+        normalize=True 时先做 L2 归一化（余弦距离与向量长度无关，
+        vector_distance_cosine 结果不变；应用层检索则可省去每次查询的归一化）。
+        """
+        if not normalize:
+            return array("f", embedding).tobytes()
+        if NUMPY_AVAILABLE:
+            values = np.asarray(embedding, dtype=np.float32)
+            norm = float(np.linalg.norm(values))
+            return (values / norm if norm else values).astype(np.float32, copy=False).tobytes()
+        norm = math.sqrt(sum(v * v for v in embedding))
+        return array("f", [v / norm for v in embedding] if norm else embedding).tobytes()
 
     @staticmethod
     def _from_f32_blob(blob: Any) -> List[float]:
-        """将数据库中的 BLOB 解码为浮点列表。"""
+        """将数据库中的 BLOB 解码为浮点列表（无 numpy 时的回退路径）。"""
         if not blob:
             return []
-        if isinstance(blob, memoryview):
-            blob = blob.tobytes()
         data = array("f")
-        data.frombytes(bytes(blob))
+        data.frombytes(blob if isinstance(blob, (bytes, memoryview)) else bytes(blob))
         return list(data)
 
+    @staticmethod
+    def _decode_embedding_matrix(
+        rows: List[Dict[str, Any]],
+    ) -> Tuple[List[Dict[str, Any]], Any]:
+        """
+        将查询结果中的 embedding BLOB 直接解码进预分配的 float32 矩阵，并保证各行已归一化。
+
+        - 每个 BLOB 通过 np.frombuffer 零拷贝视图读取，只在写入矩阵时复制一次
+        - embedding_normalized=1 的行写入时已归一化，只对旧数据做一次向量化归一化
+        - 维度与首个有效向量不一致的行会被跳过；embedding 相关列会从行数据中移除
+
+        Returns:
+            (有效行列表, 形状为 (n, dim) 的矩阵)
+        """
+        blobs = [row.pop("embedding", None) for row in rows]
+        dimension = next((len(blob) // 4 for blob in blobs if blob), 0)
+        if not dimension:
+            return [], np.empty((0, 0), dtype=np.float32)
+
+        matrix = np.empty((len(rows), dimension), dtype=np.float32)
+        legacy = np.zeros(len(rows), dtype=bool)
+        valid_rows: List[Dict[str, Any]] = []
+        for row, blob in zip(rows, blobs):
+            if not blob or len(blob) != dimension * 4:
+                continue
+            position = len(valid_rows)
+            matrix[position] = np.frombuffer(blob, dtype=np.float32)
+            legacy[position] = not row.pop("embedding_normalized", 0)
+            valid_rows.append(row)
+
+        matrix = matrix[:len(valid_rows)]
+        legacy = legacy[:len(valid_rows)]
+        if legacy.any():
+            norms = np.linalg.norm(matrix[legacy], axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix[legacy] /= norms
+        return valid_rows, matrix
+
     @staticmethod
     def _cosine_distance(vec_a: Sequence[float], vec_b: Sequence[float]) -> float:
         """计算余弦距离（1 - similarity），避免除零。"""
@@ -961,112 +1626,99 @@ class VectorStoreService:
         similarity = dot / (norm_a * norm_b)
         return 1.0 - similarity
 
-    @staticmethod
-    def _cosine_distance_batch_numpy(
-        query_vec: Sequence[float],
-        stored_vecs: List[List[float]],
-    ) -> List[float]:
-        """
-        使用numpy批量计算余弦距离（性能优化版）
-
-        相比逐个计算，批量处理可以利用numpy的向量化运算，
-        显著提高大量向量的相似度计算效率。
-
-        Args:
-            query_vec: 查询向量
-            stored_vecs: 存储的向量列表
-
-        Returns:
-            余弦距离列表（1 - similarity），与stored_vecs顺序对应
-        """
-        if not NUMPY_AVAILABLE or not query_vec or not stored_vecs:
-            # 回退到逐个计算
-            return [
-                VectorStoreService._cosine_distance(query_vec, vec)
-                for vec in stored_vecs
-            ]
-
-        # 转换为numpy数组
-        query = np.array(query_vec, dtype=np.float32)
-        stored = np.array(stored_vecs, dtype=np.float32)
-
-        # 计算L2范数
-        query_norm = np.linalg.norm(query)
-        stored_norms = np.linalg.norm(stored, axis=1)
-
-        # 避免除零
-        if query_norm == 0:
-            return [1.0] * len(stored_vecs)
-
-        # 将零范数替换为1以避免除零（这些向量的距离会是1.0）
-        zero_mask = stored_norms == 0
-        stored_norms[zero_mask] = 1.0
-
-        # 归一化
-        query_normalized = query / query_norm
-        stored_normalized = stored / stored_norms[:, np.newaxis]
-
-        # 批量点积计算相似度
-        similarities = np.dot(stored_normalized, query_normalized)
-
-        # 转换为距离并处理零范数情况
-        distances = 1.0 - similarities
-        distances[zero_mask] = 1.0
-
-        return distances.tolist()
-
     async def _query_with_python_similarity(
         self,
         *,
+        table: str,
         project_id: str,
         embedding: Sequence[float],
         top_k: int,
         sql: str,
         row_mapper: Callable[[Dict[str, Any], float], T],
+        query_filter: Optional[_QueryFilter] = None,
     ) -> List[T]:
         """
-        通用的Python回退相似度查询（numpy批量优化版）
+        通用的Python回退相似度查询
 
         当向量数据库不支持原生向量函数时，使用Python/numpy计算余弦距离。
-        优化：批量提取所有向量后使用numpy一次性计算，比逐个计算快10-100倍。
+        默认走进程内向量索引（首次查询构建，之后由写操作增量同步），
+        未启用索引或缺少 numpy 时回退为每次全表读取后批量计算。
 
         Args:
+            table: 表名（用于定位进程内索引）
             project_id: 项目ID
             embedding: 查询向量
             top_k: 返回数量
-            sql: 查询SQL（必须包含embedding列）
+            sql: 查询SQL（必须包含id与embedding列，以 WHERE project_id 条件结尾）
             row_mapper: 行数据转换函数，接收(row_dict, distance)返回结果对象
+            query_filter: 过滤条件（索引路径在检索时过滤，全表路径追加到 SQL）
 
         Returns:
             按相似度排序的结果列表
         """
-        result = await self._client.execute(sql, {"project_id": project_id})  # type: ignore[union-attr]
-
-        # 收集所有行和向量
-        rows_list: List[Dict[str, Any]] = []
-        embeddings_list: List[List[float]] = []
-
-        for row in self._iter_rows(result):
-            stored_embedding = self._from_f32_blob(row.get("embedding"))
-            if stored_embedding:  # 只处理有效向量
-                rows_list.append(row)
-                embeddings_list.append(stored_embedding)
+        query_filter = query_filter or _QueryFilter()
+
+        if vector_index_manager is not None and settings.vector_index_enabled:
+
+            async def _load_snapshot() -> Any:
+                result = await self._client.execute(sql, {"project_id": project_id})  # type: ignore[union-attr]
+                rows, matrix = self._decode_embedding_matrix(list(self._iter_rows(result)))
+                for row in rows:
+                    if "metadata" in row:
+                        row["metadata"] = self._parse_metadata(row["metadata"])
+                return [row.get("id", "") for row in rows], rows, matrix
+
+            index = await vector_index_manager.get_or_build((table, project_id), _load_snapshot)
+            if index is None:
+                return []
+            predicate = None
+            if query_filter.has_metadata_conditions:
+                predicate = lambda row: query_filter.matches_metadata(  # noqa: E731
+                    self._parse_metadata(row.get("metadata"))
+                )
+            hits = index.search(
+                embedding,
+                top_k,
+                chapter_range=query_filter.chapter_range,
+                predicate=predicate,
+            )
+            return [row_mapper(row, distance) for row, distance in hits]
 
-        if not rows_list:
+        filter_sql, filter_params = query_filter.to_sql()
+        result = await self._client.execute(  # type: ignore[union-attr]
+            sql + filter_sql,
+            {"project_id": project_id, **filter_params},
+        )
+        rows = list(self._iter_rows(result))
+
+        if not NUMPY_AVAILABLE:
+            scored: List[T] = []
+            for row in rows:
+                stored_embedding = self._from_f32_blob(row.get("embedding"))
+                if stored_embedding:  # 只处理有效向量
+                    scored.append(row_mapper(row, self._cosine_distance(embedding, stored_embedding)))
+            scored.sort(key=lambda item: item.score)
+            return scored[:top_k]
+
+        valid_rows, matrix = self._decode_embedding_matrix(rows)
+        if not valid_rows:
             return []
 
-        # 使用numpy批量计算所有距离
-        distances = self._cosine_distance_batch_numpy(embedding, embeddings_list)
-
-        # 创建结果对象
-        scored: List[T] = [
-            row_mapper(row, distance)
-            for row, distance in zip(rows_list, distances)
-        ]
+        # 存储向量已归一化：距离 = 1 - 矩阵与单位查询向量的点积
+        query = np.asarray(embedding, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query))
+        if query_norm == 0 or query.shape[0] != matrix.shape[1]:
+            distances = np.ones(len(valid_rows), dtype=np.float32)
+        else:
+            distances = 1.0 - matrix @ (query / query_norm)
 
-        # 按距离排序并返回top_k
-        scored.sort(key=lambda item: item.score)
-        return scored[:top_k]
+        limit = min(top_k, len(valid_rows))
+        if limit < len(valid_rows):
+            best = np.argpartition(distances, limit - 1)[:limit]
+            best = best[np.argsort(distances[best], kind="stable")]
+        else:
+            best = np.argsort(distances, kind="stable")
+        return [row_mapper(valid_rows[int(i)], float(distances[i])) for i in best]
 
     async def _query_chunks_with_python_similarity(
         self,
@@ -1074,18 +1726,20 @@ class VectorStoreService:
         project_id: str,
         embedding: Sequence[float],
         top_k: int,
+        query_filter: Optional[_QueryFilter] = None,
     ) -> List[RetrievedChunk]:
         """使用Python计算相似度查询章节片段（回退模式）"""
         sql = """
         SELECT
+            id,
             content,
             chapter_number,
             chapter_title,
             COALESCE(metadata, '{}') AS metadata,
-            embedding
+            embedding,
+            embedding_normalized
         FROM rag_chunks
-        WHERE project_id = :project_id
-        """
+        WHERE project_id = :project_id"""
 
         def mapper(row: Dict[str, Any], distance: float) -> RetrievedChunk:
             return RetrievedChunk(
@@ -1093,15 +1747,19 @@ class VectorStoreService:
                 chapter_number=row.get("chapter_number", 0),
                 chapter_title=row.get("chapter_title"),
                 score=distance,
-                metadata=self._parse_metadata(row.get("metadata")),
+                # 复制一份，避免调用方修改到索引中缓存的元数据
+                metadata=dict(self._parse_metadata(row.get("metadata"))),
+                chunk_id=row.get("id"),
             )
 
         return await self._query_with_python_similarity(
+            table="rag_chunks",
             project_id=project_id,
             embedding=embedding,
             top_k=top_k,
             sql=sql,
             row_mapper=mapper,
+            query_filter=query_filter,
         )
 
     async def _query_summaries_with_python_similarity(
@@ -1110,17 +1768,19 @@ class VectorStoreService:
         project_id: str,
         embedding: Sequence[float],
         top_k: int,
+        query_filter: Optional[_QueryFilter] = None,
     ) -> List[RetrievedSummary]:
         """使用Python计算相似度查询章节摘要（回退模式）"""
         sql = """
         SELECT
+            id,
             chapter_number,
             title,
             summary,
-            embedding
+            embedding,
+            embedding_normalized
         FROM rag_summaries
-        WHERE project_id = :project_id
-        """
+        WHERE project_id = :project_id"""
 
         def mapper(row: Dict[str, Any], distance: float) -> RetrievedSummary:
             return RetrievedSummary(
@@ -1131,11 +1791,13 @@ class VectorStoreService:
             )
 
         return await self._query_with_python_similarity(
+            table="rag_summaries",
             project_id=project_id,
             embedding=embedding,
             top_k=top_k,
             sql=sql,
             row_mapper=mapper,
+            query_filter=query_filter,
         )
 
     @staticmethod
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""进程级共享HTTP客户端池。
+
+LLM、嵌入、图片下载等调用原先每次请求都新建 AsyncOpenAI / httpx.AsyncClient，
+每次生成都要重新握手 TCP+TLS，连接池用完即丢。这里按
+(用途, base_url, api_key 哈希, 是否模拟浏览器, 客户端选项) 复用客户端：
+
+- keep-alive 长连接，可用时启用 HTTP/2
+- 连接数上限可配置（HTTP_POOL_*）
+- 长时间未使用的客户端自动回收；正在使用中的客户端不会被回收
+- 客户端选项（代理、是否读取系统代理、默认超时）不同的调用方各用各的客户端（如图片供应商按配置区分）
+- 应用关闭时统一关闭（main.lifespan）
+
+客户端与创建它的事件循环绑定，在其他事件循环中获取时会新建客户端。
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:  # httpx 的 HTTP/2 支持依赖 h2
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - 取决于运行环境
+    _HTTP2_AVAILABLE = False
+
+# 两次空闲回收扫描之间的最小间隔（秒）
+_EVICTION_SCAN_INTERVAL = 30.0
+
+
+@dataclass(frozen=True)
+class ClientOptions:
+    """影响客户端构造的选项（作为池键的一部分）"""
+    proxy: Optional[str] = None
+    trust_env: bool = True
+    timeout: Optional[float] = None  # None 表示使用兜底超时
+
+    def describe(self) -> str:
+        proxy = "custom" if self.proxy else ("env" if self.trust_env else "off")
+        return f"proxy={proxy} timeout={self.timeout or 'default'}"
+
+
+_DEFAULT_OPTIONS = ClientOptions()
+
+PoolKey = Tuple[str, str, str, bool, ClientOptions]
+
+
+@dataclass
+class _PoolEntry:
+    """池中的一个客户端"""
+    http_client: httpx.AsyncClient
+    loop: Optional[asyncio.AbstractEventLoop]
+    openai_client: Optional[AsyncOpenAI] = None
+    last_used: float = field(default_factory=time.monotonic)
+    active: int = 0
+
+
+def _hash_api_key(api_key: Optional[str]) -> str:
+    """API Key（及代理地址中的凭据）只以哈希形式出现在键中，避免明文驻留在池的索引里"""
+    if not api_key:
+        return ""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _current_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class HTTPClientPool:
+    """
+    共享HTTP客户端池
+
+    Usage:
+        pool = get_http_client_pool()
+        client = pool.get_openai_client(api_key=key, base_url=url)
+        async with pool.in_use(client):
+            await client.chat.completions.create(...)
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        idle_ttl: Optional[float] = None,
+        http2: Optional[bool] = None,
+    ):
+        self._limits = httpx.Limits(
+            max_connections=max_connections or settings.http_pool_max_connections,
+            max_keepalive_connections=(
+                settings.http_pool_max_keepalive if max_keepalive is None else max_keepalive
+            ),
+            keepalive_expiry=keepalive_expiry or settings.http_pool_keepalive_expiry,
+        )
+        self._idle_ttl = idle_ttl or settings.http_pool_idle_ttl
+        want_http2 = settings.http_pool_http2 if http2 is None else http2
+        self._http2 = want_http2 and _HTTP2_AVAILABLE
+
+        self._entries: Dict[PoolKey, _PoolEntry] = {}
+        # id(客户端对象) -> 键，用于 in_use() 反查
+        self._owners: Dict[int, PoolKey] = {}
+        self._closing: Set[asyncio.Task] = set()
+        self._last_scan = time.monotonic()
+        self._stats = {"created": 0, "reused": 0, "evicted": 0}
+
+    # ------------------------------------------------------------------
+    # 获取客户端
+    # ------------------------------------------------------------------
+
+    def get_http_client(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        *,
+        simulate_browser: bool = False,
+        purpose: str = "http",
+        proxy: Optional[str] = None,
+        trust_env: bool = True,
+        timeout: Optional[float] = None,
+    ) -> httpx.AsyncClient:
+        """
+        获取共享的 httpx.AsyncClient
+
+        超时请在每次请求时通过 timeout= 传入；客户端默认超时仅作兜底。
+        调用方无法逐请求传超时时（如图片供应商），可通过 timeout 指定客户端默认超时。
+
+        Args:
+            base_url: 目标服务地址（仅用于区分连接池，不作为客户端 base_url）
+            api_key: API Key（仅用于区分连接池）
+            simulate_browser: 是否模拟浏览器请求头（不同请求头的调用方不共用连接）
+            purpose: 用途标识，避免不同子系统互相影响
+            proxy: 指定代理地址
+            trust_env: 是否读取系统代理等环境配置
+            timeout: 客户端默认超时（秒）
+        """
+        options = ClientOptions(
+            proxy=_hash_api_key(proxy) if proxy else None,
+            trust_env=trust_env,
+            timeout=timeout,
+        )
+        key = (purpose, (base_url or "").rstrip("/"), _hash_api_key(api_key), simulate_browser, options)
+        # 池键中的代理地址为哈希，构造客户端时使用原始地址
+        return self._acquire(key, ClientOptions(proxy, trust_env, timeout)).http_client
+
+    def get_openai_client(
+        self,
+        *,
+        api_key: str,
+        base_url: Optional[str] = None,
+        default_headers: Optional[Dict[str, str]] = None,
+        simulate_browser: bool = False,
+    ) -> AsyncOpenAI:
+        """
+        获取共享的 AsyncOpenAI 客户端（底层 httpx 连接池同样复用）
+
+        default_headers 由 simulate_browser 决定，因此同一键下保持一致。
+        """
+        key = ("openai", (base_url or "").rstrip("/"), _hash_api_key(api_key), simulate_browser, _DEFAULT_OPTIONS)
+        entry = self._acquire(key)
+        if entry.openai_client is None:
+            entry.openai_client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                default_headers=default_headers or None,
+                http_client=entry.http_client,
+            )
+            self._owners[id(entry.openai_client)] = key
+        return entry.openai_client
+
+    @asynccontextmanager
+    async def in_use(self, client: Any) -> AsyncIterator[None]:
+        """标记客户端正在使用（期间不会被空闲回收），适用于长时间的流式请求"""
+        entry = self._entries.get(self._owners.get(id(client)))  # type: ignore[arg-type]
+        if entry is None:
+            yield
+            return
+        entry.active += 1
+        try:
+            yield
+        finally:
+            entry.active -= 1
+            entry.last_used = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+
+    async def close_all(self) -> None:
+        """关闭所有客户端（应用关闭时调用）"""
+        entries = list(self._entries.values())
+        self._entries.clear()
+        self._owners.clear()
+        for entry in entries:
+            await self._close_entry(entry)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+        if entries:
+            logger.info("共享HTTP客户端池已关闭: clients=%d", len(entries))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取连接池统计"""
+        return {
+            **self._stats,
+            "clients": len(self._entries),
+            "active": sum(1 for entry in self._entries.values() if entry.active),
+            "http2": self._http2,
+        }
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    def _acquire(self, key: PoolKey, options: ClientOptions = _DEFAULT_OPTIONS) -> _PoolEntry:
+        loop = _current_loop()
+        self._evict_idle(loop)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.loop is not loop:
+            # 客户端的连接绑定在创建时的事件循环上，跨循环使用会出错
+            self._drop(key, entry, loop)
+            entry = None
+
+        if entry is None:
+            entry = _PoolEntry(http_client=self._build_http_client(options), loop=loop)
+            self._entries[key] = entry
+            self._owners[id(entry.http_client)] = key
+            self._stats["created"] += 1
+            logger.debug(
+                "共享HTTP客户端已创建: purpose=%s base_url=%s http2=%s %s",
+                key[0], key[1] or "-", self._http2, options.describe(),
+            )
+        else:
+            self._stats["reused"] += 1
+
+        entry.last_used = time.monotonic()
+        return entry
+
+    def _build_http_client(self, options: ClientOptions = _DEFAULT_OPTIONS) -> httpx.AsyncClient:
+        if options.timeout is None:
+            # 兜底超时：调用方应按请求传入更具体的超时
+            timeout = httpx.Timeout(connect=30.0, read=600.0, write=60.0, pool=30.0)
+        else:
+            timeout = httpx.Timeout(options.timeout)
+        return httpx.AsyncClient(
+            timeout=timeout,
+            limits=self._limits,
+            http2=self._http2,
+            follow_redirects=True,
+            proxy=options.proxy,
+            trust_env=options.trust_env,
+        )
+
+    def _evict_idle(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """回收超过空闲时间且未在使用中的客户端"""
+        now = time.monotonic()
+        if now - self._last_scan < _EVICTION_SCAN_INTERVAL:
+            return
+        self._last_scan = now
+        stale = [
+            (key, entry)
+            for key, entry in self._entries.items()
+            if entry.active == 0 and now - entry.last_used > self._idle_ttl
+        ]
+        for key, entry in stale:
+            self._drop(key, entry, loop)
+            self._stats["evicted"] += 1
+        if stale:
+            logger.debug("回收空闲HTTP客户端: count=%d", len(stale))
+
+    def _drop(
+        self,
+        key: PoolKey,
+        entry: _PoolEntry,
+        loop: Optional[asyncio.AbstractEventLoop],
+    ) -> None:
+        """从池中移除客户端，并在其所属事件循环上异步关闭"""
+        self._entries.pop(key, None)
+        self._owners.pop(id(entry.http_client), None)
+        if entry.openai_client is not None:
+            self._owners.pop(id(entry.openai_client), None)
+        if entry.loop is not None and entry.loop is loop and not loop.is_closed():
+            task = loop.create_task(self._close_entry(entry))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        # 其他事件循环（或已关闭的循环）上的客户端无法安全关闭，交给垃圾回收
+
+    @staticmethod
+    async def _close_entry(entry: _PoolEntry) -> None:
+        try:
+            await entry.http_client.aclose()
+        except Exception as exc:  # pragma: no cover - 关闭失败仅记录
+            logger.debug("关闭HTTP客户端失败: %s", exc)
+
+
+_http_client_pool: Optional[HTTPClientPool] = None
+
+
+def get_http_client_pool() -> HTTPClientPool:
+    """获取全局共享HTTP客户端池"""
+    global _http_client_pool
+    if _http_client_pool is None:
+        _http_client_pool = HTTPClientPool()
+    return _http_client_pool
+
+
+async def close_http_client_pool() -> None:
+    """关闭全局共享HTTP客户端池（应用关闭时调用）"""
+    global _http_client_pool
+    if _http_client_pool is not None:
+        pool = _http_client_pool
+        _http_client_pool = None
+        await pool.close_all()
+
+
+__all__ = [
+    "ClientOptions",
+    "HTTPClientPool",
+    "get_http_client_pool",
+    "close_http_client_pool",
+]
@@ -3,10 +3,17 @@
 
 将每次请求的详细信息保存到JSONL文件，方便调试和分析。
 日志文件位置：storage/llm_requests.jsonl（项目根目录的storage）
+
+写入由后台线程完成：请求处理路径只把条目放入内存队列，不做任何文件 I/O。
+当前文件达到条目数或大小上限后轮转为分段文件 llm_requests.1.jsonl、llm_requests.2.jsonl ...
+（数字越大越旧），超出保留段数的最旧分段直接删除，不再整文件重写。
 """
 
 import json
 import logging
+import math
+import queue
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
@@ -14,6 +21,15 @@ from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# 写入队列容量（写入线程跟不上时丢弃新条目，避免内存无限增长）
+_QUEUE_MAX_SIZE = 10000
+
+# 倒序读取文件尾部时的块大小
+_TAIL_BLOCK_SIZE = 64 * 1024
+
+# 队列结束标记
+_STOP = object()
+
 
 class LLMRequestLogger:
     """
@@ -22,13 +38,21 @@ class LLMRequestLogger:
     将每次请求的详细信息保存到JSONL文件，方便调试和分析。
     """
 
-    def __init__(self, log_dir: Optional[str] = None, max_entries: int = 1000):
+    def __init__(
+        self,
+        log_dir: Optional[str] = None,
+        max_entries: int = 1000,
+        segment_entries: int = 250,
+        max_segment_bytes: int = 5 * 1024 * 1024,
+    ):
         """
         初始化日志记录器
 
         Args:
             log_dir: 日志目录，默认为项目根目录的 storage/
-            max_entries: 最大保留条目数，超过后自动清理旧记录
+            max_entries: 最少保留条目数，据此计算保留的分段数
+            segment_entries: 单个分段的最大条目数
+            max_segment_bytes: 单个分段的最大字节数
         """
         if log_dir is None:
             # 使用统一的 storage 目录（项目根目录）
@@ -37,10 +61,25 @@ class LLMRequestLogger:
         self.log_dir = Path(log_dir)
         self.log_file = self.log_dir / "llm_requests.jsonl"
         self.max_entries = max_entries
+        self.segment_entries = max(1, min(segment_entries, max_entries))
+        self.max_segment_bytes = max_segment_bytes
+        self.backup_count = math.ceil(max_entries / self.segment_entries)
 
         # 确保目录存在
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
+        # 文件锁：写入线程的追加/轮转与 get_recent_logs 的读取互斥
+        self._file_lock = threading.Lock()
+        self._active_entries = self._count_lines(self.log_file)
+
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=_QUEUE_MAX_SIZE)
+        self._dropped = 0
+        self._closed = False
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="llm-request-logger", daemon=True
+        )
+        self._writer.start()
+
     def _truncate_content(self, content: str, max_length: int = 200) -> str:
         """截断内容，保留前后部分"""
         if not content or len(content) <= max_length:
@@ -135,46 +174,143 @@ class LLMRequestLogger:
         self._write_log(log_entry)
 
     def _write_log(self, log_entry: Dict):
-        """写入日志文件"""
+        """将日志条目放入写入队列（不阻塞调用方）"""
+        if self._closed:
+            return
         try:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
+            self._queue.put_nowait(log_entry)
+        except queue.Full:
+            self._dropped += 1
+            if self._dropped == 1 or self._dropped % 1000 == 0:
+                logger.warning("LLM请求日志写入队列已满，已丢弃 %d 条", self._dropped)
 
-            # 检查是否需要清理
-            self._cleanup_if_needed()
-        except Exception as e:
-            logger.warning("写入LLM请求日志失败: %s", e)
+    def _writer_loop(self):
+        """写入线程：批量取出队列中的条目追加到当前分段"""
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # 一次取完已排队的条目，合并为一次追加
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
 
-    def _cleanup_if_needed(self):
-        """清理过多的日志条目"""
-        try:
-            if not self.log_file.exists():
+            stop = any(entry is _STOP for entry in batch)
+            entries = [entry for entry in batch if entry is not _STOP]
+            if entries:
+                self._append_entries(entries)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
                 return
 
-            # 读取所有条目
-            with open(self.log_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
+    def _append_entries(self, entries: List[Dict]):
+        """追加条目，达到分段上限时轮转"""
+        try:
+            lines = [json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries]
+            with self._file_lock:
+                index = 0
+                while index < len(lines):
+                    room = max(1, self.segment_entries - self._active_entries)
+                    chunk = lines[index:index + room]
+                    with open(self.log_file, "a", encoding="utf-8") as f:
+                        f.writelines(chunk)
+                        size = f.tell()
+                    self._active_entries += len(chunk)
+                    index += len(chunk)
 
-            # 如果超过最大条目数，保留最新的
-            if len(lines) > self.max_entries:
-                keep_lines = lines[-self.max_entries:]
-                with open(self.log_file, "w", encoding="utf-8") as f:
-                    f.writelines(keep_lines)
-                logger.info("清理LLM请求日志，保留最新 %d 条", self.max_entries)
+                    if self._active_entries >= self.segment_entries or size >= self.max_segment_bytes:
+                        self._rotate()
         except Exception as e:
-            logger.warning("清理LLM请求日志失败: %s", e)
+            logger.warning("写入LLM请求日志失败: %s", e)
+
+    def _segment_path(self, index: int) -> Path:
+        return self.log_dir / f"{self.log_file.stem}.{index}{self.log_file.suffix}"
+
+    def _rotate(self):
+        """将当前文件轮转为分段 1，已有分段依次后移，超出保留数的删除（调用方持有文件锁）"""
+        self._segment_path(self.backup_count).unlink(missing_ok=True)
+        for index in range(self.backup_count - 1, 0, -1):
+            segment = self._segment_path(index)
+            if segment.exists():
+                segment.replace(self._segment_path(index + 1))
+        self.log_file.replace(self._segment_path(1))
+        self._active_entries = 0
+        logger.debug("LLM请求日志已轮转，保留 %d 个分段", self.backup_count)
+
+    @staticmethod
+    def _count_lines(path: Path) -> int:
+        """统计已有文件的行数（仅启动时调用一次）"""
+        if not path.exists():
+            return 0
+        count = 0
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                count += block.count(b"\n")
+        return count
+
+    @staticmethod
+    def _read_tail_lines(path: Path, count: int) -> List[bytes]:
+        """从文件末尾倒序按块读取，返回最后 count 行（不读取整个文件）"""
+        if count <= 0 or not path.exists():
+            return []
+        with open(path, "rb") as f:
+            f.seek(0, 2)
+            position = f.tell()
+            buffer = b""
+            while position > 0 and buffer.count(b"\n") <= count:
+                read_size = min(_TAIL_BLOCK_SIZE, position)
+                position -= read_size
+                f.seek(position)
+                buffer = f.read(read_size) + buffer
+        lines = [line for line in buffer.split(b"\n") if line.strip()]
+        return lines[-count:]
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待写入队列中的条目全部落盘
+
+        Returns:
+            是否在超时前写完
+        """
+        if not self._writer.is_alive():
+            return self._queue.unfinished_tasks == 0
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """停止写入线程（剩余条目写完后退出）"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
 
     def get_recent_logs(self, count: int = 50) -> List[Dict]:
-        """获取最近的日志条目"""
+        """获取最近的日志条目（按时间正序），只读取当前文件及所需分段的尾部"""
         try:
-            if not self.log_file.exists():
-                return []
+            # 先等待已排队的条目落盘，保证能读到刚记录的请求
+            self.flush(timeout=1.0)
 
-            with open(self.log_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
+            collected: List[bytes] = []
+            with self._file_lock:
+                paths = [self.log_file] + [
+                    self._segment_path(index) for index in range(1, self.backup_count + 1)
+                ]
+                for path in paths:
+                    needed = count - len(collected)
+                    if needed <= 0:
+                        break
+                    collected = self._read_tail_lines(path, needed) + collected
 
-            recent_lines = lines[-count:]
-            return [json.loads(line) for line in recent_lines if line.strip()]
+            return [json.loads(line) for line in collected]
         except Exception as e:
             logger.warning("读取LLM请求日志失败: %s", e)
             return []
@@ -190,3 +326,11 @@ def get_request_logger() -> LLMRequestLogger:
     if _request_logger is None:
         _request_logger = LLMRequestLogger()
     return _request_logger
+
+
+def close_request_logger() -> None:
+    """写完剩余日志并停止写入线程（应用关闭时调用）"""
+    global _request_logger
+    if _request_logger is not None:
+        _request_logger.close()
+        _request_logger = None
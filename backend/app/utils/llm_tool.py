@@ -13,15 +13,17 @@
 import json
 import logging
 import os
+import time
 import uuid
 from dataclasses import asdict, dataclass
 from enum import Enum
-from typing import AsyncGenerator, Dict, List, Optional
+from typing import AsyncGenerator, Callable, Dict, List, Optional
 
 import httpx
 from openai import AsyncOpenAI
 
 # 从拆分后的模块导入
+from .http_client_pool import get_http_client_pool
 from .llm_request_logger import get_request_logger
 from .api_format_utils import (
     APIFormat,
@@ -68,6 +70,102 @@ class StreamCollectResult:
     reasoning: str  # 思考过程（如有）
     finish_reason: Optional[str]  # 完成原因
     chunk_count: int  # 收到的chunk数量
+    content_chunk_count: int = 0  # 携带答案/思考文本的chunk数量（近似输出token数）
+    time_to_first_token: Optional[float] = None  # 首个文本chunk到达耗时（秒）
+    duration: float = 0.0  # 整个流的耗时（秒）
+    tokens_per_second: Optional[float] = None  # 首token之后的输出速率（按文本chunk计）
+
+
+# 增量回调：(本次增量文本, 累计答案长度)，在每个答案chunk到达时调用
+ContentTap = Callable[[str, int], None]
+
+
+class StreamCollector:
+    """
+    流式响应收集器
+
+    按收集模式把 chunk 追加到列表缓冲区，结束时一次性拼接，
+    避免长文本逐 chunk 字符串拼接的二次方开销；同时记录首token耗时与输出速率。
+
+    on_content 回调在每个答案增量到达时调用，调用方可据此做早期校验
+    （如检测JSON是否已闭合），回调抛出的异常会中断收集并向上传播。
+    """
+
+    def __init__(
+        self,
+        collect_mode: ContentCollectMode = ContentCollectMode.CONTENT_ONLY,
+        on_content: Optional[ContentTap] = None,
+    ):
+        self.collect_mode = collect_mode
+        self.on_content = on_content
+        self._collect_content = collect_mode in (
+            ContentCollectMode.CONTENT_ONLY, ContentCollectMode.WITH_REASONING
+        )
+        self._collect_reasoning = collect_mode in (
+            ContentCollectMode.WITH_REASONING, ContentCollectMode.REASONING_ONLY
+        )
+        self._content_parts: List[str] = []
+        self._reasoning_parts: List[str] = []
+        self.content_length = 0
+        self.reasoning_length = 0
+        self.chunk_count = 0
+        self.content_chunk_count = 0
+        self.finish_reason: Optional[str] = None
+        self._started_at = time.perf_counter()
+        self._first_token_at: Optional[float] = None
+        self._last_token_at: Optional[float] = None
+
+    def feed(self, chunk: Dict[str, Optional[str]]) -> None:
+        """处理一个流式chunk"""
+        self.chunk_count += 1
+        content = chunk.get("content")
+        reasoning = chunk.get("reasoning_content")
+
+        if content or reasoning:
+            now = time.perf_counter()
+            if self._first_token_at is None:
+                self._first_token_at = now
+            self._last_token_at = now
+            self.content_chunk_count += 1
+
+        if content and self._collect_content:
+            self._content_parts.append(content)
+            self.content_length += len(content)
+            if self.on_content is not None:
+                self.on_content(content, self.content_length)
+
+        if reasoning and self._collect_reasoning:
+            self._reasoning_parts.append(reasoning)
+            self.reasoning_length += len(reasoning)
+
+        if chunk.get("finish_reason"):
+            self.finish_reason = chunk["finish_reason"]
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        if self._first_token_at is None:
+            return None
+        return self._first_token_at - self._started_at
+
+    def result(self) -> StreamCollectResult:
+        """拼接缓冲区并生成收集结果"""
+        duration = time.perf_counter() - self._started_at
+        tokens_per_second = None
+        if self._first_token_at is not None and self.content_chunk_count > 1:
+            generation_time = self._last_token_at - self._first_token_at
+            if generation_time > 0:
+                tokens_per_second = (self.content_chunk_count - 1) / generation_time
+
+        return StreamCollectResult(
+            content="".join(self._content_parts),
+            reasoning="".join(self._reasoning_parts),
+            finish_reason=self.finish_reason,
+            chunk_count=self.chunk_count,
+            content_chunk_count=self.content_chunk_count,
+            time_to_first_token=self.time_to_first_token,
+            duration=duration,
+            tokens_per_second=tokens_per_second,
+        )
 
 
 class LLMClient:
@@ -122,10 +220,12 @@ class LLMClient:
                 "Sec-Fetch-Site": "same-origin",
             }
 
-        self._client = AsyncOpenAI(
+        # 复用进程级共享客户端（keep-alive 连接池），避免每次生成都重新握手
+        self._client: AsyncOpenAI = get_http_client_pool().get_openai_client(
             api_key=key,
             base_url=url,
-            default_headers=default_headers if default_headers else None
+            default_headers=default_headers if default_headers else None,
+            simulate_browser=simulate_browser,
         )
 
     def _get_anthropic_headers(self) -> Dict[str, str]:
@@ -219,8 +319,9 @@ class LLMClient:
             request_id, endpoint, model
         )
 
-        # 用于收集响应信息
-        collected_content = ""
+        # 用于收集响应信息（列表缓冲，结束时再拼接）
+        collected_parts: List[str] = []
+        collected_length = 0
         chunk_count = 0
 
         try:
@@ -235,22 +336,21 @@ class LLMClient:
                 write=30.0,
                 pool=10.0
             )
-            # 配置连接限制，避免连接耗尽
-            limits = httpx.Limits(
-                max_keepalive_connections=5,
-                max_connections=10,
-                keepalive_expiry=30.0
+            # 复用共享连接池（keep-alive，可用时启用HTTP/2）
+            pool = get_http_client_pool()
+            client = pool.get_http_client(
+                self._base_url,
+                self._api_key,
+                simulate_browser=self._simulate_browser,
+                purpose="anthropic",
             )
-            async with httpx.AsyncClient(
-                timeout=timeout_config,
-                limits=limits,
-                http2=True,  # 启用HTTP/2，更稳定的连接复用
-            ) as client:
+            async with pool.in_use(client):
                 async with client.stream(
                     'POST',
                     endpoint,
                     headers=headers,
-                    json=payload
+                    json=payload,
+                    timeout=timeout_config,
                 ) as response:
                     if response.status_code != 200:
                         error_text = await response.aread()
@@ -289,7 +389,8 @@ class LLMClient:
                                     text = delta.get('text', '')
                                     if text:
                                         chunk_count += 1
-                                        collected_content += text
+                                        collected_parts.append(text)
+                                        collected_length += len(text)
                                         yield {
                                             "content": text,
                                             "finish_reason": None,
@@ -315,13 +416,13 @@ class LLMClient:
             # 请求成功，记录日志
             req_logger.log_success(
                 log_entry,
-                response_length=len(collected_content),
+                response_length=collected_length,
                 chunk_count=chunk_count,
-                response_preview=collected_content,
+                response_preview="".join(collected_parts),
             )
             logger.info(
                 "Anthropic API成功[%s]: chunks=%d, length=%d",
-                request_id, chunk_count, len(collected_content)
+                request_id, chunk_count, collected_length
             )
 
         except httpx.TimeoutException:
@@ -407,8 +508,9 @@ class LLMClient:
             extra_params={"top_p": top_p, "response_format": response_format} if (top_p or response_format) else None,
         )
 
-        # 用于收集响应信息
-        collected_content = ""
+        # 用于收集响应信息（列表缓冲，结束时再拼接）
+        collected_parts: List[str] = []
+        collected_length = 0
         chunk_count = 0
 
         try:
@@ -425,39 +527,41 @@ class LLMClient:
                 https_proxy,
                 all_proxy
             )
-            stream = await self._client.with_options(timeout=float(timeout)).chat.completions.create(**payload)
-            async for chunk in stream:
-                if not chunk.choices:
-                    continue
-                choice = chunk.choices[0]
-
-                # 支持DeepSeek R1等模型的reasoning_content字段
-                result = {
-                    "content": choice.delta.content,
-                    "finish_reason": choice.finish_reason,
-                }
-
-                # 收集响应内容
-                if choice.delta.content:
-                    chunk_count += 1
-                    collected_content += choice.delta.content
-
-                # 检查是否有reasoning_content（DeepSeek R1特有）
-                if hasattr(choice.delta, 'reasoning_content') and choice.delta.reasoning_content:
-                    result["reasoning_content"] = choice.delta.reasoning_content
-
-                yield result
+            async with get_http_client_pool().in_use(self._client):
+                stream = await self._client.with_options(timeout=float(timeout)).chat.completions.create(**payload)
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+
+                    # 支持DeepSeek R1等模型的reasoning_content字段
+                    result = {
+                        "content": choice.delta.content,
+                        "finish_reason": choice.finish_reason,
+                    }
+
+                    # 收集响应内容
+                    if choice.delta.content:
+                        chunk_count += 1
+                        collected_parts.append(choice.delta.content)
+                        collected_length += len(choice.delta.content)
+
+                    # 检查是否有reasoning_content（DeepSeek R1特有）
+                    if hasattr(choice.delta, 'reasoning_content') and choice.delta.reasoning_content:
+                        result["reasoning_content"] = choice.delta.reasoning_content
+
+                    yield result
 
             # 请求成功，记录日志
             req_logger.log_success(
                 log_entry,
-                response_length=len(collected_content),
+                response_length=collected_length,
                 chunk_count=chunk_count,
-                response_preview=collected_content,
+                response_preview="".join(collected_parts),
             )
             logger.info(
                 "OpenAI API成功[%s]: chunks=%d, length=%d",
-                request_id, chunk_count, len(collected_content)
+                request_id, chunk_count, collected_length
             )
 
         except Exception as e:
@@ -551,6 +655,7 @@ class LLMClient:
         timeout: int = 120,
         collect_mode: ContentCollectMode = ContentCollectMode.CONTENT_ONLY,
         log_chunks: bool = False,
+        on_content: Optional[ContentTap] = None,
         **kwargs,
     ) -> StreamCollectResult:
         """
@@ -566,15 +671,13 @@ class LLMClient:
             timeout: 超时时间（秒）
             collect_mode: 收集模式
             log_chunks: 是否记录chunk日志（仅前3个）
+            on_content: 答案增量回调 (delta, 累计长度)，用于早期校验，抛出异常可提前中断
             **kwargs: 其他参数
 
         Returns:
-            StreamCollectResult: 收集结果
+            StreamCollectResult: 收集结果（含首token耗时、输出速率）
         """
-        content = ""
-        reasoning = ""
-        finish_reason = None
-        chunk_count = 0
+        collector = StreamCollector(collect_mode, on_content=on_content)
 
         try:
             async for chunk in self.stream_chat(
@@ -587,27 +690,15 @@ class LLMClient:
                 timeout=timeout,
                 **kwargs,
             ):
-                chunk_count += 1
-
                 # 可选的日志记录
-                if log_chunks and chunk_count <= 3:
-                    logger.debug("收到第 %d 个 chunk: %s", chunk_count, chunk)
-
-                # 根据收集模式决定收集哪些内容
-                if collect_mode in (ContentCollectMode.CONTENT_ONLY, ContentCollectMode.WITH_REASONING):
-                    if chunk.get("content"):
-                        content += chunk["content"]
+                if log_chunks and collector.chunk_count < 3:
+                    logger.debug("收到第 %d 个 chunk: %s", collector.chunk_count + 1, chunk)
 
-                if collect_mode in (ContentCollectMode.WITH_REASONING, ContentCollectMode.REASONING_ONLY):
-                    if chunk.get("reasoning_content"):
-                        reasoning += chunk["reasoning_content"]
-
-                if chunk.get("finish_reason"):
-                    finish_reason = chunk["finish_reason"]
+                collector.feed(chunk)
         except Exception as e:
             logger.error(
                 "stream_and_collect error after %d chunks: model=%s error_type=%s error=%s",
-                chunk_count,
+                collector.chunk_count,
                 model,
                 type(e).__name__,
                 str(e),
@@ -615,12 +706,7 @@ class LLMClient:
             )
             raise
 
-        return StreamCollectResult(
-            content=content,
-            reasoning=reasoning,
-            finish_reason=finish_reason,
-            chunk_count=chunk_count,
-        )
+        return collector.result()
 
     @classmethod
     def create_from_config(
@@ -6,6 +6,8 @@ export interface GeneratedImageInfo {
   file_name: string;
   file_path: string;
   url: string;
+  thumbnail_url?: string | null;
+  preview_url?: string | null;
   scene_id: number;
   panel_id?: string | null;
   image_type?: 'panel' | 'page' | string;
@@ -149,7 +149,7 @@ export const MangaStoryboardTab: React.FC<MangaStoryboardTabProps> = ({
                 </div>
                 <a href={resolveAssetUrl(pageImage.url)} target="_blank" rel="noreferrer">
                   <img
-                    src={resolveAssetUrl(pageImage.url)}
+                    src={resolveAssetUrl(pageImage.preview_url || pageImage.url)}
                     alt={`page-${page.page_number}`}
                     loading="lazy"
                     decoding="async"
@@ -174,7 +174,7 @@ export const MangaStoryboardTab: React.FC<MangaStoryboardTabProps> = ({
                           title={`image_id=${image.id}`}
                         >
                           <img
-                            src={resolveAssetUrl(image.url)}
+                            src={resolveAssetUrl(image.thumbnail_url || image.url)}
                             alt={`thumb-${image.id}`}
                             loading="lazy"
                             decoding="async"
@@ -235,7 +235,7 @@ export const MangaStoryboardTab: React.FC<MangaStoryboardTabProps> = ({
                                       className="block h-full w-full"
                                     >
                                       <img
-                                        src={resolveAssetUrl(image.url)}
+                                        src={resolveAssetUrl(image.preview_url || image.url)}
                                         alt={panel.panel_id}
                                         loading="lazy"
                                         decoding="async"
@@ -308,7 +308,7 @@ export const MangaStoryboardTab: React.FC<MangaStoryboardTabProps> = ({
                         className="mb-2 block"
                       >
                         <img
-                          src={resolveAssetUrl(image.url)}
+                          src={resolveAssetUrl(image.preview_url || image.url)}
                           alt={panel.panel_id}
                           loading="lazy"
                           decoding="async"
@@ -334,7 +334,7 @@ export const MangaStoryboardTab: React.FC<MangaStoryboardTabProps> = ({
                               title={`image_id=${item.id}`}
                             >
                               <img
-                                src={resolveAssetUrl(item.url)}
+                                src={resolveAssetUrl(item.thumbnail_url || item.url)}
                                 alt={`thumb-${item.id}`}
                                 loading="lazy"
                                 decoding="async"
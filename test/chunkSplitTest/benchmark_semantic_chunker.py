@@ -0,0 +1,152 @@
+"""
+语义分块算法性能基准
+
+对比三种实现的分块结果与耗时：
+1. reference: 完整相似度矩阵 + 逐点前缀和 + 逐点动态规划（原实现）
+2. full:      完整相似度矩阵 + 向量化前缀和 + 向量化动态规划
+3. banded:    带状相似度（只计算 max_chunk_sentences 以内的句对）+ 向量化动态规划
+
+用法:
+    python benchmark_semantic_chunker.py
+    python benchmark_semantic_chunker.py --sizes 100 300 1000 --dim 768 --repeat 5
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# 添加项目路径
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root / "backend"))
+
+import numpy as np
+
+from app.services.rag_common.semantic_chunker import (
+    SemanticChunker,
+    SemanticChunkConfig,
+    ChunkResult,
+)
+
+MODES: Dict[str, Dict[str, bool]] = {
+    "reference": {"vectorized_dp": False, "banded_similarity": False},
+    "full": {"vectorized_dp": True, "banded_similarity": False},
+    "banded": {"vectorized_dp": True, "banded_similarity": True},
+}
+
+
+def make_chapter(n: int, dim: int, seed: int) -> Tuple[List[str], np.ndarray]:
+    """
+    生成模拟章节：若干话题段落，同一话题内的句子嵌入相近
+
+    Returns:
+        (句子列表, 嵌入矩阵)
+    """
+    rng = np.random.default_rng(seed)
+    sentences: List[str] = []
+    embeddings: List[np.ndarray] = []
+
+    while len(sentences) < n:
+        topic = rng.normal(size=dim)
+        for _ in range(int(rng.integers(3, 15))):
+            if len(sentences) >= n:
+                break
+            sentences.append("字" * int(rng.integers(15, 90)))
+            embeddings.append(topic + rng.normal(scale=0.8, size=dim))
+
+    return sentences, np.asarray(embeddings)
+
+
+def run_mode(
+    chunker: SemanticChunker,
+    sentences: List[str],
+    embeddings: np.ndarray,
+    config: SemanticChunkConfig,
+    repeat: int,
+) -> Tuple[List[ChunkResult], float]:
+    """运行指定配置，返回分块结果与最短耗时（毫秒）"""
+    best = float("inf")
+    results: List[ChunkResult] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = chunker.chunk_text_sync("", embeddings, sentences=sentences, config=config)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return results, best
+
+
+def compare(reference: List[ChunkResult], other: List[ChunkResult]) -> Tuple[bool, float]:
+    """比较切分边界是否一致，并返回密度得分的最大偏差"""
+    ref_bounds = [(c.start_sentence_idx, c.end_sentence_idx) for c in reference]
+    other_bounds = [(c.start_sentence_idx, c.end_sentence_idx) for c in other]
+    if ref_bounds != other_bounds:
+        return False, float("nan")
+    max_diff = max(
+        (abs(a.density_score - b.density_score) for a, b in zip(reference, other)),
+        default=0.0,
+    )
+    return True, max_diff
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="语义分块算法性能基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 150, 300, 600])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seeds", type=int, default=3, help="每个规模的随机章节数")
+    parser.add_argument("--max-sentences", type=int, default=20)
+    args = parser.parse_args()
+
+    base_config = SemanticChunkConfig(max_chunk_sentences=args.max_sentences)
+    chunker = SemanticChunker(config=base_config)
+    mismatches = 0
+
+    print("=" * 78)
+    print(f"语义分块基准 (dim={args.dim}, max_sentences={args.max_sentences}, repeat={args.repeat})")
+    print("=" * 78)
+    print(f"{'句子数':>6} {'模式':<10} {'耗时(ms)':>10} {'加速比':>8} {'块数':>6} {'边界一致':>8} {'得分偏差':>10}")
+    print("-" * 78)
+
+    for n in args.sizes:
+        timings: Dict[str, float] = {name: 0.0 for name in MODES}
+        chunk_counts: Dict[str, int] = {name: 0 for name in MODES}
+        identical: Dict[str, bool] = {name: True for name in MODES}
+        deviation: Dict[str, float] = {name: 0.0 for name in MODES}
+
+        for seed in range(args.seeds):
+            sentences, embeddings = make_chapter(n, args.dim, seed)
+            outputs: Dict[str, List[ChunkResult]] = {}
+            for name, flags in MODES.items():
+                config = replace(base_config, **flags)
+                outputs[name], elapsed = run_mode(chunker, sentences, embeddings, config, args.repeat)
+                timings[name] += elapsed
+                chunk_counts[name] += len(outputs[name])
+
+            for name in MODES:
+                same, diff = compare(outputs["reference"], outputs[name])
+                if not same:
+                    identical[name] = False
+                    mismatches += 1
+                elif diff > deviation[name]:
+                    deviation[name] = diff
+
+        for name in MODES:
+            avg = timings[name] / args.seeds
+            speedup = timings["reference"] / timings[name] if timings[name] else float("inf")
+            print(
+                f"{n:>6} {name:<10} {avg:>10.2f} {speedup:>7.1f}x "
+                f"{chunk_counts[name] / args.seeds:>6.1f} "
+                f"{'是' if identical[name] else '否':>8} {deviation[name]:>10.2e}"
+            )
+        print("-" * 78)
+
+    if mismatches:
+        print(f"[警告] {mismatches} 个章节的切分边界与原实现不一致")
+        return 1
+    print("所有模式的切分边界与原实现一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())